@@ -6,6 +6,7 @@ from clinical_mdr_api.domain_repositories.concepts.activities.activity_repositor
     _get_display_version,
 )
 from clinical_mdr_api.domain_repositories.concepts.concept_generic_repository import (
+    CONCEPT_FULLTEXT_SEARCH,
     ConceptGenericRepository,
 )
 from clinical_mdr_api.domain_repositories.models._utils import ListDistinct
@@ -57,6 +58,7 @@ from clinical_mdr_api.models.concepts.activities.activity_item import (
     CompactOdmItemGroup,
     CompactUnitDefinition,
 )
+from clinical_mdr_api.repositories._utils import FullTextIndex
 from common.config import settings
 from common.exceptions import BusinessLogicException
 from common.utils import convert_to_datetime, version_string_to_tuple
@@ -68,6 +70,17 @@ class ActivityInstanceRepository(ConceptGenericRepository[ActivityInstanceAR]):
     aggregate_class = ActivityInstanceAR
     value_object_class = ActivityInstanceVO
     return_model = ActivityInstance
+    fulltext_search = CONCEPT_FULLTEXT_SEARCH.extended(
+        FullTextIndex(
+            name="fulltext_ConceptValue",
+            aliases=frozenset({"topic_code", "adam_param_code", "legacy_description"}),
+        ),
+        FullTextIndex(
+            name="fulltext_ConceptValue",
+            aliases=frozenset({"activity_name"}),
+            seed="MATCH (node)-[:HAS_GROUPING]->(:ActivityGrouping)<-[:HAS_ACTIVITY]-({variable}) RETURN {variable}",
+        ),
+    )
 
     def _create_new_value_node(self, ar: ActivityInstanceAR) -> ActivityInstanceValue:
         value_node: ActivityInstanceValue = super()._create_new_value_node(ar=ar)
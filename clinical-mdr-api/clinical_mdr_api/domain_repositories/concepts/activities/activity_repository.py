@@ -3,6 +3,7 @@ from typing import Any
 from neomodel import db
 
 from clinical_mdr_api.domain_repositories.concepts.concept_generic_repository import (
+    CONCEPT_FULLTEXT_SEARCH,
     ConceptGenericRepository,
 )
 from clinical_mdr_api.domain_repositories.concepts.utils import (
@@ -42,6 +43,7 @@ from clinical_mdr_api.repositories._utils import (
     CypherQueryBuilder,
     FilterDict,
     FilterOperator,
+    FullTextIndex,
     validate_filters_and_add_search_string,
 )
 from common.config import settings
@@ -82,6 +84,37 @@ class ActivityRepository(ConceptGenericRepository[ActivityAR]):
     value_class = ActivityValue
     return_model = Activity
     filter_query_parameters: dict[Any, Any] = {}
+    fulltext_search = CONCEPT_FULLTEXT_SEARCH.extended(
+        FullTextIndex(
+            name="fulltext_ConceptValue",
+            aliases=frozenset(
+                {
+                    "synonyms",
+                    "request_rationale",
+                    "contact_person",
+                    "reason_for_rejecting",
+                }
+            ),
+        ),
+        # The names of the groups and subgroups of the groupings
+        FullTextIndex(
+            name="fulltext_ConceptValue",
+            aliases=frozenset({"activity_groupings"}),
+            seed="MATCH (node)-[:HAS_GROUP|IN_GROUP]-(:ActivityValidGroup)<-[:IN_SUBGROUP]-(:ActivityGrouping)"
+            "<-[:HAS_GROUPING]-({variable}) RETURN {variable}",
+        ),
+        FullTextIndex(
+            name="fulltext_ConceptRoot",
+            aliases=frozenset({"replaced_by_activity"}),
+            seed="MATCH (node)<-[:REPLACED_BY_ACTIVITY]-({variable}) RETURN {variable}",
+        ),
+        FullTextIndex(
+            name="fulltext_StudyValue",
+            aliases=frozenset({"requester_study_id"}),
+            seed="MATCH (node)-[:HAS_STUDY_ACTIVITY]->(:StudyActivity)-[:HAS_SELECTED_ACTIVITY]-(:ActivityValue)"
+            "<-[:HAS_VERSION]-(:ActivityRoot)-[:HAS_VERSION]->({variable}) RETURN {variable}",
+        ),
+    )
 
     def _create_aggregate_root_instance_from_cypher_result(
         self, input_dict: dict[str, Any]
@@ -0,0 +1,483 @@
+"""
+Set-based cascade of a versioning action to the concepts linked to another concept.
+
+The whole set of linked concepts is collected first, with the latest version of each,
+and the versioning steps are validated against it before anything is written.
+The versions are then moved `settings.cascade_chunk_size` concepts per statement:
+    1. new value nodes, for the concepts whose data changes with the cascade,
+    2. the HAS_VERSION relationships of all steps, closing the previous versions,
+       and the LATEST, LATEST_DRAFT, LATEST_FINAL and LATEST_RETIRED relationships.
+
+The HAS_VERSION relationships are the same as the ones written by the versioning actions
+of the aggregates, one per step, with the same version numbers and change descriptions.
+All statements run in the transaction of the caller, so a failure rolls the whole cascade back.
+"""
+
+import dataclasses
+import datetime
+import logging
+from typing import Any, Callable, Iterable, Mapping, Sequence
+
+from neomodel import db
+
+from clinical_mdr_api.domain_repositories.concepts.activities.activity_instance_repository import (
+    ActivityInstanceRepository,
+)
+from clinical_mdr_api.domain_repositories.concepts.concept_generic_repository import (
+    ConceptGenericRepository,
+)
+from clinical_mdr_api.domains.enums import LibraryItemStatus
+from clinical_mdr_api.domains.versioned_object_aggregate import (
+    LibraryItemMetadataVO,
+    VersioningActionMixin,
+)
+from common.config import settings
+from common.exceptions import BusinessLogicException, NotFoundException
+from common.telemetry import trace_calls
+from common.utils import chunks, convert_to_datetime
+
+log = logging.getLogger(__name__)
+
+LATEST_RELATIONSHIPS = {
+    LibraryItemStatus.DRAFT: "LATEST_DRAFT",
+    LibraryItemStatus.FINAL: "LATEST_FINAL",
+    LibraryItemStatus.RETIRED: "LATEST_RETIRED",
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class VersioningStep:
+    status: LibraryItemStatus
+    change_description: str
+    # Statuses the concept must have before the step, and the error raised otherwise
+    from_statuses: tuple[LibraryItemStatus, ...]
+    error: str
+    # The step links the concept to its new value node, when one is created
+    edits: bool = False
+
+    def apply(
+        self, item_metadata: LibraryItemMetadataVO, author_id: str
+    ) -> LibraryItemMetadataVO:
+        BusinessLogicException.raise_if(
+            item_metadata.status not in self.from_statuses, msg=self.error
+        )
+        new_version: Callable[..., LibraryItemMetadataVO] = {
+            LibraryItemStatus.DRAFT: item_metadata.new_draft_version,
+            LibraryItemStatus.FINAL: item_metadata.new_final_version,
+            LibraryItemStatus.RETIRED: item_metadata.new_retired_version,
+        }[self.status]
+        return new_version(
+            author_id=author_id, change_description=self.change_description
+        )
+
+
+# pylint: disable=protected-access
+NEW_VERSION = VersioningStep(
+    LibraryItemStatus.DRAFT,
+    VersioningActionMixin._NEW_VERSION_LABEL,
+    (LibraryItemStatus.FINAL,),
+    "New draft version can be created only for FINAL versions.",
+)
+APPROVE = VersioningStep(
+    LibraryItemStatus.FINAL,
+    VersioningActionMixin._FINAL_VERSION_LABEL,
+    (LibraryItemStatus.DRAFT,),
+    "Only DRAFT version can be approved.",
+)
+INACTIVATE = VersioningStep(
+    LibraryItemStatus.RETIRED,
+    VersioningActionMixin._RETIRED_VERSION_LABEL,
+    (LibraryItemStatus.FINAL,),
+    "Cannot retire draft version.",
+)
+REACTIVATE = VersioningStep(
+    LibraryItemStatus.FINAL,
+    VersioningActionMixin._REACTIVATED_VERSION_LABEL,
+    (LibraryItemStatus.RETIRED,),
+    "Only RETIRED version can be reactivated.",
+)
+CASCADE_EDIT = VersioningStep(
+    LibraryItemStatus.DRAFT,
+    "Cascade edit",
+    (LibraryItemStatus.DRAFT,),
+    "The object isn't in draft status.",
+    edits=True,
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class LatestVersion:
+    uid: str
+    item_metadata: LibraryItemMetadataVO
+    is_library_editable: bool
+
+
+class ConceptCascade:
+    """Applies versioning steps to many concepts of one repository in a bounded number of statements"""
+
+    def __init__(
+        self,
+        repository: ConceptGenericRepository,
+        author_id: str,
+        chunk_size: int | None = None,
+    ):
+        self.repository = repository
+        self.root_label = repository.root_class.__label__
+        self.value_label = repository.value_class.__label__
+        self.author_id = author_id
+        self.chunk_size = chunk_size or settings.cascade_chunk_size
+
+    @trace_calls
+    def run(self, uids: Iterable[str], steps: Sequence[VersioningStep]) -> int:
+        """Applies the steps to the concepts, returns the number of concepts touched"""
+
+        latest_versions = self._collect(uids)
+        rows = [self._version_row(latest, steps) for latest in latest_versions]
+        self._write(rows, new_value_ids={})
+        return len(rows)
+
+    @trace_calls
+    def soft_delete(self, uids: Iterable[str]) -> int:
+        """Soft deletes the concepts that were never approved, returns the number of concepts touched"""
+
+        latest_versions = self._collect(uids)
+        for latest in latest_versions:
+            BusinessLogicException.raise_if(
+                latest.item_metadata.major_version != 0, msg="Object has been accepted"
+            )
+
+        for chunk in chunks(
+            [latest.uid for latest in latest_versions], self.chunk_size
+        ):
+            db.cypher_query(
+                f"""
+                UNWIND $uids AS uid
+                MATCH (root:{self.root_label} {{uid: uid}})-[:LATEST_DRAFT|LATEST_RETIRED]->()
+                WHERE NOT (root)-[:HAS_VERSION {{version:'Final'}}]->()
+                WITH DISTINCT root
+                SET root:Deleted{self.root_label}
+                REMOVE root:{self.root_label}
+                WITH root
+                MATCH (root)-[has_version:HAS_VERSION]->()
+                WHERE has_version.end_date IS NULL
+                SET has_version.end_date = datetime(apoc.date.toISO8601(datetime().epochSeconds, 's'))
+                """,
+                {"uids": list(chunk)},
+            )
+        self._report("soft delete", len(latest_versions), len(latest_versions))
+        return len(latest_versions)
+
+    def _collect(self, uids: Iterable[str]) -> list[LatestVersion]:
+        uids = list(dict.fromkeys(uids))
+        latest_versions: dict[str, LatestVersion] = {}
+        for chunk in chunks(uids, self.chunk_size):
+            # Locks the roots until the end of the transaction, so the versions can't change before they are moved
+            rs, _ = db.cypher_query(
+                f"""
+                UNWIND $uids AS uid
+                MATCH (root:{self.root_label} {{uid: uid}})-[:LATEST]->(value:{self.value_label})
+                WITH collect([root, value]) AS items
+                CALL apoc.lock.nodes([item IN items | item[0]])
+                UNWIND items AS item
+                WITH item[0] AS root, item[1] AS value
+                MATCH (root)-[has_version:HAS_VERSION]->(value)
+                WITH root, has_version
+                ORDER BY
+                    toInteger(split(has_version.version, '.')[0]) DESC,
+                    toInteger(split(has_version.version, '.')[1]) DESC,
+                    has_version.end_date IS NULL DESC,
+                    has_version.start_date DESC
+                WITH root, head(collect(has_version)) AS has_version
+                RETURN
+                    root.uid,
+                    has_version.status,
+                    has_version.version,
+                    has_version.start_date,
+                    has_version.change_description,
+                    has_version.author_id,
+                    head([(library:Library)-->(root) | library.is_editable])
+                """,
+                {"uids": list(chunk)},
+            )
+            for (
+                uid,
+                status,
+                version,
+                start_date,
+                change_description,
+                author_id,
+                is_library_editable,
+            ) in rs:
+                major, minor = version.split(".")
+                latest_versions[uid] = LatestVersion(
+                    uid=uid,
+                    item_metadata=LibraryItemMetadataVO.from_repository_values(
+                        change_description=change_description,
+                        status=LibraryItemStatus(status),
+                        author_id=author_id,
+                        author_username=None,
+                        start_date=convert_to_datetime(start_date),
+                        end_date=None,
+                        major_version=int(major),
+                        minor_version=int(minor),
+                    ),
+                    is_library_editable=bool(is_library_editable),
+                )
+
+        for uid in uids:
+            NotFoundException.raise_if(
+                uid not in latest_versions,
+                msg=f"{self.repository.aggregate_class.__name__} with UID '{uid}' doesn't exist or there's no version with requested status or version number.",
+            )
+        return [latest_versions[uid] for uid in uids]
+
+    def _version_row(
+        self, latest: LatestVersion, steps: Sequence[VersioningStep]
+    ) -> dict[str, Any]:
+        """The HAS_VERSION relationships and latest relationships to create for one concept"""
+
+        BusinessLogicException.raise_if_not(
+            latest.is_library_editable, msg="Library isn't editable."
+        )
+
+        item_metadata = latest.item_metadata
+        versions: list[tuple[LibraryItemMetadataVO, bool]] = []
+        on_new_value = False
+        for step in steps:
+            item_metadata = step.apply(item_metadata, self.author_id)
+            on_new_value = on_new_value or step.edits
+            versions.append((item_metadata, on_new_value))
+
+        # Each version ends when the next one starts
+        end_dates: list[datetime.datetime | None] = [
+            item_metadata.start_date for item_metadata, _ in versions[1:]
+        ] + [None]
+        return {
+            "uid": latest.uid,
+            "start_date": versions[0][0].start_date,
+            "versions": [
+                {
+                    "new_value": new_value,
+                    "properties": {
+                        "author_id": item_metadata.author_id,
+                        "change_description": item_metadata.change_description,
+                        "version": item_metadata.version,
+                        "status": item_metadata.status.value,
+                        "start_date": item_metadata.start_date,
+                        "end_date": end_date,
+                    },
+                }
+                for (item_metadata, new_value), end_date in zip(versions, end_dates)
+            ],
+            # The last version of each status is the latest one
+            "latest": [
+                {"type": latest_type, "new_value": new_value}
+                for latest_type, new_value in {
+                    LATEST_RELATIONSHIPS[item_metadata.status]: new_value
+                    for item_metadata, new_value in versions
+                }.items()
+            ],
+        }
+
+    def _write(
+        self, rows: Sequence[dict[str, Any]], new_value_ids: Mapping[str, str]
+    ) -> None:
+        try:
+            for done, chunk in enumerate(chunks(rows, self.chunk_size)):
+                self._move_versions(
+                    [
+                        {**row, "new_value_id": new_value_ids.get(row["uid"])}
+                        for row in chunk
+                    ]
+                )
+                self._report(
+                    "versions", min((done + 1) * self.chunk_size, len(rows)), len(rows)
+                )
+        finally:
+            self.repository.cache_store_item_by_uid.clear()
+
+    def _move_versions(self, rows: Sequence[dict[str, Any]]) -> None:
+        db.cypher_query(
+            f"""
+            UNWIND $rows AS row
+            MATCH (root:{self.root_label} {{uid: row.uid}})-[latest:LATEST]->(value:{self.value_label})
+            OPTIONAL MATCH (new_value:{self.value_label}) WHERE elementId(new_value) = row.new_value_id
+            WITH row, root, latest, value, coalesce(new_value, value) AS new_value
+            CALL {{
+                WITH row, root
+                MATCH (root)-[has_version:HAS_VERSION]->()
+                WHERE has_version.end_date IS NULL
+                SET has_version.end_date = row.start_date
+            }}
+            CALL {{
+                WITH row, root, value, new_value
+                UNWIND row.versions AS version
+                WITH root, version, CASE WHEN version.new_value THEN new_value ELSE value END AS version_value
+                CREATE (root)-[has_version:HAS_VERSION]->(version_value)
+                SET has_version = version.properties
+                RETURN count(has_version) AS versions
+            }}
+            CALL {{
+                WITH row, root, value, new_value
+                UNWIND row.latest AS latest_rel
+                OPTIONAL MATCH (root)-[previous]->()
+                WHERE type(previous) = latest_rel.type
+                DELETE previous
+                WITH DISTINCT root, latest_rel, CASE WHEN latest_rel.new_value THEN new_value ELSE value END AS latest_value
+                CALL apoc.create.relationship(root, latest_rel.type, NULL, latest_value) YIELD rel
+                RETURN count(rel) AS latest_rels
+            }}
+            CALL {{
+                WITH root, latest, value, new_value
+                WITH root, latest, new_value WHERE new_value <> value
+                DELETE latest
+                CREATE (root)-[:LATEST]->(new_value)
+            }}
+            RETURN count(root)
+            """,
+            {"rows": list(rows)},
+        )
+
+    def _report(self, phase: str, done: int, total: int) -> None:
+        log.info("Cascade to %s, %s: %s/%s", self.root_label, phase, done, total)
+
+
+class ActivityInstanceCascade(ConceptCascade):
+    """
+    Links the activity instances of an activity to the groupings of its latest final version.
+
+    Final instances get a new draft, are edited and approved again, draft instances are only edited,
+    like `ActivityInstanceService` does for a single instance.
+    An instance whose groupings change gets a new value, a copy of its latest value and of its activity items
+    linked to the new groupings, like an edit of a single instance.
+    """
+
+    repository: ActivityInstanceRepository
+
+    def __init__(
+        self,
+        repository: ActivityInstanceRepository,
+        author_id: str,
+        activity_uid: str,
+        chunk_size: int | None = None,
+    ):
+        super().__init__(repository, author_id, chunk_size)
+        self.activity_uid = activity_uid
+
+    @trace_calls
+    def edit_groupings(self, groupings: Mapping[str, Sequence[dict[str, str]]]) -> int:
+        """
+        Links the instances to the given activity groupings, returns the number of instances touched
+
+        `groupings` maps the uid of each instance to its new groupings,
+        dicts with the `activity_group_uid` and `activity_subgroup_uid`.
+        """
+
+        rows = [
+            self._version_row(
+                latest,
+                (
+                    [NEW_VERSION, CASCADE_EDIT, APPROVE]
+                    if latest.item_metadata.status == LibraryItemStatus.FINAL
+                    else [CASCADE_EDIT]
+                ),
+            )
+            for latest in self._collect(groupings)
+        ]
+
+        new_value_ids: dict[str, str] = {}
+        for done, chunk in enumerate(chunks(rows, self.chunk_size)):
+            new_value_ids |= self._create_values(
+                [
+                    {"uid": row["uid"], "groupings": groupings[row["uid"]]}
+                    for row in chunk
+                ]
+            )
+            self._report(
+                "values", min((done + 1) * self.chunk_size, len(rows)), len(rows)
+            )
+        if new_value_ids:
+            rs, _ = db.cypher_query(
+                """
+                MATCH (:Library {name: $library_name})-[:CONTAINS_CONCEPT]->(:ActivityRoot {uid: $activity_uid})
+                RETURN count(*)
+                """,
+                {
+                    "library_name": settings.requested_library_name,
+                    "activity_uid": self.activity_uid,
+                },
+            )
+            BusinessLogicException.raise_if(
+                rs[0][0] > 0,
+                msg="Activity instances are not allowed to link to activity requests or placeholders",
+            )
+
+        self._write(rows, new_value_ids)
+        return len(rows)
+
+    def _create_values(self, rows: Sequence[dict[str, Any]]) -> dict[str, str]:
+        """
+        Creates the new values of the instances whose latest value isn't linked to exactly the given groupings,
+        returns their element ids by uid of the instance
+        """
+
+        rs, _ = db.cypher_query(
+            """
+            UNWIND $rows AS row
+            MATCH (:ActivityInstanceRoot {uid: row.uid})-[:LATEST]->(value:ActivityInstanceValue)
+            CALL {
+                WITH row
+                UNWIND row.groupings AS grouping
+                MATCH (:ActivityRoot {uid: $activity_uid})-[:LATEST_FINAL]->(:ActivityValue)-[:HAS_GROUPING]->(activity_grouping:ActivityGrouping)
+                    -[:IN_SUBGROUP]->(activity_valid_group:ActivityValidGroup)-[:IN_GROUP]->(:ActivityGroupValue)
+                    <-[:HAS_VERSION]-(:ActivityGroupRoot {uid: grouping.activity_group_uid})
+                MATCH (activity_valid_group)<-[:HAS_GROUP]-(:ActivitySubGroupValue)
+                    <-[:HAS_VERSION]-(:ActivitySubGroupRoot {uid: grouping.activity_subgroup_uid})
+                RETURN collect(DISTINCT activity_grouping) AS activity_groupings, count(DISTINCT grouping) AS found
+            }
+            WITH row, value, activity_groupings, found, [(value)-[:HAS_ACTIVITY]->(linked:ActivityGrouping) | linked] AS linked_groupings
+            WHERE found < size(row.groupings)
+                OR size(activity_groupings) <> size(linked_groupings)
+                OR any(linked IN linked_groupings WHERE NOT linked IN activity_groupings)
+            CALL {
+                WITH row, value, activity_groupings, found
+                WITH value, activity_groupings WHERE found = size(row.groupings)
+                CALL apoc.create.node(labels(value), properties(value)) YIELD node AS new_value
+                FOREACH (activity_grouping IN activity_groupings | CREATE (new_value)-[:HAS_ACTIVITY]->(activity_grouping))
+                WITH value, new_value
+                CALL {
+                    WITH value, new_value
+                    MATCH (value)-[:ACTIVITY_INSTANCE_CLASS]->(activity_instance_class:ActivityInstanceClassRoot)
+                    CREATE (new_value)-[:ACTIVITY_INSTANCE_CLASS]->(activity_instance_class)
+                }
+                CALL {
+                    WITH value, new_value
+                    MATCH (value)-[:CONTAINS_ACTIVITY_ITEM]->(activity_item:ActivityItem)
+                    CALL apoc.create.node(labels(activity_item), properties(activity_item)) YIELD node AS new_activity_item
+                    CREATE (new_value)-[:CONTAINS_ACTIVITY_ITEM]->(new_activity_item)
+                    WITH activity_item, new_activity_item
+                    CALL {
+                        WITH activity_item, new_activity_item
+                        MATCH (activity_item)-[rel]->(target)
+                        CALL apoc.create.relationship(new_activity_item, type(rel), properties(rel), target) YIELD rel AS new_rel
+                        RETURN count(new_rel) AS new_rels
+                    }
+                    CALL {
+                        WITH activity_item, new_activity_item
+                        MATCH (activity_item)<-[:HAS_ACTIVITY_ITEM]-(activity_item_class:ActivityItemClassRoot)
+                        CREATE (activity_item_class)-[:HAS_ACTIVITY_ITEM]->(new_activity_item)
+                    }
+                    RETURN count(new_activity_item) AS new_activity_items
+                }
+                RETURN collect(elementId(new_value)) AS new_value_ids
+            }
+            RETURN row.uid, head(new_value_ids)
+            """,
+            {"rows": list(rows), "activity_uid": self.activity_uid},
+        )
+        for uid, new_value_id in rs:
+            BusinessLogicException.raise_if(
+                new_value_id is None,
+                msg=f"The ActivityValidGroup node wasn't found for all groupings of Activity Instance with UID '{uid}'.",
+            )
+        return dict(rs)
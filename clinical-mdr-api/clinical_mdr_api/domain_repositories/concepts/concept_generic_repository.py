@@ -26,16 +26,67 @@ from clinical_mdr_api.domain_repositories.models.generic import (
 from clinical_mdr_api.domain_repositories.models.template_parameter import (
     TemplateParameterTermRoot,
 )
+from clinical_mdr_api.domain_repositories.template_parameters.parameter_values import (
+    template_parameter_values,
+)
 from clinical_mdr_api.domains._utils import ObjectStatus
+from clinical_mdr_api.domains.versioned_object_aggregate import LibraryItemStatus
 from clinical_mdr_api.models.utils import BaseModel
 from clinical_mdr_api.repositories._utils import (
     CypherQueryBuilder,
     FilterDict,
     FilterOperator,
+    FullTextIndex,
+    FullTextSearch,
     sb_clear_cache,
     validate_filters_and_add_search_string,
 )
 
+# Full-text indexes finding the concept values matching a wildcard filter on the aliases of the generic alias clause
+CONCEPT_FULLTEXT_SEARCH = FullTextSearch(
+    variable="concept_value",
+    indexes=(
+        FullTextIndex(
+            name="fulltext_ConceptValue",
+            aliases=frozenset(
+                {
+                    "name",
+                    "name_sentence_case",
+                    "definition",
+                    "abbreviation",
+                    "nci_concept_id",
+                    "nci_concept_name",
+                    "external_id",
+                }
+            ),
+        ),
+        FullTextIndex(
+            name="fulltext_ConceptRoot",
+            aliases=frozenset({"uid"}),
+            seed="MATCH (node)-[:HAS_VERSION]->({variable}) RETURN {variable}",
+        ),
+        # A value matching a library name, like "Sponsor", finds all concepts of the library,
+        # which the wildcard predicates then filter like the match of all nodes would
+        FullTextIndex(
+            name="fulltext_Library",
+            aliases=frozenset({"library_name"}),
+            seed="MATCH (node)-[:CONTAINS_CONCEPT]->()-[:HAS_VERSION]->({variable}) RETURN {variable}",
+        ),
+        FullTextIndex(
+            name="fulltext_HAS_VERSION",
+            aliases=frozenset({"status", "version", "change_description", "author_id"}),
+            seed="RETURN endNode(relationship) AS {variable}",
+            relationship=True,
+        ),
+        # author_username falls back to the author_id of versions without a User
+        FullTextIndex(
+            name="fulltext_User",
+            aliases=frozenset({"author_username"}),
+            seed="MATCH ()-[version:HAS_VERSION]->({variable}) WHERE version.author_id = node.user_id RETURN {variable}",
+        ),
+    ),
+)
+
 
 class ConceptGenericRepository(
     LibraryItemRepositoryImplBase, Generic[_AggregateRootType], ABC
@@ -44,6 +95,8 @@ class ConceptGenericRepository(
     value_class = type
     return_model: type = BaseModel
     filter_query_parameters: dict[Any, Any] = {}
+    # Subclasses whose return model has more wildcard aliases extend it with the indexes covering them
+    fulltext_search: FullTextSearch = CONCEPT_FULLTEXT_SEARCH
 
     @abstractmethod
     def _create_aggregate_root_instance_from_cypher_result(
@@ -304,6 +357,7 @@ class ConceptGenericRepository(
             total_count=total_count,
             return_model=self.return_model,
             format_filter_sort_keys=self.format_filter_sort_keys,
+            fulltext_search=self.fulltext_search,
         )
 
         query.parameters.update(filter_query_parameters)
@@ -399,6 +453,7 @@ class ConceptGenericRepository(
                 self.return_model
             ),
             format_filter_sort_keys=self.format_filter_sort_keys,
+            fulltext_search=self.fulltext_search,
         )
 
         query.parameters.update(filter_query_parameters)
@@ -549,19 +604,26 @@ class ConceptGenericRepository(
                 template_parameter_names = [template_parameter_name, "Comparator"]
             else:
                 template_parameter_names = [template_parameter_name]
-            for template_param_name in template_parameter_names:
-                query = """
-                    MATCH (template_parameter:TemplateParameter {name:$template_parameter_name})
-                    MATCH (concept_root:ConceptRoot {uid: $uid})-[:LATEST]->(concept_value)
-                    SET concept_root:TemplateParameterTermRoot
-                    SET concept_value:TemplateParameterTermValue
-                    MERGE (template_parameter)-[:HAS_PARAMETER_TERM]->(concept_root)
-                """
-                db.cypher_query(
-                    query,
-                    {
-                        "uid": versioned_object.uid,
-                        "template_parameter_name": template_param_name,
-                    },
-                )
-                TemplateParameterTermRoot.generate_node_uids_if_not_present()
+            query = """
+                UNWIND $template_parameter_names AS template_parameter_name
+                MATCH (template_parameter:TemplateParameter {name:template_parameter_name})
+                MATCH (concept_root:ConceptRoot {uid: $uid})-[:LATEST]->(concept_value)
+                SET concept_root:TemplateParameterTermRoot
+                SET concept_value:TemplateParameterTermValue
+                WITH template_parameter, concept_root,
+                    EXISTS { (template_parameter)-[:HAS_PARAMETER_TERM]->(concept_root) } AS linked
+                MERGE (template_parameter)-[:HAS_PARAMETER_TERM]->(concept_root)
+                WITH template_parameter WHERE NOT linked
+                RETURN DISTINCT template_parameter.name
+            """
+            result, _ = db.cypher_query(
+                query,
+                {
+                    "uid": versioned_object.uid,
+                    "template_parameter_names": template_parameter_names,
+                },
+            )
+            TemplateParameterTermRoot.generate_node_uids_if_not_present()
+            template_parameter_values.invalidate(item[0] for item in result)
+            if versioned_object.item_metadata.status == LibraryItemStatus.FINAL:
+                template_parameter_values.invalidate_final_name(root.element_id)
@@ -3,6 +3,7 @@ from typing import Any, cast
 from neomodel import db
 
 from clinical_mdr_api.domain_repositories.concepts.concept_generic_repository import (
+    CONCEPT_FULLTEXT_SEARCH,
     ConceptGenericRepository,
 )
 from clinical_mdr_api.domain_repositories.models.concepts import (
@@ -22,6 +23,9 @@ from clinical_mdr_api.domain_repositories.models.generic import (
 from clinical_mdr_api.domain_repositories.models.template_parameter import (
     TemplateParameterTermRoot,
 )
+from clinical_mdr_api.domain_repositories.template_parameters.parameter_values import (
+    template_parameter_values,
+)
 from clinical_mdr_api.domains._utils import ObjectStatus
 from clinical_mdr_api.domains.concepts.unit_definitions.unit_definition import (
     CTTerm,
@@ -36,6 +40,7 @@ from clinical_mdr_api.domains.versioned_object_aggregate import (
 from clinical_mdr_api.models.concepts.unit_definitions.unit_definition import (
     UnitDefinitionModel,
 )
+from clinical_mdr_api.repositories._utils import FullTextIndex
 from common.utils import convert_to_datetime
 
 
@@ -44,6 +49,25 @@ class UnitDefinitionRepository(ConceptGenericRepository[UnitDefinitionAR]):
     root_class = UnitDefinitionRoot
     user: str
     return_model = UnitDefinitionModel
+    fulltext_search = CONCEPT_FULLTEXT_SEARCH.extended(
+        FullTextIndex(
+            name="fulltext_ConceptValue",
+            aliases=frozenset({"legacy_code", "comment"}),
+        ),
+        FullTextIndex(
+            name="fulltext_CTTermNameValue",
+            aliases=frozenset(
+                {"ct_units.name", "unit_subsets.name", "unit_dimension.name"}
+            ),
+            seed="MATCH (node)<-[:LATEST_FINAL]-()<-[:HAS_NAME_ROOT]-()"
+            "<-[:HAS_CT_UNIT|HAS_UNIT_SUBSET|HAS_CT_DIMENSION]-({variable}) RETURN {variable}",
+        ),
+        FullTextIndex(
+            name="fulltext_DictionaryTermValue",
+            aliases=frozenset({"ucum.name"}),
+            seed="MATCH (node)<-[:LATEST_FINAL]-()<-[:HAS_UCUM_TERM]-({variable}) RETURN {variable}",
+        ),
+    )
 
     def specific_alias_clause(
         self, only_specific_status: str = ObjectStatus.LATEST.name, **kwargs
@@ -373,40 +397,35 @@ class UnitDefinitionRepository(ConceptGenericRepository[UnitDefinitionAR]):
         if versioned_object.concept_vo.is_template_parameter:
             # neomodel can't add custom label to already existing node, we have to manage that by executing cypher query
             # unit definitions should link to the template parameter with the name of the associated unit dimension
-            unit_subsets = value.has_unit_subset.all()
-            if unit_subsets:
-                for unit_subset in unit_subsets:
-                    template_parameter_name = (
-                        unit_subset.has_name_root.single()
-                        .has_latest_value.single()
-                        .name
-                    )
-                    query = """
-                        MATCH (template_parameter:TemplateParameter {name:$template_parameter_name})
-                        MATCH (concept_root:ConceptRoot {uid: $uid})-[:LATEST]->(concept_value)
-                        MERGE (template_parameter)-[:HAS_PARAMETER_TERM]->(concept_root)
-                    """
-                    db.cypher_query(
-                        query,
-                        {
-                            "uid": versioned_object.uid,
-                            "template_parameter_name": template_parameter_name,
-                        },
-                    )
+            template_parameter_names = [
+                unit_subset.has_name_root.single().has_latest_value.single().name
+                for unit_subset in value.has_unit_subset.all()
+            ]
+            template_parameter_names.append("Unit")
             query = """
                 MATCH (concept_root:ConceptRoot {uid: $uid})-[:LATEST]->(concept_value)
-                MATCH (unit:TemplateParameter {name: "Unit"})
-                MERGE (unit)-[:HAS_PARAMETER_TERM]->(concept_root)
                 SET concept_root:TemplateParameterTermRoot
                 SET concept_value:TemplateParameterTermValue
+                WITH concept_root
+                UNWIND $template_parameter_names AS template_parameter_name
+                MATCH (template_parameter:TemplateParameter {name:template_parameter_name})
+                WITH template_parameter, concept_root,
+                    EXISTS { (template_parameter)-[:HAS_PARAMETER_TERM]->(concept_root) } AS linked
+                MERGE (template_parameter)-[:HAS_PARAMETER_TERM]->(concept_root)
+                WITH template_parameter WHERE NOT linked
+                RETURN DISTINCT template_parameter.name
             """
-            db.cypher_query(
+            result, _ = db.cypher_query(
                 query,
                 {
                     "uid": versioned_object.uid,
+                    "template_parameter_names": template_parameter_names,
                 },
             )
             TemplateParameterTermRoot.generate_node_uids_if_not_present()
+            template_parameter_values.invalidate(item[0] for item in result)
+            if versioned_object.item_metadata.status == LibraryItemStatus.FINAL:
+                template_parameter_values.invalidate_final_name(root.element_id)
 
     def master_unit_exists_by_unit_dimension(self, unit_dimension: str) -> bool:
         cypher_query = f"""
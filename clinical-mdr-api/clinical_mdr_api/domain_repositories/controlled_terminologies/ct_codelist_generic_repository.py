@@ -31,6 +31,9 @@ from clinical_mdr_api.domain_repositories.models.generic import (
 from clinical_mdr_api.domain_repositories.models.template_parameter import (
     TemplateParameterTermRoot,
 )
+from clinical_mdr_api.domain_repositories.template_parameters.parameter_values import (
+    template_parameter_values,
+)
 from clinical_mdr_api.domains.versioned_object_aggregate import LibraryItemStatus
 from clinical_mdr_api.models.controlled_terminologies.ct_codelist_attributes import (
     CTCodelistAttributes,
@@ -473,12 +476,19 @@ class CTCodelistGenericRepository(
                 (codelist_ver_value:TemplateParameter)
             WITH codelist_ver_value
             MATCH (term_root:CTTermRoot {uid: $term_uid})-[:HAS_NAME_ROOT]->(term_ver_root)-[:LATEST]->(term_ver_value)
+            WITH codelist_ver_value, term_ver_root, term_ver_value,
+                EXISTS { (codelist_ver_value)-[:HAS_PARAMETER_TERM]->(term_ver_root) } AS linked
             MERGE (codelist_ver_value)-[:HAS_PARAMETER_TERM]->(term_ver_root)
             SET term_ver_root:TemplateParameterTermRoot
             SET term_ver_value:TemplateParameterTermValue
+            WITH codelist_ver_value WHERE NOT linked
+            RETURN DISTINCT codelist_ver_value.name
         """
-        db.cypher_query(query, {"codelist_uid": codelist_uid, "term_uid": term_uid})
+        result, _ = db.cypher_query(
+            query, {"codelist_uid": codelist_uid, "term_uid": term_uid}
+        )
         TemplateParameterTermRoot.generate_node_uids_if_not_present()
+        template_parameter_values.invalidate(item[0] for item in result)
 
     @sb_clear_cache(caches=["cache_store_item_by_uid"])
     def remove_term(self, codelist_uid: str, term_uid: str, author_id: str) -> None:
@@ -531,8 +541,10 @@ class CTCodelistGenericRepository(
                     MATCH (codelist_root:CTCodelistRoot {uid: $codelist_uid})-[:HAS_NAME_ROOT]->()-[:LATEST]->
                         (codelist_ver_value:TemplateParameter)-[r:HAS_PARAMETER_TERM]-(term_ver_root)
                     DELETE r
+                    RETURN DISTINCT codelist_ver_value.name
                 """
-                db.cypher_query(query, {"codelist_uid": codelist_uid})
+                result, _ = db.cypher_query(query, {"codelist_uid": codelist_uid})
+                template_parameter_values.invalidate(item[0] for item in result)
                 break
         else:
             raise exceptions.NotFoundException(
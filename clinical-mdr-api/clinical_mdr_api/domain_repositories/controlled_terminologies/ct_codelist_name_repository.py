@@ -22,6 +22,9 @@ from clinical_mdr_api.domain_repositories.models.generic import (
 from clinical_mdr_api.domain_repositories.models.template_parameter import (
     TemplateParameterTermRoot,
 )
+from clinical_mdr_api.domain_repositories.template_parameters.parameter_values import (
+    template_parameter_values,
+)
 from clinical_mdr_api.domains.controlled_terminologies.ct_codelist_name import (
     CTCodelistNameAR,
     CTCodelistNameVO,
@@ -149,31 +152,48 @@ class CTCodelistNameRepository(CTCodelistGenericRepository[CTCodelistNameAR]):
         if versioned_object.ct_codelist_vo.is_template_parameter:
             query = """
                 MATCH (codelist_root:CTCodelistRoot {uid: $codelist_uid})-[:HAS_NAME_ROOT]->()-[:LATEST]->(codelist_ver_value)
+                WITH codelist_root, codelist_ver_value, codelist_ver_value:TemplateParameter AS was_parameter
                 SET codelist_ver_value:TemplateParameter
-                WITH codelist_root, codelist_ver_value
-
-                MATCH (codelist_root)-[:HAS_TERM]->(:CTTermRoot)-[:HAS_NAME_ROOT]->(term_ver_root)-[:LATEST]->(term_ver_value)
-                MERGE (codelist_ver_value)-[hpt:HAS_PARAMETER_TERM]->(term_ver_root)
-
-                SET term_ver_root:TemplateParameterTermRoot
-                SET term_ver_value:TemplateParameterTermValue
+                WITH codelist_root, codelist_ver_value, was_parameter
+
+                CALL {
+                    WITH codelist_root, codelist_ver_value
+                    MATCH (codelist_root)-[:HAS_TERM]->(:CTTermRoot)-[:HAS_NAME_ROOT]->(term_ver_root)-[:LATEST]->(term_ver_value)
+                    WITH codelist_ver_value, term_ver_root, term_ver_value,
+                        EXISTS { (codelist_ver_value)-[:HAS_PARAMETER_TERM]->(term_ver_root) } AS linked
+                    MERGE (codelist_ver_value)-[hpt:HAS_PARAMETER_TERM]->(term_ver_root)
+
+                    SET term_ver_root:TemplateParameterTermRoot
+                    SET term_ver_value:TemplateParameterTermValue
+                    RETURN sum(CASE WHEN linked THEN 0 ELSE 1 END) AS linked_terms
+                }
+                WITH codelist_ver_value WHERE NOT was_parameter OR linked_terms > 0
+                RETURN codelist_ver_value.name
             """
-            db.cypher_query(query, {"codelist_uid": versioned_object.uid})
+            result, _ = db.cypher_query(query, {"codelist_uid": versioned_object.uid})
             TemplateParameterTermRoot.generate_node_uids_if_not_present()
         else:
             query = """
                 MATCH (codelist_root:CTCodelistRoot {uid: $codelist_uid})-[:HAS_NAME_ROOT]->()-[:LATEST]->(codelist_ver_value)
+                WITH codelist_root, codelist_ver_value, codelist_ver_value:TemplateParameter AS was_parameter
                 REMOVE codelist_ver_value:TemplateParameter
-                WITH codelist_root, codelist_ver_value
-                
-                MATCH (codelist_root)-[:HAS_TERM]->(:CTTermRoot)-[:HAS_NAME_ROOT]->(term_ver_root)-[:LATEST]->(term_ver_value)
-                MATCH (codelist_ver_value)-[hpt:HAS_PARAMETER_TERM]->(term_ver_root)
-                DELETE hpt
-                REMOVE term_ver_root.uid
-                REMOVE term_ver_root:TemplateParameterTermRoot
-                REMOVE term_ver_value:TemplateParameterTermValue
+                WITH codelist_root, codelist_ver_value, was_parameter
+
+                CALL {
+                    WITH codelist_root, codelist_ver_value
+                    MATCH (codelist_root)-[:HAS_TERM]->(:CTTermRoot)-[:HAS_NAME_ROOT]->(term_ver_root)-[:LATEST]->(term_ver_value)
+                    MATCH (codelist_ver_value)-[hpt:HAS_PARAMETER_TERM]->(term_ver_root)
+                    DELETE hpt
+                    REMOVE term_ver_root.uid
+                    REMOVE term_ver_root:TemplateParameterTermRoot
+                    REMOVE term_ver_value:TemplateParameterTermValue
+                    RETURN count(*) AS unlinked_terms
+                }
+                WITH codelist_ver_value WHERE was_parameter OR unlinked_terms > 0
+                RETURN codelist_ver_value.name
             """
-            db.cypher_query(query, {"codelist_uid": versioned_object.uid})
+            result, _ = db.cypher_query(query, {"codelist_uid": versioned_object.uid})
+        template_parameter_values.invalidate(item[0] for item in result)
 
     def is_repository_related_to_attributes(self) -> bool:
         return False
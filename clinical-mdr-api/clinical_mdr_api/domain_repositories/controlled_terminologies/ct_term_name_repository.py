@@ -31,6 +31,9 @@ from clinical_mdr_api.domain_repositories.models.generic import (
 from clinical_mdr_api.domain_repositories.models.template_parameter import (
     TemplateParameterTermRoot,
 )
+from clinical_mdr_api.domain_repositories.template_parameters.parameter_values import (
+    template_parameter_values,
+)
 from clinical_mdr_api.domains.controlled_terminologies.ct_term_name import (
     CTTermCodelistVO,
     CTTermNameAR,
@@ -38,6 +41,7 @@ from clinical_mdr_api.domains.controlled_terminologies.ct_term_name import (
 )
 from clinical_mdr_api.domains.versioned_object_aggregate import (
     LibraryItemMetadataVO,
+    LibraryItemStatus,
     LibraryVO,
 )
 from clinical_mdr_api.models.controlled_terminologies.ct_term import (
@@ -383,9 +387,13 @@ class CTTermNameRepository(  # type: ignore[misc]
                 (codelist_ver_value:TemplateParameter)
             WITH codelist_root, codelist_ver_value
             MATCH (term_root:CTTermRoot {uid: $term_uid})-[:HAS_NAME_ROOT]->(term_ver_root)-[:LATEST]->(term_ver_value)
+            WITH codelist_ver_value, term_ver_root, term_ver_value,
+                EXISTS { (codelist_ver_value)-[:HAS_PARAMETER_TERM]->(term_ver_root) } AS linked
             MERGE (codelist_ver_value)-[hpt:HAS_PARAMETER_TERM]->(term_ver_root)
             SET term_ver_root:TemplateParameterTermRoot
             SET term_ver_value:TemplateParameterTermValue
+            WITH codelist_ver_value WHERE NOT linked
+            RETURN DISTINCT codelist_ver_value.name
         """
 
         if len(versioned_object.ct_term_vo.codelists) > 0:
@@ -400,7 +408,7 @@ class CTTermNameRepository(  # type: ignore[misc]
                     "author_id": versioned_object.item_metadata.author_id,
                 },
             )
-            db.cypher_query(
+            result, _ = db.cypher_query(
                 maintain_template_parameter_query,
                 {
                     "codelist_uid": versioned_object.ct_term_vo.codelists[
@@ -409,7 +417,10 @@ class CTTermNameRepository(  # type: ignore[misc]
                     "term_uid": versioned_object.uid,
                 },
             )
+            template_parameter_values.invalidate(item[0] for item in result)
         TemplateParameterTermRoot.generate_node_uids_if_not_present()
+        if versioned_object.item_metadata.status == LibraryItemStatus.FINAL:
+            template_parameter_values.invalidate_final_name(root.element_id)
 
     def is_repository_related_to_attributes(self) -> bool:
         """
@@ -29,6 +29,9 @@ from clinical_mdr_api.domain_repositories.models.generic import (
 from clinical_mdr_api.domain_repositories.models.template_parameter import (
     TemplateParameterTermRoot,
 )
+from clinical_mdr_api.domain_repositories.template_parameters.parameter_values import (
+    template_parameter_values,
+)
 from clinical_mdr_api.domains.dictionaries.dictionary_codelist import (
     DictionaryCodelistAR,
     DictionaryCodelistVO,
@@ -430,29 +433,48 @@ class DictionaryCodelistGenericRepository(
         if versioned_object.dictionary_codelist_vo.is_template_parameter:
             query = """
                 MATCH (dictionary_codelist_root:DictionaryCodelistRoot {uid: $codelist_uid})-[:LATEST]->(dictionary_codelist_value)
+                WITH dictionary_codelist_root, dictionary_codelist_value,
+                    dictionary_codelist_value:TemplateParameter AS was_parameter
                 SET dictionary_codelist_value:TemplateParameter
-                WITH dictionary_codelist_root, dictionary_codelist_value
+                WITH dictionary_codelist_root, dictionary_codelist_value, was_parameter
 
-                MATCH (dictionary_codelist_root)-[:HAS_TERM]->(dictionary_term_root:DictionaryTermRoot)-[:LATEST]->(dictionary_term_value)
-                MERGE (dictionary_codelist_value)-[hpt:HAS_PARAMETER_TERM]->(dictionary_term_root)
-                SET dictionary_term_root:TemplateParameterTermRoot
-                SET dictionary_term_value:TemplateParameterTermValue
+                CALL {
+                    WITH dictionary_codelist_root, dictionary_codelist_value
+                    MATCH (dictionary_codelist_root)-[:HAS_TERM]->(dictionary_term_root:DictionaryTermRoot)-[:LATEST]->(dictionary_term_value)
+                    WITH dictionary_codelist_value, dictionary_term_root, dictionary_term_value,
+                        EXISTS { (dictionary_codelist_value)-[:HAS_PARAMETER_TERM]->(dictionary_term_root) } AS linked
+                    MERGE (dictionary_codelist_value)-[hpt:HAS_PARAMETER_TERM]->(dictionary_term_root)
+                    SET dictionary_term_root:TemplateParameterTermRoot
+                    SET dictionary_term_value:TemplateParameterTermValue
+                    RETURN sum(CASE WHEN linked THEN 0 ELSE 1 END) AS linked_terms
+                }
+                WITH dictionary_codelist_value WHERE NOT was_parameter OR linked_terms > 0
+                RETURN dictionary_codelist_value.name
             """
-            db.cypher_query(query, {"codelist_uid": versioned_object.uid})
+            result, _ = db.cypher_query(query, {"codelist_uid": versioned_object.uid})
             TemplateParameterTermRoot.generate_node_uids_if_not_present()
         else:
             query = """
                 MATCH (dictionary_codelist_root:DictionaryCodelistRoot {uid: $codelist_uid})-[:LATEST]->(dictionary_codelist_value)
+                WITH dictionary_codelist_root, dictionary_codelist_value,
+                    dictionary_codelist_value:TemplateParameter AS was_parameter
                 REMOVE dictionary_codelist_value:TemplateParameter
-                WITH dictionary_codelist_root, dictionary_codelist_value
+                WITH dictionary_codelist_root, dictionary_codelist_value, was_parameter
 
-                MATCH (dictionary_codelist_root)-[:HAS_TERM]->(dictionary_term_root:DictionaryTermRoot)-[:LATEST]->(dictionary_term_value)
-                MATCH (dictionary_codelist_value)-[hpt:HAS_PARAMETER_TERM]->(dictionary_term_root)
-                DELETE hpt
-                REMOVE dictionary_term_root:TemplateParameterTermRoot
-                REMOVE dictionary_term_value:TemplateParameterTermValue
+                CALL {
+                    WITH dictionary_codelist_root, dictionary_codelist_value
+                    MATCH (dictionary_codelist_root)-[:HAS_TERM]->(dictionary_term_root:DictionaryTermRoot)-[:LATEST]->(dictionary_term_value)
+                    MATCH (dictionary_codelist_value)-[hpt:HAS_PARAMETER_TERM]->(dictionary_term_root)
+                    DELETE hpt
+                    REMOVE dictionary_term_root:TemplateParameterTermRoot
+                    REMOVE dictionary_term_value:TemplateParameterTermValue
+                    RETURN count(*) AS unlinked_terms
+                }
+                WITH dictionary_codelist_value WHERE was_parameter OR unlinked_terms > 0
+                RETURN dictionary_codelist_value.name
             """
-            db.cypher_query(query, {"codelist_uid": versioned_object.uid})
+            result, _ = db.cypher_query(query, {"codelist_uid": versioned_object.uid})
+        template_parameter_values.invalidate(item[0] for item in result)
 
     def codelist_exists(self, codelist_uid: str) -> bool:
         query = """
@@ -32,6 +32,9 @@ from clinical_mdr_api.domain_repositories.models.generic import (
     VersionRoot,
     VersionValue,
 )
+from clinical_mdr_api.domain_repositories.template_parameters.parameter_values import (
+    template_parameter_values,
+)
 from clinical_mdr_api.domains.dictionaries.dictionary_term import (
     DictionaryTermAR,
     DictionaryTermVO,
@@ -448,17 +451,24 @@ class DictionaryTermGenericRepository(
                 (dictionary_codelist_value:TemplateParameter)
             WITH dictionary_codelist_root, dictionary_codelist_value
             MATCH (dictionary_term_root:DictionaryTermRoot {uid: $term_uid})-[:LATEST]->(dictionary_term_value)
+            WITH dictionary_codelist_value, dictionary_term_root, dictionary_term_value,
+                EXISTS { (dictionary_codelist_value)-[:HAS_PARAMETER_TERM]->(dictionary_term_root) } AS linked
             MERGE (dictionary_codelist_value)-[hpt:HAS_PARAMETER_TERM]->(dictionary_term_root)
             SET dictionary_term_root:TemplateParameterTermRoot
             SET dictionary_term_value:TemplateParameterTermValue
+            WITH dictionary_codelist_value WHERE NOT linked
+            RETURN DISTINCT dictionary_codelist_value.name
         """
-        db.cypher_query(
+        result, _ = db.cypher_query(
             maintain_template_parameter_query,
             {
                 "codelist_uid": versioned_object.dictionary_term_vo.codelist_uid,
                 "term_uid": versioned_object.uid,
             },
         )
+        template_parameter_values.invalidate(item[0] for item in result)
+        if versioned_object.item_metadata.status == LibraryItemStatus.FINAL:
+            template_parameter_values.invalidate_final_name(root.element_id)
 
     def term_exists(self, term_uid: str) -> bool:
         query = """
@@ -36,7 +36,12 @@ from clinical_mdr_api.domains.versioned_object_aggregate import (
     LibraryItemAggregateRootBase,
     LibraryItemStatus,
 )
-from clinical_mdr_api.repositories._utils import FilterOperator, sb_clear_cache
+from clinical_mdr_api.repositories._utils import (
+    FilterOperator,
+    FullTextIndex,
+    FullTextSearch,
+    sb_clear_cache,
+)
 from common.exceptions import NotFoundException
 
 _AggregateRootType = TypeVar("_AggregateRootType", bound=LibraryItemAggregateRootBase)
@@ -184,6 +189,134 @@ class GenericSyntaxRepository(
             page_size=page_size,
         )
 
+    def _fulltext_search_optimized(self) -> FullTextSearch:
+        """
+        Full-text indexes finding the roots of the syntax items, or of their template, referencing the found nodes.
+        Only the indexes of the variables mapped by `basemodel_to_cypher_mapping_optimized` are queried.
+        """
+
+        # pylint: disable=no-member
+        if hasattr(self, "template_class"):
+            template_rels = f"CREATED_FROM|{self.template_class.TEMPLATE_REL_LABEL}"
+            # The item, or the template of the instance, referencing the found node
+            item_to_root = f"MATCH (item)-[:{template_rels}*0..1]-({{variable}}) RETURN {{variable}}"
+        else:
+            template_rels = ""
+            item_to_root = "RETURN item AS {variable}"
+        term_rels = "HAS_TYPE|HAS_CATEGORY|HAS_SUBCATEGORY"
+        concept_rels = "HAS_ACTIVITY|HAS_ACTIVITY_GROUP|HAS_ACTIVITY_SUBGROUP"
+        indexes = [
+            FullTextIndex(
+                name="fulltext_SyntaxValue",
+                aliases=frozenset(
+                    {"value.name", "value.name_plain", "value.guidance_text"}
+                ),
+                seed="MATCH (node)<-[:HAS_VERSION]-({variable}) RETURN {variable}",
+            ),
+            FullTextIndex(
+                name="fulltext_SyntaxRoot",
+                aliases=frozenset({"root.uid", "root.sequence_id"}),
+            ),
+            FullTextIndex(
+                name="fulltext_Library",
+                aliases=frozenset({"library.name"}),
+                seed=f"MATCH (node)-[:{self.root_class.LIBRARY_REL_LABEL}]->({{variable}}) RETURN {{variable}}",
+            ),
+            FullTextIndex(
+                name="fulltext_HAS_VERSION",
+                aliases=frozenset(
+                    {"ver_rel.status", "ver_rel.version", "ver_rel.author_id"}
+                ),
+                seed="RETURN startNode(relationship) AS {variable}",
+                relationship=True,
+            ),
+            FullTextIndex(
+                name="fulltext_CTTermRoot",
+                aliases=frozenset(
+                    {"type_root.uid", "category_root.uid", "subcategory_root.uid"}
+                ),
+                seed=f"MATCH (node)<-[:{term_rels}]-(item) " + item_to_root,
+            ),
+            FullTextIndex(
+                name="fulltext_CTTermNameValue",
+                aliases=frozenset(
+                    {
+                        f"{term}_ct_term_name_value.{name}"
+                        for term in ("type", "category", "subcategory")
+                        for name in ("name", "name_sentence_case")
+                    }
+                ),
+                seed=f"MATCH (node)<-[:LATEST]-(:CTTermNameRoot)<-[:HAS_NAME_ROOT]-()<-[:{term_rels}]-(item) "
+                + item_to_root,
+            ),
+            FullTextIndex(
+                name="fulltext_CTTermAttributesValue",
+                aliases=frozenset(
+                    {
+                        f"{term}_ct_term_attributes_value.{name}"
+                        for term in ("type", "category", "subcategory")
+                        for name in ("code_submission_value", "preferred_term")
+                    }
+                ),
+                seed=f"MATCH (node)<-[:LATEST]-(:CTTermAttributesRoot)<-[:HAS_ATTRIBUTES_ROOT]-()<-[:{term_rels}]-(item) "
+                + item_to_root,
+            ),
+            FullTextIndex(
+                name="fulltext_DictionaryTermRoot",
+                aliases=frozenset({"indication_root.uid"}),
+                seed="MATCH (node)<-[:HAS_INDICATION]-({variable}) RETURN {variable}",
+            ),
+            FullTextIndex(
+                name="fulltext_DictionaryTermValue",
+                aliases=frozenset({"indication_value.name"}),
+                seed="MATCH (node)-[:LATEST]-()<-[:HAS_INDICATION]-({variable}) RETURN {variable}",
+            ),
+            FullTextIndex(
+                name="fulltext_ConceptRoot",
+                aliases=frozenset(
+                    {
+                        "activity_root.uid",
+                        "activity_group_root.uid",
+                        "activity_subgroup_root.uid",
+                    }
+                ),
+                seed=f"MATCH (node)<-[:{concept_rels}]-({{variable}}) RETURN {{variable}}",
+            ),
+            FullTextIndex(
+                name="fulltext_ConceptValue",
+                aliases=frozenset(
+                    {
+                        f"{concept}_value.{name}"
+                        for concept in (
+                            "activity",
+                            "activity_group",
+                            "activity_subgroup",
+                        )
+                        for name in ("name", "name_sentence_case")
+                    }
+                ),
+                seed=f"MATCH (node)<-[:LATEST]-()<-[:{concept_rels}]-({{variable}}) RETURN {{variable}}",
+            ),
+        ]
+        if template_rels:
+            indexes += [
+                FullTextIndex(
+                    name="fulltext_SyntaxValue",
+                    aliases=frozenset({"template_value.name"}),
+                    seed=f"MATCH (node)<-[:HAS_VERSION]-()-[:{template_rels}]-({{variable}}) RETURN {{variable}}",
+                ),
+                FullTextIndex(
+                    name="fulltext_SyntaxRoot",
+                    aliases=frozenset({"template_root.uid"}),
+                    seed=f"MATCH (node)-[:{template_rels}]-({{variable}}) RETURN {{variable}}",
+                ),
+            ]
+        mapped = set(self.basemodel_to_cypher_mapping_optimized().values())
+        return FullTextSearch(
+            variable="root",
+            indexes=tuple(index for index in indexes if index.aliases & mapped),
+        )
+
     def _parse_parameter_terms(
         self, instance_parameters
     ) -> dict[int, list[ParameterTermEntryVO]]:
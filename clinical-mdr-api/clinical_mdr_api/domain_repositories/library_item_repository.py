@@ -40,6 +40,8 @@ from clinical_mdr_api.domains.versioned_object_aggregate import (
 from clinical_mdr_api.repositories._utils import (
     ComparisonOperator,
     FilterOperator,
+    FullTextSearch,
+    get_fulltext_query,
     sb_clear_cache,
 )
 from clinical_mdr_api.services.user_info import UserInfoService
@@ -59,6 +61,15 @@ from common.utils import (
 _AggregateRootType = TypeVar("_AggregateRootType", bound=LibraryItemAggregateRootBase)
 RETRIEVED_READ_ONLY_MARK = object()
 MATCH_NODE_BY_ID = "MATCH (node) WHERE elementId(node)=$id RETURN node"
+# Variables of basemodel_to_cypher_mapping_optimized that are never strings, so never match a wildcard value
+NON_STRING_CYPHER_NAMES_OPTIMIZED = frozenset(
+    {
+        "ver_rel.start_date",
+        "ver_rel.end_date",
+        "study_count",
+        "root.is_confirmatory_testing",
+    }
+)
 
 
 class LibraryItemRepositoryImplBase(
@@ -1485,6 +1496,15 @@ class LibraryItemRepositoryImplBase(
 
         aggregates = []
 
+        # Computed first, _where_stmt_optimized pops the wildcard filter
+        # pylint: disable=assignment-from-none
+        fulltext_search = self._fulltext_search_optimized()
+        fulltext_query = (
+            self._fulltext_query_optimized(fulltext_search, filter_by, filter_operator)
+            if fulltext_search
+            else None
+        )
+
         where_stmt, params = self._where_stmt_optimized(
             filter_by, filter_operator, version_specific_uids=version_specific_uids
         )
@@ -1502,6 +1522,10 @@ class LibraryItemRepositoryImplBase(
             include_retired_versions=include_retired_versions,
         )
 
+        if fulltext_search and fulltext_query:
+            match_stmt = fulltext_search.seed_clause() + match_stmt
+            params["fulltext_query"] = fulltext_query
+
         if status:
             params["status"] = status.value
 
@@ -1854,6 +1878,43 @@ class LibraryItemRepositoryImplBase(
 
         return mapping
 
+    def _fulltext_search_optimized(self) -> FullTextSearch | None:
+        """
+        Full-text indexes finding the `root` nodes that can match a wildcard filter of `get_all_optimized`,
+        None when its wildcard filter is applied to all nodes.
+        """
+
+        return None
+
+    def _fulltext_query_optimized(
+        self,
+        fulltext_search: FullTextSearch,
+        filter_by: dict[str, dict[str, Any]] | None,
+        filter_operator: FilterOperator,
+    ) -> str | None:
+        """
+        Returns the full-text query of a single wildcard value when the given indexes cover all the variables it searches,
+        and no other filter can select the rows they don't find, else None.
+        """
+
+        if not filter_by or "*" not in filter_by:
+            return None
+        values = filter_by["*"]["v"]
+        if (
+            len(values) != 1
+            or not isinstance(values[0], str)
+            or (filter_operator != FilterOperator.AND and len(filter_by) > 1)
+        ):
+            return None
+        aliases = (
+            set(self.basemodel_to_cypher_mapping_optimized().values())
+            - NON_STRING_CYPHER_NAMES_OPTIMIZED
+        )
+        value = values[0].lower()
+        if not fulltext_search.can_seed(aliases, value):
+            return None
+        return get_fulltext_query(value)
+
     def _where_stmt_optimized(
         self,
         filter_by: dict[str, dict[str, Any]] | None = None,
@@ -1,16 +1,18 @@
-import datetime
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any, Sequence
 
 from neomodel.sync_.core import NodeMeta, db
-from neomodel.sync_.match import Collect, NodeNameResolver, Optional, Size
 
 from clinical_mdr_api.domain_repositories.generic_repository import (
     RepositoryClosureData,
 )
 from clinical_mdr_api.domain_repositories.models.study import StudyRoot, StudyValue
 from clinical_mdr_api.domain_repositories.models.study_field import StudyBooleanField
+from clinical_mdr_api.domain_repositories.study_definitions.study_items_copy import (
+    CopyProgressCallback,
+    StudyItemsCopy,
+)
 from clinical_mdr_api.domains.study_definition_aggregates.root import (
     StudyDefinitionAR,
     StudyDefinitionSnapshot,
@@ -28,6 +30,39 @@ from common import exceptions
 from common.telemetry import trace_calls
 from common.utils import convert_to_datetime
 
+# Number of structure items of the latest value `sv` of a study,
+# each counted by an independent subquery instead of counting distinct nodes in the product of all relations
+STUDY_STRUCTURE_COUNTS = """{
+    arms: COUNT { MATCH (sv)-[:HAS_STUDY_ARM]->(arm:StudyArm) RETURN DISTINCT arm },
+    pre_treatment_epochs: COUNT { MATCH (sv)-[:HAS_STUDY_EPOCH]->(epoch:StudyEpoch)-[:HAS_EPOCH_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "PRE TREATMENT EPOCH TYPE"}) RETURN DISTINCT epoch },
+    treatment_epochs: COUNT { MATCH (sv)-[:HAS_STUDY_EPOCH]->(epoch:StudyEpoch)-[:HAS_EPOCH_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "TREATMENT"}) RETURN DISTINCT epoch },
+    no_treatment_epochs: COUNT { MATCH (sv)-[:HAS_STUDY_EPOCH]->(epoch:StudyEpoch)-[:HAS_EPOCH_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "NO TREATMENT EPOCH TYPE"}) RETURN DISTINCT epoch },
+    post_treatment_epochs: COUNT { MATCH (sv)-[:HAS_STUDY_EPOCH]->(epoch:StudyEpoch)-[:HAS_EPOCH_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "POST TREATMENT EPOCH TYPE"}) RETURN DISTINCT epoch },
+    treatment_elements: COUNT { MATCH (sv)-[:HAS_STUDY_ELEMENT]->(element:StudyElement)-[:HAS_ELEMENT_SUBTYPE]->(:CTTermRoot)-[:HAS_PARENT_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "TREATMENT ELEMENT TYPE"}) RETURN DISTINCT element },
+    no_treatment_elements: COUNT { MATCH (sv)-[:HAS_STUDY_ELEMENT]->(element:StudyElement)-[:HAS_ELEMENT_SUBTYPE]->(:CTTermRoot)-[:HAS_PARENT_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "NO TREATMENT ELEMENT TYPE"}) RETURN DISTINCT element },
+    cohorts: COUNT { MATCH (sv)-[:HAS_STUDY_COHORT]->(cohort:StudyCohort) RETURN DISTINCT cohort }
+}"""
+
+
+@trace_calls
+def refresh_study_structure_summary(study_uid: str) -> None:
+    """
+    Stores the structure counts of the latest value of the study in its StudyStructureSummary node.
+    Called by the repositories saving arms, cohorts, elements and epochs, in the transaction of the change,
+    so that the summary is committed (or rolled back) together with the change it reflects.
+    The study root is locked before the MERGE, concurrent refreshes of a study without a summary
+    would otherwise each create one.
+    """
+    db.cypher_query(
+        f"""
+MATCH (sr:StudyRoot {{uid: $uid}})-[:LATEST]->(sv:StudyValue)
+CALL apoc.lock.nodes([sr])
+MERGE (sr)-[:HAS_STRUCTURE_SUMMARY]->(summary:StudyStructureSummary)
+SET summary = {STUDY_STRUCTURE_COUNTS}
+""",
+        {"uid": study_uid},
+    )
+
 
 class StudyDefinitionRepository(ABC):
     """
@@ -147,43 +182,18 @@ class StudyDefinitionRepository(ABC):
         return result
 
     def get_study_structure_overview(self):
-        query = """
+        # Studies whose structure wasn't changed since the summaries were introduced have none yet,
+        # their counts are computed on the fly
+        query = f"""
 MATCH (sr:StudyRoot)-[:LATEST]->(sv:StudyValue)
 WHERE sv.study_id_prefix IS NOT NULL AND sv.study_number IS NOT NULL
-CALL {
-    WITH sv
-    OPTIONAL MATCH (sv)-[:HAS_STUDY_ARM]->(arm:StudyArm)
-    OPTIONAL MATCH (sv)-[:HAS_STUDY_EPOCH]->(pre_treatment_epoch:StudyEpoch)-[:HAS_EPOCH_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "PRE TREATMENT EPOCH TYPE"})
-    OPTIONAL MATCH (sv)-[:HAS_STUDY_EPOCH]->(treatment_epoch:StudyEpoch)-[:HAS_EPOCH_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "TREATMENT"})
-    OPTIONAL MATCH (sv)-[:HAS_STUDY_EPOCH]->(no_treatment_epoch:StudyEpoch)-[:HAS_EPOCH_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "NO TREATMENT EPOCH TYPE"})
-    OPTIONAL MATCH (sv)-[:HAS_STUDY_EPOCH]->(post_treatment_epoch:StudyEpoch)-[:HAS_EPOCH_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "POST TREATMENT EPOCH TYPE"})
-    OPTIONAL MATCH (sv)-[:HAS_STUDY_ELEMENT]->(treatment_element:StudyElement)-[:HAS_ELEMENT_SUBTYPE]->(:CTTermRoot)-[:HAS_PARENT_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "TREATMENT ELEMENT TYPE"})
-    OPTIONAL MATCH (sv)-[:HAS_STUDY_ELEMENT]->(no_treatment_element:StudyElement)-[:HAS_ELEMENT_SUBTYPE]->(:CTTermRoot)-[:HAS_PARENT_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "NO TREATMENT ELEMENT TYPE"})
-    OPTIONAL MATCH (sv)-[:HAS_STUDY_COHORT]->(cohort:StudyCohort)
-    WITH
-        COUNT(DISTINCT arm) AS arm_count,
-        COUNT(DISTINCT pre_treatment_epoch) AS pre_treatment_epoch_count,
-        COUNT(DISTINCT treatment_epoch) AS treatment_epoch_count,
-        COUNT(DISTINCT no_treatment_epoch) AS no_treatment_epoch_count,
-        COUNT(DISTINCT post_treatment_epoch) AS post_treatment_epoch_count,
-        COUNT(DISTINCT treatment_element) AS treatment_element_count,
-        COUNT(DISTINCT no_treatment_element) AS no_treatment_element_count,
-        COUNT(DISTINCT cohort) AS cohort_count
-    RETURN
-        {
-            arms: arm_count,
-            pre_treatment_epochs: pre_treatment_epoch_count,
-            treatment_epochs: treatment_epoch_count,
-            no_treatment_epochs: no_treatment_epoch_count,
-            post_treatment_epochs: post_treatment_epoch_count,
-            treatment_elements: treatment_element_count,
-            no_treatment_elements: no_treatment_element_count,
-            cohorts: cohort_count
-        } as counts
-}
+WITH sv, head([(sr)-[:HAS_STRUCTURE_SUMMARY]->(summary:StudyStructureSummary) | summary]) AS summary
 RETURN
     sv.study_id_prefix + "-" + sv.study_number AS study_id,
-    counts
+    CASE
+        WHEN summary IS NULL THEN {STUDY_STRUCTURE_COUNTS}
+        ELSE properties(summary)
+    END AS counts
 """
 
         rs = db.cypher_query(query=query)
@@ -191,64 +201,32 @@ RETURN
         return rs
 
     def get_study_structure_statistics(self, uid: str) -> dict[str, int] | None:
-        result = (
-            StudyValue.nodes.filter(latest_value__uid=uid)
-            .traverse_relations(
-                Optional("has_study_arm"),
-                Optional("has_study_branch_arm"),
-                Optional("has_study_element"),
-                Optional("has_study_cohort"),
-                Optional("has_study_epoch"),
-                Optional("has_study_footnote__references_study_epoch"),
-                Optional("has_study_visit"),
-                Optional("has_study_footnote__references_study_visit"),
-            )
-            .annotate(
-                arm_count=Size(
-                    Collect(NodeNameResolver("has_study_arm"), distinct=True)
-                ),
-                branch_count=Size(
-                    Collect(NodeNameResolver("has_study_branch_arm"), distinct=True)
-                ),
-                element_count=Size(
-                    Collect(NodeNameResolver("has_study_element"), distinct=True)
-                ),
-                cohort_count=Size(
-                    Collect(NodeNameResolver("has_study_cohort"), distinct=True)
-                ),
-                epoch_count=Size(
-                    Collect(NodeNameResolver("has_study_epoch"), distinct=True)
-                ),
-                epoch_footnote_count=Size(
-                    Collect(
-                        NodeNameResolver("has_study_footnote__references_study_epoch"),
-                        distinct=True,
-                    )
-                ),
-                visit_count=Size(
-                    Collect(NodeNameResolver("has_study_visit"), distinct=True)
-                ),
-                visit_footnote_count=Size(
-                    Collect(
-                        NodeNameResolver("has_study_footnote__references_study_visit"),
-                        distinct=True,
-                    )
-                ),
-            )
-            .all()
-        )
-        if not result:
+        # Each count is an independent subquery, instead of counting distinct nodes
+        # in the product of all relations of the study value.
+        # Footnote counts are the numbers of distinct epochs and visits referenced by the footnotes.
+        query = """
+MATCH (:StudyRoot {uid: $uid})-[:LATEST]->(sv:StudyValue)
+RETURN {
+    arm_count: COUNT { MATCH (sv)-[:HAS_STUDY_ARM]->(n:StudyArm) RETURN DISTINCT n },
+    branch_count: COUNT { MATCH (sv)-[:HAS_STUDY_BRANCH_ARM]->(n:StudyBranchArm) RETURN DISTINCT n },
+    element_count: COUNT { MATCH (sv)-[:HAS_STUDY_ELEMENT]->(n:StudyElement) RETURN DISTINCT n },
+    cohort_count: COUNT { MATCH (sv)-[:HAS_STUDY_COHORT]->(n:StudyCohort) RETURN DISTINCT n },
+    epoch_count: COUNT { MATCH (sv)-[:HAS_STUDY_EPOCH]->(n:StudyEpoch) RETURN DISTINCT n },
+    epoch_footnote_count: COUNT {
+        MATCH (sv)-[:HAS_STUDY_FOOTNOTE]->(:StudySoAFootnote)-[:REFERENCES_STUDY_EPOCH]->(n:StudyEpoch)
+        RETURN DISTINCT n
+    },
+    visit_count: COUNT { MATCH (sv)-[:HAS_STUDY_VISIT]->(n:StudyVisit) RETURN DISTINCT n },
+    visit_footnote_count: COUNT {
+        MATCH (sv)-[:HAS_STUDY_FOOTNOTE]->(:StudySoAFootnote)-[:REFERENCES_STUDY_VISIT]->(n:StudyVisit)
+        RETURN DISTINCT n
+    }
+} AS counts
+"""
+        rs, _ = db.cypher_query(query, {"uid": uid})
+        if not rs:
             return None
-        return {
-            "arm_count": result[0][3],
-            "branch_count": result[0][4],
-            "element_count": result[0][5],
-            "cohort_count": result[0][6],
-            "epoch_count": result[0][7],
-            "epoch_footnote_count": result[0][8],
-            "visit_count": result[0][9],
-            "visit_footnote_count": result[0][10],
-        }
+        return rs[0][0]
 
     def copy_study_items(
         self,
@@ -256,172 +234,26 @@ RETURN
         study_target_uid: str,
         list_of_items_to_copy: list[str],
         author_id: str,
-    ) -> dict[str, int] | None:
-        parameters: dict[str, str | list[str] | datetime.datetime] = {}
-        exclusions = """
-            NOT EXISTS((selection_src)--(:StudyActivity))
-            AND NOT EXISTS((selection_src)--(:StudyActivitySubGroup))
-            AND NOT EXISTS((selection_src)--(:StudyActivityGroup))
-            AND NOT EXISTS((selection_src:StudySoAFootnote)--(:StudyActivitySchedule))
-            AND NOT EXISTS((selection_src)--(:StudyActivityInstance))
-            AND NOT EXISTS((selection_src)--(:StudySoAGroup))
-        """
-        if (
-            "StudySoAFootnote" in list_of_items_to_copy
-            and "StudyVisit" not in list_of_items_to_copy
-        ):
-            exclusions += """
-            AND NOT ((selection_src:StudySoAFootnote)--(:StudyVisit) AND NOT (selection_src:StudySoAFootnote)--(:StudyVisit)--(:Delete))
-        """
-        if (
-            "StudySoAFootnote" in list_of_items_to_copy
-            and "StudyEpoch" not in list_of_items_to_copy
-        ):
-            exclusions += """
-            AND NOT ((selection_src:StudySoAFootnote)--(:StudyEpoch) AND NOT (selection_src:StudySoAFootnote)--(:StudyEpoch)--(:Delete))
-        """
-
-        # COPY NODES AND OUTBOUND RELATIONSHIPS
-        query = f"""
-WITH $study_src_uid as study_src, $study_target_uid as study_target, $to_copy_labels as to_copy_labels
-with study_src, study_target, apoc.text.join(to_copy_labels, '|') AS to_copy_labels_text
-
-MATCH (sr_src:StudyRoot)-[:LATEST]->(sv_src:StudyValue)
-    WHERE sr_src.uid = study_src
-MATCH (sr_target:StudyRoot)-[:LATEST]->(sv_target:StudyValue)
-    WHERE sr_target.uid = study_target
-
-
-CALL apoc.cypher.run("
-    MATCH path = ((sr_src)-[:AUDIT_TRAIL]->(saction_src:StudyAction)--(selection_src:StudySelection&(" + to_copy_labels_text + "))<--(sv_src))
-        WHERE {exclusions}
-    return sr_src, sv_src,collect(path) as paths ", 
-{{sr_src:sr_src, sv_src:sv_src }})
-YIELD value
-
-WITH  sr_target, value.sr_src as sr_src, sv_target, value.sv_src as sv_src,value.paths as paths
-    
-CALL apoc.refactor.cloneSubgraphFromPaths(paths, {{
-    standinNodes:[[sv_src, sv_target], [sr_src,sr_target]]
-}})
-YIELD input, output, error
-SET output:TEMP
-WITH input,output
-MATCH (selection_src:StudySelection)-[r_ext_src]-(ext_src)
-    where ID(selection_src)=input
-    and not "StudySelection" in labels(ext_src)
-    and not "StudyAction" in labels(ext_src)
-    and not "StudyValue" in labels(ext_src)
-call apoc.create.relationship(output, type(r_ext_src), Null, ext_src)
-yield rel
-RETURN rel
-"""
-        parameters = {
-            "study_src_uid": study_src_uid,
-            "study_target_uid": study_target_uid,
-            "to_copy_labels": list_of_items_to_copy,
-        }
-        db.cypher_query(query=query, params=parameters)
-
-        # COPY BETWEEN SELECTIONS RELATIONSHIPS
-        query = """
-WITH $study_src_uid as study_src, $study_target_uid as study_target, $to_copy_labels as to_copy_labels
-
-MATCH (sr_from:StudyRoot)-[:LATEST]->(sv_from:StudyValue)-->(selection_src_from:StudySelection)-[r_ext_src]->(selection_src_to:StudySelection)
-    where sr_from.uid = study_src
-WITH selection_src_from.uid as from_uid, type(r_ext_src) AS from_rel_type_to, selection_src_to.uid as to_uid, study_target, to_copy_labels
-match (sr_to:StudyRoot)-[:LATEST]->(sv_to:StudyValue)-->(a:StudySelection)
-    where sr_to.uid = study_target
-match (sr_to)-[:LATEST]->(sv_to)-->(b:StudySelection) 
-WITH a,b, from_rel_type_to
-    where a.uid = from_uid
-    and b.uid = to_uid
-    AND ANY(label IN labels(a) WHERE label IN to_copy_labels)
-WITH DISTINCT a,b,from_rel_type_to
-
-call apoc.merge.relationship(a, from_rel_type_to, null, Null, b)
-yield rel
-
-
-return *
-"""
-        parameters = {
-            "study_src_uid": study_src_uid,
-            "study_target_uid": study_target_uid,
-            "to_copy_labels": list_of_items_to_copy,
-        }
-        db.cypher_query(query=query, params=parameters)
-
-        # REFACTOR UIDS AND STUDY ACTIONS
-        query = """
-
-
-WITH $study_src_uid as study_src, $study_target_uid as study_target, $to_copy_labels as to_copy_labels, $date as date, $author_id as author_id
-
-// GO ONE BY ONE LABEL TO COPY
-unwind to_copy_labels as to_copy_labels_unw
-
-MATCH (sr_target:StudyRoot)-[:LATEST]->(sv_target:StudyValue)-[relationship]-(selection_target:StudySelection)
-    where sr_target.uid = study_target AND type(relationship) <> "HAS_PROTOCOL_SOA_CELL" AND type(relationship) <> "HAS_PROTOCOL_SOA_FOOTNOTE"
-
-// Update the counter value and generate new UID and 
-CALL {
-    WITH to_copy_labels_unw, selection_target
-    WITH to_copy_labels_unw, selection_target
-        WHERE to_copy_labels_unw in labels(selection_target)
-    MATCH (m:Counter{counterId:to_copy_labels_unw+'Counter'})
-    WITH m,to_copy_labels_unw, selection_target
-    CALL apoc.atomic.add(m,'count',1,1) yield oldValue, newValue
-    WITH toInteger(newValue) as uid_number,to_copy_labels_unw, selection_target
-    with to_copy_labels_unw+"_"+apoc.text.lpad(""+(uid_number), 6, "0") as new_uid, selection_target
-    SET selection_target.old_uid = selection_target.uid
-    SET selection_target.uid = new_uid
-}
-
-// find the visit_anchor
-CALL {
-    WITH to_copy_labels_unw, selection_target
-    WITH to_copy_labels_unw, selection_target
-        WHERE "StudyVisit" in labels(selection_target) and selection_target.visit_sublabel_reference IS NOT NULL
-    MATCH (ref_svis:StudyVisit:TEMP{old_uid:selection_target.visit_sublabel_reference})
-    set selection_target.visit_sublabel_reference = ref_svis.uid
-}
-
-// remove TEMP label, remove old_uid
-CALL {
-    WITH to_copy_labels_unw, selection_target
-    WITH to_copy_labels_unw, selection_target
-        WHERE to_copy_labels_unw in labels(selection_target)
-    SET selection_target.old_uid = NULL
-    REMOVE selection_target:TEMP
-}
-
-WITH $study_src_uid as study_src, $study_target_uid as study_target, $to_copy_labels as to_copy_labels, $date as date, $author_id as author_id
-
-// Update action metadata and clean up temp labels
-MATCH (sr_target)--(saction:StudyAction:TEMP)
-    where sr_target.uid = study_target
-    and "TEMP" in labels(saction)
-WITH distinct saction, author_id, date
-SET saction.author_id = author_id
-SET saction.date = date
-REMOVE saction:TEMP
-REMOVE saction:Edit
-REMOVE saction:Create
-SET saction:Create
-
-return *
-"""
-        parameters = {
-            "study_src_uid": study_src_uid,
-            "study_target_uid": study_target_uid,
-            "to_copy_labels": list_of_items_to_copy,
-            "date": datetime.datetime.now(datetime.timezone.utc),
-            "author_id": author_id,
-        }
-        result = db.cypher_query(query=query, params=parameters)
-
-        return result
+        chunk_size: int | None = None,
+        progress: CopyProgressCallback | None = None,
+    ) -> dict[str, int]:
+        """
+        Copies the selections with the given labels from the source study to the target study,
+        in chunks of `chunk_size` selections (`settings.study_copy_chunk_size` by default).
+
+        Returns the number of copied selections per label.
+        """
+        counts = StudyItemsCopy(
+            study_src_uid=study_src_uid,
+            study_target_uid=study_target_uid,
+            labels=list_of_items_to_copy,
+            author_id=author_id,
+            chunk_size=chunk_size,
+            progress=progress,
+        ).run()
+        refresh_study_structure_summary(study_target_uid)
+
+        return counts
 
     def update_subpart_relationship(
         self,
@@ -0,0 +1,265 @@
+"""
+Copy of the selections of a study into another study, in bounded chunks.
+
+The selections are copied label by label, `settings.study_copy_chunk_size` selections per statement:
+    1. the selections, with their study actions and the relationships to the study value and study root,
+       then the relationships to the nodes outside of the study (terms, concepts, ...),
+    2. the relationships between the copied selections,
+    3. new uids from the counter of each label, and the references between visits.
+
+All statements run in the transaction of the caller, so a failure rolls the whole copy back.
+`StudyService.clone_study` creates the target study in that same transaction, committing each chunk
+would leave a partially cloned study behind that a retry could not resume from.
+The chunks bound the size of each statement, not of the transaction: its memory grows with the number
+of copied selections and is bounded by the `db.memory.transaction.max` setting of the database.
+Progress is logged, and reported to the optional `progress` callback, after each chunk,
+the duration of the copy is logged at the end so that the length of the transaction can be followed.
+"""
+
+import datetime
+import logging
+import time
+from typing import Callable, Iterable, Sequence
+
+from neomodel import db
+
+from common.config import settings
+from common.telemetry import trace_calls
+from common.utils import chunks
+
+log = logging.getLogger(__name__)
+
+# Called with the phase, the label, the number of selections processed and the total number of selections of the label
+CopyProgressCallback = Callable[[str, str, int, int], None]
+
+# Selections related to the Study Activities are never copied
+_EXCLUSIONS = """
+            NOT EXISTS((selection_src)--(:StudyActivity))
+            AND NOT EXISTS((selection_src)--(:StudyActivitySubGroup))
+            AND NOT EXISTS((selection_src)--(:StudyActivityGroup))
+            AND NOT EXISTS((selection_src:StudySoAFootnote)--(:StudyActivitySchedule))
+            AND NOT EXISTS((selection_src)--(:StudyActivityInstance))
+            AND NOT EXISTS((selection_src)--(:StudySoAGroup))
+"""
+
+
+class StudyItemsCopy:
+    def __init__(
+        self,
+        study_src_uid: str,
+        study_target_uid: str,
+        labels: Iterable[str],
+        author_id: str,
+        chunk_size: int | None = None,
+        progress: CopyProgressCallback | None = None,
+    ):
+        self.study_src_uid = study_src_uid
+        self.study_target_uid = study_target_uid
+        self.labels = list(labels)
+        self.author_id = author_id
+        self.chunk_size = chunk_size or settings.study_copy_chunk_size
+        self.progress = progress
+        self.date = datetime.datetime.now(datetime.timezone.utc)
+
+    @trace_calls
+    def run(self) -> dict[str, int]:
+        """Copies the selections, returns the number of copied selections per label"""
+
+        started = time.monotonic()
+        source_ids = self._find_selections_to_copy()
+
+        # element id of the source selection -> element id of the copy, per label
+        copies: dict[str, dict[str, str]] = {}
+        for label, ids in source_ids.items():
+            copies[label] = {}
+            for chunk in chunks(ids, self.chunk_size):
+                copies[label].update(self._copy_selections(chunk))
+                self._report("copy", label, len(copies[label]), len(ids))
+
+        for label, label_copies in copies.items():
+            pairs = list(label_copies.items())
+            for done, chunk in enumerate(chunks(pairs, self.chunk_size)):
+                self._copy_relationships_between_selections(chunk)
+                self._report(
+                    "relationships",
+                    label,
+                    min((done + 1) * self.chunk_size, len(pairs)),
+                    len(pairs),
+                )
+
+        # old uid -> new uid
+        new_uids: dict[str, str] = {}
+        visit_references: list[dict[str, str]] = []
+        for label, label_copies in copies.items():
+            copy_ids = list(label_copies.values())
+            for done, chunk in enumerate(chunks(copy_ids, self.chunk_size)):
+                for old_uid, new_uid, element_id, reference in self._assign_new_uids(
+                    label, chunk
+                ):
+                    new_uids[old_uid] = new_uid
+                    if reference is not None:
+                        visit_references.append({"id": element_id, "uid": reference})
+                self._report(
+                    "uids",
+                    label,
+                    min((done + 1) * self.chunk_size, len(copy_ids)),
+                    len(copy_ids),
+                )
+
+        for chunk in chunks(visit_references, self.chunk_size):
+            self._update_visit_references(chunk, new_uids)
+
+        counts = {label: len(label_copies) for label, label_copies in copies.items()}
+        log.info(
+            "Copy of study %s to %s: %s selections copied in %.1f s, in one transaction",
+            self.study_src_uid,
+            self.study_target_uid,
+            sum(counts.values()),
+            time.monotonic() - started,
+        )
+        return counts
+
+    def _report(self, phase: str, label: str, done: int, total: int) -> None:
+        log.info(
+            "Copy of study %s to %s, %s of %s: %s/%s",
+            self.study_src_uid,
+            self.study_target_uid,
+            phase,
+            label,
+            done,
+            total,
+        )
+        if self.progress:
+            self.progress(phase, label, done, total)
+
+    def _find_selections_to_copy(self) -> dict[str, list[str]]:
+        exclusions = _EXCLUSIONS
+        if "StudySoAFootnote" in self.labels and "StudyVisit" not in self.labels:
+            exclusions += """
+            AND NOT ((selection_src:StudySoAFootnote)--(:StudyVisit) AND NOT (selection_src:StudySoAFootnote)--(:StudyVisit)--(:Delete))
+        """
+        if "StudySoAFootnote" in self.labels and "StudyEpoch" not in self.labels:
+            exclusions += """
+            AND NOT ((selection_src:StudySoAFootnote)--(:StudyEpoch) AND NOT (selection_src:StudySoAFootnote)--(:StudyEpoch)--(:Delete))
+        """
+
+        rs, _ = db.cypher_query(
+            f"""
+MATCH (sr_src:StudyRoot {{uid: $study_src_uid}})-[:LATEST]->(sv_src:StudyValue)-->(selection_src:StudySelection)
+    WHERE ANY(label IN labels(selection_src) WHERE label IN $labels)
+    AND EXISTS {{ (sr_src)-[:AUDIT_TRAIL]->(:StudyAction)--(selection_src) }}
+    AND {exclusions}
+RETURN DISTINCT elementId(selection_src), labels(selection_src)
+""",
+            {"study_src_uid": self.study_src_uid, "labels": self.labels},
+        )
+
+        # A selection with several of the labels is copied once, with the first of them
+        source_ids: dict[str, list[str]] = {label: [] for label in self.labels}
+        for element_id, node_labels in rs:
+            label = next(label for label in self.labels if label in node_labels)
+            source_ids[label].append(element_id)
+        return source_ids
+
+    def _copy_selections(self, source_ids: Sequence[str]) -> dict[str, str]:
+        rs, _ = db.cypher_query(
+            """
+MATCH (sr_src:StudyRoot {uid: $study_src_uid})-[:LATEST]->(sv_src:StudyValue)
+MATCH (sr_target:StudyRoot {uid: $study_target_uid})-[:LATEST]->(sv_target:StudyValue)
+MATCH path = (sr_src)-[:AUDIT_TRAIL]->(:StudyAction)--(selection_src:StudySelection)<--(sv_src)
+    WHERE elementId(selection_src) IN $source_ids
+WITH sr_src, sv_src, sr_target, sv_target, collect(path) AS paths
+CALL apoc.refactor.cloneSubgraphFromPaths(paths, {
+    standinNodes: [[sv_src, sv_target], [sr_src, sr_target]]
+})
+YIELD input, output
+MATCH (source) WHERE id(source) = input
+CALL {
+    WITH output
+    WITH output WHERE output:StudyAction
+    SET output.author_id = $author_id
+    SET output.date = $date
+    REMOVE output:Edit
+    REMOVE output:Create
+    SET output:Create
+}
+CALL {
+    WITH source, output
+    WITH source, output WHERE source:StudySelection
+    MATCH (source)-[r_ext_src]-(ext_src)
+        WHERE NOT ext_src:StudySelection
+        AND NOT ext_src:StudyAction
+        AND NOT ext_src:StudyValue
+    CALL apoc.create.relationship(output, type(r_ext_src), NULL, ext_src)
+    YIELD rel
+    RETURN count(rel) AS relationships
+}
+WITH source, output WHERE source:StudySelection
+RETURN elementId(source), elementId(output)
+""",
+            {
+                "study_src_uid": self.study_src_uid,
+                "study_target_uid": self.study_target_uid,
+                "source_ids": list(source_ids),
+                "author_id": self.author_id,
+                "date": self.date,
+            },
+        )
+        return dict(rs)
+
+    def _copy_relationships_between_selections(
+        self, pairs: Sequence[tuple[str, str]]
+    ) -> None:
+        # The copies still have the uids of the selections they were copied from,
+        # the target of a relationship is found by uid as it may be an older version of a copied selection
+        db.cypher_query(
+            """
+MATCH (sr_target:StudyRoot {uid: $study_target_uid})-[:LATEST]->(sv_target:StudyValue)
+UNWIND $pairs AS pair
+MATCH (selection_src:StudySelection)-[r_src]->(selection_src_to:StudySelection)
+    WHERE elementId(selection_src) = pair[0]
+MATCH (selection_target) WHERE elementId(selection_target) = pair[1]
+MATCH (sv_target)-->(selection_target_to:StudySelection {uid: selection_src_to.uid})
+WITH DISTINCT selection_target, type(r_src) AS rel_type, selection_target_to
+CALL apoc.merge.relationship(selection_target, rel_type, NULL, NULL, selection_target_to)
+YIELD rel
+RETURN count(rel)
+""",
+            {"study_target_uid": self.study_target_uid, "pairs": list(pairs)},
+        )
+
+    def _assign_new_uids(
+        self, label: str, copy_ids: Sequence[str]
+    ) -> list[tuple[str, str, str, str | None]]:
+        rs, _ = db.cypher_query(
+            """
+MATCH (counter:Counter {counterId: $label + 'Counter'})
+CALL apoc.atomic.add(counter, 'count', size($copy_ids), 1) YIELD oldValue
+WITH toInteger(oldValue) AS last_uid_number
+UNWIND range(0, size($copy_ids) - 1) AS index
+MATCH (selection_target) WHERE elementId(selection_target) = $copy_ids[index]
+WITH selection_target, selection_target.uid AS old_uid,
+    $label + "_" + apoc.text.lpad("" + (last_uid_number + index + 1), 6, "0") AS new_uid
+SET selection_target.uid = new_uid
+RETURN old_uid, new_uid, elementId(selection_target), selection_target.visit_sublabel_reference
+""",
+            {"label": label, "copy_ids": list(copy_ids)},
+        )
+        return rs
+
+    def _update_visit_references(
+        self, visit_references: Sequence[dict[str, str]], new_uids: dict[str, str]
+    ) -> None:
+        rows = [
+            {"id": reference["id"], "uid": new_uids[reference["uid"]]}
+            for reference in visit_references
+            if reference["uid"] in new_uids
+        ]
+        db.cypher_query(
+            """
+UNWIND $rows AS row
+MATCH (visit:StudyVisit) WHERE elementId(visit) = row.id
+SET visit.visit_sublabel_reference = row.uid
+""",
+            {"rows": rows},
+        )
@@ -22,6 +22,9 @@ from clinical_mdr_api.domain_repositories.models.study_audit_trail import (
     StudyAction,
 )
 from clinical_mdr_api.domain_repositories.models.study_selections import StudyArm
+from clinical_mdr_api.domain_repositories.study_definitions.study_definition_repository import (
+    refresh_study_structure_summary,
+)
 from clinical_mdr_api.domains.enums import StudyDesignClassEnum
 from clinical_mdr_api.domains.study_selections.study_selection_arm import (
     StudySelectionArmAR,
@@ -447,6 +450,7 @@ class StudySelectionArmRepository:
                 for_deletion=False,
                 before_node=last_study_selection_node,
             )
+        refresh_study_structure_summary(study_selection.study_uid)
 
     @staticmethod
     def _set_before_audit_info(
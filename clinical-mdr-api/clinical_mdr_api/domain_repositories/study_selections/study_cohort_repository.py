@@ -20,6 +20,9 @@ from clinical_mdr_api.domain_repositories.models.study_selections import (
     StudyBranchArm,
     StudyCohort,
 )
+from clinical_mdr_api.domain_repositories.study_definitions.study_definition_repository import (
+    refresh_study_structure_summary,
+)
 from clinical_mdr_api.domains.enums import StudyDesignClassEnum
 from clinical_mdr_api.domains.study_selections.study_selection_cohort import (
     StudySelectionCohortAR,
@@ -391,6 +394,7 @@ class StudySelectionCohortRepository:
                 audit_node=audit_node,
                 for_deletion=False,
             )
+        refresh_study_structure_summary(study_selection.study_uid)
 
     @staticmethod
     def _remove_old_selection_if_exists(
@@ -20,6 +20,9 @@ from clinical_mdr_api.domain_repositories.models.study_audit_trail import (
     Edit,
 )
 from clinical_mdr_api.domain_repositories.models.study_epoch import StudyEpoch
+from clinical_mdr_api.domain_repositories.study_definitions.study_definition_repository import (
+    refresh_study_structure_summary,
+)
 from clinical_mdr_api.domains.study_definition_aggregates.study_metadata import (
     StudyStatus,
 )
@@ -485,6 +488,7 @@ class StudyEpochRepository:
                 exclude_study_selection_relationships=[],
             )
 
+        refresh_study_structure_summary(item.study_uid)
         return item
 
     def manage_versioning_create(
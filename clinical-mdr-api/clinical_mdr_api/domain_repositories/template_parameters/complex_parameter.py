@@ -4,6 +4,10 @@ from dataclasses import asdict, dataclass
 from neo4j.exceptions import ServiceUnavailable
 from neomodel import db
 
+from clinical_mdr_api.domain_repositories.template_parameters.parameter_values import (
+    template_parameter_values,
+)
+
 log = logging.getLogger(__name__)
 
 
@@ -81,56 +85,18 @@ class ComplexTemplateParameterRepository:
         return values
 
     def find_all_with_samples(self):
-        items, _ = db.cypher_query(
-            """
-            MATCH (pt:TemplateParameter)
-            CALL {
-                WITH pt
-                MATCH (pt)<-[:HAS_PARENT_PARAMETER*0..]-(pt_parents)-[:HAS_PARAMETER_TERM]->(pr)-[:LATEST_FINAL]->(pv)
-                // Filter out items from the Requested library.
-                WHERE NOT (pr)<-[:CONTAINS_CONCEPT]-(:Library {name: "Requested"})    
-                WITH  pr, pv,  pt_parents
-                ORDER BY pv.name ASC
-                LIMIT 3
-                RETURN collect({uid: pr.uid, name: pv.name, type: pt_parents.name}) AS terms
-            }
-            RETURN
-                pt.name AS name,
-                terms
-            ORDER BY name
-        """
-        )
-        return_value = [{"name": item[0], "terms": item[1]} for item in items]
-        return return_value
+        return list(template_parameter_values.get().samples)
 
     def find_values(self, template_parameter_name: str):
-        items, _ = db.cypher_query(
-            """
-            MATCH (pt:TemplateParameter {name: $name})
-            CALL {
-                WITH pt
-                MATCH (pt)<-[:HAS_PARENT_PARAMETER*0..]-(pt_parents)-[:HAS_PARAMETER_TERM]->(pr)-[:LATEST_FINAL]->(pv)
-                // Filter out the child template parameter values if theirs parent contains the same value.
-                // This ensures that the terms response will contain unique values.
-                // Also filter out items from the Requested library.
-                WHERE (pt=pt_parents OR NOT ((pt_parents)-[:HAS_PARAMETER_TERM]->(pr) AND (pt)-[:HAS_PARAMETER_TERM]->(pr))) AND NOT (pr)<-[:CONTAINS_CONCEPT]-(:Library {name: "Requested"})
-                WITH  pr, pv,  pt_parents
-                ORDER BY pv.name ASC
-                RETURN collect({uid: pr.uid, name: pv.name, type: pt_parents.name}) AS terms
-            }
-            RETURN
-                pt.name AS name,
-                terms
-            ORDER BY name
-        """,
-            {"name": template_parameter_name},
-        )
-        if len(items) > 0:
-            return items[0][1]
-        return []
+        return list(template_parameter_values.get().get_values(template_parameter_name))
 
     def get_parameter_including_terms(self, parameter_name: str):
-        for item in self.find_extended():
-            if item["name"] == parameter_name:
-                return item
+        item = template_parameter_values.get().get_samples(parameter_name)
+        if item is not None:
+            return item
+        if self.concepts is None:
+            self._fetch_concepts()
+        for concept in self.concepts:
+            if concept.name == parameter_name:
+                return concept.get_values()
         return None
@@ -0,0 +1,265 @@
+"""
+In-memory catalogue of the values of all template parameters.
+
+The values of a template parameter are the final terms of the parameter and of its descendants
+(the parameters linked to it by HAS_PARENT_PARAMETER), except the terms of the Requested library.
+Rather than walking the parameter tree for every picker, the catalogue is built from the graph
+with a couple of bulk queries and kept in memory, along with the versions of the values it was built from:
+    - each parameter name has its own TemplateParameterValuesVersion node, unique by `parameter_name`,
+    - the repositories that link or unlink parameter terms, or approve a parameter term under a new name,
+      set a new version on the nodes of the parameters concerned, in the transaction of the change,
+    - each read compares the versions in the graph with the ones of the catalogue,
+      and reloads the terms of the parameters whose version differs.
+As the versions are committed (or rolled back) together with the change, all workers and API instances
+refresh their catalogue once the change is visible, and a build which read uncommitted or outdated terms
+is never taken for the current versions.
+Changes to unrelated parameters don't wait on a shared node, and only refresh the parameters they changed.
+The catalogue is fully rebuilt after `settings.template_parameter_values_cache_ttl` seconds,
+so that terms written to the graph without the API (e.g. by imports) are picked up as well.
+"""
+
+import heapq
+import logging
+import time
+from collections import defaultdict, deque
+from itertools import chain
+from threading import Lock
+from typing import Any, Iterable
+
+from neomodel import db
+
+from common.config import settings
+
+log = logging.getLogger(__name__)
+
+NBR_SAMPLES = 3
+
+# Element id, name and [element id, name] of the children of each template parameter
+ParameterRow = tuple[str, str, list[tuple[str, str]]]
+# Element id of the parameter, uid and latest final name of the term
+TermRow = tuple[str, str, str | None]
+
+
+def _term_sort_key(term: dict[str, Any]) -> tuple[bool, str]:
+    # Like Cypher's ORDER BY, nulls last
+    return term["name"] is None, term["name"] or ""
+
+
+class ParameterValues:
+    """The values of all template parameters, by parameter name"""
+
+    def __init__(self, parameters: Iterable[ParameterRow], terms: Iterable[TermRow]):
+        names: dict[str, str] = {}
+        children: dict[str, list[str]] = {}
+        for element_id, name, parameter_children in parameters:
+            names[element_id] = name
+            children[element_id] = []
+            for child_id, child_name in parameter_children:
+                names.setdefault(child_id, child_name)
+                children[element_id].append(child_id)
+
+        terms_by_parameter: dict[str, list[tuple[str, str | None]]] = defaultdict(list)
+        for element_id, uid, term_name in terms:
+            terms_by_parameter[element_id].append((uid, term_name))
+
+        # Parameters with the same name (e.g. several versions of a codelist name) are listed each,
+        # the values of the first one are returned when looking them up by name
+        self.samples: list[dict[str, Any]] = []
+        self._values: dict[str, list[dict[str, Any]]] = {}
+        self._samples: dict[str, dict[str, Any]] = {}
+        for element_id in sorted(children, key=lambda element_id: names[element_id]):
+            own_uids = {uid for uid, _ in terms_by_parameter.get(element_id, ())}
+            all_terms = []
+            values = []
+            for descendant_id in self._descendants(element_id, children):
+                descendant_name = names[descendant_id]
+                for uid, term_name in terms_by_parameter.get(descendant_id, ()):
+                    term = {"uid": uid, "name": term_name, "type": descendant_name}
+                    all_terms.append(term)
+                    # A term of a descendant that the parameter has as well is listed once
+                    if descendant_id == element_id or uid not in own_uids:
+                        values.append(term)
+            values.sort(key=_term_sort_key)
+            parameter_name = names[element_id]
+            item: dict[str, Any] = {
+                "name": parameter_name,
+                "terms": heapq.nsmallest(NBR_SAMPLES, all_terms, key=_term_sort_key),
+            }
+            self.samples.append(item)
+            self._samples.setdefault(parameter_name, item)
+            self._values.setdefault(parameter_name, values)
+
+    @staticmethod
+    def _descendants(element_id: str, children: dict[str, list[str]]) -> list[str]:
+        """The parameter itself and its descendants, each once"""
+        descendants = [element_id]
+        seen = {element_id}
+        to_visit = deque([element_id])
+        while to_visit:
+            for child_id in children.get(to_visit.popleft(), ()):
+                if child_id not in seen:
+                    seen.add(child_id)
+                    descendants.append(child_id)
+                    to_visit.append(child_id)
+        return descendants
+
+    def get_values(self, parameter_name: str) -> list[dict[str, Any]]:
+        return self._values.get(parameter_name, [])
+
+    def get_samples(self, parameter_name: str) -> dict[str, Any] | None:
+        return self._samples.get(parameter_name)
+
+
+class ParameterValueCatalogue:
+    """Builds the `ParameterValues` from the graph when needed, and refreshes them when their versions change or expire"""
+
+    def __init__(self, ttl: int | None = None):
+        self.ttl = settings.template_parameter_values_cache_ttl if ttl is None else ttl
+        # The values, the versions of the graph they were built from, the terms they were built with by parameter name,
+        # and when they were fully built
+        self._built: (
+            tuple[ParameterValues, dict[str, str], dict[str, list[TermRow]], float]
+            | None
+        ) = None
+        self._build_lock = Lock()
+
+    @staticmethod
+    def invalidate(parameter_names: Iterable[str]) -> None:
+        """
+        Called by the repositories with the names of the parameters whose terms changed, in the transaction of the change,
+        so that all catalogues refresh these parameters once it is committed.
+        A random version never matches the version of a build, even of a build which saw a rolled back change.
+        The version nodes are locked in name order, so that concurrent changes can't deadlock on them.
+        """
+        parameter_names = sorted(set(parameter_names))
+        if not parameter_names:
+            return
+        db.cypher_query(
+            """
+            UNWIND $parameter_names AS parameter_name
+            MERGE (version:TemplateParameterValuesVersion {parameter_name: parameter_name})
+            SET version.version = randomUUID()
+            """,
+            {"parameter_names": parameter_names},
+        )
+
+    @staticmethod
+    def invalidate_final_name(term_root_element_id: str) -> None:
+        """
+        Called by the repositories when a parameter term is approved, in the transaction of the approval.
+        Sets a new version for the parameters of the term only when it is approved for the first time,
+        or under another name than its previous final version.
+        """
+        db.cypher_query(
+            """
+            MATCH (term_root:TemplateParameterTermRoot)-[has_version:HAS_VERSION {status: "Final"}]->(term_value)
+            WHERE elementId(term_root) = $element_id
+            WITH term_root, term_value
+            ORDER BY has_version.start_date DESC
+            WITH term_root, collect(coalesce(term_value.name, ""))[..2] AS final_names
+            WHERE size(final_names) = 1 OR final_names[0] <> final_names[1]
+            MATCH (parameter)-[:HAS_PARAMETER_TERM]->(term_root)
+            WITH DISTINCT parameter.name AS parameter_name
+            ORDER BY parameter_name
+            MERGE (version:TemplateParameterValuesVersion {parameter_name: parameter_name})
+            SET version.version = randomUUID()
+            """,
+            {"element_id": term_root_element_id},
+        )
+
+    def clear(self) -> None:
+        """Drops the values kept by this process, for changes made without `invalidate`"""
+        self._built = None
+
+    def get(self) -> ParameterValues:
+        # The versions are read before the terms, so that terms read along with an outdated version
+        # are at worst newer than it, and reloaded once more on the next read
+        version = self._retrieve_version()
+        built = self._built
+        if (
+            built is not None
+            and built[1] == version
+            and time.monotonic() - built[3] < self.ttl
+        ):
+            return built[0]
+
+        # A single build at a time, the other readers wait for it
+        with self._build_lock:
+            built = self._built
+            start = time.monotonic()
+            if built is None or start - built[3] >= self.ttl:
+                built_at = start
+                terms = self._retrieve_terms()
+            else:
+                parameter_values, built_version, terms, built_at = built
+                if built_version == version:
+                    return parameter_values
+                changed = sorted(
+                    parameter_name
+                    for parameter_name in version.keys() | built_version.keys()
+                    if version.get(parameter_name) != built_version.get(parameter_name)
+                )
+                terms = {
+                    parameter_name: parameter_terms
+                    for parameter_name, parameter_terms in terms.items()
+                    if parameter_name not in changed
+                }
+                terms.update(self._retrieve_terms(changed))
+
+            parameter_values = ParameterValues(
+                self._retrieve_parameters(), chain.from_iterable(terms.values())
+            )
+            log.info(
+                "Built the values of %s template parameters in %.2f s",
+                len(parameter_values.samples),
+                time.monotonic() - start,
+            )
+            self._built = (parameter_values, version, terms, built_at)
+        return parameter_values
+
+    @staticmethod
+    def _retrieve_version() -> dict[str, str]:
+        items, _ = db.cypher_query(
+            """
+            MATCH (version:TemplateParameterValuesVersion)
+            RETURN version.parameter_name AS parameter_name, version.version AS version
+            """
+        )
+        return {item[0]: item[1] for item in items}
+
+    @staticmethod
+    def _retrieve_parameters() -> list[ParameterRow]:
+        items, _ = db.cypher_query(
+            """
+            MATCH (pt:TemplateParameter)
+            RETURN
+                elementId(pt) AS element_id,
+                pt.name AS name,
+                [(pt)<-[:HAS_PARENT_PARAMETER]-(child) | [elementId(child), child.name]] AS children
+            """
+        )
+        return [(item[0], item[1], item[2]) for item in items]
+
+    @staticmethod
+    def _retrieve_terms(
+        parameter_names: list[str] | None = None,
+    ) -> dict[str, list[TermRow]]:
+        """The terms of the given parameters, or of all parameters, by parameter name"""
+        items, _ = db.cypher_query(
+            """
+            MATCH (parameter)-[:HAS_PARAMETER_TERM]->(pr)-[:LATEST_FINAL]->(pv)
+            WHERE $parameter_names IS NULL OR parameter.name IN $parameter_names
+            // Filter out items from the Requested library.
+            AND NOT (pr)<-[:CONTAINS_CONCEPT]-(:Library {name: "Requested"})
+            RETURN parameter.name AS parameter_name, elementId(parameter) AS element_id, pr.uid AS uid, pv.name AS name
+            """,
+            {"parameter_names": parameter_names},
+        )
+        terms: dict[str, list[TermRow]] = defaultdict(list)
+        for item in items:
+            terms[item[0]].append((item[1], item[2], item[3]))
+        return dict(terms)
+
+
+# Shared by all repositories of this process
+template_parameter_values = ParameterValueCatalogue()
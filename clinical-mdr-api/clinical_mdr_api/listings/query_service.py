@@ -1,16 +1,19 @@
 import json
 import os
+import threading
 from datetime import datetime
 from typing import Any
 
 from neomodel import db
 
 from clinical_mdr_api import utils
+from clinical_mdr_api.domains.listings.utils import AdamReport
 from clinical_mdr_api.models.utils import GenericFilteringReturn
 from clinical_mdr_api.repositories._utils import (
     CypherQueryBuilder,
     FilterDict,
     FilterOperator,
+    validate_filters_and_add_search_string,
 )
 from common.config import settings
 
@@ -23,6 +26,53 @@ MATCH_LATEST_STUDY = """
 """
 
 
+METADATA_PATH = os.path.join(os.path.dirname(__file__), "metadata.json")
+
+
+class ListingsMetadata:
+    """
+    Metadata of the legacy datasets, read from a JSON file once per process.
+
+    The items are indexed by dataset name, and the file is read again when its modification time changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime: float | None = None
+        self._items: list[dict[str, Any]] = []
+        self._by_dataset: dict[str, list[dict[str, Any]]] = {}
+
+    def _load(self) -> None:
+        mtime = os.stat(self.path).st_mtime
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            with open(self.path, "r", encoding="UTF-8") as metadata:
+                items = json.load(metadata)
+            by_dataset: dict[str, list[dict[str, Any]]] = {}
+            for item in items:
+                by_dataset.setdefault(item["dataset_name"], []).append(item)
+            self._items, self._by_dataset = items, by_dataset
+            self._mtime = mtime
+
+    def get(self, dataset_names: list[str] | None = None) -> list[dict[str, Any]]:
+        """Returns the metadata items of the datasets, in file order, or all items"""
+
+        self._load()
+        if not dataset_names:
+            return list(self._items)
+        requested = set(dataset_names)
+        if len(requested) == 1:
+            return list(self._by_dataset.get(dataset_names[0], []))
+        return [item for item in self._items if item["dataset_name"] in requested]
+
+
+listings_metadata = ListingsMetadata(METADATA_PATH)
+
+
 class QueryService:
     """class holding the queries for the listing endpoints."""
 
@@ -59,21 +109,9 @@ class QueryService:
     def get_metadata(self, dataset_name) -> list[Any]:
         """Get metadata for legacy (and other) datasets"""
 
-        with open(
-            os.getcwd() + "/clinical_mdr_api/listings/metadata.json",
-            "r",
-            encoding="UTF-8",
-        ) as metadata:
-            meta = json.load(metadata)
-
-        if dataset_name:
-            meta = [
-                x
-                for x in meta
-                if x["dataset_name"] in dataset_name.replace(" ", "").lower().split(",")
-            ]
-
-        return meta
+        return listings_metadata.get(
+            dataset_name.replace(" ", "").lower().split(",") if dataset_name else None
+        )
 
     def get_topic_codes(
         self,
@@ -464,18 +502,12 @@ class QueryService:
 
         return utils.db_result_to_list(result_array)
 
-    def get_mdvisit(
-        self,
-        study_uid: str,
-        study_value_version: str | None = None,
-    ) -> list[Any]:
+    def _mdvisit_clauses(self, study_value_version: str | None) -> tuple[str, str]:
         if study_value_version:
-            query = MATCH_SPECIFIC_STUDY_VERSION
+            match_clause = MATCH_SPECIFIC_STUDY_VERSION
         else:
-            query = MATCH_LATEST_STUDY
-        query = (
-            query
-            + """
+            match_clause = MATCH_LATEST_STUDY
+        match_clause += """
         MATCH (sv)-[:HAS_STUDY_VISIT]->(v:StudyVisit)
         OPTIONAL MATCH  (v)-->(nr:VisitNameRoot)-[:LATEST]->(nv:VisitNameValue)
         OPTIONAL MATCH  (v)-->(dr:StudyDayRoot)-[:LATEST]->(dv:StudyDayValue)
@@ -483,10 +515,10 @@ class QueryService:
         OPTIONAL MATCH  (v)-[:HAS_VISIT_TYPE]->(:CTTermRoot)-[:HAS_NAME_ROOT]->(:CTTermNameRoot)-[:LATEST]-(vtnv:CTTermNameValue)
         OPTIONAL MATCH (udv:UnitDefinitionValue)-[:LATEST_FINAL]-(udr:UnitDefinitionRoot)--(stf:StudyTimeField)--(sv)
             WHERE stf.field_name = "soa_preferred_time_unit"
-        RETURN
+        WITH
             toUpper(sv.study_id_prefix + '-' + sv.study_number) AS STUDYID,
-            toInteger(v.unique_visit_number) AS VISIT_NUM,
-            toUpper(nv.name) AS VISIT_NAME,
+            vtnv.name AS VISTPCD,
+            toInteger(v.unique_visit_number) AS AVISITN,
             CASE
                 // WEEK
                 WHEN udv.name = "week" THEN nv.name + " (" +udv.name + " "+toInteger(wv.value)+")"
@@ -494,37 +526,24 @@ class QueryService:
                 WHEN udv.name = "day" THEN nv.name + " (" +udv.name + " "+toInteger(dv.value)+")"
             ELSE NULL
             END AS AVISIT,
-            toInteger(dv.value) AS DAY_VALUE,
-            v.short_visit_label as VISIT_SHORT_LABEL,
-            dv.name AS DAY_NAME,
-            wv.name AS WEEK_NAME,
-            toInteger(wv.value) AS WEEK_VALUE,
-            vtnv.name as VISIT_TYPE_NAME
-        ORDER BY VISIT_NUM;
+            toInteger(dv.value) AS AVISIT1N,
+            v.short_visit_label AS VISLABEL,
+            dv.name AS AVISIT1,
+            wv.name AS AVISIT2,
+            coalesce(toString(toInteger(wv.value)), 'None') AS AVISIT2N
+        ORDER BY AVISITN
         """
-        )
-        result_array = db.cypher_query(
-            query=query,
-            params={
-                "study_uid": str(study_uid),
-                "study_value_version": str(study_value_version),
-            },
-        )
-
-        return utils.db_result_to_list(result_array)
+        alias_clause = """
+            STUDYID, VISTPCD, AVISITN, AVISIT, AVISIT1N, VISLABEL, AVISIT1, AVISIT2, AVISIT2N
+        """
+        return match_clause, alias_clause
 
-    def get_mdflow(
-        self,
-        study_uid: str,
-        study_value_version: str | None = None,
-    ) -> list[Any]:
+    def _mdflow_clauses(self, study_value_version: str | None) -> tuple[str, str]:
         if study_value_version:
-            query = MATCH_SPECIFIC_STUDY_VERSION
+            match_clause = MATCH_SPECIFIC_STUDY_VERSION
         else:
-            query = MATCH_LATEST_STUDY
-        query = (
-            query
-            + """
+            match_clause = MATCH_LATEST_STUDY
+        match_clause += """
         MATCH (sv)--(sact_schedule:StudyActivitySchedule)
         MATCH (sact_schedule)--(v:StudyVisit)--(sv)
         OPTIONAL MATCH (v)-[:HAS_VISIT_TYPE]-(:CTTermRoot)-[:HAS_NAME_ROOT]-(:CTTermNameRoot)-[:LATEST_FINAL]-(ctterm_name_value_visit_type:CTTermNameValue)
@@ -576,7 +595,7 @@ class QueryService:
                 ELSE NULL
             END AS ABLFL,
             ctterm_name_value_visit_type.name AS ASSMTYPE
-        RETURN distinct  STUDYID_FLOWCHART,
+        WITH distinct  STUDYID_FLOWCHART,
             AVISITN,
             PARAMCD,
             AVISIT,
@@ -588,33 +607,33 @@ class QueryService:
             BASETYPE,
             ABLFL,
             ASSMTYPE
-        ORDER BY STUDYID_FLOWCHART, AVISITN, PARAMN;
+        ORDER BY STUDYID_FLOWCHART, AVISITN, PARAMN
         """
-        )
-        result_array = db.cypher_query(
-            query=query,
-            params={
-                "study_uid": str(study_uid),
-                "study_value_version": str(study_value_version),
-            },
-        )
-
-        return utils.db_result_to_list(result_array)
+        # visit and parameter numbers are sorted as numbers above, and returned as strings
+        alias_clause = """
+            STUDYID_FLOWCHART,
+            toString(AVISITN) AS AVISITN,
+            PARAMCD,
+            AVISIT,
+            PARAM,
+            CASE WHEN PARAMN IS NULL OR PARAMN = 0 THEN NULL ELSE toString(PARAMN) END AS PARAMN,
+            ATPTN,
+            ATPT,
+            TOPICCD,
+            BASETYPE,
+            ABLFL,
+            ASSMTYPE
+        """
+        return match_clause, alias_clause
 
-    def get_mdendpnt(
-        self,
-        study_uid: str,
-        study_value_version: str | None = None,
-    ) -> list[Any]:
+    def _mdendpnt_clauses(self, study_value_version: str | None) -> tuple[str, str]:
         if study_value_version:
-            query = "MATCH (s_r:StudyRoot {uid: $study_uid})-[l:HAS_VERSION{status:'RELEASED', version:$study_value_version}]->(s_v:StudyValue) "
+            match_clause = "MATCH (s_r:StudyRoot {uid: $study_uid})-[l:HAS_VERSION{status:'RELEASED', version:$study_value_version}]->(s_v:StudyValue) "
         else:
-            query = (
+            match_clause = (
                 "MATCH (s_r:StudyRoot {uid: $study_uid})-[:LATEST]->(s_v:StudyValue)"
             )
-        query = (
-            query
-            + """
+        match_clause += """
         MATCH (s_v)-[:HAS_STUDY_OBJECTIVE]-(s_obj:StudyObjective)
         // fetch objective data
         OPTIONAL MATCH (s_obj)-[:HAS_OBJECTIVE_LEVEL]->(:CTTermRoot)-[:HAS_NAME_ROOT]->(:CTTermNameRoot)-[:LATEST]->(obj_lev:CTTermNameValue)
@@ -659,7 +678,7 @@ class QueryService:
             COLLECT(DISTINCT activity_subgroup_tem_par_value.name) as activity_subgroup_tem_par_root_uid_collected,
             COLLECT(DISTINCT activity_group_tem_par_value.name) as activity_group_tem_par_root_uid_collected,
             COLLECT(DISTINCT activity_instance_tem_par_value.name) as activity_instance_tem_par_root_uid_collected
-        return 
+        WITH 
             DISTINCT s_r.uid as STUDYID_OBJ, 
             obj_lev.name AS OBJTVLVL,
             obj_val.name AS OBJTV,
@@ -678,16 +697,116 @@ class QueryService:
             activity_instance_tem_par_root_uid_collected AS RACTINST
         ORDER BY STUDYID_OBJ, OBJTV, ENDPNT, TMFRM
         """
+        alias_clause = """
+            STUDYID_OBJ, OBJTVLVL, OBJTV, OBJTVPT, ENDPNTLVL, ENDPNTSL, ENDPNT, ENDPNTPT,
+            UNITDEF, UNIT, TMFRM, TMFRMPT, RACT, RACTSGRP, RACTGRP, RACTINST
+        """
+        return match_clause, alias_clause
+
+    def _adam_report_query(
+        self,
+        adam_report: AdamReport,
+        study_uid: str,
+        study_value_version: str | None,
+        return_model: type,
+        **kwargs,
+    ) -> CypherQueryBuilder:
+        """
+        Builds the query of an ADaM report, filtered, sorted and paginated in the database.
+
+        The report rows are aliased with the field names of the return model, and keep the order
+        of the report when no sorting is requested.
+        """
+        clauses = {
+            AdamReport.MDVISIT: self._mdvisit_clauses,
+            AdamReport.MDFLOW: self._mdflow_clauses,
+            AdamReport.MDENDPNT: self._mdendpnt_clauses,
+        }[adam_report]
+        match_clause, alias_clause = clauses(study_value_version)
+        filter_by = kwargs.pop("filter_by", None)
+        query = CypherQueryBuilder(
+            match_clause=match_clause,
+            alias_clause=alias_clause,
+            filter_by=FilterDict.model_validate({"elements": filter_by}),
+            return_model=return_model,
+            **kwargs,
         )
-        result_array = db.cypher_query(
-            query=query,
-            params={
+        query.parameters.update(
+            {
                 "study_uid": str(study_uid),
                 "study_value_version": str(study_value_version),
-            },
+            }
         )
+        return query
 
-        return utils.db_result_to_list(result_array)
+    def get_adam_report(
+        self,
+        adam_report: AdamReport,
+        study_uid: str,
+        return_model: type,
+        study_value_version: str | None = None,
+        sort_by: dict[str, bool] | None = None,
+        page_number: int = 1,
+        page_size: int = 0,
+        filter_by: dict[str, dict[str, Any]] | None = None,
+        filter_operator: FilterOperator = FilterOperator.AND,
+        total_count: bool = False,
+    ) -> GenericFilteringReturn:
+        """Query to get a page of an ADaM report (MDVISIT, MDFLOW or MDENDPNT) of a study."""
+
+        query = self._adam_report_query(
+            adam_report,
+            study_uid,
+            study_value_version,
+            return_model,
+            sort_by=sort_by,
+            page_number=page_number,
+            page_size=page_size,
+            filter_by=filter_by,
+            filter_operator=filter_operator,
+            total_count=total_count,
+        )
+        result = utils.db_result_to_list(query.execute())
+
+        total = 0
+        if total_count:
+            count_result, _ = db.cypher_query(
+                query=query.count_query, params=query.parameters
+            )
+            if len(count_result) > 0:
+                total = count_result[0][0]
+
+        return GenericFilteringReturn(items=result, total=total)
+
+    def get_adam_report_headers(
+        self,
+        adam_report: AdamReport,
+        study_uid: str,
+        return_model: type,
+        field_name: str,
+        search_string: str = "",
+        filter_by: dict[str, dict[str, Any]] | None = None,
+        filter_operator: FilterOperator = FilterOperator.AND,
+        page_size: int = 10,
+        study_value_version: str | None = None,
+    ) -> list[Any]:
+        """Query to get the distinct values of a field of an ADaM report of a study."""
+
+        query = self._adam_report_query(
+            adam_report,
+            study_uid,
+            study_value_version,
+            return_model,
+            filter_by=validate_filters_and_add_search_string(
+                search_string, field_name, filter_by
+            ),
+            filter_operator=filter_operator,
+        )
+        query.full_query = query.build_header_query(
+            header_alias=field_name, page_size=page_size
+        )
+        result_array, _ = query.execute()
+        return result_array[0][0] if len(result_array) > 0 else []
 
     def get_ta(
         self,
@@ -19,20 +19,29 @@ from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from opencensus.ext.azure.trace_exporter import AzureExporter
 from opencensus.trace.print_exporter import PrintExporter
-from opencensus.trace.samplers import AlwaysOnSampler
+from opencensus.trace.samplers import ProbabilitySampler
 from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware import Middleware
 from starlette_context.middleware import RawContextMiddleware
 
 from clinical_mdr_api.utils.api_version import get_api_version
 from common.auth.dependencies import security
 from common.auth.discovery import reconfigure_with_openid_discovery
+from common.auth.user import user_registry
 from common.config import settings
 from common.exceptions import MDRApiBaseException
 from common.models.error import ErrorResponse
+from common.telemetry.query_profiler import QueryProfilerMiddleware
 from common.telemetry.request_metrics import patch_neomodel_database
 from common.telemetry.traceback_middleware import ExceptionTracebackMiddleware
 from common.telemetry.tracing_middleware import TracingMiddleware
+from common.unit_of_work import (
+    BOOKMARKS_HEADER_NAME,
+    UnitOfWorkMiddleware,
+    install_unit_of_work,
+    patch_neomodel_transactions,
+)
 
 log = logging.getLogger(__name__)
 
@@ -53,6 +62,14 @@ if settings.gzip_response_min_size:
 # Context middleware - must come before TracingMiddleware
 middlewares.append(Middleware(RawContextMiddleware))
 
+# Calling endpoint of the profiled Cypher queries - must come after RawContextMiddleware
+if settings.query_profiler_enabled:
+    middlewares.append(Middleware(QueryProfilerMiddleware))
+
+# Neo4j bookmarks of the request unit of work - must come after RawContextMiddleware
+if settings.neo4j_unit_of_work_enabled:
+    middlewares.append(Middleware(UnitOfWorkMiddleware))
+
 # Tracing middleware
 if settings.tracing_enabled:
 
@@ -81,13 +98,18 @@ if settings.tracing_enabled:
     middlewares.append(
         Middleware(
             TracingMiddleware,
-            sampler=AlwaysOnSampler(),
+            sampler=ProbabilitySampler(settings.trace_sample_rate),
             exporter=tracing_exporter,
             exclude_paths={"*/system/healthcheck"},
+            route_sample_rates=settings.trace_route_sample_rates,
+            retain_slow_duration=settings.trace_retain_slow_request_duration,
+            retain_failed=settings.trace_retain_failed_requests,
         )
     )
 
-    patch_neomodel_database()
+patch_neomodel_database(
+    tracing=settings.tracing_enabled, profiling=settings.query_profiler_enabled
+)
 
 
 middlewares.append(
@@ -97,7 +119,7 @@ middlewares.append(
         allow_credentials=settings.allow_credentials,
         allow_methods=settings.allow_methods,
         allow_headers=settings.allow_headers,
-        expose_headers=["traceresponse"],
+        expose_headers=["traceresponse", BOOKMARKS_HEADER_NAME],
     )
 )
 
@@ -111,6 +133,8 @@ async def lifespan(_app: FastAPI):
         # Reconfiguring Swagger UI settings with OpenID Connect discovery
         await reconfigure_with_openid_discovery()
     yield
+    # Writes the users buffered since the last flush
+    await run_in_threadpool(user_registry.close)
 
 
 app = FastAPI(
@@ -207,6 +231,8 @@ async def value_error_handler(request: Request, exception: ValueError):
 # pylint: disable=wrong-import-position,ungrouped-imports
 from clinical_mdr_api import routers
 
+routers.import_routers()
+
 # Include routers here
 app.include_router(routers.system_router, tags=["System"])
 
@@ -551,6 +577,10 @@ app.include_router(
 )
 app.include_router(routers.ddf_router, prefix="/usdm/v3", tags=["USDM endpoints"])
 
+if settings.neo4j_unit_of_work_enabled:
+    patch_neomodel_transactions()
+    install_unit_of_work(app)
+
 
 def custom_openapi():
     if app.openapi_schema:
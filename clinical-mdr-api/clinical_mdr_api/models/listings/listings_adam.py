@@ -96,7 +96,7 @@ class FlowchartMetadataAdamListing(BaseModel):
             PARAMCD=query_result["PARAMCD"],
             AVISIT=query_result["AVISIT"],
             PARAM=query_result["PARAM"],
-            PARAMN=str(query_result["PARAMN"]) if query_result["PARAMN"] else None,
+            PARAMN=query_result["PARAMN"],
             ATPTN=query_result["ATPTN"],
             ATPT=query_result["ATPT"],
             TOPICCD=query_result["TOPICCD"],
@@ -151,14 +151,14 @@ class StudyVisitAdamListing(BaseModel):
     def from_query(cls, query_result: dict[Any, Any]) -> Self:
         return cls(
             STUDYID=query_result["STUDYID"],
-            VISTPCD=query_result["VISIT_TYPE_NAME"],
-            AVISITN=query_result["VISIT_NUM"],
+            VISTPCD=query_result["VISTPCD"],
+            AVISITN=query_result["AVISITN"],
             AVISIT=query_result["AVISIT"],
-            AVISIT1N=query_result["DAY_VALUE"],
-            VISLABEL=query_result["VISIT_SHORT_LABEL"],
-            AVISIT1=query_result["DAY_NAME"],
-            AVISIT2=query_result["WEEK_NAME"],
-            AVISIT2N=str(query_result["WEEK_VALUE"]),
+            AVISIT1N=query_result["AVISIT1N"],
+            VISLABEL=query_result["VISLABEL"],
+            AVISIT1=query_result["AVISIT1"],
+            AVISIT2=query_result["AVISIT2"],
+            AVISIT2N=query_result["AVISIT2N"],
         )
 
 
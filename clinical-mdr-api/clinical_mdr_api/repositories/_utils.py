@@ -1,12 +1,15 @@
 import functools
 import logging
 import re
+from dataclasses import dataclass, replace
 from datetime import datetime
 from enum import Enum
-from typing import Annotated, Any, Callable, Generic
+from threading import Lock
+from typing import Annotated, Any, Callable, Collection, Generic
 
+from cachetools import TTLCache, cached
 from dateutil.parser import isoparse
-from neo4j.exceptions import CypherSyntaxError
+from neo4j.exceptions import CypherSyntaxError, Neo4jError
 from neomodel import Q, db
 from pydantic import BaseModel, Field, field_validator
 from pydantic.types import T
@@ -17,6 +20,7 @@ from clinical_mdr_api.models.concepts.activities.activity import (
 from clinical_mdr_api.models.concepts.concept import VersionProperties
 from clinical_mdr_api.models.controlled_terminologies.ct_term import SimpleTermModel
 from clinical_mdr_api.models.standard_data_models.sponsor_model import SponsorModelBase
+from common.config import settings
 from common.exceptions import ValidationException
 from common.utils import (
     filter_sort_valid_keys_re,
@@ -27,6 +31,8 @@ from common.utils import (
 
 # Re-used regex
 nested_regex = re.compile(r"\.")
+fulltext_word_regex = re.compile(r"[a-z0-9]+")
+cypher_options_regex = re.compile(r"^\s*CYPHER(\s+\w+=\w+)*\s+", re.IGNORECASE)
 
 log = logging.getLogger(__name__)
 
@@ -452,6 +458,130 @@ class FilterDict(BaseModel):
         return val
 
 
+@dataclass(frozen=True)
+class FullTextIndex:
+    """
+    A Neo4j full-text index, created by `neo4j-mdr-db/db_schema.py`, finding values of some aliases of a query.
+
+    Attributes:
+        name: Name of the full-text index.
+        aliases: Aliases of the query whose values are properties indexed by it.
+        seed: Cypher reading the `node` (or `relationship`) found by the index,
+            and returning the node it belongs to as `{variable}`, the variable seeded by `FullTextSearch`.
+        relationship: Whether it indexes relationships rather than nodes.
+    """
+
+    name: str
+    aliases: frozenset[str]
+    seed: str = "RETURN node AS {variable}"
+    relationship: bool = False
+
+
+@dataclass(frozen=True)
+class FullTextSearch:
+    """
+    Full-text indexes finding the nodes of a query variable that can match a wildcard filter.
+
+    When all the aliases searched by the wildcard are covered by the indexes,
+    `CypherQueryBuilder` matches only the nodes they find instead of all nodes of the label.
+    The nodes found are a superset of the matching ones, the wildcard predicates still filter them.
+    Otherwise, the wildcard filter is applied to all nodes, as without indexes.
+
+    An index of a property shared by many nodes, like the name of their library, finds all of them
+    when the wildcard value matches it, so such a search is no faster than without indexes.
+    """
+
+    variable: str
+    indexes: tuple[FullTextIndex, ...]
+
+    @property
+    def aliases(self) -> frozenset[str]:
+        return frozenset().union(*(index.aliases for index in self.indexes))
+
+    def extended(self, *indexes: FullTextIndex) -> "FullTextSearch":
+        """
+        Returns these indexes with more aliases, for a query with more aliases than the one they were declared for.
+        The aliases of an index already searched with the same seed are added to it, so that it is queried once.
+        """
+
+        extended_indexes = list(self.indexes)
+        for index in indexes:
+            for position, existing in enumerate(extended_indexes):
+                if (existing.name, existing.seed, existing.relationship) == (
+                    index.name,
+                    index.seed,
+                    index.relationship,
+                ):
+                    extended_indexes[position] = replace(
+                        existing, aliases=existing.aliases | index.aliases
+                    )
+                    break
+            else:
+                extended_indexes.append(index)
+        return replace(self, indexes=tuple(extended_indexes))
+
+    def can_seed(self, aliases: Collection[str], value: str | None) -> bool:
+        """Whether the indexes cover all the aliases searched by the wildcard value, and can be queried for it"""
+
+        return (
+            settings.fulltext_search_enabled
+            and value is not None
+            and bool(aliases)
+            and set(aliases) <= self.aliases
+            and get_fulltext_query(value) is not None
+            and all(
+                index.name in get_online_fulltext_indexes() for index in self.indexes
+            )
+        )
+
+    def seed_clause(self) -> str:
+        """The subquery returning the union of the `{variable}` nodes found by the indexes for `$fulltext_query`"""
+
+        seeds = []
+        for index in self.indexes:
+            procedure, yielded = (
+                ("queryRelationships", "relationship")
+                if index.relationship
+                else ("queryNodes", "node")
+            )
+            seeds.append(
+                f"CALL db.index.fulltext.{procedure}('{index.name}', $fulltext_query) YIELD {yielded} "
+                + index.seed.format(variable=self.variable)
+            )
+        return f"CALL {{ {' UNION '.join(seeds)} }} "
+
+
+@cached(cache=TTLCache(maxsize=1, ttl=60), lock=Lock())
+def get_online_fulltext_indexes() -> frozenset[str]:
+    """Returns the names of the full-text indexes ready to be queried, none when they can't be listed"""
+
+    try:
+        rows, _ = db.cypher_query(
+            "SHOW FULLTEXT INDEXES YIELD name, state WHERE state = 'ONLINE' RETURN name"
+        )
+    except Neo4jError as exc:
+        log.warning("Could not list the full-text indexes: %s", exc)
+        return frozenset()
+    return frozenset(row[0] for row in rows)
+
+
+def get_fulltext_query(text: str) -> str | None:
+    """
+    Returns the Lucene query finding the indexed values that contain every word of the given lowercase text,
+    or None if the text can't be searched through a full-text index.
+
+    The words are searched as substrings of the indexed words, so the values containing the text are all found.
+    The standard analyzer only splits ASCII text between words, so other texts aren't searched.
+    """
+
+    if not text.isascii():
+        return None
+    words = fulltext_word_regex.findall(text)
+    if not words:
+        return None
+    return " AND ".join(f"*{word}*" for word in words)
+
+
 class CypherQueryBuilder:
     """
     This class builds two queries : items and total_count with filtering and pagination capabilities.
@@ -489,6 +619,8 @@ class CypherQueryBuilder:
         format_filter_sort_keys: Callable. In some cases, the returned model property
             keys differ from the property keys defined in the database.
             To cover these cases, a conversion function can be provided.
+        fulltext_search : FullTextSearch. Full-text indexes to match only the nodes they find
+            when a wildcard filtering is requested, see the FullTextSearch class.
 
     Output properties :
         full_query : Complete cypher query with all clauses. See build_full_query
@@ -520,6 +652,7 @@ class CypherQueryBuilder:
         wildcard_properties_list: list[str] | None = None,
         format_filter_sort_keys: Callable | None = None,
         union_match_clause: str | None = None,
+        fulltext_search: FullTextSearch | None = None,
     ):
         if wildcard_properties_list is None:
             wildcard_properties_list = []
@@ -537,6 +670,10 @@ class CypherQueryBuilder:
         self.return_model = return_model
         self.wildcard_properties_list = wildcard_properties_list
         self.format_filter_sort_keys = format_filter_sort_keys
+        self.fulltext_search = fulltext_search
+        # Aliases searched by the wildcard filter, and its search value
+        self.wildcard_aliases: set[str] = set()
+        self.wildcard_value: str | None = None
         self.filter_clause = ""
         self.sort_clause = ""
         self.pagination_clause = ""
@@ -548,6 +685,8 @@ class CypherQueryBuilder:
 
         if filter_by and len(self.filter_by.elements) > 0:
             self.build_filter_clause()
+            if self.fulltext_search and self.can_seed_from_fulltext_indexes():
+                self.seed_from_fulltext_indexes()
         if self.page_size > 0:
             self.build_pagination_clause()
         if self.sort_by:
@@ -722,6 +861,7 @@ class CypherQueryBuilder:
                                     _predicates.append(
                                         f"toLower({db_property}){_parsed_operator}$wildcard_{index}"
                                     )
+                                    self.wildcard_aliases.add(db_property)
                             # If not, then extract list of properties from return model
                             elif self.return_model:
                                 for (
@@ -742,6 +882,7 @@ class CypherQueryBuilder:
                                         _predicates.append(
                                             f"toLower({attribute}){_parsed_operator}$wildcard_{index}"
                                         )
+                                        self.wildcard_aliases.add(attribute)
                                     # if field is list [str]
                                     elif (
                                         get_sub_fields(attr_desc) is not None
@@ -749,8 +890,9 @@ class CypherQueryBuilder:
                                         and attribute not in ["possible_actions"]
                                     ):
                                         _predicates.append(
-                                            f"$wildcard_{index} IN {attribute}"
+                                            f"any(attr in {attribute} WHERE toLower(attr){_parsed_operator}$wildcard_{index})"
                                         )
+                                        self.wildcard_aliases.add(attribute)
                                     # Wildcard filtering for SimpleTermModel
                                     elif (
                                         get_field_type(attr_desc.annotation)
@@ -767,11 +909,17 @@ class CypherQueryBuilder:
                                             _predicates.append(
                                                 f"toLower({attribute}.name){_parsed_operator}$wildcard_{index}"
                                             )
+                                            self.wildcard_aliases.add(
+                                                f"{attribute}.name"
+                                            )
                                         else:
                                             # if field is an array of SimpleTermModels
                                             _predicates.append(
                                                 f"$wildcard_{index} IN [attr in {attribute} | toLower(attr.name)]"
                                             )
+                                            self.wildcard_aliases.add(
+                                                f"{attribute}.name"
+                                            )
                                     elif (
                                         get_field_type(attr_desc.annotation)
                                         is ActivityGroupingHierarchySimpleModel
@@ -782,12 +930,16 @@ class CypherQueryBuilder:
                                         _predicates.append(
                                             f"any(attr in {attribute} WHERE toLower(attr.activity_subgroup.name) {_parsed_operator} $wildcard_{index})"
                                         )
+                                        self.wildcard_aliases.add(attribute)
                             # If none are provided, raise an exception
                             else:
                                 raise ValidationException(
                                     msg="Wildcard filtering not properly covered for this object"
                                 )
                             self.parameters[f"wildcard_{index}"] = elm.lower()
+                            self.wildcard_value = (
+                                elm.lower() if len(_values) == 1 else None
+                            )
                         else:
                             # name=$name_0 with name_0 defined in parameter objects
                             # . for nested properties will be replaced by _
@@ -881,6 +1033,36 @@ class CypherQueryBuilder:
             + f" {self.filter_operator.value.upper()} ".join(list(filter_predicates))
         )
 
+    def can_seed_from_fulltext_indexes(self) -> bool:
+        """
+        The full-text indexes can replace the match of all nodes when they cover all aliases searched by a single wildcard value,
+        and no other filter can select the rows they don't find.
+        """
+
+        return (
+            self.filter_operator == FilterOperator.AND
+            or len(self.filter_by.elements) == 1
+        ) and self.fulltext_search.can_seed(self.wildcard_aliases, self.wildcard_value)
+
+    def seed_from_fulltext_indexes(self) -> None:
+        """Prepends the union of the nodes found by the full-text indexes to the match clauses"""
+
+        assert (
+            self.wildcard_value is not None
+        ), "Only called when can_seed_from_fulltext_indexes"
+        seed_clause = self.fulltext_search.seed_clause()
+
+        def seeded(match_clause: str) -> str:
+            # Cypher query options must stay first
+            options = cypher_options_regex.match(match_clause)
+            position = options.end() if options else 0
+            return match_clause[:position] + seed_clause + match_clause[position:]
+
+        self.match_clause = seeded(self.match_clause)
+        if self.union_match_clause:
+            self.union_match_clause = seeded(self.union_match_clause)
+        self.parameters["fulltext_query"] = get_fulltext_query(self.wildcard_value)
+
     def build_pagination_clause(self) -> None:
         validate_max_skip_clause(page_number=self.page_number, page_size=self.page_size)
 
@@ -1,7 +1,11 @@
 from typing import Annotated, Any
 
 from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
 
+from clinical_mdr_api.domain_repositories.template_parameters.parameter_values import (
+    template_parameter_values,
+)
 from clinical_mdr_api.domain_repositories.user_repository import UserRepository
 from clinical_mdr_api.models.user import UserInfo, UserInfoPatchInput
 from clinical_mdr_api.routers import _generic_descriptions
@@ -9,6 +13,8 @@ from clinical_mdr_api.services._meta_repository import MetaRepository
 from common import exceptions
 from common.auth import rbac
 from common.auth.dependencies import security
+from common.auth.user import user_registry
+from common.telemetry.query_profiler import QuerySortKey, query_profiler
 
 # Prefixed with "/admin"
 router = APIRouter()
@@ -54,6 +60,7 @@ def clear_caches() -> list[dict[Any, Any]]:
             cache_store = getattr(repo, store_name, None)
             if cache_store is not None:
                 cache_store.clear()
+    template_parameter_values.clear()
 
     return get_caches()
 
@@ -73,6 +80,23 @@ def get_users() -> list[UserInfo]:
     return user_repository.get_all_users()
 
 
+@router.get(
+    "/user-registry",
+    dependencies=[security, rbac.ADMIN_READ],
+    summary="Returns the metrics of the users buffered by this API process",
+    description="""
+Users seen for the first time are written right away,
+later changes of their claims are buffered and written together every `USER_FLUSH_INTERVAL` seconds.""",
+    status_code=200,
+    responses={
+        403: _generic_descriptions.ERROR_403,
+        404: _generic_descriptions.ERROR_404,
+    },
+)
+def get_user_registry() -> dict[str, Any]:
+    return user_registry.metrics()
+
+
 @router.patch(
     "/users/{user_id}",
     dependencies=[security, rbac.ADMIN_WRITE],
@@ -92,6 +116,62 @@ def patch_user(user_id: str, payload: UserInfoPatchInput) -> UserInfo:
     raise exceptions.NotFoundException(msg=f"User with ID '{user_id}' doesn't exist.")
 
 
+@router.get(
+    "/query-profile",
+    dependencies=[security, rbac.ADMIN_READ],
+    summary="Returns Cypher query statistics aggregated by query fingerprint and endpoint",
+    description="""
+Cypher queries are normalized into fingerprints, with literals and whitespace stripped.
+Latencies are in seconds, percentiles are computed from the most recent executions.""",
+    status_code=200,
+    responses={
+        403: _generic_descriptions.ERROR_403,
+        404: _generic_descriptions.ERROR_404,
+    },
+)
+def get_query_profile(
+    sort_by: Annotated[
+        QuerySortKey,
+        Query(description="Statistic to sort by, in descending order"),
+    ] = "total_time",
+    limit: Annotated[
+        int, Query(ge=1, description="Maximum number of entries to return")
+    ] = 50,
+) -> list[dict[Any, Any]]:
+    return query_profiler.entries(sort_by=sort_by, limit=limit)
+
+
+@router.get(
+    "/query-profile/dump",
+    dependencies=[security, rbac.ADMIN_READ],
+    summary="Downloads all Cypher query statistics as a JSON file",
+    status_code=200,
+    responses={
+        403: _generic_descriptions.ERROR_403,
+        404: _generic_descriptions.ERROR_404,
+    },
+)
+def dump_query_profile() -> JSONResponse:
+    return JSONResponse(
+        content=query_profiler.dump(),
+        headers={"Content-Disposition": 'attachment; filename="query-profile.json"'},
+    )
+
+
+@router.delete(
+    "/query-profile",
+    dependencies=[security, rbac.ADMIN_WRITE],
+    summary="Resets the Cypher query statistics",
+    status_code=204,
+    responses={
+        403: _generic_descriptions.ERROR_403,
+        404: _generic_descriptions.ERROR_404,
+    },
+)
+def reset_query_profile() -> None:
+    query_profiler.reset()
+
+
 def _get_all_repos():
     meta_repository = MetaRepository()
     all_repos = []
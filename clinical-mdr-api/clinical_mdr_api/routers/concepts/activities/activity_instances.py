@@ -58,6 +58,7 @@ Possible errors:
         404: _generic_descriptions.ERROR_404,
     },
 )
+@decorators.fast_json_response()
 @decorators.allow_exports(
     {
         "defaults": [
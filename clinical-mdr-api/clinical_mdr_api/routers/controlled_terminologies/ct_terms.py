@@ -73,6 +73,7 @@ def create(
         404: _generic_descriptions.ERROR_404,
     },
 )
+@decorators.fast_json_response(exclude_unset=True)
 @decorators.allow_exports(
     {
         "defaults": [
@@ -10,7 +10,6 @@ from clinical_mdr_api.domain_repositories.study_selections.study_soa_repository
 )
 from clinical_mdr_api.models.utils import PrettyJSONResponse
 from clinical_mdr_api.routers import _generic_descriptions
-from clinical_mdr_api.services.ddf.usdm_service import USDMService
 from clinical_mdr_api.services.studies.study_design_figure import (
     StudyDesignFigureService,
 )
@@ -54,6 +53,9 @@ Possible errors:
 def get_study(
     study_uid: Annotated[str, Path(description="The unique uid of the study.")]
 ) -> dict[str, Any]:
+    # The USDM model takes long to import, load it on first use
+    from clinical_mdr_api.services.ddf.usdm_service import USDMService
+
     usdm_service = USDMService()
     ddf_study_wrapper = usdm_service.get_by_uid(study_uid)
     return ddf_study_wrapper
@@ -83,6 +85,9 @@ def get_study_m11_protocol(
     request: Request,
     study_uid: Annotated[str, Path(description="The unique uid of the study.")],
 ):
+    # The USDM model takes long to import, load it on first use
+    from clinical_mdr_api.services.ddf.usdm_service import USDMService
+
     usdm_service = USDMService()
     ddf_study_wrapper = usdm_service.get_by_uid(study_uid)
     ddf_study = ddf_study_wrapper.get("study")
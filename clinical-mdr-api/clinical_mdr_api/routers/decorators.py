@@ -1,9 +1,13 @@
 """Decorators that can be used on routers"""
 
 import functools
+import typing
+
+from fastapi import Response
 
 # pylint: disable=unused-import
 from clinical_mdr_api.routers.export import allow_exports
+from clinical_mdr_api.routers.responses import PydanticJSONResponse
 
 # pylint: disable=unused-import
 from clinical_mdr_api.services.decorators import validate_if_study_is_not_locked
@@ -27,3 +31,28 @@ def validate_serial_number_against_neo4j_max_and_min_int():
         return wrapper
 
     return decorator
+
+
+def fast_json_response(exclude_unset: bool = False):
+    """Decorator serializing the returned models straight to JSON with pydantic-core, see `PydanticJSONResponse`.
+
+    FastAPI still builds the OpenAPI schema from the return annotation, but skips validating
+    and encoding the result, as the endpoint returns a `Response`.
+    Only use it on endpoints returning models built (and so validated) by the services.
+    Pass the `response_model_exclude_unset` of the route as `exclude_unset`.
+    Place it above `allow_exports`, responses returned by the endpoint are passed through.
+    """
+
+    def decorator(func):
+        annotation = typing.get_type_hints(func, include_extras=True)["return"]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            return PydanticJSONResponse.create(result, annotation, exclude_unset)
+
+        return wrapper
+
+    return decorator
@@ -8,7 +8,6 @@ from typing import Any
 import yaml
 from dict2xml import dict2xml
 from fastapi.responses import StreamingResponse
-from openpyxl import Workbook
 
 from clinical_mdr_api.models import utils
 from clinical_mdr_api.models.utils import BaseModel
@@ -156,6 +155,9 @@ def _export_to_xslx(data: dict[Any, Any], headers: list[Any]):
 
     The generated content will only contain items listed in headers.
     """
+    # openpyxl takes long to import, load it on first use
+    from openpyxl import Workbook
+
     stream = io.BytesIO()
     workbook = Workbook()
     # grab the active worksheet
@@ -1,9 +1,16 @@
 """Custom FastAPI response classes."""
 
-from typing import Any
+import functools
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Any, get_origin
 
 import yaml
 from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+from clinical_mdr_api.models.utils import CustomPage, GenericFilteringReturn
+from common.config import settings
 
 
 class YAMLResponse(Response):
@@ -11,3 +18,125 @@ class YAMLResponse(Response):
 
     def render(self, content: Any) -> bytes:
         return yaml.safe_dump(content, encoding="utf-8", allow_unicode=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _type_adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def _page_item_type(annotation: Any) -> Any | None:
+    """Returns the item type of `CustomPage[T]` and `GenericFilteringReturn[T]` annotations"""
+
+    metadata = getattr(annotation, "__pydantic_generic_metadata__", None)
+    if metadata and metadata["origin"] in (CustomPage, GenericFilteringReturn):
+        return metadata["args"][0]
+    return None
+
+
+class PydanticJSONResponse(Response):
+    """
+    JSON response serialized by pydantic-core straight from the models built by the service,
+    without the re-validation and `jsonable_encoder` pass that FastAPI applies to the `response_model`.
+
+    The content is serialized as the given `annotation` (the return annotation of the endpoint),
+    so fields of subclasses are left out like FastAPI does.
+    Lists and pages with more than `settings.fast_json_stream_min_items` items are streamed
+    in chunks of `settings.fast_json_chunk_size` items, see `create`.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        annotation: Any,
+        exclude_unset: bool = False,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        self.annotation = annotation
+        self.exclude_unset = exclude_unset
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        return b"".join(
+            iter_json_chunks(content, self.annotation, self.exclude_unset, chunk_size=0)
+        )
+
+    @classmethod
+    def create(
+        cls, content: Any, annotation: Any, exclude_unset: bool = False
+    ) -> Response:
+        """Returns a streaming response for large results, and a `PydanticJSONResponse` otherwise"""
+
+        items = content.items if _page_item_type(annotation) else content
+        if (
+            isinstance(items, Sequence)
+            and not isinstance(items, str)
+            and len(items) > settings.fast_json_stream_min_items
+        ):
+            return StreamingResponse(
+                iter_json_chunks(
+                    content,
+                    annotation,
+                    exclude_unset,
+                    chunk_size=settings.fast_json_chunk_size,
+                ),
+                media_type=cls.media_type,
+            )
+        return cls(content, annotation, exclude_unset)
+
+
+def iter_json_chunks(
+    content: Any, annotation: Any, exclude_unset: bool = False, chunk_size: int = 0
+) -> Iterator[bytes]:
+    """
+    Serializes `content` as `annotation` to JSON, yielding the items of lists and pages
+    in chunks of `chunk_size` items (all at once if 0).
+    """
+
+    item_type = _page_item_type(annotation)
+    if item_type is not None and isinstance(content, BaseModel):
+        items = content.items
+        rest = content.model_dump_json(
+            by_alias=True, exclude={"items"}, exclude_unset=exclude_unset
+        ).encode()
+        yield b'{"items":'
+        yield from _iter_json_list(
+            items,
+            list[item_type],  # type: ignore[valid-type]
+            exclude_unset,
+            chunk_size,
+        )
+        yield b"}" if rest == b"{}" else b"," + rest[1:]
+        return
+
+    origin = get_origin(annotation)
+    if origin in (list, Sequence) and isinstance(content, Sequence):
+        yield from _iter_json_list(content, annotation, exclude_unset, chunk_size)
+        return
+
+    yield _type_adapter(annotation).dump_json(
+        content, by_alias=True, exclude_unset=exclude_unset
+    )
+
+
+def _iter_json_list(
+    items: Sequence[Any], annotation: Any, exclude_unset: bool, chunk_size: int
+) -> Iterator[bytes]:
+    adapter = _type_adapter(annotation)
+    if not chunk_size or len(items) <= chunk_size:
+        yield adapter.dump_json(items, by_alias=True, exclude_unset=exclude_unset)
+        return
+
+    yield b"["
+    for start in range(0, len(items), chunk_size):
+        chunk = adapter.dump_json(
+            items[start : start + chunk_size],
+            by_alias=True,
+            exclude_unset=exclude_unset,
+        )
+        # Strip the brackets of the chunk
+        yield chunk[1:-1] if start == 0 else b"," + chunk[1:-1]
+    yield b"]"
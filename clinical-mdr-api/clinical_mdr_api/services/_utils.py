@@ -26,7 +26,7 @@ from clinical_mdr_api.repositories._utils import (
     FilterOperator,
 )
 from common.exceptions import ValidationException
-from common.telemetry import trace_block, trace_calls
+from common.telemetry import trace_block, trace_calls, tracing_details_enabled
 from common.utils import get_field_type
 
 
@@ -449,17 +449,18 @@ def service_level_generic_filtering(
     """
 
     with trace_block("service_level_generic_filtering") as span:
-        span.add_attribute(
-            "call.kwargs",
-            {
-                "filter_by": filter_by,
-                "filter_operator": filter_operator,
-                "sort_by": sort_by,
-                "total_count": total_count,
-                "page_number": page_number,
-                "page_size": page_size,
-            },
-        )
+        if tracing_details_enabled():
+            span.add_attribute(
+                "call.kwargs",
+                {
+                    "filter_by": filter_by,
+                    "filter_operator": filter_operator,
+                    "sort_by": sort_by,
+                    "total_count": total_count,
+                    "page_number": page_number,
+                    "page_size": page_size,
+                },
+            )
         span.add_attribute("call.num_input", len(items))
 
         filtered_items = generic_item_filtering(
@@ -521,14 +522,15 @@ def generic_item_filtering(
     """
 
     with trace_block("generic_item_filtering") as span:
-        span.add_attribute(
-            "call.kwargs",
-            {
-                "filter_by": filter_by,
-                "filter_operator": filter_operator,
-                "sort_by": sort_by,
-            },
-        )
+        if tracing_details_enabled():
+            span.add_attribute(
+                "call.kwargs",
+                {
+                    "filter_by": filter_by,
+                    "filter_operator": filter_operator,
+                    "sort_by": sort_by,
+                },
+            )
         span.add_attribute("call.num_input", len(items))
 
         if sort_by is None:
@@ -713,15 +715,16 @@ def service_level_generic_header_filtering(
     """
 
     with trace_block("service_level_generic_header_filtering") as span:
-        span.add_attribute(
-            "call.kwargs",
-            {
-                "filter_by": filter_by,
-                "filter_operator": filter_operator,
-                "search_string": search_string,
-                "page_size": page_size,
-            },
-        )
+        if tracing_details_enabled():
+            span.add_attribute(
+                "call.kwargs",
+                {
+                    "filter_by": filter_by,
+                    "filter_operator": filter_operator,
+                    "search_string": search_string,
+                    "page_size": page_size,
+                },
+            )
         span.add_attribute("call.num_input", len(items))
 
         if filter_by is None:
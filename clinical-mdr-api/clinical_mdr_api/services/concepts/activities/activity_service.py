@@ -6,6 +6,9 @@ from neomodel import db
 from clinical_mdr_api.domain_repositories.concepts.activities.activity_repository import (
     ActivityRepository,
 )
+from clinical_mdr_api.domain_repositories.concepts.concept_cascade import (
+    ActivityInstanceCascade,
+)
 from clinical_mdr_api.domains.concepts.activities.activity import (
     ActivityAR,
     ActivityGroupingVO,
@@ -29,16 +32,11 @@ from clinical_mdr_api.models.concepts.activities.activity import (
 )
 from clinical_mdr_api.models.concepts.activities.activity_instance import (
     ActivityInstanceDetail,
-    ActivityInstanceEditInput,
-    ActivityInstanceGrouping,
 )
 from clinical_mdr_api.models.utils import GenericFilteringReturn
 from clinical_mdr_api.repositories._utils import FilterOperator
 from clinical_mdr_api.services._utils import is_library_editable
 from clinical_mdr_api.services.concepts import constants
-from clinical_mdr_api.services.concepts.activities.activity_instance_service import (
-    ActivityInstanceService,
-)
 from clinical_mdr_api.services.concepts.concept_generic_service import (
     ConceptGenericService,
     _AggregateRootType,
@@ -406,10 +404,17 @@ class ActivityService(ConceptGenericService[ActivityAR]):
             )
         return result
 
-    def cascade_edit_and_approve(self, item: ActivityAR):
+    def cascade_edit_and_approve(self, item: ActivityAR) -> int:
+        """
+        Links the instances of the previous final version of the activity to the groupings of the approved version.
+
+        Final instances get a new draft, are edited and approved again, draft instances are only edited.
+        All instances are versioned together, see `ActivityInstanceCascade`.
+        Returns the number of instances touched.
+        """
         if not item.concept_vo.is_data_collected:
             # Do not upversion any instances if the activity is without data collection
-            return
+            return 0
 
         _, _, _, activity_after_save = item.repository_closure_data
         _, _, _, activity_before_save = activity_after_save.repository_closure_data
@@ -422,10 +427,10 @@ class ActivityService(ConceptGenericService[ActivityAR]):
             )
         )
         if linked_instances is None:
-            return
-
-        instance_service = ActivityInstanceService()
+            return 0
 
+        # instance uid -> groupings of the activity the instance stays linked to
+        instance_groupings: dict[str, list[dict[str, str]]] = {}
         for instance in linked_instances.get("activity_instances", []):
             if instance["version"]["status"] not in (
                 LibraryItemStatus.DRAFT.value,
@@ -433,7 +438,7 @@ class ActivityService(ConceptGenericService[ActivityAR]):
             ):
                 continue
 
-            instance_groupings = []
+            groupings = []
             for grouping in item.concept_vo.activity_groupings:
                 grp = {
                     "activity_uid": item.uid,
@@ -441,29 +446,19 @@ class ActivityService(ConceptGenericService[ActivityAR]):
                     "activity_subgroup_uid": grouping.activity_subgroup_uid,
                 }
                 if grp in instance["activity_groupings"]:
-                    instance_groupings.append(ActivityInstanceGrouping(**grp))
+                    groupings.append(grp)
 
-            if not instance_groupings:
+            if not groupings:
                 # No matching groupings found, skip this instance
                 continue
 
-            if instance["version"]["status"] == LibraryItemStatus.FINAL.value:
-                instance_service.non_transactional_create_new_version(instance["uid"])
+            instance_groupings[instance["uid"]] = groupings
 
-            # Edit all instances (both DRAFT and FINAL) to update their groupings
-            edit_input = ActivityInstanceEditInput(
-                change_description="Cascade edit",
-                activity_groupings=instance_groupings,
-                name=instance["name"],
-                name_sentence_case=instance["name_sentence_case"],
-            )
-            instance_service.non_transactional_edit(
-                uid=instance["uid"], concept_edit_input=edit_input, patch_mode=False
-            )
-
-            # Only approve instances that are in FINAL status
-            if instance["version"]["status"] == LibraryItemStatus.FINAL.value:
-                instance_service.non_transactional_approve(instance["uid"])
+        return ActivityInstanceCascade(
+            self._repos.activity_instance_repository,
+            author_id=self.author_id,
+            activity_uid=item.uid,
+        ).edit_groupings(instance_groupings)
 
     def get_specific_activity_version_groupings(
         self,
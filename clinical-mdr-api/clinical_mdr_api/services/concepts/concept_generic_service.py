@@ -716,17 +716,21 @@ class ConceptGenericService(Generic[_AggregateRootType], ABC):
             "Name",
         )
 
-    def cascade_edit_and_approve(self, item: _AggregateRootType):
-        pass
+    # The cascade methods version the items linked to the given item,
+    # and return the number of linked items touched
+    # pylint: disable=unused-argument
 
-    def cascade_new_version(self, item: _AggregateRootType):
-        pass
+    def cascade_edit_and_approve(self, item: _AggregateRootType) -> int:
+        return 0
 
-    def cascade_inactivate(self, item: _AggregateRootType):
-        pass
+    def cascade_new_version(self, item: _AggregateRootType) -> int:
+        return 0
 
-    def cascade_reactivate(self, item: _AggregateRootType):
-        pass
+    def cascade_inactivate(self, item: _AggregateRootType) -> int:
+        return 0
 
-    def cascade_delete(self, item: _AggregateRootType):
-        pass
+    def cascade_reactivate(self, item: _AggregateRootType) -> int:
+        return 0
+
+    def cascade_delete(self, item: _AggregateRootType) -> int:
+        return 0
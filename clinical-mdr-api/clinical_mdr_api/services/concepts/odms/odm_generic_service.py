@@ -2,6 +2,13 @@ import re
 from abc import ABC
 from typing import Any
 
+from clinical_mdr_api.domain_repositories.concepts.concept_cascade import (
+    APPROVE,
+    INACTIVATE,
+    NEW_VERSION,
+    REACTIVATE,
+    ConceptCascade,
+)
 from clinical_mdr_api.domain_repositories.concepts.odms.form_repository import (
     FormRepository,
 )
@@ -347,78 +354,37 @@ class OdmGenericService(ConceptGenericService[_AggregateRootType], ABC):
                     },
                 )
 
-    def cascade_new_version(self, item):
+    def _description_cascade(self) -> ConceptCascade:
         from clinical_mdr_api.services.concepts.odms.odm_descriptions import (
             OdmDescriptionService,
         )
 
         description_service = OdmDescriptionService()
-
-        if getattr(item.concept_vo, "description_uids", None):
-            for description_uid in item.concept_vo.description_uids:
-
-                item = description_service._find_by_uid_or_raise_not_found(
-                    description_uid, for_update=True
-                )
-                item.create_new_version(author_id=description_service.author_id)
-                description_service.repository.save(item)
-
-    def cascade_inactivate(self, item):
-        from clinical_mdr_api.services.concepts.odms.odm_descriptions import (
-            OdmDescriptionService,
+        return ConceptCascade(
+            description_service.repository, author_id=description_service.author_id
         )
 
-        description_service = OdmDescriptionService()
-
-        if getattr(item.concept_vo, "description_uids", None):
-            for description_uid in item.concept_vo.description_uids:
-                item = description_service._find_by_uid_or_raise_not_found(
-                    description_uid, for_update=True
-                )
-                item.inactivate(author_id=description_service.author_id)
-                description_service.repository.save(item)
-
-    def cascade_reactivate(self, item):
-        from clinical_mdr_api.services.concepts.odms.odm_descriptions import (
-            OdmDescriptionService,
+    def cascade_new_version(self, item) -> int:
+        return self._description_cascade().run(
+            getattr(item.concept_vo, "description_uids", None) or [], [NEW_VERSION]
         )
 
-        description_service = OdmDescriptionService()
-
-        if getattr(item.concept_vo, "description_uids", None):
-            for description_uid in item.concept_vo.description_uids:
-                item = description_service._find_by_uid_or_raise_not_found(
-                    description_uid, for_update=True
-                )
-                item.reactivate(author_id=description_service.author_id)
-                description_service.repository.save(item)
-
-    def cascade_edit_and_approve(self, item):
-        from clinical_mdr_api.services.concepts.odms.odm_descriptions import (
-            OdmDescriptionService,
+    def cascade_inactivate(self, item) -> int:
+        return self._description_cascade().run(
+            getattr(item.concept_vo, "description_uids", None) or [], [INACTIVATE]
         )
 
-        description_service = OdmDescriptionService()
-
-        if getattr(item.concept_vo, "description_uids", None):
-            for description_uid in item.concept_vo.description_uids:
-                item = description_service._find_by_uid_or_raise_not_found(
-                    description_uid, for_update=True
-                )
-                item.approve(author_id=description_service.author_id)
-                description_service.repository.save(item)
-
-    def cascade_delete(self, item):
-        from clinical_mdr_api.services.concepts.odms.odm_descriptions import (
-            OdmDescriptionService,
+    def cascade_reactivate(self, item) -> int:
+        return self._description_cascade().run(
+            getattr(item.concept_vo, "description_uids", None) or [], [REACTIVATE]
         )
 
-        description_service = OdmDescriptionService()
+    def cascade_edit_and_approve(self, item) -> int:
+        return self._description_cascade().run(
+            getattr(item.concept_vo, "description_uids", None) or [], [APPROVE]
+        )
 
-        if getattr(item.concept_vo, "description_uids", None):
-            for description_uid in item.concept_vo.description_uids:
-                item = description_service._find_by_uid_or_raise_not_found(
-                    description_uid, for_update=True
-                )
-                item.soft_delete()
-                description_service.repository.save(item)
+    def cascade_delete(self, item) -> int:
+        return self._description_cascade().soft_delete(
+            getattr(item.concept_vo, "description_uids", None) or []
+        )
@@ -5,7 +5,6 @@ from xml.dom.minidom import Document
 
 from fastapi import UploadFile
 from lxml import etree
-from weasyprint import HTML
 
 from clinical_mdr_api.domains._utils import ObjectStatus, get_iso_lang_data
 from clinical_mdr_api.domains.concepts.odms.odm_xml_definition import (
@@ -156,6 +155,9 @@ class OdmXmlExporterService:
                     xslt, access_control=etree.XSLTAccessControl.DENY_ALL
                 )
 
+                # WeasyPrint takes long to import, load it on first use
+                from weasyprint import HTML
+
                 rs = HTML(string=etree.tostring(transform(dom))).write_pdf()
             except Exception as exc:
                 raise BusinessLogicException(msg=exc.args[0]) from exc
@@ -12,10 +12,17 @@ from clinical_mdr_api.models.listings.listings_adam import (
 from clinical_mdr_api.models.utils import GenericFilteringReturn
 from clinical_mdr_api.repositories._utils import FilterOperator
 from clinical_mdr_api.services._meta_repository import MetaRepository
-from clinical_mdr_api.services._utils import (
-    service_level_generic_filtering,
-    service_level_generic_header_filtering,
-)
+
+ADAM_REPORT_MODELS: dict[
+    AdamReport,
+    type[StudyVisitAdamListing]
+    | type[StudyEndpntAdamListing]
+    | type[FlowchartMetadataAdamListing],
+] = {
+    AdamReport.MDVISIT: StudyVisitAdamListing,
+    AdamReport.MDENDPNT: StudyEndpntAdamListing,
+    AdamReport.MDFLOW: FlowchartMetadataAdamListing,
+}
 
 
 class ADAMListingsService:
@@ -25,41 +32,6 @@ class ADAMListingsService:
         self._query_service = QueryService()
 
     @db.transaction
-    def list_mdflow(
-        self,
-        study_uid: str,
-        study_value_version: str | None = None,
-    ) -> list[FlowchartMetadataAdamListing]:
-        data = self._query_service.get_mdflow(
-            study_uid=study_uid, study_value_version=study_value_version
-        )
-        result = [FlowchartMetadataAdamListing.from_query(item) for item in data]
-        return result
-
-    @db.transaction
-    def list_mdvisit(
-        self,
-        study_uid: str,
-        study_value_version: str | None = None,
-    ) -> list[StudyVisitAdamListing]:
-        data = self._query_service.get_mdvisit(
-            study_uid=study_uid, study_value_version=study_value_version
-        )
-        result = [StudyVisitAdamListing.from_query(item) for item in data]
-        return result
-
-    @db.transaction
-    def list_mdendpnt(
-        self,
-        study_uid: str,
-        study_value_version: str | None = None,
-    ) -> list[StudyEndpntAdamListing]:
-        data = self._query_service.get_mdendpnt(
-            study_uid=study_uid, study_value_version=study_value_version
-        )
-        result = [StudyEndpntAdamListing.from_query(item) for item in data]
-        return result
-
     def get_report(
         self,
         adam_report: AdamReport,
@@ -76,31 +48,24 @@ class ADAMListingsService:
         | GenericFilteringReturn[StudyEndpntAdamListing]
         | GenericFilteringReturn[FlowchartMetadataAdamListing]
     ):
-        result = []
-
-        if adam_report == AdamReport.MDVISIT:
-            result = self.list_mdvisit(
-                study_uid, study_value_version=study_value_version
-            )
-        elif adam_report == AdamReport.MDENDPNT:
-            result = self.list_mdendpnt(
-                study_uid, study_value_version=study_value_version
-            )
-        elif adam_report == AdamReport.MDFLOW:
-            result = self.list_mdflow(
-                study_uid, study_value_version=study_value_version
-            )
-
-        return service_level_generic_filtering(
-            items=result,
-            filter_by=filter_by,
-            filter_operator=filter_operator,
+        return_model = ADAM_REPORT_MODELS[adam_report]
+        data = self._query_service.get_adam_report(
+            adam_report=adam_report,
+            study_uid=study_uid,
+            return_model=return_model,
+            study_value_version=study_value_version,
             sort_by=sort_by,
-            total_count=total_count,
             page_number=page_number,
             page_size=page_size,
+            filter_by=filter_by,
+            filter_operator=filter_operator,
+            total_count=total_count,
         )
+        data.items = list(map(return_model.from_query, data.items))
+
+        return data
 
+    @db.transaction
     def get_distinct_adam_listing_values_for_headers(
         self,
         field_name: str,
@@ -112,27 +77,14 @@ class ADAMListingsService:
         page_size: int = 10,
         study_value_version: str | None = None,
     ):
-        result = []
-
-        if adam_report == AdamReport.MDVISIT:
-            result = self.list_mdvisit(
-                study_uid, study_value_version=study_value_version
-            )
-        elif adam_report == AdamReport.MDENDPNT:
-            result = self.list_mdendpnt(
-                study_uid, study_value_version=study_value_version
-            )
-        elif adam_report == AdamReport.MDFLOW:
-            result = self.list_mdflow(
-                study_uid, study_value_version=study_value_version
-            )
-
-        filtered_items = service_level_generic_header_filtering(
-            items=result,
+        return self._query_service.get_adam_report_headers(
+            adam_report=adam_report,
+            study_uid=study_uid,
+            return_model=ADAM_REPORT_MODELS[adam_report],
             field_name=field_name,
             search_string=search_string,
             filter_by=filter_by,
             filter_operator=filter_operator,
             page_size=page_size,
+            study_value_version=study_value_version,
         )
-        return filtered_items
@@ -10,6 +10,9 @@ from opencensus.trace import execution_context
 from clinical_mdr_api.domain_repositories.study_definitions.study_definition_repository_impl import (
     StudyDefinitionRepositoryImpl,
 )
+from clinical_mdr_api.domain_repositories.study_definitions.study_items_copy import (
+    CopyProgressCallback,
+)
 from clinical_mdr_api.domain_repositories.study_selections.study_soa_repository import (
     SoALayout,
 )
@@ -1059,7 +1062,14 @@ class StudyService:
         self,
         study_src_uid: str,
         study_clone_input: StudyCloneInput,
+        progress: CopyProgressCallback | None = None,
     ) -> Study:
+        """
+        Creates a new study and copies the selected items of the source study into it.
+
+        The study and all chunks of the copy are written in one transaction, so that a failure leaves nothing behind.
+        `progress` is called after each chunk of the copy, see `StudyItemsCopy`.
+        """
         study_create_input = StudyCreateInput(
             study_number=study_clone_input.study_number,
             study_acronym=study_clone_input.study_acronym,
@@ -1149,6 +1159,7 @@ class StudyService:
             study_target_uid=study_created.uid,
             list_of_items_to_copy=list_of_items_to_copy,
             author_id=self.author_id,
+            progress=progress,
         )
         return study_created
 
@@ -1,11 +1,12 @@
 import logging
 import os
+import threading
 from collections import OrderedDict
 from typing import Any, Mapping, MutableMapping
 
 import yattag
+from cachetools import LRUCache
 from colour import Color
-from PIL import ImageFont
 
 from clinical_mdr_api.models.study_selections.study import StudySoaPreferences
 from clinical_mdr_api.models.study_selections.study_epoch import StudyEpoch
@@ -27,6 +28,7 @@ from clinical_mdr_api.services.studies.study_epoch import StudyEpochService
 
 # Page and margin sizes (horizontal, vertical) in millimeters
 from clinical_mdr_api.services.studies.study_visit import StudyVisitService
+from clinical_mdr_api.services.utils.text_metrics import get_text_metrics
 from common.config import settings
 from common.telemetry import trace_calls
 
@@ -135,6 +137,13 @@ STYLES = {
 
 log = logging.getLogger(__name__)
 
+# Rendered figures of locked and released study versions, which don't change,
+# keyed by (study_uid, study_value_version, debug)
+study_design_figure_cache: LRUCache[tuple[str, str, bool], str] = LRUCache(
+    maxsize=max(1, settings.study_design_figure_cache_size)
+)
+study_design_figure_cache_lock = threading.Lock()
+
 
 class StudyDesignFigureService:
     """Draws an SVG image of Study Design Figure
@@ -152,10 +161,29 @@ class StudyDesignFigureService:
         font_path = os.path.join(settings.app_root_dir, FONT_FILE_NAME)
         # Although ImageFont.truetype() expects point size, it seems we need to scale it up for calculations in pixels
         self.font_size = int(round(FONT_SIZE * FONT_SIZE_POINT_TO_PIXELS_RATIO))
-        self.font = ImageFont.truetype(font_path, self.font_size)
+        # The font is loaded once per process, and text sizes are cached across requests
+        self.text_metrics = get_text_metrics(font_path, self.font_size)
+        self.font = self.text_metrics.font
 
     @trace_calls
     def get_svg_document(self, study_uid: str, study_value_version: str | None = None):
+        """Returns the SVG drawing as text, from cache for a locked or released version of the study"""
+
+        if not study_value_version or not settings.study_design_figure_cache_size:
+            return self._render_svg_document(study_uid, study_value_version)
+
+        key = (study_uid, study_value_version, self.debug)
+        with study_design_figure_cache_lock:
+            svg = study_design_figure_cache.get(key)
+        if svg is None:
+            svg = self._render_svg_document(study_uid, study_value_version)
+            with study_design_figure_cache_lock:
+                study_design_figure_cache[key] = svg
+        return svg
+
+    def _render_svg_document(
+        self, study_uid: str, study_value_version: str | None = None
+    ) -> str:
         """Fetches necessary data and returns the SVG drawing as text"""
 
         # fetch data
@@ -801,7 +829,7 @@ class StudyDesignFigureService:
 
     def _get_text_size_px(self, text: str) -> tuple[int, int]:
         """Returns width and height (in pixels) of given text if rendered with font and size"""
-        return self.font.getbbox(text)[2:4]
+        return self.text_metrics.text_size(text)
 
     def _get_words_size_px(self, text: str) -> tuple[tuple[str, int, int]]:
         """Returns a tuple of (word, width, height) in pixels of each word of a text if rendered with font and size"""
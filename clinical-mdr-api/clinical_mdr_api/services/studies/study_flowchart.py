@@ -1,11 +1,10 @@
 import logging
 from collections import defaultdict
 from datetime import datetime
-from typing import Any, Iterable, Mapping, Sequence, TypeVar
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, Sequence, TypeVar
 
 from docx.enum.style import WD_STYLE_TYPE
 from neomodel import db
-from openpyxl.workbook import Workbook
 
 from clinical_mdr_api.domain_repositories.study_selections.study_soa_repository import (
     SoALayout,
@@ -76,6 +75,9 @@ from common.exceptions import BusinessLogicException, NotFoundException
 from common.telemetry import trace_calls
 from common.utils import VisitClass
 
+if TYPE_CHECKING:
+    from openpyxl import Workbook
+
 NUM_OPERATIONAL_CODE_COLS = 2
 SOA_CHECK_MARK = "X"
 
@@ -821,7 +823,7 @@ class StudyFlowchartService:
         study_value_version: str | None,
         layout: SoALayout,
         time_unit: str | None,
-    ) -> Workbook:
+    ) -> "Workbook":
         # build internal representation of flowchart
         table = self.get_flowchart_table(
             study_uid=study_uid,
@@ -842,7 +844,7 @@ class StudyFlowchartService:
         study_uid: str,
         study_value_version: str | None,
         time_unit: str | None,
-    ) -> Workbook:
+    ) -> "Workbook":
         # build internal representation of flowchart
         table = self.get_operational_spreadsheet(
             study_uid=study_uid,
@@ -1,20 +1,18 @@
 import os
 from collections import defaultdict
-from typing import Annotated, Any, Mapping
+from typing import TYPE_CHECKING, Annotated, Any, Mapping
 
 import yattag
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.shared import Inches
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import NamedStyle
-from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.table import Table, TableStyleInfo
-from openpyxl.worksheet.worksheet import Worksheet
 from pydantic import BaseModel, ConfigDict, Field
 
 from clinical_mdr_api.services.utils.docx_builder import DocxBuilder
 from common.telemetry import trace_calls
 
+if TYPE_CHECKING:
+    from openpyxl import Workbook
+
 CHAR_WIDTHS = {
     "i": 0.5,
     "l": 0.5,
@@ -394,7 +392,14 @@ def table_to_xlsx(
     table: TableWithFootnotes,
     styles: Mapping[str, str] | None = None,
     template: str | None = None,
-) -> Workbook:
+) -> "Workbook":
+    # openpyxl takes long to import, load it on first use
+    from openpyxl import Workbook, load_workbook
+    from openpyxl.styles import NamedStyle
+    from openpyxl.utils import get_column_letter
+    from openpyxl.worksheet.table import Table, TableStyleInfo
+    from openpyxl.worksheet.worksheet import Worksheet
+
     if template:
         template = os.path.join(os.path.dirname(__file__), template)
         workbook = load_workbook(template)
@@ -0,0 +1,92 @@
+"""
+Process-wide text measurement
+
+Fonts are loaded once per process, and the size of a text is cached by font and text.
+When the font is laid out without shaping, the size of a text made of printable ASCII characters is computed
+from precomputed tables of glyph advances, glyph bounding boxes and kerning of glyph pairs,
+instead of laying out the text.
+"""
+
+import math
+import string
+import threading
+from functools import lru_cache
+
+from PIL import ImageFont
+
+# Characters of the glyph tables, texts with any other character are measured by the font
+TABLE_CHARACTERS = string.printable.strip() + " "
+
+
+class GlyphTable:
+    """Advances, right and bottom of the bounding box, and kerning of the glyphs of a font, in pixels"""
+
+    def __init__(self, font: ImageFont.FreeTypeFont, characters: str):
+        self.advances = {char: font.getlength(char) for char in characters}
+        self.boxes = {char: font.getbbox(char)[2:4] for char in characters}
+        self.kerning = {}
+        for first in characters:
+            for second in characters:
+                if kerning := (
+                    font.getlength(first + second)
+                    - self.advances[first]
+                    - self.advances[second]
+                ):
+                    self.kerning[first + second] = kerning
+
+    def text_size(self, text: str) -> tuple[int, int]:
+        """Returns the right and bottom of the bounding box of a non-empty text, raises KeyError for unknown glyphs"""
+
+        pen = sum(self.advances[char] for char in text[:-1])
+        if self.kerning:
+            pen += sum(
+                self.kerning.get(text[i : i + 2], 0) for i in range(len(text) - 1)
+            )
+        # glyphs are placed at the pen position rounded to whole pixels
+        right = math.floor(pen + 0.5) + self.boxes[text[-1]][0]
+        return right, max(self.boxes[char][1] for char in text)
+
+
+class TextMetrics:
+    """Measures texts rendered with a TrueType font of a given size in pixels"""
+
+    def __init__(
+        self,
+        font_path: str,
+        size: int,
+        cache_size: int = 65536,
+        glyph_table: bool = True,
+    ):
+        self.font = ImageFont.truetype(font_path, size)
+        # shaping may substitute glyphs, then a text doesn't measure as the sum of its glyphs
+        self.use_glyph_table = (
+            glyph_table and self.font.layout_engine == ImageFont.Layout.BASIC
+        )
+        self._glyph_table: GlyphTable | None = None
+        self._lock = threading.Lock()
+        self.text_size = lru_cache(maxsize=cache_size)(self._text_size)
+
+    @property
+    def glyph_table(self) -> GlyphTable:
+        if self._glyph_table is None:
+            with self._lock:
+                if self._glyph_table is None:
+                    self._glyph_table = GlyphTable(self.font, TABLE_CHARACTERS)
+        return self._glyph_table
+
+    def _text_size(self, text: str) -> tuple[int, int]:
+        """Returns width and height (in pixels) of the text, the right and bottom of its bounding box"""
+
+        if text and self.use_glyph_table:
+            try:
+                return self.glyph_table.text_size(text)
+            except KeyError:
+                pass
+        return tuple(self.font.getbbox(text)[2:4])
+
+
+@lru_cache(maxsize=None)
+def get_text_metrics(font_path: str, size: int) -> TextMetrics:
+    """Returns the text metrics of the font, loaded once per process"""
+
+    return TextMetrics(font_path, size)
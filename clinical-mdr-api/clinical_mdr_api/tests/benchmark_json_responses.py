@@ -0,0 +1,139 @@
+"""
+Benchmark of the JSON serialization of large list responses
+
+    python -m clinical_mdr_api.tests.benchmark_json_responses
+
+Compares the default FastAPI path (re-validation against the response model, then encoding)
+with `PydanticJSONResponse` on pages of synthetic activity instances and CT terms.
+"""
+
+import asyncio
+import datetime
+import enum
+import json
+import time
+import types
+import typing
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import BaseModel
+
+from clinical_mdr_api.models.concepts.activities.activity_instance import (
+    ActivityInstance,
+)
+from clinical_mdr_api.models.controlled_terminologies.ct_term import (
+    CTTermNameAndAttributes,
+)
+from clinical_mdr_api.models.utils import CustomPage
+from clinical_mdr_api.routers.responses import iter_json_chunks
+from common.config import settings
+
+PAGE_SIZES = (100, 1000, 10000)
+REPEAT = 5
+
+_SCALARS = {
+    str: "Lorem ipsum dolor sit amet",
+    int: 42,
+    float: 4.2,
+    bool: True,
+    datetime.datetime: datetime.datetime(2024, 1, 1, 12, 0),
+    datetime.date: datetime.date(2024, 1, 1),
+}
+
+
+def _build_union_example(args: tuple, depth: int) -> typing.Any:
+    non_null = [arg for arg in args if arg is not type(None)]
+    if depth > 3 and len(non_null) < len(args):
+        return None
+    return build_example(non_null[0], depth)
+
+
+def _build_list_example(args: tuple, depth: int) -> list:
+    if depth > 3 or not args:
+        return []
+    return [build_example(args[0], depth + 1) for _ in range(2)]
+
+
+def build_example(annotation: typing.Any, depth: int = 0) -> typing.Any:
+    """Builds an example value of the annotation, with every field of nested models filled in"""
+
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is typing.Annotated:
+        return build_example(args[0], depth)
+    if origin in (typing.Union, types.UnionType):
+        return _build_union_example(args, depth)
+    if origin is typing.Literal:
+        return args[0]
+    if origin in (list, typing.Sequence, set, tuple) or annotation is list:
+        return _build_list_example(args, depth)
+    if origin is dict or annotation is dict:
+        return {}
+    if annotation in _SCALARS:
+        return _SCALARS[annotation]
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return next(iter(annotation))
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation.model_construct(
+            **{
+                name: build_example(field.annotation, depth + 1)
+                for name, field in annotation.model_fields.items()
+            }
+        )
+    return None
+
+
+def measure(func, *args) -> float:
+    """Returns the best time of REPEAT runs of func(*args) in milliseconds"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def fastapi_default(page: CustomPage, annotation, exclude_unset: bool) -> bytes:
+    field = create_model_field("Response", annotation, mode="serialization")
+    content = asyncio.run(
+        serialize_response(
+            field=field, response_content=page, exclude_unset=exclude_unset
+        )
+    )
+    return JSONResponse(content).body
+
+
+def pydantic_json(page: CustomPage, annotation, exclude_unset: bool) -> bytes:
+    # The chunks that PydanticJSONResponse renders, or streams for large pages
+    return b"".join(
+        iter_json_chunks(
+            page, annotation, exclude_unset, chunk_size=settings.fast_json_chunk_size
+        )
+    )
+
+
+def main():
+    print(f"{'listing':<30} {'items':>6} {'default':>10} {'fast':>10} {'speedup':>8}")
+    for item_type, exclude_unset in (
+        (ActivityInstance, False),
+        (CTTermNameAndAttributes, True),
+    ):
+        annotation = CustomPage[item_type]
+        item = build_example(item_type)
+        for size in PAGE_SIZES:
+            page = CustomPage(items=[item] * size, total=size, page=1, size=size)
+            default = measure(fastapi_default, page, annotation, exclude_unset)
+            fast = measure(pydantic_json, page, annotation, exclude_unset)
+            assert json.loads(
+                fastapi_default(page, annotation, exclude_unset)
+            ) == json.loads(pydantic_json(page, annotation, exclude_unset))
+            print(
+                f"{item_type.__name__:<30} {size:>6} {default:>8.1f}ms {fast:>8.1f}ms {default / fast:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
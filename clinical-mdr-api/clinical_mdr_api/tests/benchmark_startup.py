@@ -0,0 +1,74 @@
+"""
+Benchmark of the startup (import) time of the API
+
+    python -m clinical_mdr_api.tests.benchmark_startup [number of modules to list]
+
+Imports `clinical_mdr_api.main` in a fresh interpreter with `python -X importtime`,
+then prints the total import time and the top-level packages that took longest to import.
+The budget is enforced by `clinical_mdr_api/tests/benchmarks/test_startup.py`.
+"""
+
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+APP_MODULE = "clinical_mdr_api.main"
+
+# Seconds, generous to leave room for slower CI machines
+IMPORT_TIME_BUDGET = float(os.environ.get("STARTUP_IMPORT_TIME_BUDGET", "25"))
+
+# Imported on first use by the endpoints that need them
+LAZY_MODULES = ("weasyprint", "openpyxl", "ctrxml", "usdm_model", "xsdata")
+
+
+def measure_import_time(
+    module: str = APP_MODULE,
+) -> tuple[float, dict[str, float], list[str]]:
+    """Imports the module in a fresh interpreter.
+
+    Returns the total import time in seconds, the self time in seconds per top-level package,
+    and the top-level packages of the lazy modules that got imported.
+    """
+
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(sorted({{name.split('.')[0] for name in sys.modules}} & set({LAZY_MODULES!r}))))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total = 0.0
+    packages: dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us) / 1e6
+        if not name.startswith("  "):
+            total += int(cumulative_us) / 1e6
+
+    lazy_imported = [name for name in result.stdout.strip().split(",") if name]
+    return total, dict(packages), lazy_imported
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    total, packages, lazy_imported = measure_import_time()
+
+    print(f"{APP_MODULE} imported in {total:.2f}s, budget {IMPORT_TIME_BUDGET:.2f}s")
+    print(f"Lazy modules imported on startup: {', '.join(lazy_imported) or 'none'}")
+    print(f"{'package':<40} {'self time':>10}")
+    for name, seconds in sorted(packages.items(), key=lambda x: x[1], reverse=True)[
+        :limit
+    ]:
+        print(f"{name:<40} {seconds:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""
+End-to-end performance benchmark of the API on a large synthetic study
+
+    python -m clinical_mdr_api.tests.benchmark_study [--size small|medium|large] [--seed 0] [--repeat 3]
+        [--output results.json] [--baseline baseline.json] [--save-baseline] [--tolerance 0.25] [--keep-db]
+
+Creates a temporary database on the Neo4j server of `NEO4J_DSN`, generates a study of the given size
+with `LargeStudyTestData`, then calls the SoA, study selection listing, ADaM listing, study visit create and edit,
+USDM, CTR ODM XML and consumer API endpoints.
+
+For each scenario, it records the median wall time of the repeated calls (after a warm-up call),
+the number of Cypher queries reported by `RequestMetrics` in the `X-Metrics` response header,
+and the peak memory allocated by Python during one more call (measured with `tracemalloc`, in a separate call
+as tracing the allocations slows down the code).
+
+With `--baseline`, the results are compared to a stored run of the same size and seed:
+a wall time or peak memory above the baseline by more than the tolerance, or any additional Cypher query,
+is reported as a regression and the command exits with status 1.
+`--save-baseline` writes the results to the baseline file instead.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from starlette.testclient import TestClient
+
+from clinical_mdr_api.tests.fixtures.database import populate_base_data
+from clinical_mdr_api.tests.integration.utils.api import drop_db, inject_and_clear_db
+from clinical_mdr_api.tests.integration.utils.factory_large_study import (
+    STUDY_SIZES,
+    LargeStudyTestData,
+)
+from common.config import settings
+from common.telemetry.request_metrics import REQUEST_METRICS_HEADER_NAME, RequestMetrics
+
+DATABASE_NAME = "benchmark.study"
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Formatted with the uid of the study and of the last generated visit
+    path: str
+    params: dict[str, Any] = field(default_factory=dict)
+    # Builds the request body from the study data and the number of the call
+    payload: Callable[[LargeStudyTestData, int], dict[str, Any]] | None = None
+    consumer_api: bool = False
+
+
+def _new_visit(data: LargeStudyTestData, number: int) -> dict[str, Any]:
+    # A week after the previous new visit, so that each call creates a valid visit
+    return data.visit_input(day=(len(data.VISITS) + number) * 7)
+
+
+def _edited_visit(data: LargeStudyTestData, number: int) -> dict[str, Any]:
+    visit = list(data.study_visits.values())[-1]
+    return {
+        **data.visit_input(day=(len(data.VISITS) - 1) * 7),
+        "uid": visit.uid,
+        "description": f"Edited {number}",
+    }
+
+
+SCENARIOS = [
+    Scenario(
+        "protocol SoA",
+        "GET",
+        "/studies/{study_uid}/flowchart",
+        {"layout": "protocol", "force_build": True},
+    ),
+    Scenario(
+        "detailed SoA",
+        "GET",
+        "/studies/{study_uid}/flowchart",
+        {"layout": "detailed", "force_build": True},
+    ),
+    Scenario(
+        "operational SoA",
+        "GET",
+        "/studies/{study_uid}/flowchart",
+        {"layout": "operational", "force_build": True},
+    ),
+    Scenario("study epochs", "GET", "/studies/{study_uid}/study-epochs"),
+    Scenario(
+        "study visits", "GET", "/studies/{study_uid}/study-visits", {"page_size": 0}
+    ),
+    Scenario("study arms", "GET", "/studies/{study_uid}/study-arms", {"page_size": 0}),
+    Scenario(
+        "study activities",
+        "GET",
+        "/studies/{study_uid}/study-activities",
+        {"page_size": 0},
+    ),
+    Scenario(
+        "study activity instances",
+        "GET",
+        "/studies/{study_uid}/study-activity-instances",
+        {"page_size": 0},
+    ),
+    Scenario(
+        "study activity schedules",
+        "GET",
+        "/studies/{study_uid}/study-activity-schedules",
+    ),
+    Scenario(
+        "study SoA footnotes",
+        "GET",
+        "/studies/{study_uid}/study-soa-footnotes",
+        {"page_size": 0},
+    ),
+    Scenario(
+        "ADaM MDVISIT listing",
+        "GET",
+        "/listings/studies/{study_uid}/adam/mdvisit",
+        {"page_size": 0},
+    ),
+    Scenario(
+        "ADaM MDVISIT filtered page",
+        "GET",
+        "/listings/studies/{study_uid}/adam/mdvisit",
+        {
+            "page_size": 10,
+            "page_number": 2,
+            "total_count": True,
+            "sort_by": '{"AVISITN": false}',
+            "filters": '{"VISTPCD": {"v": ["Treatment"], "op": "co"}}',
+        },
+    ),
+    Scenario(
+        "ADaM MDVISIT headers",
+        "GET",
+        "/listings/studies/{study_uid}/adam/mdvisit/headers",
+        {"field_name": "AVISIT", "page_size": 50},
+    ),
+    Scenario(
+        "ADaM MDFLOW listing",
+        "GET",
+        "/listings/studies/{study_uid}/adam/mdflow",
+        {"page_size": 0},
+    ),
+    Scenario(
+        "ADaM MDFLOW filtered page",
+        "GET",
+        "/listings/studies/{study_uid}/adam/mdflow",
+        {
+            "page_size": 50,
+            "total_count": True,
+            "sort_by": '{"TOPICCD": true}',
+            "filters": '{"AVISIT": {"v": ["Visit"], "op": "co"}}',
+        },
+    ),
+    Scenario(
+        "ADaM MDENDPNT listing",
+        "GET",
+        "/listings/studies/{study_uid}/adam/mdendpnt",
+        {"page_size": 0},
+    ),
+    Scenario("USDM", "GET", "/usdm/v3/studyDefinitions/{study_uid}"),
+    Scenario("CTR ODM XML", "GET", "/studies/{study_uid}/ctr/odm.xml"),
+    Scenario(
+        "consumer API study visits",
+        "GET",
+        "/v1/studies/{study_uid}/study-visits",
+        consumer_api=True,
+    ),
+    Scenario(
+        "consumer API study activities",
+        "GET",
+        "/v1/studies/{study_uid}/study-activities",
+        consumer_api=True,
+    ),
+    Scenario(
+        "consumer API detailed SoA",
+        "GET",
+        "/v1/studies/{study_uid}/detailed-soa",
+        consumer_api=True,
+    ),
+    Scenario(
+        "consumer API operational SoA",
+        "GET",
+        "/v1/studies/{study_uid}/operational-soa",
+        consumer_api=True,
+    ),
+    Scenario(
+        "study visit edit",
+        "PATCH",
+        "/studies/{study_uid}/study-visits/{visit_uid}",
+        payload=_edited_visit,
+    ),
+    Scenario(
+        "study visit create",
+        "POST",
+        "/studies/{study_uid}/study-visits",
+        payload=_new_visit,
+    ),
+]
+
+
+def call(
+    client: TestClient,
+    scenario: Scenario,
+    data: LargeStudyTestData,
+    number: int,
+) -> tuple[float, int | None]:
+    """Calls the endpoint of the scenario, returns the wall time in seconds and the number of Cypher queries"""
+
+    path = scenario.path.format(
+        study_uid=data.study.uid, visit_uid=list(data.study_visits.values())[-1].uid
+    )
+    payload = scenario.payload(data, number) if scenario.payload else None
+
+    start = time.perf_counter()
+    response = client.request(
+        scenario.method, path, params=scenario.params, json=payload
+    )
+    wall_time = time.perf_counter() - start
+
+    if response.status_code >= 400:
+        raise RuntimeError(
+            f"{scenario.name}: {scenario.method} {path} returned {response.status_code}: {response.text[:1000]}"
+        )
+
+    cypher_count = None
+    if header := response.headers.get(REQUEST_METRICS_HEADER_NAME):
+        cypher_count = RequestMetrics.model_validate(json.loads(header)).cypher_count
+    return wall_time, cypher_count
+
+
+def run_scenario(
+    client: TestClient, scenario: Scenario, data: LargeStudyTestData, repeat: int
+) -> dict[str, Any]:
+    # warm-up call, loads the modules imported on first use and fills the caches
+    call(client, scenario, data, 0)
+
+    wall_times = []
+    cypher_count = None
+    for number in range(1, repeat + 1):
+        wall_time, cypher_count = call(client, scenario, data, number)
+        wall_times.append(wall_time)
+
+    tracemalloc.start()
+    try:
+        call(client, scenario, data, repeat + 1)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_time": statistics.median(wall_times),
+        "cypher_count": cypher_count,
+        "peak_memory": peak_memory,
+    }
+
+
+def compare(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    tolerance: float,
+) -> list[str]:
+    """Returns the regressions of the results compared to the baseline"""
+
+    regressions = []
+    for name, result in results.items():
+        if not (base := baseline.get(name)):
+            continue
+        for key in ("wall_time", "peak_memory"):
+            if result[key] > base[key] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {key} {result[key]:.4g} > baseline {base[key]:.4g} (+{tolerance:.0%})"
+                )
+        if (
+            result["cypher_count"] is not None
+            and base["cypher_count"] is not None
+            and result["cypher_count"] > base["cypher_count"]
+        ):
+            regressions.append(
+                f"{name}: cypher_count {result['cypher_count']} > baseline {base['cypher_count']}"
+            )
+    return regressions
+
+
+def _change(value: float | None, base: float | None) -> str:
+    if value is None or not base:
+        return ""
+    return f"{(value - base) / base:+.0%}"
+
+
+def print_results(
+    results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]]
+) -> None:
+    print(
+        f"{'scenario':<32} {'wall time':>10} {'':>6} {'cypher':>7} {'':>6} {'peak memory':>12} {'':>6}"
+    )
+    for name, result in results.items():
+        base = baseline.get(name, {})
+        print(
+            f"{name:<32} {result['wall_time'] * 1000:>8.1f}ms {_change(result['wall_time'], base.get('wall_time')):>6}"
+            f" {result['cypher_count'] if result['cypher_count'] is not None else '-':>7}"
+            f" {_change(result['cypher_count'], base.get('cypher_count')):>6}"
+            f" {result['peak_memory'] / 2**20:>9.1f}MiB {_change(result['peak_memory'], base.get('peak_memory')):>6}"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m clinical_mdr_api.tests.benchmark_study",
+        description="End-to-end performance benchmark of the API on a large synthetic study",
+    )
+    parser.add_argument("--size", choices=STUDY_SIZES, default="medium")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="file to write the results to, as JSON")
+    parser.add_argument("--baseline", help="file of the baseline results, as JSON")
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="write the results to the baseline file instead of comparing them",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative increase of the wall time and peak memory",
+    )
+    parser.add_argument(
+        "--keep-db", action="store_true", help="do not drop the database at the end"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Cypher query count of each request in the response header
+    settings.tracing_enabled = True
+    settings.tracing_metrics_header = True
+
+    # Importing the apps sets the database connection, the benchmark database must be set after
+    from clinical_mdr_api.main import app
+    from consumer_api.consumer_api import app as consumer_app
+
+    inject_and_clear_db(DATABASE_NAME)
+    try:
+        start = time.perf_counter()
+        base_data = populate_base_data(DATABASE_NAME)
+        data = LargeStudyTestData(
+            base_data.project, STUDY_SIZES[args.size], seed=args.seed
+        )
+        print(
+            f"Generated {args.size} study {data.study.uid} in {time.perf_counter() - start:.1f}s"
+        )
+
+        client = TestClient(app)
+        consumer_client = TestClient(consumer_app)
+        results = {
+            scenario.name: run_scenario(
+                consumer_client if scenario.consumer_api else client,
+                scenario,
+                data,
+                args.repeat,
+            )
+            for scenario in SCENARIOS
+        }
+    finally:
+        if not args.keep_db:
+            drop_db(DATABASE_NAME)
+
+    run = {"size": args.size, "seed": args.seed, "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        print_results(results, {})
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    baseline: dict[str, dict[str, Any]] = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+        if (stored["size"], stored["seed"]) != (args.size, args.seed):
+            sys.exit(
+                f"Baseline is of size {stored['size']} seed {stored['seed']}, run with the same size and seed"
+            )
+        baseline = stored["results"]
+
+    print_results(results, baseline)
+
+    if regressions := compare(results, baseline, args.tolerance):
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
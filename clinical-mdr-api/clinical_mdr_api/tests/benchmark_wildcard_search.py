@@ -0,0 +1,127 @@
+"""
+Benchmark of the wildcard search of library lists, with and without the full-text indexes
+
+    python -m clinical_mdr_api.tests.benchmark_wildcard_search [--search blood --search 00001] [--repeat 5]
+
+Calls the list endpoints with `filters={"*": {"v": [search]}}` on the populated database of `NEO4J_DSN`,
+once with `FULLTEXT_SEARCH_ENABLED` and once without, and prints the median wall time of each.
+"seeded" tells whether the indexes were used, they aren't when the wildcard searches aliases they don't cover.
+The full-text indexes are created with the rest of the schema by `neo4j-mdr-db/init_neo4j.py`.
+The totals of both runs must be the same, as the indexes only narrow the rows the wildcard predicates are applied to.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from starlette.testclient import TestClient
+
+from clinical_mdr_api.repositories._utils import (
+    FullTextSearch,
+    get_online_fulltext_indexes,
+)
+from common.config import settings
+
+ENDPOINTS = [
+    "/concepts/activities/activities",
+    "/concepts/activities/activity-groups",
+    "/concepts/activities/activity-sub-groups",
+    "/concepts/activities/activity-instances",
+    "/concepts/compounds",
+    "/concepts/active-substances",
+    "/concepts/unit-definitions",
+    "/objective-templates",
+    "/objective-pre-instances",
+    "/objectives",
+    "/endpoint-templates",
+    "/criteria-templates",
+    "/footnote-templates",
+    "/activity-instruction-templates",
+    "/timeframe-templates",
+]
+SEARCHES = ["blood", "pressure", "00001", "final"]
+
+
+def search(
+    client: TestClient, path: str, text: str, repeat: int
+) -> tuple[float, int, bool]:
+    """Returns the median wall time of the search, the total number of results, and whether the indexes were used"""
+
+    params = {
+        "filters": json.dumps({"*": {"v": [text]}}),
+        "total_count": True,
+        "page_size": 10,
+    }
+    seeded = False
+    seed_clause = FullTextSearch.seed_clause
+
+    def seed_and_record(fulltext_search: FullTextSearch) -> str:
+        nonlocal seeded
+        seeded = True
+        return seed_clause(fulltext_search)
+
+    FullTextSearch.seed_clause = seed_and_record
+    try:
+        wall_times = []
+        # first call warms up the caches of the database
+        for _ in range(repeat + 1):
+            start = time.perf_counter()
+            response = client.get(path, params=params)
+            wall_times.append(time.perf_counter() - start)
+            response.raise_for_status()
+    finally:
+        FullTextSearch.seed_clause = seed_clause
+
+    return statistics.median(wall_times[1:]), response.json()["total"], seeded
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m clinical_mdr_api.tests.benchmark_wildcard_search",
+        description="Wildcard search latency with and without the full-text indexes",
+    )
+    parser.add_argument(
+        "--search", action="append", help="text to search, can be repeated"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # pylint: disable=import-outside-toplevel
+    from clinical_mdr_api.main import app
+
+    client = TestClient(app)
+
+    print(f"online full-text indexes: {sorted(get_online_fulltext_indexes())}")
+    print(
+        f"{'endpoint':<42} {'search':<10} {'total':>7} {'scan':>10} {'index':>10} {'speedup':>8} {'seeded':>7}"
+    )
+    mismatches = []
+    for path in ENDPOINTS:
+        for text in args.search or SEARCHES:
+            settings.fulltext_search_enabled = False
+            scan, scan_total, _ = search(client, path, text, args.repeat)
+            settings.fulltext_search_enabled = True
+            index, index_total, seeded = search(client, path, text, args.repeat)
+
+            if scan_total != index_total:
+                mismatches.append(f"{path} {text!r}: {scan_total} != {index_total}")
+            print(
+                f"{path:<42} {text:<10} {index_total:>7} {scan * 1000:>8.1f}ms"
+                f" {index * 1000:>8.1f}ms {scan / index:>7.1f}x {'yes' if seeded else 'no':>7}"
+            )
+
+    if mismatches:
+        print("Different totals with the full-text indexes:")
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# pylint: disable=redefined-outer-name
+
+import pytest
+
+from clinical_mdr_api.tests.microbenchmarks.benchmarks import BENCHMARKS, Microbenchmark
+from clinical_mdr_api.tests.microbenchmarks.runner import calibrate, measure
+
+
+@pytest.fixture(scope="module")
+def reference() -> float:
+    return calibrate()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "benchmark", BENCHMARKS, ids=[benchmark.name for benchmark in BENCHMARKS]
+)
+def test_microbenchmark_threshold(benchmark: Microbenchmark, reference: float):
+    result = measure(benchmark, reference)
+
+    assert (
+        result.passed
+    ), f"{result.name} took {result.units:.1f} reference units ({result.time * 1000:.1f}ms), threshold is {result.threshold:.1f}"
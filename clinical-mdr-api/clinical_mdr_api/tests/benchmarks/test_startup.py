@@ -0,0 +1,23 @@
+import pytest
+
+from clinical_mdr_api.tests.benchmark_startup import (
+    IMPORT_TIME_BUDGET,
+    measure_import_time,
+)
+
+
+@pytest.mark.benchmark
+def test_startup_lazy_modules():
+    _, _, lazy_imported = measure_import_time()
+
+    assert not lazy_imported, f"Imported on startup: {lazy_imported}"
+
+
+@pytest.mark.benchmark
+def test_startup_import_time_budget():
+    total, packages, _ = measure_import_time()
+
+    slowest = sorted(packages.items(), key=lambda x: x[1], reverse=True)[:10]
+    assert (
+        total <= IMPORT_TIME_BUDGET
+    ), f"Import took {total:.2f}s, budget is {IMPORT_TIME_BUDGET:.2f}s. Slowest packages: {slowest}"
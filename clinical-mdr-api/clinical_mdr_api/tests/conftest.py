@@ -1,12 +1,65 @@
 # pylint: disable=unused-wildcard-import,wildcard-import
 
+import logging
+
+import pytest
+
+from clinical_mdr_api.domain_repositories.template_parameters.parameter_values import (
+    template_parameter_values,
+)
 from clinical_mdr_api.tests.fixtures.app import *
 from clinical_mdr_api.tests.fixtures.auth import *
 from clinical_mdr_api.tests.fixtures.database import *
 from clinical_mdr_api.tests.fixtures.logging import *
+from clinical_mdr_api.tests.fixtures.queries import *
 from clinical_mdr_api.tests.fixtures.routes import *
 from clinical_mdr_api.tests.fixtures.study import *
 from clinical_mdr_api.tests.fixtures.tracing import *
+from common.telemetry.query_budget import QueryCounter
+
+log = logging.getLogger(__name__)
+
+
+@pytest.fixture(autouse=True)
+def clear_template_parameter_values():
+    """Tests create parameter terms with plain Cypher queries, which don't invalidate the catalogue of their values"""
+    template_parameter_values.clear()
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "max_queries(n): fail the test if its body runs more than n Cypher queries",
+    )
+    config.addinivalue_line(
+        "markers",
+        "benchmark: wall-clock test, skipped unless pytest is called with --benchmark",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="Benchmarks only run with --benchmark")
+    for item in items:
+        if item.get_closest_marker("benchmark"):
+            item.add_marker(skip_benchmark)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item: pytest.Item):
+    """Fails tests marked with `max_queries(n)` that run more than `n` Cypher queries in the test body"""
+
+    marker = item.get_closest_marker("max_queries")
+    if marker is None:
+        return (yield)
+
+    budget = marker.args[0]
+    with QueryCounter() as counter:
+        result = yield
+    log.info("%s ran %s Cypher queries", item.nodeid, counter.count)
+    assert counter.count <= budget, counter.report(budget)
+    return result
 
 
 def pytest_addoption(parser):
@@ -24,3 +77,9 @@ def pytest_addoption(parser):
         default=False,
         help="Enables logging of tracing messages of OpenCensus tracer",
     )
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="Run the wall-clock tests marked with `benchmark`",
+    )
@@ -160,6 +160,11 @@ def temp_database_populated(request, temp_database: str) -> TempDatabasePopulate
     """
 
     log.info("%s: injecting base data", request.fixturename)
+    return populate_base_data(temp_database)
+
+
+def populate_base_data(database_name: str) -> TempDatabasePopulated:
+    """injects the generic base data of `temp_database_populated` into the current database"""
 
     ## Libraries
     TestUtils.create_library(settings.cdisc_library_name, True)
@@ -243,4 +248,4 @@ def temp_database_populated(request, temp_database: str) -> TempDatabasePopulate
         clinical_programme_uid=clinical_programme.uid,
     )
 
-    return TempDatabasePopulated(temp_database, clinical_programme, project)
+    return TempDatabasePopulated(database_name, clinical_programme, project)
@@ -0,0 +1,27 @@
+import contextlib
+
+import pytest
+
+from common.telemetry.query_budget import QueryCounter
+
+__all__ = ["max_queries"]
+
+
+@pytest.fixture
+def max_queries():
+    """Asserts that a block runs at most `n` Cypher queries
+
+    def test_get_study(api_client, max_queries):
+        with max_queries(10):
+            api_client.get("/studies/Study_000001")
+
+    The whole test body can be limited with the `@pytest.mark.max_queries(n)` marker instead.
+    """
+
+    @contextlib.contextmanager
+    def _max_queries(budget: int):
+        with QueryCounter() as counter:
+            yield counter
+        assert counter.count <= budget, counter.report(budget)
+
+    return _max_queries
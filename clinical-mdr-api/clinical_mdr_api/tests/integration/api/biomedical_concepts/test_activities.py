@@ -530,6 +530,18 @@ def test_get_activity_pagination(api_client):
     ), "Results should be returned by ActivitySubGroup name descending order"
 
 
+def test_get_activities_query_budget(api_client, max_queries):
+    url = "/concepts/activities/activities?page_number=2&page_size=3&total_count=true"
+    # The first request of the test client stores the dummy user
+    api_client.get(url)
+
+    # One query for the page, one for the total count
+    with max_queries(2):
+        response = api_client.get(url)
+    assert_response_status_code(response, 200)
+    assert response.json()["items"]
+
+
 def test_get_activities_with_split_groupings_pagination(api_client):
     results_paginated: dict[int, str] = {}
     sort_by = '{"name": true}'
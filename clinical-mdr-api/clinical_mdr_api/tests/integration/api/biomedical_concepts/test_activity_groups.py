@@ -105,6 +105,18 @@ def test_get_activity_group(api_client):
     assert res["possible_actions"] == ["inactivate", "new_version"]
 
 
+def test_get_activity_groups_query_budget(api_client, max_queries):
+    url = "/concepts/activities/activity-groups?page_size=10&total_count=true"
+    # The first request of the test client stores the dummy user
+    api_client.get(url)
+
+    # One query for the page, one for the total count
+    with max_queries(2):
+        response = api_client.get(url)
+    assert_response_status_code(response, 200)
+    assert response.json()["items"]
+
+
 def test_get_activity_group_version(api_client):
     response = api_client.get(
         f"/concepts/activities/activity-groups/{activity_groups_all[0].uid}/versions"
@@ -131,6 +131,18 @@ def test_get_ct_terms_pagination(api_client, base_url, page_size, sort_by):
     assert len(results_all_in_one_page) == len(results_paginated_merged)
 
 
+def test_get_ct_terms_query_budget(api_client, max_queries):
+    url = "/ct/terms?codelist_uid=C66737&page_size=10&total_count=true"
+    # The first request of the test client stores the dummy user
+    api_client.get(url)
+
+    # One query to check the codelist, one for the page, one for the total count
+    with max_queries(3):
+        response = api_client.get(url)
+    assert_response_status_code(response, 200)
+    assert response.json()["items"]
+
+
 @pytest.mark.parametrize(
     "export_format",
     [
@@ -0,0 +1,360 @@
+"""
+Equivalence of the chunked copy of study items with the single statement copy it replaced
+"""
+
+# pylint: disable=redefined-outer-name
+# pylint: disable=unused-argument
+
+import datetime
+import re
+
+import pytest
+from neomodel import db
+
+from clinical_mdr_api.domain_repositories.study_definitions.study_items_copy import (
+    StudyItemsCopy,
+)
+from clinical_mdr_api.tests.integration.utils.api import inject_and_clear_db
+
+LABELS = ["StudyArm", "StudyBranchArm", "StudyEpoch", "StudyVisit", "StudySoAFootnote"]
+
+SOURCE_STUDY_CYPHER = """
+CREATE (sr:StudyRoot {uid: "StudyCopySource"})-[:LATEST]->(sv:StudyValue {study_number: "1"})
+CREATE (:StudyRoot {uid: "StudyCopyLegacy"})-[:LATEST]->(:StudyValue {study_number: "2"})
+CREATE (:StudyRoot {uid: "StudyCopyChunked"})-[:LATEST]->(:StudyValue {study_number: "3"})
+CREATE (arm_type:CTTermRoot {uid: "ArmType"})
+CREATE (epoch_type:CTTermRoot {uid: "EpochType"})
+CREATE (visit_type:CTTermRoot {uid: "VisitType"})
+FOREACH (label IN ["StudyArm", "StudyBranchArm", "StudyEpoch", "StudyVisit", "StudySoAFootnote"] |
+    CREATE (:Counter {counterId: label + "Counter", count: 10})
+)
+WITH sr, sv, arm_type, epoch_type, visit_type
+UNWIND range(1, 7) AS i
+CREATE (sv)-[:HAS_STUDY_ARM]->(arm:StudySelection:StudyArm {uid: "StudyArm_00000" + i, name: "Arm " + i})
+CREATE (arm)-[:HAS_ARM_TYPE]->(arm_type)
+CREATE (sr)-[:AUDIT_TRAIL]->(:StudyAction:Edit {author_id: "someone"})-[:AFTER]->(arm)
+CREATE (sv)-[:HAS_STUDY_BRANCH_ARM]->(branch:StudySelection:StudyBranchArm {uid: "StudyBranchArm_00000" + i, name: "Branch " + i})
+CREATE (branch)-[:STUDY_BRANCH_ARM_HAS_STUDY_ARM]->(arm)
+CREATE (sr)-[:AUDIT_TRAIL]->(:StudyAction:Create {author_id: "someone"})-[:AFTER]->(branch)
+CREATE (sv)-[:HAS_STUDY_EPOCH]->(epoch:StudySelection:StudyEpoch {uid: "StudyEpoch_00000" + i, name: "Epoch " + i})
+CREATE (epoch)-[:HAS_EPOCH]->(epoch_type)
+CREATE (sr)-[:AUDIT_TRAIL]->(:StudyAction:Create {author_id: "someone"})-[:AFTER]->(epoch)
+CREATE (sv)-[:HAS_STUDY_VISIT]->(visit:StudySelection:StudyVisit {
+    uid: "StudyVisit_00000" + i,
+    name: "Visit " + i,
+    visit_sublabel_reference: CASE WHEN i > 1 THEN "StudyVisit_000001" END
+})
+CREATE (visit)-[:HAS_VISIT_TYPE]->(visit_type)
+CREATE (epoch)-[:STUDY_EPOCH_HAS_STUDY_VISIT]->(visit)
+CREATE (sr)-[:AUDIT_TRAIL]->(:StudyAction:Create {author_id: "someone"})-[:AFTER]->(visit)
+CREATE (sv)-[:HAS_STUDY_FOOTNOTE]->(footnote:StudySelection:StudySoAFootnote {uid: "StudySoAFootnote_00000" + i, name: "Footnote " + i})
+CREATE (footnote)-[:REFERENCES_STUDY_VISIT]->(visit)
+CREATE (sr)-[:AUDIT_TRAIL]->(:StudyAction:Create {author_id: "someone"})-[:AFTER]->(footnote)
+"""
+
+
+def legacy_copy_study_items(
+    study_src_uid: str,
+    study_target_uid: str,
+    list_of_items_to_copy: list[str],
+    author_id: str,
+) -> None:
+    # The implementation of StudyDefinitionRepository.copy_study_items before the chunked copy
+    parameters: dict[str, str | list[str] | datetime.datetime] = {}
+    exclusions = """
+        NOT EXISTS((selection_src)--(:StudyActivity))
+        AND NOT EXISTS((selection_src)--(:StudyActivitySubGroup))
+        AND NOT EXISTS((selection_src)--(:StudyActivityGroup))
+        AND NOT EXISTS((selection_src:StudySoAFootnote)--(:StudyActivitySchedule))
+        AND NOT EXISTS((selection_src)--(:StudyActivityInstance))
+        AND NOT EXISTS((selection_src)--(:StudySoAGroup))
+    """
+    if (
+        "StudySoAFootnote" in list_of_items_to_copy
+        and "StudyVisit" not in list_of_items_to_copy
+    ):
+        exclusions += """
+        AND NOT ((selection_src:StudySoAFootnote)--(:StudyVisit) AND NOT (selection_src:StudySoAFootnote)--(:StudyVisit)--(:Delete))
+    """
+    if (
+        "StudySoAFootnote" in list_of_items_to_copy
+        and "StudyEpoch" not in list_of_items_to_copy
+    ):
+        exclusions += """
+        AND NOT ((selection_src:StudySoAFootnote)--(:StudyEpoch) AND NOT (selection_src:StudySoAFootnote)--(:StudyEpoch)--(:Delete))
+    """
+
+    # COPY NODES AND OUTBOUND RELATIONSHIPS
+    query = f"""
+WITH $study_src_uid as study_src, $study_target_uid as study_target, $to_copy_labels as to_copy_labels
+with study_src, study_target, apoc.text.join(to_copy_labels, '|') AS to_copy_labels_text
+
+MATCH (sr_src:StudyRoot)-[:LATEST]->(sv_src:StudyValue)
+WHERE sr_src.uid = study_src
+MATCH (sr_target:StudyRoot)-[:LATEST]->(sv_target:StudyValue)
+WHERE sr_target.uid = study_target
+
+
+CALL apoc.cypher.run("
+MATCH path = ((sr_src)-[:AUDIT_TRAIL]->(saction_src:StudyAction)--(selection_src:StudySelection&(" + to_copy_labels_text + "))<--(sv_src))
+    WHERE {exclusions}
+return sr_src, sv_src,collect(path) as paths ", 
+{{sr_src:sr_src, sv_src:sv_src }})
+YIELD value
+
+WITH  sr_target, value.sr_src as sr_src, sv_target, value.sv_src as sv_src,value.paths as paths
+
+CALL apoc.refactor.cloneSubgraphFromPaths(paths, {{
+standinNodes:[[sv_src, sv_target], [sr_src,sr_target]]
+}})
+YIELD input, output, error
+SET output:TEMP
+WITH input,output
+MATCH (selection_src:StudySelection)-[r_ext_src]-(ext_src)
+where ID(selection_src)=input
+and not "StudySelection" in labels(ext_src)
+and not "StudyAction" in labels(ext_src)
+and not "StudyValue" in labels(ext_src)
+call apoc.create.relationship(output, type(r_ext_src), Null, ext_src)
+yield rel
+RETURN rel
+"""
+    parameters = {
+        "study_src_uid": study_src_uid,
+        "study_target_uid": study_target_uid,
+        "to_copy_labels": list_of_items_to_copy,
+    }
+    db.cypher_query(query=query, params=parameters)
+
+    # COPY BETWEEN SELECTIONS RELATIONSHIPS
+    query = """
+WITH $study_src_uid as study_src, $study_target_uid as study_target, $to_copy_labels as to_copy_labels
+
+MATCH (sr_from:StudyRoot)-[:LATEST]->(sv_from:StudyValue)-->(selection_src_from:StudySelection)-[r_ext_src]->(selection_src_to:StudySelection)
+where sr_from.uid = study_src
+WITH selection_src_from.uid as from_uid, type(r_ext_src) AS from_rel_type_to, selection_src_to.uid as to_uid, study_target, to_copy_labels
+match (sr_to:StudyRoot)-[:LATEST]->(sv_to:StudyValue)-->(a:StudySelection)
+where sr_to.uid = study_target
+match (sr_to)-[:LATEST]->(sv_to)-->(b:StudySelection) 
+WITH a,b, from_rel_type_to
+where a.uid = from_uid
+and b.uid = to_uid
+AND ANY(label IN labels(a) WHERE label IN to_copy_labels)
+WITH DISTINCT a,b,from_rel_type_to
+
+call apoc.merge.relationship(a, from_rel_type_to, null, Null, b)
+yield rel
+
+
+return *
+"""
+    parameters = {
+        "study_src_uid": study_src_uid,
+        "study_target_uid": study_target_uid,
+        "to_copy_labels": list_of_items_to_copy,
+    }
+    db.cypher_query(query=query, params=parameters)
+
+    # REFACTOR UIDS AND STUDY ACTIONS
+    query = """
+
+
+WITH $study_src_uid as study_src, $study_target_uid as study_target, $to_copy_labels as to_copy_labels, $date as date, $author_id as author_id
+
+// GO ONE BY ONE LABEL TO COPY
+unwind to_copy_labels as to_copy_labels_unw
+
+MATCH (sr_target:StudyRoot)-[:LATEST]->(sv_target:StudyValue)-[relationship]-(selection_target:StudySelection)
+where sr_target.uid = study_target AND type(relationship) <> "HAS_PROTOCOL_SOA_CELL" AND type(relationship) <> "HAS_PROTOCOL_SOA_FOOTNOTE"
+
+// Update the counter value and generate new UID and 
+CALL {
+WITH to_copy_labels_unw, selection_target
+WITH to_copy_labels_unw, selection_target
+    WHERE to_copy_labels_unw in labels(selection_target)
+MATCH (m:Counter{counterId:to_copy_labels_unw+'Counter'})
+WITH m,to_copy_labels_unw, selection_target
+CALL apoc.atomic.add(m,'count',1,1) yield oldValue, newValue
+WITH toInteger(newValue) as uid_number,to_copy_labels_unw, selection_target
+with to_copy_labels_unw+"_"+apoc.text.lpad(""+(uid_number), 6, "0") as new_uid, selection_target
+SET selection_target.old_uid = selection_target.uid
+SET selection_target.uid = new_uid
+}
+
+// find the visit_anchor
+CALL {
+WITH to_copy_labels_unw, selection_target
+WITH to_copy_labels_unw, selection_target
+    WHERE "StudyVisit" in labels(selection_target) and selection_target.visit_sublabel_reference IS NOT NULL
+MATCH (ref_svis:StudyVisit:TEMP{old_uid:selection_target.visit_sublabel_reference})
+set selection_target.visit_sublabel_reference = ref_svis.uid
+}
+
+// remove TEMP label, remove old_uid
+CALL {
+WITH to_copy_labels_unw, selection_target
+WITH to_copy_labels_unw, selection_target
+    WHERE to_copy_labels_unw in labels(selection_target)
+SET selection_target.old_uid = NULL
+REMOVE selection_target:TEMP
+}
+
+WITH $study_src_uid as study_src, $study_target_uid as study_target, $to_copy_labels as to_copy_labels, $date as date, $author_id as author_id
+
+// Update action metadata and clean up temp labels
+MATCH (sr_target)--(saction:StudyAction:TEMP)
+where sr_target.uid = study_target
+and "TEMP" in labels(saction)
+WITH distinct saction, author_id, date
+SET saction.author_id = author_id
+SET saction.date = date
+REMOVE saction:TEMP
+REMOVE saction:Edit
+REMOVE saction:Create
+SET saction:Create
+
+return *
+"""
+    parameters = {
+        "study_src_uid": study_src_uid,
+        "study_target_uid": study_target_uid,
+        "to_copy_labels": list_of_items_to_copy,
+        "date": datetime.datetime.now(datetime.timezone.utc),
+        "author_id": author_id,
+    }
+    db.cypher_query(query=query, params=parameters)
+
+
+def study_signature(study_uid: str) -> list:
+    """Describes the selections of the study and their relationships, by name instead of uid"""
+
+    rs, _ = db.cypher_query(
+        """
+MATCH (:StudyRoot {uid: $study_uid})-[:LATEST]->(sv:StudyValue)-[r_sv]->(selection:StudySelection)
+CALL {
+    WITH selection
+    MATCH (selection)-[r]-(other)
+    WHERE NOT other:StudyValue
+    RETURN collect([
+        type(r),
+        startNode(r) = selection,
+        labels(other),
+        CASE WHEN other:StudySelection THEN other.name
+             WHEN other:StudyAction THEN other.author_id
+             ELSE other.uid END
+    ]) AS relationships
+}
+RETURN
+    labels(selection),
+    type(r_sv),
+    selection.name,
+    relationships
+""",
+        {"study_uid": study_uid},
+    )
+    return sorted(
+        [
+            sorted(node_labels),
+            rel_type,
+            name,
+            sorted(relationships, key=str),
+        ]
+        for node_labels, rel_type, name, relationships in rs
+    )
+
+
+@pytest.fixture(scope="module")
+def source_study():
+    inject_and_clear_db("studyitemscopy")
+    db.cypher_query(SOURCE_STUDY_CYPHER)
+
+
+@db.transaction
+def copy_chunked(progress: list) -> dict[str, int]:
+    return StudyItemsCopy(
+        study_src_uid="StudyCopySource",
+        study_target_uid="StudyCopyChunked",
+        labels=LABELS,
+        author_id="copier",
+        chunk_size=2,
+        progress=lambda *args: progress.append(args),
+    ).run()
+
+
+@db.transaction
+def copy_legacy():
+    legacy_copy_study_items(
+        study_src_uid="StudyCopySource",
+        study_target_uid="StudyCopyLegacy",
+        list_of_items_to_copy=LABELS,
+        author_id="copier",
+    )
+
+
+def test_chunked_copy_is_equivalent_to_single_statement_copy(source_study):
+    copy_legacy()
+    progress = []
+    counts = copy_chunked(progress)
+
+    assert counts == {label: 7 for label in LABELS}
+    assert ("copy", "StudyVisit", 2, 7) in progress
+    assert ("copy", "StudyVisit", 7, 7) in progress
+
+    chunked = study_signature("StudyCopyChunked")
+    assert len(chunked) == 7 * len(LABELS)
+    assert chunked == study_signature("StudyCopyLegacy")
+
+    rs, _ = db.cypher_query(
+        """
+MATCH (:StudyRoot {uid: "StudyCopyChunked"})-[:LATEST]->(:StudyValue)-->(selection:StudySelection)
+RETURN selection.uid
+"""
+    )
+    uids = [row[0] for row in rs]
+    assert len(set(uids)) == len(uids)
+    assert all(re.fullmatch(r"Study[A-Za-z]+_0000(1[1-9]|2[0-4])", uid) for uid in uids)
+
+    rs, _ = db.cypher_query(
+        """
+MATCH (:StudyRoot {uid: "StudyCopyChunked"})-[:AUDIT_TRAIL]->(action:StudyAction)
+RETURN DISTINCT apoc.coll.sort(labels(action)), action.author_id
+"""
+    )
+    assert rs == [[["Create", "StudyAction"], "copier"]]
+
+    # The single statement copy only updated the references to visits it had already given a new uid
+    rs, _ = db.cypher_query(
+        """
+MATCH (:StudyRoot {uid: "StudyCopyChunked"})-[:LATEST]->(sv:StudyValue)-->(visit:StudyVisit)
+WHERE visit.visit_sublabel_reference IS NOT NULL
+MATCH (sv)-->(referenced:StudyVisit {uid: visit.visit_sublabel_reference})
+RETURN DISTINCT referenced.name, count(visit)
+"""
+    )
+    assert rs == [["Visit 1", 6]]
+
+
+def test_failed_copy_is_rolled_back(source_study):
+    def fail(phase, label, done, total):
+        if phase == "uids":
+            raise RuntimeError("stop")
+
+    db.cypher_query(
+        'CREATE (:StudyRoot {uid: "StudyCopyFailed"})-[:LATEST]->(:StudyValue {study_number: "4"})'
+    )
+
+    @db.transaction
+    def copy():
+        StudyItemsCopy(
+            study_src_uid="StudyCopySource",
+            study_target_uid="StudyCopyFailed",
+            labels=LABELS,
+            author_id="copier",
+            chunk_size=2,
+            progress=fail,
+        ).run()
+
+    with pytest.raises(RuntimeError):
+        copy()
+
+    assert study_signature("StudyCopyFailed") == []
@@ -0,0 +1,283 @@
+"""
+Equivalence of the study structure counts with the queries they replaced
+"""
+
+# pylint: disable=redefined-outer-name
+# pylint: disable=unused-argument
+# pylint: disable=line-too-long
+
+import pytest
+from neomodel import db
+from neomodel.sync_.match import Collect, NodeNameResolver, Optional, Size
+
+from clinical_mdr_api.domain_repositories.models.study import StudyValue
+from clinical_mdr_api.domain_repositories.study_definitions.study_definition_repository import (
+    refresh_study_structure_summary,
+)
+from clinical_mdr_api.domain_repositories.study_definitions.study_definition_repository_impl import (
+    StudyDefinitionRepositoryImpl,
+)
+from clinical_mdr_api.tests.integration.utils.api import inject_and_clear_db
+
+STUDIES_CYPHER = """
+UNWIND ["PRE TREATMENT EPOCH TYPE", "TREATMENT", "NO TREATMENT EPOCH TYPE", "POST TREATMENT EPOCH TYPE",
+        "TREATMENT ELEMENT TYPE", "NO TREATMENT ELEMENT TYPE"] AS submission_value
+CREATE (:CTTermRoot {uid: submission_value})-[:HAS_ATTRIBUTES_ROOT]->(:CTTermAttributesRoot)
+    -[:LATEST]->(:CTTermAttributesValue {code_submission_value: submission_value})
+WITH count(*) AS _
+MATCH (treatment_element_type:CTTermRoot {uid: "TREATMENT ELEMENT TYPE"})
+MATCH (no_treatment_element_type:CTTermRoot {uid: "NO TREATMENT ELEMENT TYPE"})
+CREATE (:CTTermRoot {uid: "TreatmentSubtype"})-[:HAS_PARENT_TYPE]->(treatment_element_type)
+CREATE (:CTTermRoot {uid: "NoTreatmentSubtype"})-[:HAS_PARENT_TYPE]->(no_treatment_element_type)
+CREATE (:CTTermRoot {uid: "OtherSubtype"})
+WITH count(*) AS _
+UNWIND [
+    {number: "1", arms: 3, branches: 2, cohorts: 2, visits: 5,
+     epochs: ["PRE TREATMENT EPOCH TYPE", "TREATMENT", "TREATMENT", "POST TREATMENT EPOCH TYPE"],
+     elements: ["TreatmentSubtype", "TreatmentSubtype", "NoTreatmentSubtype", "OtherSubtype"]},
+    {number: "2", arms: 1, branches: 0, cohorts: 0, visits: 2,
+     epochs: ["NO TREATMENT EPOCH TYPE", "TREATMENT"],
+     elements: ["NoTreatmentSubtype"]},
+    {number: "3", arms: 0, branches: 0, cohorts: 0, visits: 0, epochs: [], elements: []}
+] AS study
+CREATE (sr:StudyRoot {uid: "StudyStructure" + study.number})
+    -[:LATEST]->(sv:StudyValue {study_id_prefix: "STRUCT", study_number: study.number})
+FOREACH (i IN range(1, study.arms) | CREATE (sv)-[:HAS_STUDY_ARM]->(:StudySelection:StudyArm {uid: "Arm" + i}))
+FOREACH (i IN range(1, study.branches) |
+    CREATE (sv)-[:HAS_STUDY_BRANCH_ARM]->(:StudySelection:StudyBranchArm {uid: "Branch" + i})
+)
+FOREACH (i IN range(1, study.cohorts) |
+    CREATE (sv)-[:HAS_STUDY_COHORT]->(:StudySelection:StudyCohort {uid: "Cohort" + i})
+)
+WITH sr, sv, study
+CALL {
+    WITH sv, study
+    UNWIND range(0, size(study.epochs) - 1) AS i
+    MATCH (epoch_type:CTTermRoot {uid: study.epochs[i]})
+    CREATE (sv)-[:HAS_STUDY_EPOCH]->(epoch:StudySelection:StudyEpoch {uid: "Epoch" + i, order: i})
+    CREATE (epoch)-[:HAS_EPOCH_TYPE]->(epoch_type)
+    RETURN count(*) AS epochs
+}
+CALL {
+    WITH sv, study
+    UNWIND study.elements AS subtype_uid
+    MATCH (subtype:CTTermRoot {uid: subtype_uid})
+    CREATE (sv)-[:HAS_STUDY_ELEMENT]->(element:StudySelection:StudyElement)
+    CREATE (element)-[:HAS_ELEMENT_SUBTYPE]->(subtype)
+    RETURN count(*) AS elements
+}
+CALL {
+    WITH sv, study
+    UNWIND range(1, study.visits) AS i
+    CREATE (sv)-[:HAS_STUDY_VISIT]->(:StudySelection:StudyVisit {uid: "Visit" + i, order: i})
+    RETURN count(*) AS visits
+}
+// Several footnotes referencing the same epochs and visits
+CALL {
+    WITH sv
+    MATCH (sv)-[:HAS_STUDY_EPOCH]->(epoch:StudyEpoch)
+    WHERE epoch.order < 2
+    UNWIND range(1, 3) AS i
+    CREATE (sv)-[:HAS_STUDY_FOOTNOTE]->(:StudySelection:StudySoAFootnote)-[:REFERENCES_STUDY_EPOCH]->(epoch)
+    RETURN count(*) AS epoch_footnotes
+}
+CALL {
+    WITH sv
+    MATCH (sv)-[:HAS_STUDY_VISIT]->(visit:StudyVisit)
+    WHERE visit.order <= 3
+    UNWIND range(1, 2) AS i
+    CREATE (sv)-[:HAS_STUDY_FOOTNOTE]->(:StudySelection:StudySoAFootnote)-[:REFERENCES_STUDY_VISIT]->(visit)
+    RETURN count(*) AS visit_footnotes
+}
+RETURN count(*)
+"""
+
+STUDY_UIDS = ["StudyStructure1", "StudyStructure2", "StudyStructure3"]
+
+
+def legacy_study_structure_statistics(uid: str) -> dict[str, int] | None:
+    # The implementation of StudyDefinitionRepository.get_study_structure_statistics before the COUNT subqueries
+    result = (
+        StudyValue.nodes.filter(latest_value__uid=uid)
+        .traverse_relations(
+            Optional("has_study_arm"),
+            Optional("has_study_branch_arm"),
+            Optional("has_study_element"),
+            Optional("has_study_cohort"),
+            Optional("has_study_epoch"),
+            Optional("has_study_footnote__references_study_epoch"),
+            Optional("has_study_visit"),
+            Optional("has_study_footnote__references_study_visit"),
+        )
+        .annotate(
+            arm_count=Size(Collect(NodeNameResolver("has_study_arm"), distinct=True)),
+            branch_count=Size(
+                Collect(NodeNameResolver("has_study_branch_arm"), distinct=True)
+            ),
+            element_count=Size(
+                Collect(NodeNameResolver("has_study_element"), distinct=True)
+            ),
+            cohort_count=Size(
+                Collect(NodeNameResolver("has_study_cohort"), distinct=True)
+            ),
+            epoch_count=Size(
+                Collect(NodeNameResolver("has_study_epoch"), distinct=True)
+            ),
+            epoch_footnote_count=Size(
+                Collect(
+                    NodeNameResolver("has_study_footnote__references_study_epoch"),
+                    distinct=True,
+                )
+            ),
+            visit_count=Size(
+                Collect(NodeNameResolver("has_study_visit"), distinct=True)
+            ),
+            visit_footnote_count=Size(
+                Collect(
+                    NodeNameResolver("has_study_footnote__references_study_visit"),
+                    distinct=True,
+                )
+            ),
+        )
+        .all()
+    )
+    if not result:
+        return None
+    return {
+        "arm_count": result[0][3],
+        "branch_count": result[0][4],
+        "element_count": result[0][5],
+        "cohort_count": result[0][6],
+        "epoch_count": result[0][7],
+        "epoch_footnote_count": result[0][8],
+        "visit_count": result[0][9],
+        "visit_footnote_count": result[0][10],
+    }
+
+
+def legacy_study_structure_overview() -> dict[str, dict[str, int]]:
+    # The query of StudyDefinitionRepository.get_study_structure_overview before the COUNT subqueries
+    rs, _ = db.cypher_query(
+        """
+MATCH (sr:StudyRoot)-[:LATEST]->(sv:StudyValue)
+WHERE sv.study_id_prefix IS NOT NULL AND sv.study_number IS NOT NULL
+CALL {
+    WITH sv
+    OPTIONAL MATCH (sv)-[:HAS_STUDY_ARM]->(arm:StudyArm)
+    OPTIONAL MATCH (sv)-[:HAS_STUDY_EPOCH]->(pre_treatment_epoch:StudyEpoch)-[:HAS_EPOCH_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "PRE TREATMENT EPOCH TYPE"})
+    OPTIONAL MATCH (sv)-[:HAS_STUDY_EPOCH]->(treatment_epoch:StudyEpoch)-[:HAS_EPOCH_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "TREATMENT"})
+    OPTIONAL MATCH (sv)-[:HAS_STUDY_EPOCH]->(no_treatment_epoch:StudyEpoch)-[:HAS_EPOCH_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "NO TREATMENT EPOCH TYPE"})
+    OPTIONAL MATCH (sv)-[:HAS_STUDY_EPOCH]->(post_treatment_epoch:StudyEpoch)-[:HAS_EPOCH_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "POST TREATMENT EPOCH TYPE"})
+    OPTIONAL MATCH (sv)-[:HAS_STUDY_ELEMENT]->(treatment_element:StudyElement)-[:HAS_ELEMENT_SUBTYPE]->(:CTTermRoot)-[:HAS_PARENT_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "TREATMENT ELEMENT TYPE"})
+    OPTIONAL MATCH (sv)-[:HAS_STUDY_ELEMENT]->(no_treatment_element:StudyElement)-[:HAS_ELEMENT_SUBTYPE]->(:CTTermRoot)-[:HAS_PARENT_TYPE]->(:CTTermRoot)-[:HAS_ATTRIBUTES_ROOT]-(:CTTermAttributesRoot)-[:LATEST]-(:CTTermAttributesValue {code_submission_value: "NO TREATMENT ELEMENT TYPE"})
+    OPTIONAL MATCH (sv)-[:HAS_STUDY_COHORT]->(cohort:StudyCohort)
+    WITH
+        COUNT(DISTINCT arm) AS arm_count,
+        COUNT(DISTINCT pre_treatment_epoch) AS pre_treatment_epoch_count,
+        COUNT(DISTINCT treatment_epoch) AS treatment_epoch_count,
+        COUNT(DISTINCT no_treatment_epoch) AS no_treatment_epoch_count,
+        COUNT(DISTINCT post_treatment_epoch) AS post_treatment_epoch_count,
+        COUNT(DISTINCT treatment_element) AS treatment_element_count,
+        COUNT(DISTINCT no_treatment_element) AS no_treatment_element_count,
+        COUNT(DISTINCT cohort) AS cohort_count
+    RETURN
+        {
+            arms: arm_count,
+            pre_treatment_epochs: pre_treatment_epoch_count,
+            treatment_epochs: treatment_epoch_count,
+            no_treatment_epochs: no_treatment_epoch_count,
+            post_treatment_epochs: post_treatment_epoch_count,
+            treatment_elements: treatment_element_count,
+            no_treatment_elements: no_treatment_element_count,
+            cohorts: cohort_count
+        } as counts
+}
+RETURN
+    sv.study_id_prefix + "-" + sv.study_number AS study_id,
+    counts
+"""
+    )
+    return dict(rs)
+
+
+def study_structure_overview() -> dict[str, dict[str, int]]:
+    rs, _ = StudyDefinitionRepositoryImpl("test").get_study_structure_overview()
+    return dict(rs)
+
+
+@pytest.fixture(scope="module")
+def studies():
+    inject_and_clear_db("studystructure")
+    db.cypher_query(STUDIES_CYPHER)
+
+
+def test_statistics_equal_the_traversal_they_replaced(studies):
+    repository = StudyDefinitionRepositoryImpl("test")
+    for uid in STUDY_UIDS:
+        assert repository.get_study_structure_statistics(
+            uid
+        ) == legacy_study_structure_statistics(uid)
+    assert repository.get_study_structure_statistics("StudyStructureMissing") is None
+
+
+def test_statistics_count_referenced_epochs_and_visits(studies):
+    statistics = StudyDefinitionRepositoryImpl("test").get_study_structure_statistics(
+        "StudyStructure1"
+    )
+    # 6 footnotes reference 2 distinct epochs, 6 others reference 3 distinct visits
+    assert statistics == {
+        "arm_count": 3,
+        "branch_count": 2,
+        "element_count": 4,
+        "cohort_count": 2,
+        "epoch_count": 4,
+        "epoch_footnote_count": 2,
+        "visit_count": 5,
+        "visit_footnote_count": 3,
+    }
+
+
+def test_overview_equals_the_query_it_replaced(studies):
+    legacy = legacy_study_structure_overview()
+    assert set(legacy) == {"STRUCT-1", "STRUCT-2", "STRUCT-3"}
+    assert legacy["STRUCT-1"]["treatment_epochs"] == 2
+
+    # Computed on the fly without summaries, then read from the summaries
+    assert study_structure_overview() == legacy
+    for uid in STUDY_UIDS:
+        refresh_study_structure_summary(uid)
+    assert study_structure_overview() == legacy
+
+
+def test_summary_is_refreshed_in_the_transaction_of_the_change(studies):
+    refresh_study_structure_summary("StudyStructure2")
+
+    @db.transaction
+    def add_arm_and_fail():
+        db.cypher_query(
+            """
+MATCH (:StudyRoot {uid: "StudyStructure2"})-[:LATEST]->(sv:StudyValue)
+CREATE (sv)-[:HAS_STUDY_ARM]->(:StudySelection:StudyArm {uid: "ArmRolledBack"})
+"""
+        )
+        refresh_study_structure_summary("StudyStructure2")
+        raise RuntimeError("stop")
+
+    with pytest.raises(RuntimeError):
+        add_arm_and_fail()
+    assert study_structure_overview()["STRUCT-2"]["arms"] == 1
+
+    @db.transaction
+    def add_arm():
+        db.cypher_query(
+            """
+MATCH (:StudyRoot {uid: "StudyStructure2"})-[:LATEST]->(sv:StudyValue)
+CREATE (sv)-[:HAS_STUDY_ARM]->(:StudySelection:StudyArm {uid: "ArmCommitted"})
+"""
+        )
+        refresh_study_structure_summary("StudyStructure2")
+
+    add_arm()
+    overview = study_structure_overview()
+    assert overview["STRUCT-2"]["arms"] == 2
+    assert overview == legacy_study_structure_overview()
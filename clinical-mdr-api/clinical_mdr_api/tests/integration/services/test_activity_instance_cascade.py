@@ -0,0 +1,284 @@
+"""
+Tests of the cascade of an approved activity to its activity instances.
+
+Two activities fan out to the same number of instances, one of them is approved
+with `ActivityInstanceCascade`, the other one with the previous service,
+which created a new version, edited and approved the instances one by one.
+Both must leave the same versions, values, groupings and activity items in the graph.
+"""
+
+# pylint: disable=unused-argument
+# pylint: disable=redefined-outer-name
+# pylint: disable=line-too-long
+
+from typing import Any
+
+import pytest
+from neomodel import db
+
+from clinical_mdr_api.domains.concepts.activities.activity import ActivityAR
+from clinical_mdr_api.domains.enums import LibraryItemStatus
+from clinical_mdr_api.models.concepts.activities.activity import (
+    ActivityEditInput,
+    ActivityGrouping,
+)
+from clinical_mdr_api.models.concepts.activities.activity_instance import (
+    ActivityInstanceEditInput,
+    ActivityInstanceGrouping,
+)
+from clinical_mdr_api.services.concepts.activities.activity_instance_service import (
+    ActivityInstanceService,
+)
+from clinical_mdr_api.services.concepts.activities.activity_service import (
+    ActivityService,
+)
+from clinical_mdr_api.tests.integration.utils.api import (
+    inject_and_clear_db,
+    inject_base_data,
+)
+from clinical_mdr_api.tests.integration.utils.utils import TestUtils
+from common.config import settings
+
+# Instances linked to each activity, every third one is left in draft
+INSTANCES_PER_ACTIVITY = 240
+CHUNK_SIZE = 64
+
+
+class LegacyActivityService(ActivityService):
+    """Cascades the approval of an activity to its instances one by one, as before `ActivityInstanceCascade`"""
+
+    def cascade_edit_and_approve(self, item: ActivityAR) -> int:
+        _, _, _, activity_after_save = item.repository_closure_data
+        _, _, _, activity_before_save = activity_after_save.repository_closure_data
+        item_metadata = activity_before_save.item_metadata
+        last_final_version = f"{item_metadata.major_version}.0"
+
+        linked_instances = (
+            self._repos.activity_repository.get_linked_upgradable_activity_instances(
+                uid=item.uid, version=last_final_version
+            )
+        )
+        if linked_instances is None:
+            return 0
+
+        instance_service = ActivityInstanceService()
+        touched = 0
+        for instance in linked_instances.get("activity_instances", []):
+            if instance["version"]["status"] not in (
+                LibraryItemStatus.DRAFT.value,
+                LibraryItemStatus.FINAL.value,
+            ):
+                continue
+
+            instance_groupings = []
+            for grouping in item.concept_vo.activity_groupings:
+                grp = {
+                    "activity_uid": item.uid,
+                    "activity_group_uid": grouping.activity_group_uid,
+                    "activity_subgroup_uid": grouping.activity_subgroup_uid,
+                }
+                if grp in instance["activity_groupings"]:
+                    instance_groupings.append(ActivityInstanceGrouping(**grp))
+            if not instance_groupings:
+                continue
+
+            if instance["version"]["status"] == LibraryItemStatus.FINAL.value:
+                instance_service.non_transactional_create_new_version(instance["uid"])
+            instance_service.non_transactional_edit(
+                uid=instance["uid"],
+                concept_edit_input=ActivityInstanceEditInput(
+                    change_description="Cascade edit",
+                    activity_groupings=instance_groupings,
+                    name=instance["name"],
+                    name_sentence_case=instance["name_sentence_case"],
+                ),
+                patch_mode=False,
+            )
+            if instance["version"]["status"] == LibraryItemStatus.FINAL.value:
+                instance_service.non_transactional_approve(instance["uid"])
+            touched += 1
+        return touched
+
+
+@pytest.fixture(scope="module")
+def test_data():
+    inject_and_clear_db("activityinstancecascade.services")
+    inject_base_data()
+
+    activity_group = TestUtils.create_activity_group(name="Cascade group")
+    activity_subgroups = [
+        TestUtils.create_activity_subgroup(
+            name=f"Cascade subgroup {i}", activity_groups=[activity_group.uid]
+        )
+        for i in range(2)
+    ]
+    activity_instance_class = TestUtils.create_activity_instance_class(
+        name="Cascade instance class"
+    )
+    activity_item_class = TestUtils.create_activity_item_class(
+        name="Cascade item class",
+        order=1,
+        activity_instance_classes=[
+            {
+                "uid": activity_instance_class.uid,
+                "mandatory": True,
+                "is_adam_param_specific_enabled": False,
+            }
+        ],
+        role_uid=TestUtils.create_ct_term(sponsor_preferred_name="Role").term_uid,
+        data_type_uid=TestUtils.create_ct_term(
+            sponsor_preferred_name="Data type"
+        ).term_uid,
+    )
+    codelist = TestUtils.create_ct_codelist(extensible=True, approve=True)
+    ct_term = TestUtils.create_ct_term(
+        codelist_uid=codelist.codelist_uid, sponsor_preferred_name="Cascade term"
+    )
+
+    activities = {}
+    for path in ("cascade", "legacy"):
+        activity = TestUtils.create_activity(
+            name=f"Activity {path}",
+            activity_subgroups=[subgroup.uid for subgroup in activity_subgroups],
+            activity_groups=[activity_group.uid] * len(activity_subgroups),
+        )
+        instance_uids = []
+        for i in range(INSTANCES_PER_ACTIVITY):
+            # Half of the instances are linked to both groupings, they lose one with the new activity version
+            linked_subgroups = activity_subgroups[: 1 + i % 2]
+            instance = TestUtils.create_activity_instance(
+                name=f"Instance {path} {i}",
+                name_sentence_case=f"instance {path} {i}",
+                topic_code=f"topic_{path}_{i}",
+                activity_instance_class_uid=activity_instance_class.uid,
+                activities=[activity.uid] * len(linked_subgroups),
+                activity_subgroups=[subgroup.uid for subgroup in linked_subgroups],
+                activity_groups=[activity_group.uid] * len(linked_subgroups),
+                activity_items=[
+                    {
+                        "activity_item_class_uid": activity_item_class.uid,
+                        "ct_term_uids": [ct_term.term_uid],
+                        "unit_definition_uids": [],
+                        "is_adam_param_specific": False,
+                        "odm_form_uids": [],
+                        "odm_item_group_uids": [],
+                        "odm_item_uids": [],
+                    }
+                ],
+                approve=i % 3 != 0,
+            )
+            instance_uids.append(instance.uid)
+
+        # New version of the activity, linked to the first subgroup only
+        ActivityService().create_new_version(activity.uid)
+        ActivityService().edit_draft(
+            activity.uid,
+            ActivityEditInput(
+                change_description="Drop the second subgroup",
+                name=activity.name,
+                name_sentence_case=activity.name_sentence_case,
+                is_data_collected=True,
+                activity_groupings=[
+                    ActivityGrouping(
+                        activity_group_uid=activity_group.uid,
+                        activity_subgroup_uid=activity_subgroups[0].uid,
+                    )
+                ],
+            ),
+        )
+        activities[path] = (activity.uid, instance_uids)
+
+    yield {
+        "activities": activities,
+        "activity_group_uid": activity_group.uid,
+        "activity_subgroup_uid": activity_subgroups[0].uid,
+    }
+
+
+def _instance_snapshot(uid: str, path: str) -> dict[str, Any]:
+    """The versions, values, groupings and activity items of an instance, without what depends on the path"""
+
+    rs, _ = db.cypher_query(
+        """
+        MATCH (root:ActivityInstanceRoot {uid: $uid})-[:LATEST]->(latest_value:ActivityInstanceValue)
+        RETURN
+            [(root)-[has_version:HAS_VERSION]->(value) | [
+                has_version.start_date, has_version.version, has_version.status,
+                has_version.change_description, has_version.end_date IS NULL, elementId(value)
+            ]],
+            elementId(latest_value),
+            properties(latest_value),
+            [(root)-[latest]->(value) WHERE type(latest) STARTS WITH 'LATEST_' | [type(latest), elementId(value)]],
+            [(latest_value)-[:HAS_ACTIVITY]->(grouping:ActivityGrouping)-[:IN_SUBGROUP]->(valid_group:ActivityValidGroup) | [
+                head([(valid_group)<-[:HAS_GROUP]-(:ActivitySubGroupValue)<-[:HAS_VERSION]-(subgroup_root) | subgroup_root.uid]),
+                head([(valid_group)-[:IN_GROUP]->(:ActivityGroupValue)<-[:HAS_VERSION]-(group_root) | group_root.uid]),
+                exists((:ActivityRoot)-[:LATEST_FINAL]->(:ActivityValue)-[:HAS_GROUPING]->(grouping))
+            ]],
+            [(latest_value)-[:CONTAINS_ACTIVITY_ITEM]->(activity_item:ActivityItem) | [
+                activity_item.is_adam_param_specific,
+                [(activity_item)<-[:HAS_ACTIVITY_ITEM]-(item_class) | item_class.uid],
+                [(activity_item)-[rel]->(target) | type(rel) + ' ' + elementId(target)]
+            ]],
+            [(latest_value)-[:ACTIVITY_INSTANCE_CLASS]->(instance_class) | instance_class.uid]
+        """,
+        {"uid": uid},
+    )
+    versions, latest_value, properties, latest_rels, groupings, items, classes = rs[0]
+
+    # The values are compared by their order of appearance in the versions
+    versions = sorted(versions, key=lambda version: (version[0], version[1]))
+    value_ids = list(dict.fromkeys(version[5] for version in versions))
+    for key in ("name", "name_sentence_case", "topic_code"):
+        assert path in properties.pop(key).lower()
+    return {
+        "versions": [
+            version[1:5] + [value_ids.index(version[5])] for version in versions
+        ],
+        "latest_value": value_ids.index(latest_value),
+        "latest_rels": sorted(
+            [rel_type, value_ids.index(value_id)] for rel_type, value_id in latest_rels
+        ),
+        "properties": properties,
+        "groupings": sorted(groupings),
+        "items": sorted(
+            [is_adam, sorted(item_classes), sorted(targets)]
+            for is_adam, item_classes, targets in items
+        ),
+        "classes": classes,
+    }
+
+
+def test_cascade_matches_the_instance_by_instance_cascade(test_data, monkeypatch):
+    monkeypatch.setattr(settings, "cascade_chunk_size", CHUNK_SIZE)
+
+    cascade_uid, cascade_instances = test_data["activities"]["cascade"]
+    legacy_uid, legacy_instances = test_data["activities"]["legacy"]
+    ActivityService().approve(cascade_uid, cascade_edit_and_approve=True)
+    LegacyActivityService().approve(legacy_uid, cascade_edit_and_approve=True)
+
+    for i, (cascade_instance, legacy_instance) in enumerate(
+        zip(cascade_instances, legacy_instances)
+    ):
+        snapshot = _instance_snapshot(cascade_instance, "cascade")
+        assert snapshot == _instance_snapshot(legacy_instance, "legacy"), i
+
+        # Every instance is linked to the remaining grouping of the approved activity only
+        assert snapshot["groupings"] == [
+            [
+                test_data["activity_subgroup_uid"],
+                test_data["activity_group_uid"],
+                True,
+            ]
+        ]
+        expected_versions = (
+            [["0.2", "Draft", "Cascade edit"]]
+            if i % 3 == 0
+            else [
+                ["1.1", "Draft", "New draft created"],
+                ["1.2", "Draft", "Cascade edit"],
+                ["2.0", "Final", "Approved version"],
+            ]
+        )
+        assert [
+            version[:3] for version in snapshot["versions"][-len(expected_versions) :]
+        ] == expected_versions
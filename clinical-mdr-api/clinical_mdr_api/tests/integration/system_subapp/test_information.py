@@ -1,3 +1,5 @@
+import pytest
+
 from clinical_mdr_api.models.system import SystemInformation
 from clinical_mdr_api.tests.utils.checks import (
     JSON_CONTENT_TYPE,
@@ -7,6 +9,7 @@ from clinical_mdr_api.tests.utils.checks import (
 )
 
 
+@pytest.mark.max_queries(1)
 def test_information(api_client):
     response = api_client.request("GET", "/system/information")
     assert_response_status_code(response, 200)
@@ -17,6 +20,7 @@ def test_information(api_client):
     assert info.build_id
 
 
+@pytest.mark.max_queries(0)
 def test_build_id(api_client):
     response = api_client.request("GET", "/system/information/build-id")
     assert_response_status_code(response, 200)
@@ -0,0 +1,130 @@
+"""
+Tests for the request-scoped Neo4j unit of work
+"""
+
+# pylint: disable=unused-argument
+# pylint: disable=redefined-outer-name
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from neo4j.exceptions import ClientError
+from neomodel import db
+from starlette.middleware import Middleware
+from starlette_context.middleware import RawContextMiddleware
+
+from clinical_mdr_api.tests.integration.utils.api import inject_and_clear_db
+from common.unit_of_work import (
+    BOOKMARKS_HEADER_NAME,
+    UnitOfWorkMiddleware,
+    current_unit_of_work,
+    install_unit_of_work,
+    patch_neomodel_transactions,
+)
+
+
+def _count() -> int:
+    rs, _ = db.cypher_query("MATCH (n:UnitOfWorkTest) RETURN count(n)")
+    return rs[0][0]
+
+
+@db.transaction
+def _create_in_transaction(name: str):
+    db.cypher_query("CREATE (:UnitOfWorkTest {name: $name})", {"name": name})
+
+
+def create_app() -> FastAPI:
+    test_app = FastAPI(
+        middleware=[
+            Middleware(RawContextMiddleware),
+            Middleware(UnitOfWorkMiddleware),
+        ]
+    )
+
+    @test_app.get("/count")
+    def get_count():
+        unit_of_work = current_unit_of_work()
+        return {"count": _count(), "access_mode": unit_of_work.access_mode}
+
+    @test_app.get("/write-in-transaction")
+    def write_in_transaction():
+        _create_in_transaction("from get")
+        return {"count": _count()}
+
+    @test_app.get("/write-without-transaction")
+    def write_without_transaction():
+        db.cypher_query("CREATE (:UnitOfWorkTest {name: 'not allowed'})")
+
+    @test_app.post("/items")
+    def create_items(fail: bool = False):
+        unit_of_work = current_unit_of_work()
+        _create_in_transaction("first")
+        db.cypher_query("CREATE (:UnitOfWorkTest {name: 'second'})")
+        if fail:
+            raise ValueError("rollback")
+        return {"access_mode": unit_of_work.access_mode}
+
+    install_unit_of_work(test_app)
+    return test_app
+
+
+@pytest.fixture(scope="module")
+def api_client():
+    inject_and_clear_db("unitofwork.api")
+    patch_neomodel_transactions()
+    yield TestClient(create_app(), raise_server_exceptions=False)
+
+
+@pytest.fixture(autouse=True)
+def clear_nodes(api_client):
+    db.cypher_query("MATCH (n:UnitOfWorkTest) DETACH DELETE n")
+
+
+def test_get_runs_in_read_transaction(api_client):
+    response = api_client.get("/count")
+
+    assert response.status_code == 200
+    assert response.json() == {"count": 0, "access_mode": "READ"}
+
+
+def test_post_runs_in_one_write_transaction(api_client):
+    response = api_client.post("/items")
+
+    assert response.status_code == 200
+    assert response.json() == {"access_mode": "WRITE"}
+    assert response.headers[BOOKMARKS_HEADER_NAME]
+    assert _count() == 2
+
+
+def test_failed_post_rolls_back_nested_transactions(api_client):
+    response = api_client.post("/items", params={"fail": True})
+
+    assert response.status_code == 500
+    assert _count() == 0
+
+
+def test_bookmarks_are_passed_back(api_client):
+    response = api_client.post("/items")
+    bookmarks = response.headers[BOOKMARKS_HEADER_NAME]
+
+    response = api_client.get("/count", headers={BOOKMARKS_HEADER_NAME: bookmarks})
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 2
+
+
+def test_write_transaction_within_get(api_client):
+    response = api_client.get("/write-in-transaction")
+
+    assert response.status_code == 200
+    assert response.json() == {"count": 1}
+    assert response.headers[BOOKMARKS_HEADER_NAME]
+    assert _count() == 1
+
+
+def test_write_without_transaction_within_get_is_refused(api_client):
+    with pytest.raises(ClientError):
+        with TestClient(create_app()) as client:
+            client.get("/write-without-transaction")
+
+    assert _count() == 0
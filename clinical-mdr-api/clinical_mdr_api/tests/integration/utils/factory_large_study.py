@@ -0,0 +1,238 @@
+"""
+Deterministic generator of large synthetic studies, for performance benchmarks.
+
+The study is built through the services, like `SoATestData` which it extends,
+with a structure derived from a `StudySize` and a random seed:
+the same size and seed always give the same epochs, visits, activities, instances, schedules, footnotes and arms.
+Only the uids and the study number differ between runs.
+"""
+
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any
+
+from clinical_mdr_api.domains.study_selections.study_selection_base import SoAItemType
+from clinical_mdr_api.models.projects.project import Project
+from clinical_mdr_api.models.study_selections.study_epoch import StudyEpoch
+from clinical_mdr_api.models.study_selections.study_selection import StudySelectionArm
+from clinical_mdr_api.tests.integration.utils.factory_soa import SoATestData
+from clinical_mdr_api.tests.integration.utils.utils import TestUtils
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StudySize:
+    activities: int
+    instances_per_activity: int
+    visits: int
+    epochs: int
+    arms: int
+    footnotes: int
+    # Share of the visits each activity is scheduled for
+    schedule_density: float = 0.3
+    activity_groups: int = 5
+    activity_subgroups_per_group: int = 3
+
+
+STUDY_SIZES = {
+    "small": StudySize(
+        activities=20,
+        instances_per_activity=1,
+        visits=10,
+        epochs=3,
+        arms=2,
+        footnotes=5,
+    ),
+    "medium": StudySize(
+        activities=100,
+        instances_per_activity=2,
+        visits=30,
+        epochs=4,
+        arms=3,
+        footnotes=20,
+    ),
+    "large": StudySize(
+        activities=300,
+        instances_per_activity=2,
+        visits=60,
+        epochs=5,
+        arms=4,
+        footnotes=50,
+        activity_groups=10,
+        activity_subgroups_per_group=5,
+    ),
+}
+
+SOA_GROUPS = ["Subject Related Information", "Efficacy", "Safety", "Biomarkers"]
+
+
+class LargeStudyTestData(SoATestData):
+    """SoATestData with a synthetic structure of the given size"""
+
+    def __init__(self, project: Project, size: StudySize, seed: int = 0):
+        self.size = size
+        self.rng = random.Random(seed)
+
+        # SoATestData builds the study from these, they override its class constants
+        # pylint: disable=invalid-name
+        self.EPOCHS = self.generate_epochs()
+        self.VISITS = self.generate_visits()
+        self.ACTIVITIES = self.generate_activities()
+        self.FOOTNOTES = self.generate_footnotes()
+        # pylint: enable=invalid-name
+
+        super().__init__(project)
+
+        self.study_arms = self.create_study_arms()
+
+    def generate_epochs(self) -> dict[str, dict[str, Any]]:
+        subtypes = (
+            ["Screening"] + ["Treatment"] * max(self.size.epochs - 2, 0) + ["Follow-Up"]
+        )[-self.size.epochs :]
+        return {
+            f"{subtype} {i + 1}": {"subtype": subtype, "color_hash": "#C5E1A5FF"}
+            for i, subtype in enumerate(subtypes)
+        }
+
+    def generate_visits(self) -> dict[str, dict[str, Any]]:
+        epochs = list(self.EPOCHS.items())
+        visits = {}
+        for i in range(self.size.visits):
+            epoch_name, epoch = epochs[i * len(epochs) // self.size.visits]
+            visits[f"V{i + 1}"] = {
+                "epoch": epoch_name,
+                "type": epoch["subtype"],
+                "visit_contact_mode": "On Site Visit",
+                "is_global_anchor_visit": i == 0,
+                "day": i * 7,
+                "min_window": -1,
+                "max_window": 1,
+            }
+        return visits
+
+    def generate_activities(self) -> dict[str, dict[str, Any]]:
+        visit_names = list(self.VISITS)
+        num_visits = max(1, round(len(visit_names) * self.size.schedule_density))
+        activities = {}
+        for i in range(self.size.activities):
+            group = i % self.size.activity_groups
+            subgroup = (i // self.size.activity_groups) % (
+                self.size.activity_subgroups_per_group
+            )
+            name = f"Synthetic Activity {i + 1:04d}"
+            activities[name] = {
+                "soa_group": self.rng.choice(SOA_GROUPS),
+                "group": f"Synthetic Group {group + 1:02d}",
+                "subgroup": f"Synthetic Subgroup {group + 1:02d}.{subgroup + 1:02d}",
+                "visits": sorted(
+                    self.rng.sample(visit_names, num_visits), key=visit_names.index
+                ),
+                "show_soa_group": True,
+                "show_group": True,
+                "show_subgroup": True,
+                "show_activity": True,
+                "instances": [
+                    {
+                        "class": "Synthetic class",
+                        "name": f"{name} instance {j + 1}",
+                        "topic_code": f"SYN{i + 1:04d}{j + 1}",
+                        "adam_param_code": f"SYN{i + 1:04d}{j + 1}",
+                    }
+                    for j in range(self.size.instances_per_activity)
+                ],
+            }
+        return activities
+
+    def generate_footnotes(self) -> dict[str, list[dict[str, str]]]:
+        scheduled = [
+            (name, visit)
+            for name, activity in self.ACTIVITIES.items()
+            for visit in activity["visits"]
+        ]
+        footnotes = {}
+        for i in range(self.size.footnotes):
+            activity, visit = self.rng.choice(scheduled)
+            footnotes[f"Synthetic footnote {i + 1:04d}"] = [
+                {
+                    "type": SoAItemType.STUDY_ACTIVITY_SCHEDULE.value,
+                    "visit": visit,
+                    "activity": activity,
+                },
+                {
+                    "type": SoAItemType.STUDY_ACTIVITY.value,
+                    "name": self.rng.choice(list(self.ACTIVITIES)),
+                },
+                {
+                    "type": SoAItemType.STUDY_VISIT.value,
+                    "name": self.rng.choice(list(self.VISITS)),
+                },
+            ]
+        return footnotes
+
+    def create_study_epochs(self, epoch_dict) -> dict[str, StudyEpoch]:
+        log.debug("creating StudyEpochs")
+
+        epochs = {
+            k: TestUtils.create_study_epoch(
+                study_uid=self.study.uid,
+                epoch_subtype=self._epoch_terms[epo["subtype"]].term_uid,
+                color_hash=epo.get("color_hash"),
+            )
+            for k, epo in epoch_dict.items()
+        }
+
+        log.info("created StudyEpochs: %s", {k: epo.uid for k, epo in epochs.items()})
+
+        return epochs
+
+    def create_study_arms(self) -> list[StudySelectionArm]:
+        arm_types = self.create_codelist_with_terms(
+            name="Arm Type",
+            terms={"Investigational Arm"},
+            sponsor_preferred_name="Arm Type",
+            submission_value="ARMTTP",
+            extensible=True,
+            approve=True,
+        )
+
+        arms = [
+            TestUtils.create_study_arm(
+                study_uid=self.study.uid,
+                name=f"Synthetic Arm {i + 1}",
+                short_name=f"Arm {i + 1}",
+                code=f"ARM{i + 1}",
+                randomization_group=f"Randomization Group {i + 1}",
+                number_of_subjects=10 * (i + 1),
+                arm_type_uid=arm_types["Investigational Arm"].term_uid,
+            )
+            for i in range(self.size.arms)
+        ]
+
+        log.info("created StudyArms: %s", [arm.arm_uid for arm in arms])
+
+        return arms
+
+    def visit_input(self, day: int) -> dict[str, Any]:
+        """Payload of a visit in the last epoch, to create or edit a visit through the API"""
+
+        return {
+            "study_epoch_uid": list(self.study_epochs.values())[-1].uid,
+            "visit_type_uid": self._visit_type_terms["Follow-Up"].term_uid,
+            "time_reference_uid": self._visit_timeref_terms[
+                "Global anchor visit"
+            ].term_uid,
+            "time_value": day,
+            "time_unit_uid": self._unit_definitions["day"].uid,
+            "show_visit": True,
+            "min_visit_window_value": -1,
+            "max_visit_window_value": 1,
+            "visit_window_unit_uid": self._unit_definitions["days"].uid,
+            "visit_contact_mode_uid": self._visit_contact_terms[
+                "On Site Visit"
+            ].term_uid,
+            "visit_class": "SINGLE_VISIT",
+            "visit_subclass": "SINGLE_VISIT",
+            "is_global_anchor_visit": False,
+        }
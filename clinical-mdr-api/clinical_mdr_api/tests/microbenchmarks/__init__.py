@@ -0,0 +1,17 @@
+"""
+Microbenchmarks of the in-memory hot paths of the API, no database required
+
+    python -m clinical_mdr_api.tests.microbenchmarks [-k text] [--rounds 5] [--profile-dir DIR] [--json FILE]
+
+Times filtering and pagination of items in Python, `FieldsDirective` filtering, the study visit timeline,
+the SoA table assembly, the HTML, DOCX and XLSX rendering of tables, the study design figure layout,
+and the HTML stripping and parameter extraction of syntax templates, on large synthetic inputs (see `fixtures`).
+
+Timings are expressed in units of a fixed pure-Python reference workload timed on the same machine,
+so that the thresholds in `benchmarks.BENCHMARKS` hold on any machine.
+Set `MICROBENCHMARK_THRESHOLD_FACTOR` to loosen all thresholds, exits with status 1 when any is exceeded.
+With `--profile-dir`, a cProfile stats file with a text report, and the tracemalloc peak with the top allocating lines
+are written for each benchmark.
+The thresholds are also checked by `clinical_mdr_api/tests/benchmarks/test_microbenchmarks.py`, which only runs
+when pytest is called with `--benchmark` (`pipenv run testbenchmark`), not in CI.
+"""
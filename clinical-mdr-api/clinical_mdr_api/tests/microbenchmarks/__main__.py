@@ -0,0 +1,3 @@
+from clinical_mdr_api.tests.microbenchmarks.runner import main
+
+main()
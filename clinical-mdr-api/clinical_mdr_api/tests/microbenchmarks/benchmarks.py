@@ -0,0 +1,276 @@
+"""The microbenchmarks of the in-memory hot paths, with their regression thresholds"""
+
+# pylint: disable=protected-access
+
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from clinical_mdr_api.domain_repositories.study_selections.study_soa_repository import (
+    SoALayout,
+)
+from clinical_mdr_api.domain_repositories.template_parameters.parameter_values import (
+    ParameterValues,
+)
+from clinical_mdr_api.listings.query_service import QueryService
+from clinical_mdr_api.models.listings.listings import MetaData
+from clinical_mdr_api.models.listings.listings_adam import FlowchartMetadataAdamListing
+from clinical_mdr_api.repositories._utils import FilterOperator
+from clinical_mdr_api.services._utils import (
+    FieldsDirective,
+    filter_base_model_using_fields_directive,
+    generic_item_filtering,
+    generic_pagination,
+)
+from clinical_mdr_api.services.studies.study_flowchart import (
+    DOCX_STYLES,
+    OPERATIONAL_XLSX_STYLES,
+    StudyFlowchartService,
+)
+from clinical_mdr_api.services.utils.table_f import (
+    table_to_docx,
+    table_to_html,
+    table_to_xlsx,
+)
+from clinical_mdr_api.tests.microbenchmarks import fixtures
+from clinical_mdr_api.utils import convert_to_plain, extract_parameters, strip_html
+from common.utils import BaseTimelineAR
+
+
+@dataclass(frozen=True)
+class Microbenchmark:
+    name: str
+    # Prepares the positional arguments of one call, not included in the timing
+    setup: Callable[[], tuple]
+    func: Callable[..., Any]
+    # Budget of one call in units of the reference workload, see `runner.calibrate()`
+    threshold: float
+
+
+def _filter_and_paginate(items):
+    filtered = generic_item_filtering(
+        items,
+        filter_by={
+            "status": {"v": ["Draft", "Final"], "op": "eq"},
+            "name": {"v": ["alpha"], "op": "co"},
+            "term.order": {"v": ["10"], "op": "gt"},
+        },
+        filter_operator=FilterOperator.AND,
+        sort_by={"term.sponsor_preferred_name": True, "number": False},
+    )
+    return generic_pagination(filtered, page_number=2, page_size=100)
+
+
+def _filter_any(items):
+    return generic_item_filtering(
+        items,
+        filter_by={
+            "status": {"v": ["Retired"]},
+            "number": {"v": ["500"], "op": "lt"},
+        },
+        filter_operator=FilterOperator.OR,
+        sort_by={"start_date": False},
+    )
+
+
+def _fields_directive(items):
+    fields_directive = FieldsDirective.from_fields_query_parameter(
+        "uid, name, status, term.term_uid, term.order, -tags"
+    )
+    return [
+        filter_base_model_using_fields_directive(item, fields_directive)
+        for item in items
+    ]
+
+
+def _generate_timeline(visits):
+    return BaseTimelineAR(study_uid="Study_000001", _visits=visits)._generate_timeline()
+
+
+def _activity_rows(service, grouped_visits):
+    return service._get_activity_rows(
+        service.study_activities,
+        service.study_activity_schedules,
+        grouped_visits,
+        layout=SoALayout.DETAILED,
+    )
+
+
+def _build_soa(service):
+    return service.build_flowchart_table(
+        study_uid="", study_value_version=None, layout=SoALayout.DETAILED
+    )
+
+
+def _strip_html(templates):
+    return [strip_html(template) for template in templates]
+
+
+def _uncached_names():
+    strip_html.cache_clear()
+    return (fixtures.build_names(),)
+
+
+def _convert_to_plain(names):
+    return [convert_to_plain(name) for name in names]
+
+
+def _adam_flowchart(rows):
+    return [FlowchartMetadataAdamListing.from_query(row) for row in rows]
+
+
+def _listings_metadata(query_service):
+    return [
+        list(map(MetaData.from_query, query_service.get_metadata(dataset_name)))
+        for dataset_name in ("topic_cd_def", "cdisc_ct_val, cdisc_ct_list", None) * 100
+    ]
+
+
+def _template_parameter_values(parameters, terms):
+    parameter_values = ParameterValues(parameters, terms)
+    return [parameter_values.get_values(name) for _, name, _ in parameters]
+
+
+def _extract_parameters(templates):
+    return [extract_parameters(template) for template in templates]
+
+
+BENCHMARKS: list[Microbenchmark] = [
+    Microbenchmark(
+        "generic_item_filtering AND + generic_pagination",
+        lambda: (fixtures.build_items(),),
+        _filter_and_paginate,
+        threshold=6,
+    ),
+    Microbenchmark(
+        "generic_item_filtering OR",
+        lambda: (fixtures.build_items(),),
+        _filter_any,
+        threshold=7,
+    ),
+    Microbenchmark(
+        "FieldsDirective filtering",
+        lambda: (fixtures.build_items(),),
+        _fields_directive,
+        threshold=10,
+    ),
+    Microbenchmark(
+        "BaseTimelineAR._generate_timeline",
+        lambda: (fixtures.build_visits(),),
+        _generate_timeline,
+        threshold=1,
+    ),
+    Microbenchmark(
+        "StudyFlowchartService._get_activity_rows",
+        lambda: (fixtures.build_flowchart_service(), fixtures.build_grouped_visits()),
+        _activity_rows,
+        threshold=5,
+    ),
+    Microbenchmark(
+        "StudyFlowchartService.build_flowchart_table",
+        lambda: (fixtures.build_flowchart_service(),),
+        _build_soa,
+        threshold=7,
+    ),
+    Microbenchmark(
+        "StudyFlowchartService.propagate_hidden_rows",
+        lambda: (deepcopy(fixtures.build_detailed_soa_table()).rows,),
+        StudyFlowchartService.propagate_hidden_rows,
+        threshold=1.5,
+    ),
+    Microbenchmark(
+        "StudyFlowchartService.add_footnotes",
+        lambda: (
+            deepcopy(fixtures.build_detailed_soa_table()),
+            fixtures.soa_test_data.FOOTNOTES,
+        ),
+        StudyFlowchartService.add_footnotes,
+        threshold=2.5,
+    ),
+    Microbenchmark(
+        "table_to_html",
+        lambda: (fixtures.build_detailed_soa_table(),),
+        table_to_html,
+        threshold=3,
+    ),
+    Microbenchmark(
+        "table_to_docx",
+        lambda: (fixtures.build_detailed_soa_table(), DOCX_STYLES),
+        table_to_docx,
+        threshold=20,
+    ),
+    Microbenchmark(
+        "table_to_xlsx",
+        lambda: (fixtures.build_detailed_soa_table(), OPERATIONAL_XLSX_STYLES),
+        table_to_xlsx,
+        threshold=4,
+    ),
+    Microbenchmark(
+        "StudyDesignFigureService._calculate_widths",
+        lambda: (
+            fixtures.build_design_figure_service(),
+            fixtures.build_design_figure_matrix(),
+        ),
+        lambda service, table: service._calculate_widths(table),
+        threshold=5,
+    ),
+    Microbenchmark(
+        "StudyDesignFigureService._mk_timeline",
+        lambda: (
+            fixtures.build_design_figure_service(),
+            *deepcopy(fixtures.build_design_figure_table()),
+        ),
+        lambda service, table, doc_height: service._mk_timeline(
+            table,
+            service._pick_first_visit_of_epochs(
+                fixtures.design_figure_data.STUDY_VISITS
+            ),
+            doc_height,
+            fixtures.design_figure_data.SOA_PREFERENCES,
+            "week",
+        ),
+        threshold=1,
+    ),
+    Microbenchmark(
+        "StudyDesignFigureService.get_svg_document of a large study",
+        lambda: (fixtures.build_large_design_figure_service(),),
+        lambda service: service.get_svg_document(""),
+        threshold=4,
+    ),
+    Microbenchmark(
+        "strip_html",
+        lambda: (fixtures.build_templates(),),
+        _strip_html,
+        threshold=1,
+    ),
+    Microbenchmark(
+        "convert_to_plain of distinct names",
+        _uncached_names,
+        _convert_to_plain,
+        threshold=45,
+    ),
+    Microbenchmark(
+        "ADaM MDFLOW rows of a large study",
+        lambda: (fixtures.build_adam_flowchart_rows(),),
+        _adam_flowchart,
+        threshold=13,
+    ),
+    Microbenchmark(
+        "listings metadata by dataset name",
+        lambda: (QueryService(),),
+        _listings_metadata,
+        threshold=2,
+    ),
+    Microbenchmark(
+        "values of all template parameters of a large library",
+        fixtures.build_template_parameter_rows,
+        _template_parameter_values,
+        threshold=13,
+    ),
+    Microbenchmark(
+        "extract_parameters",
+        lambda: (fixtures.build_templates(),),
+        _extract_parameters,
+        threshold=1,
+    ),
+]
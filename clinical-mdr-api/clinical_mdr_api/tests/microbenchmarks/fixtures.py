@@ -0,0 +1,434 @@
+"""Builders of large synthetic inputs for the microbenchmarks
+
+Builders are cached, so the inputs are built once per process.
+SoA and study design figure inputs scale up the data of the unit tests.
+"""
+
+# pylint: disable=protected-access
+
+import datetime
+import random
+import re
+from collections import OrderedDict
+from functools import cache
+
+from pydantic import BaseModel
+
+from clinical_mdr_api.domain_repositories.study_selections.study_soa_repository import (
+    SoALayout,
+)
+from clinical_mdr_api.domains.study_definition_aggregates.study_metadata import (
+    StudyStatus,
+)
+from clinical_mdr_api.domains.study_selections.study_visit import (
+    StudyVisitVO,
+    TimePoint,
+)
+from clinical_mdr_api.models.controlled_terminologies.ct_term import (
+    SimpleCTTermNameWithConflictFlag,
+)
+from clinical_mdr_api.models.study_selections.study import StudySoaPreferencesInput
+from clinical_mdr_api.models.study_selections.study_selection import (
+    StudyActivitySchedule,
+    StudySelectionActivity,
+)
+from clinical_mdr_api.services.studies.study_design_figure import (
+    StudyDesignFigureService,
+)
+from clinical_mdr_api.services.studies.study_flowchart import StudyFlowchartService
+from clinical_mdr_api.services.utils.table_f import TableWithFootnotes
+from clinical_mdr_api.tests.unit.services import soa_test_data
+from clinical_mdr_api.tests.unit.services import (
+    test_study_design_figure as design_figure_data,
+)
+from common.config import settings
+from common.utils import TimeUnit, VisitClass, VisitSubclass
+
+SEED = 42
+
+# Copies of each StudyActivity of the unit test data, 9 StudyActivities in the data
+SOA_SCALE = 40
+# Copies of each StudyArm of the unit test data, 3 StudyArms in the data
+DESIGN_FIGURE_SCALE = 10
+# Copies of each StudyArm and StudyVisit of the unit test data for a large study, 13 StudyVisits in the data
+LARGE_DESIGN_FIGURE_SCALE = 12
+LARGE_DESIGN_FIGURE_VISIT_SCALE = 30
+NUM_ITEMS = 5000
+NUM_VISITS = 300
+NUM_TEMPLATES = 2000
+NUM_NAMES = 20000
+NUM_ADAM_ACTIVITIES = 100
+# Template parameter trees of a root, 3 children and 2 grandchildren per child
+NUM_PARAMETER_TREES = 10
+NUM_PARAMETER_TERMS = 40000
+
+
+class SyntheticTerm(BaseModel):
+    term_uid: str
+    sponsor_preferred_name: str | None = None
+    order: int | None = None
+
+
+class SyntheticItem(BaseModel):
+    uid: str
+    name: str | None = None
+    number: int | None = None
+    start_date: datetime.datetime | None = None
+    status: str | None = None
+    term: SyntheticTerm | None = None
+    tags: list[str] = []
+
+
+@cache
+def build_items(num: int = NUM_ITEMS) -> list[SyntheticItem]:
+    """Items with a nested model, like the list items of the API that are filtered in Python"""
+
+    rng = random.Random(SEED)
+    terms = [
+        SyntheticTerm(
+            term_uid=f"CTTerm_{i:06d}", sponsor_preferred_name=f"Term {i}", order=i
+        )
+        for i in range(50)
+    ]
+    return [
+        SyntheticItem(
+            uid=f"Item_{i:06d}",
+            name=f"Item {rng.randrange(num)} {rng.choice(['alpha', 'beta', 'gamma'])}",
+            number=rng.randrange(1000),
+            start_date=datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=i),
+            status=rng.choice(["Draft", "Final", "Retired"]),
+            term=rng.choice(terms) if i % 10 else None,
+            tags=[f"tag{rng.randrange(20)}" for _ in range(3)],
+        )
+        for i in range(num)
+    ]
+
+
+def _term(name: str) -> SimpleCTTermNameWithConflictFlag:
+    return SimpleCTTermNameWithConflictFlag(
+        term_uid=f"CTTerm_{name.replace(' ', '')}", sponsor_preferred_name=name
+    )
+
+
+@cache
+def build_visits(num: int = NUM_VISITS) -> list[StudyVisitVO]:
+    """StudyVisitVOs anchored to a baseline visit or the previous visit, with groups of subvisits"""
+
+    day = TimeUnit(name="day", conversion_factor_to_master=1)
+    on_site = _term("On Site Visit")
+    baseline = _term("Baseline")
+    treatment = _term("Treatment")
+    previous_visit = _term(settings.previous_visit_name)
+
+    visits = []
+    for i in range(num):
+        visit_subclass = VisitSubclass.SINGLE_VISIT
+        sublabel_reference = None
+        reference, value = baseline, i * 7
+        if i % 10 == 5:
+            visit_subclass = VisitSubclass.ANCHOR_VISIT_IN_GROUP_OF_SUBV
+        elif i % 10 in (6, 7):
+            visit_subclass = VisitSubclass.ADDITIONAL_SUBVISIT_IN_A_GROUP_OF_SUBV
+            sublabel_reference = f"StudyVisit_{i - i % 10 + 5:06d}"
+            reference, value = previous_visit, 1
+        visits.append(
+            StudyVisitVO(
+                uid=f"StudyVisit_{i:06d}",
+                visit_window_min=-1,
+                visit_window_max=1,
+                window_unit_uid="UnitDefinition_day",
+                description=None,
+                start_rule=None,
+                end_rule=None,
+                visit_contact_mode=on_site,
+                visit_type=baseline if i == 0 else treatment,
+                status=StudyStatus.DRAFT,
+                start_date=datetime.datetime(2024, 1, 1),
+                author_id="unknown-user",
+                author_username="unknown-user@example.com",
+                visit_class=VisitClass.SINGLE_VISIT,
+                visit_subclass=visit_subclass,
+                is_global_anchor_visit=i == 0,
+                visit_number=i + 1,
+                visit_order=i + 1,
+                show_visit=True,
+                visit_sublabel_reference=sublabel_reference,
+                timepoint=TimePoint(
+                    uid=f"TimePoint_{i:06d}",
+                    visit_timereference=reference,
+                    time_unit_uid="UnitDefinition_day",
+                    visit_value=value,
+                ),
+                time_unit_object=day,
+                window_unit_object=day,
+                day_unit_object=day,
+            )
+        )
+    return visits
+
+
+class SyntheticStudyFlowchartService(StudyFlowchartService):
+    """StudyFlowchartService on the SoA data of the unit tests, with each StudyActivity copied `scale` times"""
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, scale: int = SOA_SCALE):
+        self.scale = scale
+        self.study_activities, self.study_activity_schedules = self._scale_up()
+
+    def _scale_up(
+        self,
+    ) -> tuple[list[StudySelectionActivity], list[StudyActivitySchedule]]:
+        # the first copy keeps the uids, as referenced by the footnotes
+        def copy_uid(uid: str, i: int) -> str:
+            return f"{uid}_{i}" if i else uid
+
+        study_activities = []
+        for study_activity in soa_test_data.STUDY_ACTIVITIES:
+            # copies follow the original to keep the groupings together
+            for i in range(self.scale):
+                study_activities.append(
+                    study_activity.model_copy(
+                        update={
+                            "study_activity_uid": copy_uid(
+                                study_activity.study_activity_uid, i
+                            ),
+                            "order": len(study_activities) + 1,
+                        }
+                    )
+                )
+
+        study_activity_schedules = [
+            schedule.model_copy(
+                update={
+                    "study_activity_schedule_uid": copy_uid(
+                        schedule.study_activity_schedule_uid, i
+                    ),
+                    "study_activity_uid": copy_uid(schedule.study_activity_uid, i),
+                }
+            )
+            for schedule in soa_test_data.STUDY_ACTIVITY_SCHEDULES
+            for i in range(self.scale)
+        ]
+
+        return study_activities, study_activity_schedules
+
+    def _get_study_visits(self, *_args, **_kwargs):
+        return soa_test_data.STUDY_VISITS
+
+    def fetch_study_activities(self, *_args, **_kwargs):
+        return self.study_activities
+
+    def _get_study_activity_schedules(self, *_args, **_kwargs):
+        return self.study_activity_schedules
+
+    def fetch_study_activity_instances(self, *_args, **_kwargs):
+        return []
+
+    def _get_study_footnotes(self, *_args, **_kwargs):
+        return soa_test_data.FOOTNOTES
+
+    def _validate_parameters(self, *_args, **_kwargs):
+        pass
+
+    def _get_soa_preferences(self, *_args, **_kwargs) -> StudySoaPreferencesInput:
+        return StudySoaPreferencesInput()
+
+    def get_preferred_time_unit(self, *_args, **_kwargs) -> str:
+        return "week"
+
+
+@cache
+def build_flowchart_service() -> SyntheticStudyFlowchartService:
+    return SyntheticStudyFlowchartService()
+
+
+@cache
+def build_grouped_visits() -> dict:
+    return StudyFlowchartService._group_visits(
+        soa_test_data.STUDY_VISITS, collapse_visit_groups=True
+    )
+
+
+@cache
+def build_detailed_soa_table() -> TableWithFootnotes:
+    """Detailed SoA table with footnotes, use a copy for in-place operations"""
+
+    return build_flowchart_service().build_flowchart_table(
+        study_uid="", study_value_version=None, layout=SoALayout.DETAILED
+    )
+
+
+class SyntheticStudyDesignFigureService(StudyDesignFigureService):
+    """StudyDesignFigureService on the data of the unit tests, with each StudyArm copied `scale` times"""
+
+    def __init__(self, scale: int = DESIGN_FIGURE_SCALE, visit_scale: int = 1):
+        super().__init__()
+
+        # copies follow the original to keep the visits of an epoch together
+        self.study_visits = [
+            visit.model_copy(update={"uid": f"{visit.uid}_{i}" if i else visit.uid})
+            for visit in design_figure_data.STUDY_VISITS
+            for i in range(visit_scale)
+        ]
+
+        self.study_arms = OrderedDict()
+        self.study_design_cells = []
+        for i in range(scale):
+            for uid, arm in design_figure_data.STUDY_ARMS.items():
+                self.study_arms[f"{uid}_{i}"] = arm.model_copy(
+                    update={
+                        "arm_uid": f"{uid}_{i}",
+                        "short_name": f"{arm.short_name} {i}",
+                    }
+                )
+            for cell in design_figure_data.STUDY_DESIGN_CELLS:
+                self.study_design_cells.append(
+                    cell.model_copy(
+                        update={
+                            "design_cell_uid": f"{cell.design_cell_uid}_{i}",
+                            "study_arm_uid": f"{cell.study_arm_uid}_{i}",
+                        }
+                    )
+                )
+
+    def _get_study_arms(self, *_args, **_kwargs):
+        return self.study_arms
+
+    def _get_study_epochs(self, *_args, **_kwargs):
+        return design_figure_data.STUDY_EPOCHS
+
+    def _get_study_elements(self, *_args, **_kwargs):
+        return design_figure_data.STUDY_ELEMENTS
+
+    def _get_study_design_cells(self, *_args, **_kwargs):
+        return self.study_design_cells
+
+    def _get_study_visits(self, *_args, **_kwargs):
+        return self.study_visits
+
+    def _get_soa_preferences(self, *_args, **_kwargs):
+        return design_figure_data.SOA_PREFERENCES
+
+    def _get_preferred_time_unit_name(self, *_args, **_kwargs):
+        return "week"
+
+
+@cache
+def build_design_figure_service() -> SyntheticStudyDesignFigureService:
+    return SyntheticStudyDesignFigureService()
+
+
+@cache
+def build_large_design_figure_service() -> SyntheticStudyDesignFigureService:
+    """Study design figure of dozens of StudyArms and hundreds of StudyVisits"""
+
+    return SyntheticStudyDesignFigureService(
+        scale=LARGE_DESIGN_FIGURE_SCALE, visit_scale=LARGE_DESIGN_FIGURE_VISIT_SCALE
+    )
+
+
+def build_design_figure_matrix() -> list:
+    """Data matrix of the study design figure, a new one each call as it's updated in place"""
+
+    service = build_design_figure_service()
+    return service._mk_data_matrix(
+        service.study_arms,
+        design_figure_data.STUDY_EPOCHS,
+        design_figure_data.STUDY_ELEMENTS,
+        service.study_design_cells,
+        design_figure_data.SOA_PREFERENCES,
+    )
+
+
+@cache
+def build_design_figure_table() -> tuple[list, int]:
+    """Data matrix with calculated cells, and the document height, as input of the timeline"""
+
+    service = build_design_figure_service()
+    table = build_design_figure_matrix()
+    fig_width = service._calculate_widths(table)
+    _, doc_height = service._calculate_cells(table, fig_width)
+    return table, doc_height
+
+
+@cache
+def build_templates(num: int = NUM_TEMPLATES) -> list[str]:
+    """Syntax template names with HTML markup and [parameters]"""
+
+    rng = random.Random(SEED)
+    parameters = ["Indication", "Intervention", "Duration", "TimePoint", "Activity"]
+    return [
+        f"<p>Subjects with <b>[{rng.choice(parameters)}]</b> receiving [{rng.choice(parameters)}]"
+        f" for [{rng.choice(parameters)}] <i>until</i> [{rng.choice(parameters)}], template {i}</p>"
+        f"<ul><li>first [{rng.choice(parameters)}]</li><li>second &amp; last</li></ul>"
+        for i in range(num)
+    ]
+
+
+@cache
+def build_names(num: int = NUM_NAMES) -> list[str]:
+    """Distinct syntax template instance names, with the [parameters] of the templates replaced by values"""
+
+    rng = random.Random(SEED)
+    values = ["type 2 diabetes", "insulin &amp; metformin", "52 weeks", "baseline"]
+    templates = build_templates()
+    return [
+        re.sub(
+            r"\[\w+\]",
+            lambda _, i=i: f'[<span class="parameter">{rng.choice(values)} {i}</span>]',
+            templates[i % len(templates)],
+        )
+        for i in range(num)
+    ]
+
+
+@cache
+def build_adam_flowchart_rows(
+    num_visits: int = NUM_VISITS, num_activities: int = NUM_ADAM_ACTIVITIES
+) -> list[dict]:
+    """MDFLOW rows of a study with every activity scheduled in every visit, as aliased by the query"""
+
+    return [
+        {
+            "STUDYID_FLOWCHART": "CDISC DEV-0",
+            "AVISITN": str(visit * 100),
+            "PARAMCD": f"PARAM{activity}",
+            "AVISIT": f"Visit {visit} (day {visit * 7})",
+            "PARAM": f"PARAM{activity} (mg/dL)",
+            "PARAMN": str(activity + 1),
+            "ATPTN": None,
+            "ATPT": None,
+            "TOPICCD": f"TOPIC{activity}",
+            "BASETYPE": "BASELINE" if visit == 1 else None,
+            "ABLFL": "Y" if visit == 1 else None,
+            "ASSMTYPE": "BASELINE" if visit == 1 else None,
+        }
+        for visit in range(1, num_visits + 1)
+        for activity in range(num_activities)
+    ]
+
+
+@cache
+def build_template_parameter_rows(
+    num_trees: int = NUM_PARAMETER_TREES, num_terms: int = NUM_PARAMETER_TERMS
+) -> tuple[list[tuple], list[tuple]]:
+    """Parameter and term rows of a library, as retrieved by `ParameterValueCatalogue`"""
+
+    rng = random.Random(SEED)
+    parameters = []
+    for tree in range(num_trees):
+        children = [f"Param{tree}.{child}" for child in range(3)]
+        parameters.append((f"Param{tree}", f"Param{tree}", [(c, c) for c in children]))
+        for child in children:
+            grandchildren = [f"{child}.{grandchild}" for grandchild in range(2)]
+            parameters.append((child, child, [(g, g) for g in grandchildren]))
+            parameters.extend((g, g, []) for g in grandchildren)
+
+    terms = []
+    for i in range(num_terms):
+        element_id = rng.choice(parameters)[0]
+        terms.append((element_id, f"Term_{i:06}", f"term {rng.randrange(num_terms)}"))
+        # A few terms of the children are terms of their parents as well
+        if "." in element_id and rng.random() < 0.05:
+            terms.append((element_id.rsplit(".", 1)[0], f"Term_{i:06}", terms[-1][2]))
+    return parameters, terms
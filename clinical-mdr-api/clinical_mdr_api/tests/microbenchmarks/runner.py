@@ -0,0 +1,170 @@
+"""Timing, profiling and threshold checks of the microbenchmarks"""
+
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from clinical_mdr_api.tests.microbenchmarks.benchmarks import BENCHMARKS, Microbenchmark
+
+ROUNDS = 5
+
+# Multiplies all thresholds, to leave room for noisy CI machines
+THRESHOLD_FACTOR = float(os.environ.get("MICROBENCHMARK_THRESHOLD_FACTOR", "1"))
+
+
+@dataclass
+class Result:
+    name: str
+    # Seconds, best of the rounds
+    time: float
+    # Time in units of the reference workload
+    units: float
+    threshold: float
+
+    @property
+    def passed(self) -> bool:
+        return self.units <= self.threshold
+
+
+def reference_workload():
+    """Fixed pure-Python work (dicts, strings, sorting) that all timings are expressed in units of"""
+
+    data = {f"key-{i}": i * 7 % 1000 for i in range(20_000)}
+    return sorted(data.items(), key=lambda item: (item[1], item[0]))
+
+
+def best_time(func, *args, rounds: int = ROUNDS) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibrate() -> float:
+    """Seconds taken by the reference workload on this machine"""
+
+    return best_time(reference_workload, rounds=10)
+
+
+def measure(
+    benchmark: Microbenchmark, reference: float, rounds: int = ROUNDS
+) -> Result:
+    # warm-up call, builds the cached inputs and loads the modules imported on first use
+    benchmark.func(*benchmark.setup())
+
+    best = float("inf")
+    for _ in range(rounds):
+        args = benchmark.setup()
+        start = time.perf_counter()
+        benchmark.func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return Result(
+        name=benchmark.name,
+        time=best,
+        units=best / reference,
+        threshold=benchmark.threshold * THRESHOLD_FACTOR,
+    )
+
+
+def _file_name(benchmark: Microbenchmark) -> str:
+    return "".join(c if c.isalnum() or c in "._-" else "_" for c in benchmark.name)
+
+
+def profile_cpu(benchmark: Microbenchmark, output_dir: Path) -> Path:
+    """Profiles one call with cProfile, writes the stats file and a text report of the top functions"""
+
+    args = benchmark.setup()
+    profiler = cProfile.Profile()
+    profiler.runcall(benchmark.func, *args)
+
+    path = output_dir / f"{_file_name(benchmark)}.prof"
+    profiler.dump_stats(path)
+    with open(path.with_suffix(".prof.txt"), "w", encoding="utf-8") as f:
+        pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(40)
+    return path
+
+
+def profile_memory(benchmark: Microbenchmark, output_dir: Path) -> Path:
+    """Traces the allocations of one call, writes the peak and the top allocating lines"""
+
+    args = benchmark.setup()
+    tracemalloc.start(10)
+    try:
+        benchmark.func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    path = output_dir / f"{_file_name(benchmark)}.memory.txt"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{benchmark.name}\npeak: {peak / 2**20:.2f} MiB\n\n")
+        for stat in snapshot.statistics("lineno")[:30]:
+            f.write(f"{stat}\n")
+    return path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m clinical_mdr_api.tests.microbenchmarks",
+        description="Microbenchmarks of the in-memory hot paths, no database required",
+    )
+    parser.add_argument(
+        "-k", dest="keyword", help="only run the benchmarks with this text in the name"
+    )
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        help="directory to write cProfile and tracemalloc reports of each benchmark to",
+    )
+    parser.add_argument("--json", type=Path, help="file to write the results to")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchmarks = [
+        benchmark
+        for benchmark in BENCHMARKS
+        if not args.keyword or args.keyword.lower() in benchmark.name.lower()
+    ]
+
+    reference = calibrate()
+    print(f"reference workload: {reference * 1000:.2f}ms")
+    print(f"{'benchmark':<50} {'time':>10} {'units':>8} {'threshold':>10}")
+
+    results = []
+    for benchmark in benchmarks:
+        result = measure(benchmark, reference, rounds=args.rounds)
+        results.append(result)
+        print(
+            f"{result.name:<50} {result.time * 1000:>8.2f}ms {result.units:>8.1f} {result.threshold:>10.1f}"
+            f"{'' if result.passed else '  FAILED'}"
+        )
+
+        if args.profile_dir:
+            args.profile_dir.mkdir(parents=True, exist_ok=True)
+            profile_cpu(benchmark, args.profile_dir)
+            profile_memory(benchmark, args.profile_dir)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {"reference": reference, "results": [asdict(r) for r in results]},
+                f,
+                indent=2,
+            )
+
+    if not all(result.passed for result in results):
+        sys.exit(1)
@@ -0,0 +1,176 @@
+# pylint: disable=redefined-outer-name
+
+import dataclasses
+import datetime
+from unittest.mock import patch
+
+import pytest
+
+from clinical_mdr_api.domain_repositories.concepts.activities.activity_instance_repository import (
+    ActivityInstanceRepository,
+)
+from clinical_mdr_api.domain_repositories.concepts.concept_cascade import (
+    APPROVE,
+    CASCADE_EDIT,
+    INACTIVATE,
+    NEW_VERSION,
+    REACTIVATE,
+    ActivityInstanceCascade,
+    ConceptCascade,
+    LatestVersion,
+)
+from clinical_mdr_api.domains.enums import LibraryItemStatus
+from clinical_mdr_api.domains.versioned_object_aggregate import LibraryItemMetadataVO
+from common.exceptions import BusinessLogicException
+
+
+def latest_version(
+    status: LibraryItemStatus, version: str, is_library_editable: bool = True
+) -> LatestVersion:
+    major, minor = version.split(".")
+    return LatestVersion(
+        uid="ActivityInstance_000001",
+        item_metadata=LibraryItemMetadataVO.from_repository_values(
+            change_description="Initial version",
+            status=status,
+            author_id="author",
+            author_username=None,
+            start_date=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+            end_date=None,
+            major_version=int(major),
+            minor_version=int(minor),
+        ),
+        is_library_editable=is_library_editable,
+    )
+
+
+@pytest.fixture
+def cascade():
+    return ConceptCascade(ActivityInstanceRepository(), author_id="cascader")
+
+
+def test_final_instance_gets_new_draft_edit_and_approval(cascade):
+    row = cascade._version_row(
+        latest_version(LibraryItemStatus.FINAL, "1.0"),
+        [NEW_VERSION, CASCADE_EDIT, APPROVE],
+    )
+
+    versions = row["versions"]
+    assert [
+        (
+            version["properties"]["version"],
+            version["properties"]["status"],
+            version["properties"]["change_description"],
+            version["new_value"],
+        )
+        for version in versions
+    ] == [
+        ("1.1", "Draft", "New draft created", False),
+        ("1.2", "Draft", "Cascade edit", True),
+        ("2.0", "Final", "Approved version", True),
+    ]
+    assert all(version["properties"]["author_id"] == "cascader" for version in versions)
+    # each version ends when the next one starts, the last one stays open
+    for version, next_version in zip(versions, versions[1:]):
+        assert (
+            version["properties"]["end_date"]
+            == next_version["properties"]["start_date"]
+        )
+    assert versions[-1]["properties"]["end_date"] is None
+    assert row["start_date"] == versions[0]["properties"]["start_date"]
+    assert row["latest"] == [
+        {"type": "LATEST_DRAFT", "new_value": True},
+        {"type": "LATEST_FINAL", "new_value": True},
+    ]
+
+
+@pytest.mark.parametrize(
+    "status, version, step, expected_status, expected_version, latest_type",
+    [
+        (LibraryItemStatus.FINAL, "2.0", NEW_VERSION, "Draft", "2.1", "LATEST_DRAFT"),
+        (LibraryItemStatus.DRAFT, "1.3", APPROVE, "Final", "2.0", "LATEST_FINAL"),
+        (
+            LibraryItemStatus.FINAL,
+            "2.0",
+            INACTIVATE,
+            "Retired",
+            "2.0",
+            "LATEST_RETIRED",
+        ),
+        (LibraryItemStatus.RETIRED, "2.0", REACTIVATE, "Final", "2.0", "LATEST_FINAL"),
+        (LibraryItemStatus.DRAFT, "0.1", CASCADE_EDIT, "Draft", "0.2", "LATEST_DRAFT"),
+    ],
+)
+def test_version_of_each_step(
+    cascade, status, version, step, expected_status, expected_version, latest_type
+):
+    row = cascade._version_row(latest_version(status, version), [step])
+
+    assert len(row["versions"]) == 1
+    assert row["versions"][0]["properties"]["status"] == expected_status
+    assert row["versions"][0]["properties"]["version"] == expected_version
+    assert row["latest"] == [{"type": latest_type, "new_value": step.edits}]
+
+
+@pytest.mark.parametrize(
+    "status, step, message",
+    [
+        (LibraryItemStatus.DRAFT, NEW_VERSION, "only for FINAL versions"),
+        (LibraryItemStatus.FINAL, APPROVE, "Only DRAFT version can be approved."),
+        (LibraryItemStatus.DRAFT, INACTIVATE, "Cannot retire draft version."),
+        (LibraryItemStatus.FINAL, REACTIVATE, "Only RETIRED version"),
+        (LibraryItemStatus.FINAL, CASCADE_EDIT, "isn't in draft status"),
+    ],
+)
+def test_step_not_allowed_for_status(cascade, status, step, message):
+    with pytest.raises(BusinessLogicException, match=message):
+        cascade._version_row(latest_version(status, "1.0"), [step])
+
+
+def test_library_not_editable(cascade):
+    with pytest.raises(BusinessLogicException, match="Library isn't editable."):
+        cascade._version_row(
+            latest_version(LibraryItemStatus.FINAL, "1.0", is_library_editable=False),
+            [NEW_VERSION],
+        )
+
+
+def test_edit_groupings_versions_all_instances_from_one_collection():
+    cascade = ActivityInstanceCascade(
+        ActivityInstanceRepository(),
+        author_id="cascader",
+        activity_uid="Activity_000001",
+    )
+    final = latest_version(LibraryItemStatus.FINAL, "1.0")
+    draft = dataclasses.replace(
+        latest_version(LibraryItemStatus.DRAFT, "0.1"), uid="ActivityInstance_000002"
+    )
+    grouping = {
+        "activity_group_uid": "ActivityGroup_000001",
+        "activity_subgroup_uid": "ActivitySubGroup_000001",
+    }
+    groupings = {final.uid: [grouping], draft.uid: [grouping]}
+
+    with patch.object(
+        cascade, "_collect", return_value=[final, draft]
+    ) as collect, patch.object(
+        cascade, "_create_values", return_value={}
+    ) as create_values, patch.object(
+        cascade, "_write"
+    ) as write:
+        assert cascade.edit_groupings(groupings) == 2
+
+    collect.assert_called_once_with(groupings)
+    create_values.assert_called_once_with(
+        [
+            {"uid": final.uid, "groupings": [grouping]},
+            {"uid": draft.uid, "groupings": [grouping]},
+        ]
+    )
+    write.assert_called_once()
+    rows, new_value_ids = write.call_args.args
+    assert [
+        [version["properties"]["version"] for version in row["versions"]]
+        for row in rows
+    ] == [["1.1", "1.2", "2.0"], ["0.2"]]
+    assert not new_value_ids
@@ -0,0 +1,358 @@
+# pylint: disable=protected-access
+from unittest.mock import patch
+
+import pytest
+
+from clinical_mdr_api.domain_repositories.concepts.activities.activity_group_repository import (
+    ActivityGroupRepository,
+)
+from clinical_mdr_api.domain_repositories.concepts.activities.activity_instance_repository import (
+    ActivityInstanceRepository,
+)
+from clinical_mdr_api.domain_repositories.concepts.activities.activity_repository import (
+    ActivityRepository,
+)
+from clinical_mdr_api.domain_repositories.concepts.activities.activity_sub_group_repository import (
+    ActivitySubGroupRepository,
+)
+from clinical_mdr_api.domain_repositories.concepts.compound_alias_repository import (
+    CompoundAliasRepository,
+)
+from clinical_mdr_api.domain_repositories.concepts.compound_repository import (
+    CompoundRepository,
+)
+from clinical_mdr_api.domain_repositories.concepts.concept_generic_repository import (
+    CONCEPT_FULLTEXT_SEARCH,
+)
+from clinical_mdr_api.domain_repositories.concepts.simple_concepts.numeric_value_repository import (
+    NumericValueRepository,
+)
+from clinical_mdr_api.domain_repositories.concepts.simple_concepts.text_value_repository import (
+    TextValueRepository,
+)
+from clinical_mdr_api.domain_repositories.concepts.simple_concepts.visit_name_repository import (
+    VisitNameRepository,
+)
+from clinical_mdr_api.domain_repositories.concepts.unit_definitions.unit_definition_repository import (
+    UnitDefinitionRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_instances.activity_instruction_repository import (
+    ActivityInstructionRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_instances.criteria_repository import (
+    CriteriaRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_instances.endpoint_repository import (
+    EndpointRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_instances.footnote_repository import (
+    FootnoteRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_instances.objective_repository import (
+    ObjectiveRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_instances.timeframe_repository import (
+    TimeframeRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_pre_instances.activity_instruction_pre_instance_repository import (
+    ActivityInstructionPreInstanceRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_pre_instances.criteria_pre_instance_repository import (
+    CriteriaPreInstanceRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_pre_instances.endpoint_pre_instance_repository import (
+    EndpointPreInstanceRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_pre_instances.footnote_pre_instance_repository import (
+    FootnotePreInstanceRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_pre_instances.objective_pre_instance_repository import (
+    ObjectivePreInstanceRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_templates.activity_instruction_template_repository import (
+    ActivityInstructionTemplateRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_templates.criteria_template_repository import (
+    CriteriaTemplateRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_templates.endpoint_template_repository import (
+    EndpointTemplateRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_templates.footnote_template_repository import (
+    FootnoteTemplateRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_templates.objective_template_repository import (
+    ObjectiveTemplateRepository,
+)
+from clinical_mdr_api.domain_repositories.syntax_templates.timeframe_template_repository import (
+    TimeframeTemplateRepository,
+)
+from clinical_mdr_api.models.listings.listings_adam import StudyEndpntAdamListing
+from clinical_mdr_api.repositories._utils import (
+    CypherQueryBuilder,
+    FilterDict,
+    FilterOperator,
+    FullTextIndex,
+    get_fulltext_query,
+)
+
+MATCH_CLAUSE = "CYPHER runtime=slotted MATCH (concept_root:ActivityRoot)-[:LATEST]->(concept_value:ActivityValue)"
+ALIAS_CLAUSE = (
+    "concept_root.uid AS uid, concept_value.name AS name, version_rel.status AS status"
+)
+ONLINE_INDEXES = frozenset(index.name for index in CONCEPT_FULLTEXT_SEARCH.indexes)
+
+
+def build_query(
+    filter_by,
+    wildcard_properties_list=("uid", "name", "status"),
+    filter_operator=FilterOperator.AND,
+    online_indexes=ONLINE_INDEXES,
+) -> CypherQueryBuilder:
+    with patch(
+        "clinical_mdr_api.repositories._utils.get_online_fulltext_indexes",
+        return_value=online_indexes,
+    ):
+        return CypherQueryBuilder(
+            match_clause=MATCH_CLAUSE,
+            alias_clause=ALIAS_CLAUSE,
+            filter_by=FilterDict.model_validate({"elements": filter_by}),
+            filter_operator=filter_operator,
+            wildcard_properties_list=list(wildcard_properties_list),
+            fulltext_search=CONCEPT_FULLTEXT_SEARCH,
+        )
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("blood", "*blood*"),
+        ("systolic blood-pressure", "*systolic* AND *blood* AND *pressure*"),
+        ("activity_000123", "*activity* AND *000123*"),
+        ("1.0", "*1* AND *0*"),
+        ("é", None),
+        ("-", None),
+    ],
+)
+def test_get_fulltext_query(text, expected):
+    assert get_fulltext_query(text) == expected
+
+
+def test_wildcard_seeded_from_fulltext_indexes():
+    query = build_query({"*": {"v": ["Blood"]}, "status": {"v": ["Final"]}})
+
+    assert query.full_query.startswith(
+        "CYPHER runtime=slotted CALL { CALL db.index.fulltext.queryNodes('fulltext_ConceptValue', $fulltext_query)"
+    )
+    assert "queryRelationships('fulltext_HAS_VERSION', $fulltext_query)" in (
+        query.full_query
+    )
+    assert query.count_query.startswith("CYPHER runtime=slotted CALL {")
+    assert query.parameters["fulltext_query"] == "*blood*"
+    # the wildcard predicates still filter the rows found by the indexes
+    assert "toLower(name) CONTAINS $wildcard_0" in query.filter_clause
+
+
+@pytest.mark.parametrize(
+    "filter_by, wildcard_properties_list, filter_operator, online_indexes",
+    [
+        # an alias not covered by the indexes
+        (
+            {"*": {"v": ["blood"]}},
+            ("name", "activity_group_name"),
+            FilterOperator.AND,
+            ONLINE_INDEXES,
+        ),
+        # rows not found by the indexes can match another filter
+        (
+            {"*": {"v": ["blood"]}, "status": {"v": ["Final"]}},
+            ("name",),
+            FilterOperator.OR,
+            ONLINE_INDEXES,
+        ),
+        # several wildcard values
+        (
+            {"*": {"v": ["blood", "pressure"]}},
+            ("name",),
+            FilterOperator.AND,
+            ONLINE_INDEXES,
+        ),
+        # text the indexes can't search
+        ({"*": {"v": ["-"]}}, ("name",), FilterOperator.AND, ONLINE_INDEXES),
+        # indexes not created yet
+        ({"*": {"v": ["blood"]}}, ("name",), FilterOperator.AND, frozenset()),
+        # no wildcard
+        (
+            {"name": {"v": ["blood"], "op": "co"}},
+            ("name",),
+            FilterOperator.AND,
+            ONLINE_INDEXES,
+        ),
+    ],
+)
+def test_wildcard_fallback_without_fulltext_indexes(
+    filter_by, wildcard_properties_list, filter_operator, online_indexes
+):
+    query = build_query(
+        filter_by, wildcard_properties_list, filter_operator, online_indexes
+    )
+
+    assert query.full_query.startswith(MATCH_CLAUSE)
+    assert "fulltext_query" not in query.parameters
+
+
+def test_wildcard_fallback_when_disabled():
+    with patch(
+        "clinical_mdr_api.repositories._utils.settings.fulltext_search_enabled", False
+    ):
+        query = build_query({"*": {"v": ["blood"]}})
+
+    assert query.full_query.startswith(MATCH_CLAUSE)
+
+
+def test_wildcard_searches_in_the_elements_of_list_columns():
+    query = CypherQueryBuilder(
+        match_clause="MATCH (endpoint:StudyEndpoint)",
+        alias_clause="endpoint.uid AS STUDYID_OBJ, endpoint.activities AS RACT",
+        filter_by=FilterDict.model_validate({"elements": {"*": {"v": ["Blood"]}}}),
+        return_model=StudyEndpntAdamListing,
+    )
+
+    assert (
+        "any(attr in RACT WHERE toLower(attr) CONTAINS $wildcard_0)" in query.full_query
+    )
+    assert query.parameters["wildcard_0"] == "blood"
+
+
+def test_extended_merges_the_aliases_of_an_index_with_the_same_seed():
+    search = CONCEPT_FULLTEXT_SEARCH.extended(
+        FullTextIndex(name="fulltext_ConceptValue", aliases=frozenset({"synonyms"})),
+        FullTextIndex(
+            name="fulltext_ConceptValue",
+            aliases=frozenset({"activity_name"}),
+            seed="MATCH (node)<-[:HAS_ACTIVITY]-({variable}) RETURN {variable}",
+        ),
+    )
+
+    assert len(search.indexes) == len(CONCEPT_FULLTEXT_SEARCH.indexes) + 1
+    assert {"name", "synonyms"} <= search.indexes[0].aliases
+    assert search.aliases == CONCEPT_FULLTEXT_SEARCH.aliases | {
+        "synonyms",
+        "activity_name",
+    }
+
+
+@pytest.mark.parametrize(
+    "repository_class",
+    [
+        ActivityRepository,
+        ActivityInstanceRepository,
+        ActivityGroupRepository,
+        ActivitySubGroupRepository,
+        CompoundRepository,
+        CompoundAliasRepository,
+        NumericValueRepository,
+        TextValueRepository,
+        VisitNameRepository,
+        UnitDefinitionRepository,
+    ],
+)
+def test_concept_wildcard_seeded_from_fulltext_indexes(repository_class):
+    repository = repository_class()
+    online_indexes = frozenset(
+        index.name for index in repository.fulltext_search.indexes
+    )
+    with patch(
+        "clinical_mdr_api.repositories._utils.get_online_fulltext_indexes",
+        return_value=online_indexes,
+    ):
+        query = CypherQueryBuilder(
+            match_clause=MATCH_CLAUSE,
+            alias_clause=ALIAS_CLAUSE,
+            filter_by=FilterDict.model_validate({"elements": {"*": {"v": ["blood"]}}}),
+            return_model=repository.return_model,
+            format_filter_sort_keys=repository.format_filter_sort_keys,
+            fulltext_search=repository.fulltext_search,
+        )
+
+        assert query.can_seed_from_fulltext_indexes()
+
+
+SYNTAX_REPOSITORY_CLASSES = [
+    ActivityInstructionTemplateRepository,
+    CriteriaTemplateRepository,
+    EndpointTemplateRepository,
+    FootnoteTemplateRepository,
+    ObjectiveTemplateRepository,
+    TimeframeTemplateRepository,
+    ActivityInstructionPreInstanceRepository,
+    CriteriaPreInstanceRepository,
+    EndpointPreInstanceRepository,
+    FootnotePreInstanceRepository,
+    ObjectivePreInstanceRepository,
+    ActivityInstructionRepository,
+    CriteriaRepository,
+    EndpointRepository,
+    FootnoteRepository,
+    ObjectiveRepository,
+    TimeframeRepository,
+]
+
+
+@pytest.mark.parametrize("repository_class", SYNTAX_REPOSITORY_CLASSES)
+def test_syntax_wildcard_seeded_from_fulltext_indexes(repository_class):
+    repository = repository_class()
+    online_indexes = frozenset(
+        index.name for index in repository._fulltext_search_optimized().indexes
+    )
+    with patch(
+        "clinical_mdr_api.repositories._utils.get_online_fulltext_indexes",
+        return_value=online_indexes,
+    ), patch(
+        "clinical_mdr_api.domain_repositories.library_item_repository.db.cypher_query",
+        return_value=([], []),
+    ) as cypher_query:
+        repository.get_all(filter_by={"*": {"v": ["Blood"]}})
+
+    query = cypher_query.call_args.args[0]
+    params = cypher_query.call_args.kwargs["params"]
+    assert query.lstrip().startswith(
+        "CALL { CALL db.index.fulltext.queryNodes('fulltext_SyntaxValue', $fulltext_query)"
+    )
+    assert params["fulltext_query"] == "*blood*"
+
+
+@pytest.mark.parametrize(
+    "filter_by, filter_operator, online_indexes",
+    [
+        # rows not found by the indexes can match another filter
+        (
+            {"*": {"v": ["blood"]}, "name": {"v": ["pressure"]}},
+            FilterOperator.OR,
+            None,
+        ),
+        # several wildcard values
+        ({"*": {"v": ["blood", "pressure"]}}, FilterOperator.AND, None),
+        # a wildcard value that isn't a string
+        ({"*": {"v": [1]}}, FilterOperator.AND, None),
+        # indexes not created yet
+        ({"*": {"v": ["blood"]}}, FilterOperator.AND, frozenset()),
+    ],
+)
+def test_syntax_wildcard_fallback_without_fulltext_indexes(
+    filter_by, filter_operator, online_indexes
+):
+    repository = ObjectiveTemplateRepository()
+    fulltext_search = repository._fulltext_search_optimized()
+    if online_indexes is None:
+        online_indexes = frozenset(index.name for index in fulltext_search.indexes)
+    with patch(
+        "clinical_mdr_api.repositories._utils.get_online_fulltext_indexes",
+        return_value=online_indexes,
+    ):
+        assert (
+            repository._fulltext_query_optimized(
+                fulltext_search, filter_by, filter_operator
+            )
+            is None
+        )
@@ -0,0 +1,150 @@
+from clinical_mdr_api.domain_repositories.template_parameters import (
+    parameter_values as parameter_values_module,
+)
+from clinical_mdr_api.domain_repositories.template_parameters.parameter_values import (
+    ParameterValueCatalogue,
+    ParameterValues,
+)
+
+PARAMETERS = [
+    ("1", "Intervention", [("2", "Compound"), ("3", "CompoundAlias")]),
+    ("2", "Compound", [("4", "Lipid")]),
+    ("3", "CompoundAlias", [("4", "Lipid")]),
+    ("4", "Lipid", []),
+    ("5", "Activity", []),
+]
+TERMS = [
+    ("1", "Compound_1", "metformin"),
+    ("2", "Compound_1", "metformin"),
+    ("2", "Compound_2", "insulin"),
+    ("3", "CompoundAlias_1", "glucophage"),
+    ("4", "Lipid_1", "cholesterol"),
+    ("4", "Lipid_2", None),
+]
+
+
+def test_values_of_parameter_and_descendants():
+    parameter_values = ParameterValues(PARAMETERS, TERMS)
+
+    # The term of Compound that Intervention has as well is listed once,
+    # and Lipid reached through both Compound and CompoundAlias is listed once
+    assert parameter_values.get_values("Intervention") == [
+        {"uid": "Lipid_1", "name": "cholesterol", "type": "Lipid"},
+        {"uid": "CompoundAlias_1", "name": "glucophage", "type": "CompoundAlias"},
+        {"uid": "Compound_2", "name": "insulin", "type": "Compound"},
+        {"uid": "Compound_1", "name": "metformin", "type": "Intervention"},
+        {"uid": "Lipid_2", "name": None, "type": "Lipid"},
+    ]
+    assert parameter_values.get_values("Activity") == []
+    assert parameter_values.get_values("Unknown") == []
+
+
+def test_samples_of_all_parameters():
+    parameter_values = ParameterValues(PARAMETERS, TERMS)
+
+    assert [item["name"] for item in parameter_values.samples] == [
+        "Activity",
+        "Compound",
+        "CompoundAlias",
+        "Intervention",
+        "Lipid",
+    ]
+    assert parameter_values.get_samples("Compound")["terms"] == [
+        {"uid": "Lipid_1", "name": "cholesterol", "type": "Lipid"},
+        {"uid": "Compound_2", "name": "insulin", "type": "Compound"},
+        {"uid": "Compound_1", "name": "metformin", "type": "Compound"},
+    ]
+    assert parameter_values.get_samples("Unknown") is None
+
+
+def _retrieve_terms(terms, retrieved):
+    def retrieve_terms(parameter_names=None):
+        retrieved.append(parameter_names)
+        names = {element_id: name for element_id, name, _ in PARAMETERS}
+        terms_by_name = {}
+        for term in terms:
+            if parameter_names is None or names[term[0]] in parameter_names:
+                terms_by_name.setdefault(names[term[0]], []).append(term)
+        return terms_by_name
+
+    return retrieve_terms
+
+
+def test_catalogue_refreshes_parameters_whose_version_changes(monkeypatch):
+    terms = list(TERMS)
+    version = {"Compound": "1"}
+    retrieved = []
+    catalogue = ParameterValueCatalogue(ttl=600)
+    monkeypatch.setattr(catalogue, "_retrieve_version", lambda: dict(version))
+    monkeypatch.setattr(catalogue, "_retrieve_parameters", lambda: PARAMETERS)
+    monkeypatch.setattr(catalogue, "_retrieve_terms", _retrieve_terms(terms, retrieved))
+
+    parameter_values = catalogue.get()
+    terms.append(("5", "Activity_1", "body weight"))
+    terms.append(("4", "Lipid_3", "triglyceride"))
+    assert catalogue.get() is parameter_values
+    assert catalogue.get().get_values("Activity") == []
+    assert retrieved == [None]
+
+    # Committed by another worker, only the terms of the changed parameter are reloaded
+    version["Activity"] = "1"
+    assert catalogue.get().get_values("Activity") == [
+        {"uid": "Activity_1", "name": "body weight", "type": "Activity"}
+    ]
+    assert retrieved == [None, ["Activity"]]
+    assert {"uid": "Lipid_3", "name": "triglyceride", "type": "Lipid"} not in (
+        catalogue.get().get_values("Compound")
+    )
+
+    # The values of a parameter include the refreshed terms of its descendants
+    version["Lipid"] = "1"
+    assert {"uid": "Lipid_3", "name": "triglyceride", "type": "Lipid"} in (
+        catalogue.get().get_values("Compound")
+    )
+    assert retrieved == [None, ["Activity"], ["Lipid"]]
+
+    # Rolled back after the catalogue was refreshed with the uncommitted terms
+    terms.remove(("5", "Activity_1", "body weight"))
+    version["Activity"] = "2"
+    assert catalogue.get().get_values("Activity") == []
+    version["Activity"] = "1"
+    assert catalogue.get().get_values("Activity") == []
+
+
+def test_catalogue_is_rebuilt_after_clear_or_expiry(monkeypatch):
+    terms = list(TERMS)
+    retrieved = []
+    catalogue = ParameterValueCatalogue(ttl=600)
+    monkeypatch.setattr(catalogue, "_retrieve_version", dict)
+    monkeypatch.setattr(catalogue, "_retrieve_parameters", lambda: PARAMETERS)
+    monkeypatch.setattr(catalogue, "_retrieve_terms", _retrieve_terms(terms, retrieved))
+
+    parameter_values = catalogue.get()
+    terms.append(("5", "Activity_1", "body weight"))
+    assert catalogue.get() is parameter_values
+
+    catalogue.clear()
+    assert catalogue.get().get_values("Activity") == [
+        {"uid": "Activity_1", "name": "body weight", "type": "Activity"}
+    ]
+
+    terms.pop()
+    catalogue.ttl = 0
+    assert catalogue.get().get_values("Activity") == []
+    assert retrieved == [None, None, None]
+
+
+def test_invalidate_sets_versions_of_given_parameters_only(monkeypatch):
+    queries = []
+    monkeypatch.setattr(
+        parameter_values_module.db,
+        "cypher_query",
+        lambda query, params=None: queries.append(params),
+    )
+
+    ParameterValueCatalogue.invalidate([])
+    ParameterValueCatalogue.invalidate(name for name in ())
+    assert not queries
+
+    ParameterValueCatalogue.invalidate(["Unit", "Compound", "Unit"])
+    assert queries == [{"parameter_names": ["Compound", "Unit"]}]
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from clinical_mdr_api.models.utils import CustomPage, GenericFilteringReturn
+from clinical_mdr_api.routers.responses import PydanticJSONResponse, iter_json_chunks
+from common.config import settings
+
+
+class Item(BaseModel):
+    uid: str
+    name: str | None = None
+
+
+class DetailedItem(Item):
+    detail: str
+
+
+ITEMS = [Item(uid="1", name="one"), Item(uid="2"), DetailedItem(uid="3", detail="x")]
+EXPECTED_ITEMS = [
+    {"uid": "1", "name": "one"},
+    {"uid": "2", "name": None},
+    {"uid": "3", "name": None},
+]
+
+
+@pytest.mark.parametrize("chunk_size", [0, 1, 2, 10])
+def test_iter_json_chunks_page(chunk_size):
+    page = CustomPage(items=ITEMS, total=3, page=1, size=10)
+
+    content = b"".join(iter_json_chunks(page, CustomPage[Item], chunk_size=chunk_size))
+
+    assert json.loads(content) == {
+        "items": EXPECTED_ITEMS,
+        "total": 3,
+        "page": 1,
+        "size": 10,
+    }
+
+
+def test_iter_json_chunks_exclude_unset():
+    page = GenericFilteringReturn(items=ITEMS, total=3)
+
+    content = b"".join(
+        iter_json_chunks(page, GenericFilteringReturn[Item], exclude_unset=True)
+    )
+
+    assert json.loads(content) == {
+        "items": [{"uid": "1", "name": "one"}, {"uid": "2"}, {"uid": "3"}],
+        "total": 3,
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [0, 2])
+def test_iter_json_chunks_list(chunk_size):
+    content = b"".join(iter_json_chunks(ITEMS, list[Item], chunk_size=chunk_size))
+
+    assert json.loads(content) == EXPECTED_ITEMS
+
+
+def test_iter_json_chunks_model():
+    content = b"".join(iter_json_chunks(ITEMS[2], Item))
+
+    assert json.loads(content) == EXPECTED_ITEMS[2]
+
+
+def test_pydantic_json_response_streams_large_results(monkeypatch):
+    monkeypatch.setattr(settings, "fast_json_stream_min_items", 2)
+
+    small = PydanticJSONResponse.create(ITEMS[:2], list[Item])
+    large = PydanticJSONResponse.create(ITEMS, list[Item])
+
+    assert isinstance(small, PydanticJSONResponse)
+    assert json.loads(small.body) == EXPECTED_ITEMS[:2]
+    assert isinstance(large, StreamingResponse)
+    assert large.media_type == "application/json"
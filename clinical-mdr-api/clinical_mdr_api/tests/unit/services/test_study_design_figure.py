@@ -2454,3 +2454,26 @@ def test_get_svg_document():
     assert "markerWidth" in doc, '"markerWidth" found, missing arrowhead markers?'
 
     assert doc == SVG_DOCUMENT
+
+
+def test_svg_document_cached_by_study_version():
+    renders = []
+
+    class CountingStudyDesignFigureService(MockStudyDesignFigureService):
+        def draw_svg(self, table, timeline, doc_width, doc_height):
+            renders.append(self.debug)
+            return super().draw_svg(table, timeline, doc_width, doc_height)
+
+    for _ in range(2):
+        CountingStudyDesignFigureService().get_svg_document(STUDY_UID, "1")
+    assert len(renders) == 1
+
+    # other version or rendering parameters aren't served from the cache
+    CountingStudyDesignFigureService().get_svg_document(STUDY_UID, "2")
+    CountingStudyDesignFigureService(debug=True).get_svg_document(STUDY_UID, "1")
+    assert len(renders) == 3
+
+    # the latest version of the study may change, it's always rendered
+    for _ in range(2):
+        CountingStudyDesignFigureService().get_svg_document(STUDY_UID)
+    assert len(renders) == 5
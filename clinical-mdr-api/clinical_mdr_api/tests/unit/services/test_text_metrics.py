@@ -0,0 +1,32 @@
+import os
+import random
+
+from clinical_mdr_api.services.studies.study_design_figure import FONT_FILE_NAME
+from clinical_mdr_api.services.utils.text_metrics import (
+    TABLE_CHARACTERS,
+    TextMetrics,
+    get_text_metrics,
+)
+from common.config import settings
+
+FONT_PATH = os.path.join(settings.app_root_dir, FONT_FILE_NAME)
+
+
+def test_glyph_table_measures_as_the_font():
+    metrics = TextMetrics(FONT_PATH, 16)
+    assert metrics.use_glyph_table
+
+    rng = random.Random(42)
+    # kerned pairs, spaces and characters measured by the font
+    characters = TABLE_CHARACTERS + "AVTYLPW.,   éøÅα"
+    texts = ["", " ", "AV", "Week 1 ", "Screening, Treatment. Follow-up"] + [
+        "".join(rng.choice(characters) for _ in range(rng.randrange(1, 80)))
+        for _ in range(2000)
+    ]
+    for text in texts:
+        assert metrics.text_size(text) == tuple(metrics.font.getbbox(text)[2:4]), text
+
+
+def test_text_metrics_loaded_once():
+    assert get_text_metrics(FONT_PATH, 16) is get_text_metrics(FONT_PATH, 16)
+    assert get_text_metrics(FONT_PATH, 16) is not get_text_metrics(FONT_PATH, 12)
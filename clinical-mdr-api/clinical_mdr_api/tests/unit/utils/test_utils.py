@@ -1,10 +1,13 @@
+import random
 import unittest
 
+from bs4 import BeautifulSoup
 from parameterized import parameterized
 from pydantic import BaseModel
 
 import common.utils
 from clinical_mdr_api import utils
+from clinical_mdr_api.tests.microbenchmarks import fixtures
 
 
 class TestServiceUtils(unittest.TestCase):
@@ -189,3 +192,60 @@ class TestServiceUtils(unittest.TestCase):
     def test_strtobool_raises_exception(self, value, exception_type):
         with self.assertRaises(exception_type):
             common.utils.strtobool(value)
+
+
+class TestStripHtml(unittest.TestCase):
+    def assert_stripped_as_parsed(self, html):
+        assert utils.strip_html(html) == BeautifulSoup(html, "lxml").text, html
+
+    @parameterized.expand(
+        [
+            ("<p>Some <b>bold</b> text.</p>",),
+            ('<p>Dose of [<span class="parameter">10 mg</span>]</p>',),
+            ("<p>a &lt; b &amp; c &gt; d &quot;e&quot; &#39;f&#39; &nbsp;</p>",),
+            ("<p>a < b</p>",),
+            ("<p>x <= 5 and y <7</p>",),
+            ("<p></p>",),
+            ("<p> </p><p>\n</p><ul>\n  <li>one</li>\n</ul>",),
+            ("  \n<p>leading whitespace</p>",),
+            ("<p>line<br>break<br/>and<br />more</p>",),
+            ("<p>unclosed <b>bold</p>",),
+            ("<p>stray</b> end</p>",),
+            ("<p>paragraph <ul><li>list</li></ul></p>",),
+            ("<li>one<li>two",),
+            ("<a href=x>one<a href=y>two</a></a>",),
+            ("<table><tr><td>cell</td></tr></table>",),
+            ("&foo; &amp &#128; &#0;",),
+            ("<",),
+            ("text\rwith\x00control",),
+        ]
+    )
+    def test_strip_html_as_parsed(self, html):
+        self.assert_stripped_as_parsed(html)
+
+    def test_strip_html_of_syntax_templates(self):
+        for html in fixtures.build_templates()[:200] + fixtures.build_names()[:200]:
+            # syntax template HTML is stripped without parsing
+            assert utils._strip_html_fast(html) is not None
+            self.assert_stripped_as_parsed(html)
+
+    def test_strip_html_of_random_html(self):
+        rng = random.Random(0)
+        tags = ["p", "b", "i", "span", "sup", "ul", "li", "div", "a", "br", "pre"]
+        texts = ["a", " ", "\n", " x ", "[Param]", "&amp;", "&nbsp;", "a < b", "<7"]
+
+        def html(depth: int = 0) -> str:
+            nodes = []
+            for _ in range(rng.randint(0, 3)):
+                if depth > 2 or rng.random() < 0.5:
+                    nodes.append(rng.choice(texts))
+                    continue
+                tag = rng.choice(tags)
+                if tag == "br":
+                    nodes.append("<br/>")
+                else:
+                    nodes.append(f'<{tag} class="x">{html(depth + 1)}</{tag}>')
+            return "".join(nodes)
+
+        for _ in range(2000):
+            self.assert_stripped_as_parsed(html())
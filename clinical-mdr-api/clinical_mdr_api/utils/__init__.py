@@ -1,6 +1,8 @@
 import json
 import re
 import string
+from functools import lru_cache
+from html.entities import name2codepoint
 from typing import Any, Iterable, overload
 
 from bs4 import BeautifulSoup
@@ -108,10 +110,175 @@ def is_attribute_in_model(attribute: str, model: type[BaseModel]) -> bool:
     return attribute in model.model_fields.keys()
 
 
+# Tags of the HTML produced by the syntax template editor, that strip_html() removes without parsing
+_PLAIN_TEXT_INLINE_TAGS = frozenset(
+    ("a", "b", "i", "u", "s", "em", "strong", "span", "sub", "sup")
+)
+_PLAIN_TEXT_BLOCK_TAGS = frozenset(("p", "div", "ul", "ol", "li"))
+_PLAIN_TEXT_VOID_TAGS = frozenset(("br",))
+_PLAIN_TEXT_ENTITIES = {
+    name: chr(codepoint) for name, codepoint in name2codepoint.items()
+} | {"apos": "'"}
+# Splits HTML into text, and tags or entities
+_PLAIN_TEXT_SPLIT_RE = re.compile(r"(<[^<>]*>|&[^&<>;\s]*;)")
+_PLAIN_TEXT_TAG_RE = re.compile(
+    r"<(/?)([a-z][a-z0-9]*)"
+    r"(?:\s+[^\s\"'<>/=]+(?:\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s\"'<>=`]+))?)*\s*(/?)>"
+)
+_PLAIN_TEXT_ENTITY_RE = re.compile(
+    r"&(?:#([0-9]{1,7})|#[xX]([0-9a-fA-F]{1,6})|([a-zA-Z][a-zA-Z0-9]*));"
+)
+_PLAIN_TEXT_CONTROL_RE = re.compile(r"[\x00-\x08\x0b-\x1f\x7f]")
+# < signs that may start a tag or other markup
+_PLAIN_TEXT_MARKUP_START_RE = re.compile(r"<(?![\s0-9=\[\]])")
+_ASCII_SPACES = " \n\t"
+
+
+@lru_cache(maxsize=4096)
+def _plain_text_markup(markup: str) -> tuple[str, str] | None:
+    """
+    Parses a tag or an entity.
+
+    Returns ("start" | "end" | "void", tag name) for a tag, ("text", text) for an entity or a < sign starting text,
+    or None if not supported.
+    """
+    if markup[0] == "&":
+        if not (match := _PLAIN_TEXT_ENTITY_RE.fullmatch(markup)):
+            return None
+        if match[3] is not None:
+            text = _PLAIN_TEXT_ENTITIES.get(match[3])
+            return ("text", text) if text is not None else None
+        codepoint = int(match[1]) if match[1] is not None else int(match[2], 16)
+        if (
+            codepoint in (0x09, 0x0A)
+            or 0x20 <= codepoint < 0x7F
+            or (0xA0 <= codepoint <= 0x10FFFF and not 0xD800 <= codepoint <= 0xDFFF)
+        ):
+            return "text", chr(codepoint)
+        return None
+
+    if not (match := _PLAIN_TEXT_TAG_RE.fullmatch(markup)):
+        if "&" in markup or _PLAIN_TEXT_MARKUP_START_RE.match(markup):
+            return None
+        # a < sign that can't start a tag, like in "a < b > c"
+        return "text", markup
+
+    end, tag, void = match.groups()
+    if tag in _PLAIN_TEXT_VOID_TAGS:
+        return None if end else ("void", tag)
+    if void or (
+        tag not in _PLAIN_TEXT_INLINE_TAGS and tag not in _PLAIN_TEXT_BLOCK_TAGS
+    ):
+        return None
+    return ("end" if end else "start"), tag
+
+
+def _collapse_blank_node(parts: list[str], node_start: int) -> None:
+    # BeautifulSoup collapses text made of whitespace only to a single newline or space
+    text = "".join(parts[node_start:])
+    parts[node_start:] = ["\n" if "\n" in text else " "]
+
+
+def _split_plain_text(html: str) -> list[str] | None:
+    """Splits HTML into alternating text and markup, or returns None if it doesn't start like the parser expects"""
+    if _PLAIN_TEXT_CONTROL_RE.search(html):
+        return None
+
+    # the parser drops the whitespace the document starts with
+    pieces = _PLAIN_TEXT_SPLIT_RE.split(html.lstrip(_ASCII_SPACES))
+    # and the whitespace after a < sign the document starts with
+    if pieces[0][:1] == "<" or (
+        not pieces[0]
+        and len(pieces) > 1
+        and pieces[1][0] == "<"
+        and _PLAIN_TEXT_TAG_RE.fullmatch(pieces[1]) is None
+    ):
+        return None
+    return pieces
+
+
+def _is_unsupported_text(text: str) -> bool:
+    # a < sign ending a text is followed by markup or ends the document
+    return bool(
+        "&" in text or _PLAIN_TEXT_MARKUP_START_RE.search(text) or text[-1] == "<"
+    )
+
+
+def _is_misnested_start_tag(tag: str, open_tags: list[str]) -> bool:
+    if tag in _PLAIN_TEXT_BLOCK_TAGS:
+        # the parser moves blocks out of paragraphs and inline elements
+        if any(
+            open_tag == "p" or open_tag in _PLAIN_TEXT_INLINE_TAGS
+            for open_tag in open_tags
+        ):
+            return True
+        # and closes a list item opened outside of a list
+        return tag == "li" and open_tags[-1:] == ["li"]
+    # a link opened in a link closes it
+    return tag == "a" and "a" in open_tags
+
+
+def _strip_html_fast(html: str) -> str | None:
+    """
+    Removes the tags of well-formed HTML made of the tags and entities of syntax templates, without parsing.
+
+    Returns the same text as the lxml parser would, or None if the HTML isn't supported.
+    """
+    if (pieces := _split_plain_text(html)) is None:
+        return None
+
+    parts: list[str] = []
+    open_tags: list[str] = []
+    # the current text node is parts[node_start:], blank while it has whitespace only
+    node_start = 0
+    blank = True
+
+    # pieces alternate between text and markup, starting and ending with text
+    for i, piece in enumerate(pieces):
+        if not i % 2:
+            if piece:
+                if _is_unsupported_text(piece):
+                    return None
+                parts.append(piece)
+                if blank and piece.strip(_ASCII_SPACES):
+                    blank = False
+            continue
+
+        if (markup := _plain_text_markup(piece)) is None:
+            return None
+        kind, value = markup
+        if kind == "text":
+            parts.append(value)
+            if blank and value.strip(_ASCII_SPACES):
+                blank = False
+            continue
+
+        if blank and len(parts) > node_start:
+            _collapse_blank_node(parts, node_start)
+        node_start = len(parts)
+        blank = True
+        if kind == "end":
+            if open_tags[-1:] != [value]:
+                return None
+            open_tags.pop()
+        elif kind == "start":
+            if _is_misnested_start_tag(value, open_tags):
+                return None
+            open_tags.append(value)
+
+    if blank and len(parts) > node_start:
+        _collapse_blank_node(parts, node_start)
+    return None if open_tags else "".join(parts)
+
+
+@lru_cache(maxsize=65536)
 def strip_html(html: str) -> str:
     """
     Removes HTML tags from a string.
 
+    The HTML of syntax templates is stripped without parsing, any other HTML is parsed with lxml.
+    Results are cached by the input string.
+
     Args:
         html (str): The string containing HTML tags.
 
@@ -122,7 +289,10 @@ def strip_html(html: str) -> str:
         >>> strip_html("<p>Some <b>bold</b> text.</p>")
         "Some bold text."
     """
-    return BeautifulSoup(html, "lxml").text
+    text = _strip_html_fast(html)
+    if text is None:
+        text = BeautifulSoup(html, "lxml").text
+    return text
 
 
 def convert_to_plain(text: str) -> str:
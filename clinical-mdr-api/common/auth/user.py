@@ -1,12 +1,14 @@
 import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
 
-from cachetools import TTLCache, cached
 from neomodel.sync_.core import db
 from starlette_context import context
 
 from common.auth.models import Auth, User
-
-cache_persist_user = TTLCache(maxsize=1000, ttl=10)
+from common.config import settings
 
 log = logging.getLogger(__name__)
 
@@ -23,43 +25,211 @@ def user() -> User:
     return auth().user
 
 
-@cached(cache=cache_persist_user, key=lambda user_info: user_info.id())
-def persist_user(user_info: User):
-    """Persists user information in the database."""
-
-    log.info("Persisting user %s", user_info)
-    db.cypher_query(
-        query="""
-        MERGE (u:User {user_id: $id})
-        ON CREATE
-            SET u.created = datetime(),
-                u.oid = $oid,
-                u.azp = $azp,
-                u.username = $username,
-                u.name = $name,
-                u.email = $email,
-                u.roles = $roles
-        ON MATCH
-            SET u.updated = datetime(),
-                u.oid = $oid,
-                u.azp = $azp,
-                u.username = COALESCE($username, u.username),
-                u.name = $name,
-                u.email = $email,
-                u.roles = $roles
-        """,
-        params={
-            "id": user_info.id(),
-            "oid": user_info.oid,
-            "azp": user_info.azp,
-            "username": user_info.username,
-            "name": user_info.name,
-            "email": user_info.email,
-            "roles": list(user_info.roles),
-        },
+def _user_claims(user_info: User) -> tuple:
+    return (
+        user_info.oid,
+        user_info.azp,
+        user_info.username,
+        user_info.name,
+        user_info.email,
+        tuple(sorted(user_info.roles)),
     )
 
 
+class UserRegistry:
+    """
+    Write-behind store of the users seen by this process.
+
+    Users seen for the first time are written to the database right away, so that the author of
+    anything they create can be looked up. Later on, the user is only written again when their claims
+    change, and the changes are buffered and written together in one statement
+    every `settings.user_flush_interval` seconds, and on shutdown.
+
+    The claims last written are kept for at most `max_users` users, the least recently seen is forgotten first.
+    """
+
+    def __init__(self, flush_interval: float, max_users: int = 1000):
+        self.flush_interval = flush_interval
+        self.max_users = max_users
+        # user id -> claims last written to the database
+        self._flushed: OrderedDict[str, tuple] = OrderedDict()
+        # user id -> (claims, query parameters) waiting to be written
+        self._pending: dict[str, tuple[tuple, dict[str, Any]]] = {}
+        # user id -> claims being written by the current flush
+        self._writing: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        # serializes the writes, so that an older flush can't overwrite a newer one
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.recorded = 0
+        self.buffered = 0
+        self.flushes = 0
+        self.flushed_users = 0
+        self.failed_flushes = 0
+        self.last_flush_at: float | None = None
+        self.last_flush_duration: float | None = None
+
+    def record(self, user_info: User) -> bool:
+        """Buffers the user information if it changed since it was last written
+
+        Returns whether the user is seen for the first time, and must be written right away.
+        """
+
+        user_id = user_info.id()
+        claims = _user_claims(user_info)
+        with self._lock:
+            self.recorded += 1
+            flushed = self._flushed.get(user_id)
+            if flushed is not None:
+                self._flushed.move_to_end(user_id)
+            pending = self._pending.get(user_id)
+            writing = self._writing.get(user_id)
+            last_claims: tuple | None
+            if pending:
+                last_claims = pending[0]
+            elif writing:
+                last_claims = writing
+            else:
+                last_claims = flushed
+            if last_claims == claims:
+                return False
+
+            self._pending[user_id] = (
+                claims,
+                {
+                    "id": user_id,
+                    "oid": user_info.oid,
+                    "azp": user_info.azp,
+                    "username": user_info.username,
+                    "name": user_info.name,
+                    "email": user_info.email,
+                    "roles": list(user_info.roles),
+                },
+            )
+            self.buffered += 1
+            self._start()
+            return flushed is None and writing is None
+
+    def flush(self) -> int:
+        """Writes the buffered users to the database in one statement, returns the number of users written"""
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._writing = {
+                    user_id: claims for user_id, (claims, _) in pending.items()
+                }
+            if not pending:
+                return 0
+
+            log.info("Persisting %s users", len(pending))
+            start = time.perf_counter()
+            try:
+                db.cypher_query(
+                    query="""
+                    UNWIND $users AS user
+                    MERGE (u:User {user_id: user.id})
+                    ON CREATE
+                        SET u.created = datetime(),
+                            u.oid = user.oid,
+                            u.azp = user.azp,
+                            u.username = user.username,
+                            u.name = user.name,
+                            u.email = user.email,
+                            u.roles = user.roles
+                    ON MATCH
+                        SET u.updated = datetime(),
+                            u.oid = user.oid,
+                            u.azp = user.azp,
+                            u.username = COALESCE(user.username, u.username),
+                            u.name = user.name,
+                            u.email = user.email,
+                            u.roles = user.roles
+                    """,
+                    params={"users": [params for _, params in pending.values()]},
+                )
+            except Exception:
+                with self._lock:
+                    self._writing = {}
+                    self.failed_flushes += 1
+                    # put back the users not recorded again meanwhile, to retry on the next flush
+                    self._pending = pending | self._pending
+                raise
+
+            with self._lock:
+                self._writing = {}
+                for user_id, (claims, _) in pending.items():
+                    self._flushed[user_id] = claims
+                    self._flushed.move_to_end(user_id)
+                while len(self._flushed) > self.max_users:
+                    self._flushed.popitem(last=False)
+                self.flushes += 1
+                self.flushed_users += len(pending)
+                self.last_flush_at = time.time()
+                self.last_flush_duration = time.perf_counter() - start
+            return len(pending)
+
+    def _start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="user-registry", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:  # pylint: disable=broad-exception-caught
+                log.exception("Failed to persist users, retrying in the next flush")
+
+    def close(self) -> None:
+        """Stops the periodic flush and writes the buffered users"""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.flush()
+        except Exception:  # pylint: disable=broad-exception-caught
+            log.exception("Failed to persist users on shutdown")
+
+    def clear(self) -> None:
+        """Forgets the users seen and drops the buffered ones, they are written again when next seen"""
+
+        with self._lock:
+            self._flushed.clear()
+            self._pending.clear()
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "known_users": len(self._flushed),
+                "buffered_users": len(self._pending),
+                "recorded": self.recorded,
+                "buffered": self.buffered,
+                "flushes": self.flushes,
+                "flushed_users": self.flushed_users,
+                "failed_flushes": self.failed_flushes,
+                "last_flush_at": self.last_flush_at,
+                "last_flush_duration": self.last_flush_duration,
+                "flush_interval": self.flush_interval,
+            }
+
+
+user_registry = UserRegistry(flush_interval=settings.user_flush_interval)
+
+
+def persist_user(user_info: User):
+    """Persists user information in the database, see `UserRegistry`."""
+
+    if user_registry.record(user_info):
+        user_registry.flush()
+
+
 def clear_users_cache():
-    cache_persist_user.clear()
+    user_registry.clear()
     log.info("Users cache cleared")
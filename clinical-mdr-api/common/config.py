@@ -44,6 +44,11 @@ class Settings(BaseSettings):
         "tracing_enabled",
         "tracing_metrics_header",
         "trace_request_body",
+        "neo4j_unit_of_work_enabled",
+        "fulltext_search_enabled",
+        "query_profiler_enabled",
+        "repeated_query_raise",
+        "trace_retain_failed_requests",
         mode="before",
     )
     @classmethod
@@ -68,10 +73,34 @@ class Settings(BaseSettings):
     neo4j_database: str | None = None  # deprecated, include database name in NEO4J_DSN
     neo4j_dsn: str
     neo4j_connection_lifetime: int = 29 * 60
+    neo4j_unit_of_work_enabled: bool = Field(
+        default=False,
+        description="Run each request in one Neo4j transaction, READ for GET requests and WRITE otherwise",
+    )
+    fulltext_search_enabled: bool = Field(
+        default=True,
+        description="Find the rows matching a wildcard filter through the Neo4j full-text indexes, when they are online",
+    )
 
     # Cache Configuration
     cache_max_size: int = 1000
     cache_ttl: int = 3600
+    study_copy_chunk_size: int = Field(
+        default=500,
+        description="Number of selections copied per statement when copying the items of a study",
+    )
+    cascade_chunk_size: int = Field(
+        default=500,
+        description="Number of linked concepts versioned per statement when cascading a versioning action",
+    )
+    study_design_figure_cache_size: int = Field(
+        default=100,
+        description="Number of study design figures of locked study versions kept rendered, 0 disables",
+    )
+    template_parameter_values_cache_ttl: int = Field(
+        default=600,
+        description="Seconds to keep the values of the template parameters, for the terms written to the graph without the API (e.g. by imports), 0 to always rebuild them",
+    )
 
     # Security & CORS
     allow_origin_regex: str | None = None
@@ -99,6 +128,34 @@ class Settings(BaseSettings):
 
     # Performance
     slow_query_duration: int = 1
+    query_profiler_enabled: bool = True
+    query_profiler_max_entries: int = Field(
+        default=1000,
+        description="Number of (query fingerprint, endpoint) entries kept by the query profiler",
+    )
+    query_profiler_max_samples: int = Field(
+        default=200,
+        description="Number of recent latencies kept per query profiler entry for percentiles",
+    )
+    fast_json_stream_min_items: int = Field(
+        default=2000,
+        description="Stream the fast JSON responses of lists with more items than this",
+    )
+    fast_json_chunk_size: int = Field(
+        default=500, description="Number of items per chunk of streamed JSON lists"
+    )
+    user_flush_interval: float = Field(
+        default=5,
+        description="Seconds between the writes of changed user claims, users seen for the first time are written right away",
+    )
+    repeated_query_threshold: int = Field(
+        default=0,
+        description="Report a query shape that runs more than this many times in a request (0 disables)",
+    )
+    repeated_query_raise: bool = Field(
+        default=False,
+        description="Raise an error instead of logging a warning for repeated queries",
+    )
 
     # Tracing & Monitoring
     uvicorn_log_config: str = ""
@@ -108,6 +165,34 @@ class Settings(BaseSettings):
     trace_request_body_min_status_code: int = 400
     trace_request_body_truncate_bytes: int = 2048
     trace_query_max_len: int = 4000
+    trace_sample_rate: float = Field(
+        default=1.0, ge=0, le=1, description="Ratio of requests to trace"
+    )
+    ENV_TRACE_ROUTE_SAMPLE_RATES: str = Field(
+        default="",
+        alias="TRACE_ROUTE_SAMPLE_RATES",
+        description="Comma separated `path-pattern=rate` pairs overriding the sample rate, e.g. `*/listings/*=0.05`",
+    )
+
+    @property
+    def trace_route_sample_rates(self) -> dict[str, float]:
+        return {
+            pattern.strip(): float(rate)
+            for pattern, rate in (
+                item.rsplit("=", 1)
+                for item in self.ENV_TRACE_ROUTE_SAMPLE_RATES.split(",")
+                if item.strip()
+            )
+        }
+
+    trace_retain_slow_request_duration: float = Field(
+        default=0,
+        description="Export the request span of requests that weren't sampled if slower than this (seconds, 0 disables)",
+    )
+    trace_retain_failed_requests: bool = Field(
+        default=True,
+        description="Export the request span of failed requests that weren't sampled",
+    )
     traceback_max_entries: int = Field(
         default=15, description="Limit number of stack trace entries in tracebacks"
     )
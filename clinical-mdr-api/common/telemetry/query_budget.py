@@ -0,0 +1,92 @@
+"""
+Detection of repeated Cypher queries (N+1 query patterns) and query counting for tests.
+
+With `settings.repeated_query_threshold` set, the queries of each request are counted by fingerprint
+(see `common.telemetry.query_profiler.fingerprint`). When a query shape runs more than the threshold,
+a warning is logged, or `RepeatedQueryError` is raised with `settings.repeated_query_raise`.
+
+`QueryCounter` collects the fingerprints of all Cypher queries run in any thread of the process while active,
+it's used by the `max_queries` test fixture and marker to pin the query budget of endpoints.
+"""
+
+import logging
+import threading
+from collections import Counter
+
+from starlette_context import context
+
+from common.config import settings
+from common.telemetry.query_profiler import current_endpoint, fingerprint
+
+log = logging.getLogger(__name__)
+
+_counters: list["QueryCounter"] = []
+_counters_lock = threading.Lock()
+
+
+class RepeatedQueryError(RuntimeError):
+    """The same query shape ran more times than allowed within a request"""
+
+
+def check_repeated_query(query: str) -> None:
+    """Counts the query by fingerprint in the current request, and reports it once above the threshold"""
+
+    threshold = settings.repeated_query_threshold
+    if not threshold or not context.exists():
+        return
+
+    counts = context.get("query_fingerprint_counts")
+    if counts is None:
+        counts = context["query_fingerprint_counts"] = {}
+
+    key = fingerprint(query)
+    count = counts[key] = counts.get(key, 0) + 1
+    if count != threshold + 1:
+        return
+
+    msg = f"Query ran more than {threshold} times in request {current_endpoint()}: {key[:settings.trace_query_max_len]}"
+    if settings.repeated_query_raise:
+        raise RepeatedQueryError(msg)
+    log.warning(msg)
+
+
+def count_query(query: str) -> None:
+    """Adds the query to the active query counters"""
+
+    if not _counters:
+        return
+
+    key = fingerprint(query)
+    with _counters_lock:
+        for counter in _counters:
+            counter.queries.append(key)
+
+
+class QueryCounter:
+    """Collects the fingerprints of the Cypher queries run while the context manager is active"""
+
+    def __init__(self):
+        self.queries: list[str] = []
+
+    def __enter__(self) -> "QueryCounter":
+        with _counters_lock:
+            _counters.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        with _counters_lock:
+            _counters.remove(self)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def most_common(self, n: int = 5) -> list[tuple[str, int]]:
+        return Counter(self.queries).most_common(n)
+
+    def report(self, budget: int) -> str:
+        lines = [f"{self.count} Cypher queries ran, the budget is {budget}."]
+        lines.extend(
+            f"  {count} x {query[:200]}" for query, count in self.most_common()
+        )
+        return "\n".join(lines)
@@ -0,0 +1,170 @@
+"""
+In-process Cypher query profiler.
+
+Every Cypher statement is normalized into a fingerprint, with string and numeric literals replaced by `?`
+and whitespace collapsed, so that queries of the same shape are aggregated together.
+Per fingerprint and calling endpoint, the profiler keeps the number of executions, total and max latency,
+latency percentiles (from the most recent samples) and the number of rows returned.
+
+The store is bounded by `settings.query_profiler_max_entries`, the least recently used entry is evicted first.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, Literal
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+from starlette_context import context
+
+from common.config import settings
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL_RE = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b")
+_LIST_LITERAL_RE = re.compile(r"\[\s*\?(?:\s*,\s*\?)*\s*\]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+QuerySortKey = Literal["total_time", "count", "max_time", "p95_time", "rows"]
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(query: str) -> str:
+    """Returns the normalized shape of a Cypher query"""
+
+    query = _STRING_LITERAL_RE.sub("?", query)
+    query = _NUMBER_LITERAL_RE.sub("?", query)
+    query = _LIST_LITERAL_RE.sub("[?]", query)
+    return _WHITESPACE_RE.sub(" ", query).strip()
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1)))
+    )
+    return sorted_values[index]
+
+
+class QueryStats:
+    """Aggregated statistics of one query fingerprint called from one endpoint"""
+
+    __slots__ = ("count", "total_time", "max_time", "rows", "samples")
+
+    def __init__(self, max_samples: int):
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.rows = 0
+        self.samples: deque[float] = deque(maxlen=max_samples)
+
+    def add(self, duration: float, rows: int) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.rows += rows
+        self.samples.append(duration)
+        self.max_time = max(self.max_time, duration)
+
+    def to_dict(self) -> dict[str, Any]:
+        samples = sorted(self.samples)
+        return {
+            "count": self.count,
+            "total_time": round(self.total_time, 6),
+            "mean_time": round(self.total_time / self.count, 6) if self.count else 0.0,
+            "p50_time": round(_percentile(samples, 50), 6),
+            "p95_time": round(_percentile(samples, 95), 6),
+            "max_time": round(self.max_time, 6),
+            "rows": self.rows,
+        }
+
+
+class QueryProfiler:
+    """Thread-safe, bounded store of query statistics keyed by (fingerprint, endpoint)"""
+
+    def __init__(self, max_entries: int = 1000, max_samples: int = 200):
+        self.max_entries = max_entries
+        self.max_samples = max_samples
+        self.started_at = time.time()
+        self.evicted = 0
+        self._entries: OrderedDict[tuple[str, str | None], QueryStats] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(
+        self, query: str, duration: float, rows: int = 0, endpoint: str | None = None
+    ) -> None:
+        key = (fingerprint(query), endpoint)
+        with self._lock:
+            stats = self._entries.get(key)
+            if stats is None:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evicted += 1
+                stats = self._entries[key] = QueryStats(self.max_samples)
+            else:
+                self._entries.move_to_end(key)
+            stats.add(duration, rows)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.evicted = 0
+            self.started_at = time.time()
+
+    def entries(
+        self, sort_by: QuerySortKey = "total_time", limit: int | None = None
+    ) -> list[dict[str, Any]]:
+        with self._lock:
+            snapshot = [
+                (fp, endpoint, stats.to_dict())
+                for (fp, endpoint), stats in self._entries.items()
+            ]
+
+        rows = [
+            {"fingerprint": fp, "endpoint": endpoint, **stats}
+            for fp, endpoint, stats in snapshot
+        ]
+        rows.sort(key=lambda row: row[sort_by], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def dump(self) -> dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "dumped_at": time.time(),
+            "max_entries": self.max_entries,
+            "evicted": self.evicted,
+            "entries": self.entries(),
+        }
+
+
+query_profiler = QueryProfiler(
+    max_entries=settings.query_profiler_max_entries,
+    max_samples=settings.query_profiler_max_samples,
+)
+
+
+def current_endpoint() -> str | None:
+    """Returns the method and route path of the current request, if any"""
+
+    if not context.exists():
+        return None
+    scope = context.get("query_profiler_scope")
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path")
+    return f"{scope.get('method')} {path}"
+
+
+class QueryProfilerMiddleware:
+    """Makes the request scope available to the query profiler,
+    the router sets the matched route on the scope once the request reaches it"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            context["query_profiler_scope"] = scope
+        await self.app(scope, receive, send)
@@ -14,7 +14,9 @@ from starlette.types import Message
 from starlette_context import context
 
 from common.config import settings
-from common.telemetry import trace_block
+from common.telemetry import trace_block, tracing_details_enabled
+from common.telemetry.query_budget import check_repeated_query, count_query
+from common.telemetry.query_profiler import current_endpoint, query_profiler
 
 log = logging.getLogger(__name__)
 
@@ -107,7 +109,8 @@ def cypher_tracing(query: str, params: Mapping):
         start_time = time.time()
 
     with trace_block("neomodel.query") as span:
-        span.add_attribute("cypher.query", query[: settings.trace_query_max_len])
+        if tracing_details_enabled():
+            span.add_attribute("cypher.query", query[: settings.trace_query_max_len])
         # span.add_attribute("cypher.params", params)
 
         # run the query (or any wrapped code) as a distinct operation (logical tracing block == Span)
@@ -129,8 +132,12 @@ def cypher_tracing(query: str, params: Mapping):
                 # metrics.cypher_slowest_query_params = params
 
 
-def patch_neomodel_database():
-    """Monkey-patch neomodel.core.db singleton to trace Cypher queries"""
+def patch_neomodel_database(tracing: bool = True, profiling: bool = False):
+    """Monkey-patch neomodel.core.db singleton to trace and/or profile Cypher queries,
+    and to count them for the repeated query detection and the query budgets of tests"""
+
+    if getattr(neomodel.sync_.core.Database, "_cypher_query_patched", False):
+        return
 
     def wrap(func):
         @wraps(func)
@@ -143,8 +150,12 @@ def patch_neomodel_database():
             retry_on_session_expire,
             resolve_objects,
         ):
-            with cypher_tracing(query, params):
-                return func(
+            check_repeated_query(query)
+            count_query(query)
+
+            with cypher_tracing(query, params) if tracing else contextlib.nullcontext():
+                start_time = time.perf_counter()
+                results, meta = func(
                     self,
                     session=session,
                     query=query,
@@ -153,6 +164,14 @@ def patch_neomodel_database():
                     retry_on_session_expire=retry_on_session_expire,
                     resolve_objects=resolve_objects,
                 )
+                if profiling:
+                    query_profiler.record(
+                        query,
+                        time.perf_counter() - start_time,
+                        rows=len(results) if results else 0,
+                        endpoint=current_endpoint(),
+                    )
+                return results, meta
 
         return _run_cypher_query
 
@@ -161,3 +180,4 @@ def patch_neomodel_database():
     neomodel.sync_.core.Database._run_cypher_query = wrap(
         neomodel.sync_.core.Database._run_cypher_query
     )
+    neomodel.sync_.core.Database._cypher_query_patched = True
@@ -1,24 +1,48 @@
 import json
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
 from functools import wraps
-from typing import Callable, Generator, Sequence
+from typing import Callable, ContextManager, Generator, Sequence
 
 from opencensus.trace import Span, execution_context
+from opencensus.trace.blank_span import BlankSpan
 from opencensus.trace.tracer import Tracer
 
-__all__ = ["trace_block", "trace_calls"]
+__all__ = ["trace_block", "trace_calls", "trace_details", "tracing_details_enabled"]
+
+# Whether `trace_block` and `trace_calls` record spans in the current context,
+# switched off by TracingMiddleware for the requests that are not sampled
+_trace_details: ContextVar[bool] = ContextVar("trace_details", default=True)
+
+_NOOP_BLOCK = nullcontext(BlankSpan())
+
+
+def tracing_details_enabled() -> bool:
+    """Returns False if the current request is not sampled, so spans and their attributes needn't be built"""
+    return _trace_details.get()
 
 
 @contextmanager
+def trace_details(enabled: bool) -> Generator[None]:
+    """Switches recording of `trace_block` and `trace_calls` spans on or off within the block"""
+
+    token = _trace_details.set(enabled)
+    try:
+        yield
+    finally:
+        _trace_details.reset(token)
+
+
 def trace_block(
     name,
     annotation_description: str | None = None,
     annotation_kwargs: dict[str, str] | None = None,
     /,
     **attributes,
-) -> Generator[Span]:
+) -> ContextManager[Span]:
     """
     Trace a block of code using the `with` statement. Yields an OpenCensus tracing Span.
+    When the request is not sampled, yields a no-op span without touching the tracer.
 
     Args:
         name (str): The name of the tracing Span.
@@ -38,6 +62,19 @@ def trace_block(
             pass
     """
 
+    if not _trace_details.get():
+        return _NOOP_BLOCK
+
+    return _trace_block(name, annotation_description, annotation_kwargs, attributes)
+
+
+@contextmanager
+def _trace_block(
+    name,
+    annotation_description: str | None,
+    annotation_kwargs: dict[str, str] | None,
+    attributes: dict,
+) -> Generator[Span]:
     tracer: Tracer = execution_context.get_opencensus_tracer()
 
     with tracer.span(name) as span:
@@ -103,7 +140,10 @@ def trace_calls(
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*_args, **_kwargs):
-            with trace_block(func.__qualname__) as span:
+            if not _trace_details.get():
+                return func(*_args, **_kwargs)
+
+            with _trace_block(func.__qualname__, None, None, {}) as span:
                 span.add_attribute("call.module", func.__module__)
                 span.add_attribute("call.name", func.__name__)
                 span.add_attribute("call.qualname", func.__qualname__)
@@ -1,6 +1,7 @@
 import logging
+import time
 from fnmatch import fnmatch
-from typing import Iterable
+from typing import Iterable, Mapping
 
 from opencensus.log import get_log_attrs
 from opencensus.trace import Span, execution_context
@@ -11,7 +12,7 @@ from opencensus.trace.print_exporter import PrintExporter
 from opencensus.trace.propagation.trace_context_http_header_format import (
     TraceContextPropagator,
 )
-from opencensus.trace.samplers import AlwaysOnSampler, Sampler
+from opencensus.trace.samplers import AlwaysOnSampler, ProbabilitySampler, Sampler
 from opencensus.trace.span import SpanKind
 from opencensus.trace.tracer import Tracer
 from starlette.datastructures import Headers, MutableHeaders
@@ -25,13 +26,39 @@ from common.telemetry.request_metrics import (
     include_request_metrics,
     init_request_metrics,
 )
+from common.telemetry.tracing import trace_details
 
 TRACE_RESPONSE_HEADER_NAME = "traceresponse"
+TRACE_PARENT_HEADER_NAME = "traceparent"
 
 log = logging.getLogger(__name__)
 
 
+class CollectingExporter(Exporter):
+    """Keeps the exported spans in a list, until deciding whether to export them for real"""
+
+    def __init__(self):
+        self.span_datas = []
+
+    def emit(self, span_datas):
+        self.span_datas.extend(span_datas)
+
+    def export(self, span_datas):
+        self.emit(span_datas)
+
+
 class TracingMiddleware:
+    """
+    Traces requests with OpenCensus.
+
+    Requests are sampled by the `sampler`, or by a `ProbabilitySampler` of the first matching pattern
+    of `route_sample_rates`. A `traceparent` request header with the sampled flag set is always sampled.
+
+    The spans of `trace_block` and `trace_calls` are only recorded for sampled requests.
+    For the other requests only the request span is built, and it's dropped at the end of the request,
+    unless it's retained as slower than `retain_slow_duration` seconds or as failed with `retain_failed`.
+    """
+
     def __init__(
         self,
         app: ASGIApp,
@@ -41,6 +68,9 @@ class TracingMiddleware:
         sampler: Sampler | None = None,
         exporter: Exporter | None = None,
         propagator=None,
+        route_sample_rates: Mapping[str, float] | None = None,
+        retain_slow_duration: float = 0,
+        retain_failed: bool = False,
     ) -> None:
         self.app = app
         self.exclude_paths = tuple(exclude_paths or [])
@@ -49,9 +79,28 @@ class TracingMiddleware:
         self.sampler = sampler or AlwaysOnSampler()
         self.exporter = exporter or PrintExporter()
         self.propagator = propagator or TraceContextPropagator()
+        self.route_samplers = [
+            (pattern, ProbabilitySampler(rate))
+            for pattern, rate in (route_sample_rates or {}).items()
+        ]
+        self.retain_slow_duration = retain_slow_duration
+        self.retain_failed = retain_failed
 
         log.info("Initializing TracingMiddleware")
 
+    def get_sampler(self, path: str) -> Sampler:
+        for pattern, sampler in self.route_samplers:
+            if fnmatch(path, pattern):
+                return sampler
+        return self.sampler
+
+    def should_retain(self, duration: float, status_code: int | None) -> bool:
+        """Tail-based retention of the request span of a request that was not sampled"""
+
+        if self.retain_failed and (status_code is None or status_code >= 500):
+            return True
+        return bool(self.retain_slow_duration) and duration >= self.retain_slow_duration
+
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] not in ("http", "websocket"):  # pragma: no cover
             log.debug(
@@ -106,12 +155,22 @@ class TracingMiddleware:
         # noinspection PyTypeChecker
         span_context = self.propagator.from_headers(headers)
 
+        # Without a traceparent header the span context defaults to sampled, ignore that
+        if TRACE_PARENT_HEADER_NAME not in headers:
+            span_context.trace_options.set_enabled(False)
+        sampled = span_context.trace_options.get_enabled() or self.get_sampler(
+            path
+        ).should_sample(span_context)
+
+        collecting_exporter = None if sampled else CollectingExporter()
         tracer = Tracer(
             span_context=span_context,
-            sampler=self.sampler,
-            exporter=self.exporter,
+            sampler=AlwaysOnSampler(),
+            exporter=self.exporter if sampled else collecting_exporter,
             propagator=self.propagator,
         )
+        if not sampled:
+            span_context.trace_options.set_enabled(False)
 
         init_request_metrics()
 
@@ -137,9 +196,13 @@ class TracingMiddleware:
             return message
 
         span: Span
+        status_code: int | None = None
 
         async def _send(message: Message) -> None:
+            nonlocal status_code
+
             if message["type"] == "http.response.start":
+                status_code = message.get("status", 0)
                 self.add_traceresponse_header(message)
                 if settings.tracing_metrics_header:
                     add_request_metrics_header(message)
@@ -155,12 +218,35 @@ class TracingMiddleware:
 
             await send(message)
 
-        with tracer.span(f"{scope.get('method')} {scope.get('path')}") as span:
-            span.span_kind = SpanKind.SERVER
-
-            self.add_attributes_form_request_scope(span, scope, headers=headers)
+        start_time = time.perf_counter()
+        retain = False
 
-            await self.app(scope, _receive, _send)
+        try:
+            with (
+                tracer.span(f"{scope.get('method')} {scope.get('path')}") as span,
+                trace_details(sampled),
+            ):
+                span.span_kind = SpanKind.SERVER
+
+                self.add_attributes_form_request_scope(span, scope, headers=headers)
+
+                try:
+                    await self.app(scope, _receive, _send)
+                except Exception:
+                    status_code = 500
+                    raise
+                finally:
+                    if not sampled:
+                        retain = self.should_retain(
+                            time.perf_counter() - start_time, status_code
+                        )
+                        if retain:
+                            span.add_attribute("trace.retained", True)
+
+        finally:
+            # The request span is exported once it has ended
+            if retain:
+                self.exporter.export(collecting_exporter.span_datas)
 
     @staticmethod
     def add_attributes_form_request_scope(
@@ -0,0 +1,128 @@
+# pylint: disable=redefined-outer-name
+# pylint: disable=unused-argument
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from fastapi import Depends, FastAPI, Header
+from starlette.testclient import TestClient
+from starlette_context import context
+from starlette_context.middleware import RawContextMiddleware
+
+from common.auth import user as user_module
+from common.auth.dependencies import dummy_access_token_claims, dummy_auth_object
+from common.auth.user import UserRegistry, persist_user, user
+
+USERS = 20
+REQUESTS = 1000
+
+
+def authenticate(x_user: str = Header(), x_name: str = Header("John Smith")):
+    access_token_claims = dummy_access_token_claims()
+    access_token_claims.oid = x_user
+    access_token_claims.name = x_name
+    context["auth"] = dummy_auth_object(access_token_claims)
+    persist_user(user_info=user())
+
+
+app = FastAPI(dependencies=[Depends(authenticate)])
+app.add_middleware(RawContextMiddleware)
+
+
+@app.get("/")
+def endpoint():
+    return user().id()
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    # the periodic flush is driven by the tests
+    registry = UserRegistry(flush_interval=3600)
+    monkeypatch.setattr(user_module, "user_registry", registry)
+    yield registry
+    registry.close()
+
+
+@pytest.fixture
+def cypher_query():
+    # the database object is thread local, the requests are served from other threads
+    with patch.object(type(user_module.db), "cypher_query") as mock:
+        yield mock
+
+
+def written_users(cypher_query) -> list[dict]:
+    return [
+        params
+        for call in cypher_query.call_args_list
+        for params in call.kwargs["params"]["users"]
+    ]
+
+
+def test_concurrent_requests_write_each_user_once(registry, cypher_query):
+    client = TestClient(app)
+
+    def get(i: int):
+        response = client.get("/", headers={"x-user": f"user-{i % USERS}"})
+        response.raise_for_status()
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(get, range(REQUESTS)))
+
+    assert registry.flush() == 0
+    # users seen for the first time are written right away, and only once
+    assert cypher_query.call_count <= USERS
+    assert sorted(params["id"] for params in written_users(cypher_query)) == sorted(
+        f"user-{i}" for i in range(USERS)
+    )
+    metrics = registry.metrics()
+    assert metrics["recorded"] == REQUESTS
+    assert metrics["known_users"] == USERS
+    assert metrics["buffered_users"] == 0
+    assert metrics["flushed_users"] == USERS
+
+
+def test_changed_claims_are_written_behind_in_one_statement(registry, cypher_query):
+    client = TestClient(app)
+    for i in range(USERS):
+        client.get("/", headers={"x-user": f"user-{i}"})
+    cypher_query.reset_mock()
+
+    for _ in range(3):
+        for i in range(5):
+            client.get("/", headers={"x-user": f"user-{i}", "x-name": "Jane Doe"})
+
+    assert cypher_query.call_count == 0
+    assert registry.metrics()["buffered_users"] == 5
+
+    assert registry.flush() == 5
+    assert cypher_query.call_count == 1
+    assert {params["name"] for params in written_users(cypher_query)} == {"Jane Doe"}
+    assert registry.metrics()["buffered_users"] == 0
+
+
+def test_failed_flush_is_retried(registry, cypher_query):
+    client = TestClient(app)
+    client.get("/", headers={"x-user": "user-0"})
+    client.get("/", headers={"x-user": "user-0", "x-name": "Jane Doe"})
+
+    cypher_query.side_effect = RuntimeError("Leader unavailable")
+    with pytest.raises(RuntimeError):
+        registry.flush()
+    assert registry.metrics()["failed_flushes"] == 1
+    assert registry.metrics()["buffered_users"] == 1
+
+    cypher_query.side_effect = None
+    cypher_query.reset_mock()
+    registry.close()
+    assert [params["name"] for params in written_users(cypher_query)] == ["Jane Doe"]
+
+
+def test_cleared_users_are_written_again(registry, cypher_query):
+    client = TestClient(app)
+    client.get("/", headers={"x-user": "user-0"})
+    client.get("/", headers={"x-user": "user-0"})
+    user_module.clear_users_cache()
+    client.get("/", headers={"x-user": "user-0"})
+
+    assert cypher_query.call_count == 2
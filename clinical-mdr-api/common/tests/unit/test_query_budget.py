@@ -0,0 +1,69 @@
+# pylint: disable=redefined-outer-name
+# pylint: disable=unused-argument
+
+import logging
+
+import pytest
+from starlette_context import request_cycle_context
+
+from common.config import settings
+from common.telemetry.query_budget import (
+    QueryCounter,
+    RepeatedQueryError,
+    check_repeated_query,
+    count_query,
+)
+
+
+@pytest.fixture
+def repeated_query_threshold(monkeypatch):
+    monkeypatch.setattr(settings, "repeated_query_threshold", 2)
+
+
+def test_query_counter():
+    count_query("RETURN 0")
+
+    with QueryCounter() as counter:
+        for i in range(3):
+            count_query(f"MATCH (n {{id: {i}}}) RETURN n")
+        count_query("RETURN 1")
+
+    count_query("RETURN 2")
+
+    assert counter.count == 4
+    assert counter.most_common(1) == [("MATCH (n {id: ?}) RETURN n", 3)]
+    assert counter.report(3).startswith(
+        "4 Cypher queries ran, the budget is 3.\n  3 x MATCH (n {id: ?}) RETURN n"
+    )
+
+
+def test_repeated_query_is_logged_once(repeated_query_threshold, caplog):
+    with caplog.at_level(logging.WARNING), request_cycle_context({}):
+        for i in range(5):
+            check_repeated_query(f"MATCH (n {{id: {i}}}) RETURN n")
+            check_repeated_query("RETURN 1")
+
+    assert len(caplog.records) == 2
+    assert "more than 2 times" in caplog.records[0].getMessage()
+
+
+def test_repeated_query_counts_per_request(repeated_query_threshold, monkeypatch):
+    monkeypatch.setattr(settings, "repeated_query_raise", True)
+
+    for _ in range(3):
+        with request_cycle_context({}):
+            check_repeated_query("RETURN 1")
+            check_repeated_query("RETURN 1")
+
+    with request_cycle_context({}):
+        check_repeated_query("RETURN 1")
+        check_repeated_query("RETURN 1")
+        with pytest.raises(RepeatedQueryError):
+            check_repeated_query("RETURN 1")
+
+
+def test_repeated_query_outside_request(repeated_query_threshold, monkeypatch):
+    monkeypatch.setattr(settings, "repeated_query_raise", True)
+
+    for _ in range(5):
+        check_repeated_query("RETURN 1")
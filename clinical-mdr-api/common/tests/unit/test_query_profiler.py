@@ -0,0 +1,63 @@
+from common.telemetry.query_profiler import QueryProfiler, fingerprint
+
+
+def test_fingerprint():
+    assert (
+        fingerprint(
+            """MATCH (n:StudyRoot {uid: 'Study_000001'})
+            WHERE n.version = "1.0" AND n.count > 10 AND n.x IN [1, 2.5, -3]
+            RETURN n LIMIT 25"""
+        )
+        == "MATCH (n:StudyRoot {uid: ?}) WHERE n.version = ? AND n.count > ? AND n.x IN [?] RETURN n LIMIT ?"
+    )
+    # parameters and identifiers ending with digits are kept
+    assert (
+        fingerprint("MATCH (n1) WHERE n1.uid = $uid1 RETURN n1")
+        == "MATCH (n1) WHERE n1.uid = $uid1 RETURN n1"
+    )
+    assert fingerprint("RETURN 'it\\'s'") == "RETURN ?"
+
+
+def test_query_profiler_aggregates_by_fingerprint_and_endpoint():
+    profiler = QueryProfiler()
+    for i in range(1, 11):
+        profiler.record(
+            f"MATCH (n {{id: {i}}}) RETURN n", i / 10, rows=1, endpoint="GET /a"
+        )
+    profiler.record("MATCH (n {id: 1}) RETURN n", 5.0, rows=3, endpoint="GET /b")
+
+    entries = profiler.entries()
+
+    assert [(e["endpoint"], e["count"]) for e in entries] == [
+        ("GET /a", 10),
+        ("GET /b", 1),
+    ]
+    first = entries[0]
+    assert first["fingerprint"] == "MATCH (n {id: ?}) RETURN n"
+    assert first["total_time"] == 5.5
+    assert first["p50_time"] == 0.5
+    assert first["p95_time"] == 1.0
+    assert first["max_time"] == 1.0
+    assert first["rows"] == 10
+
+    assert profiler.entries(sort_by="max_time", limit=1)[0]["endpoint"] == "GET /b"
+
+
+def test_query_profiler_is_bounded():
+    profiler = QueryProfiler(max_entries=2, max_samples=3)
+    profiler.record("RETURN 1", 1)
+    profiler.record("MATCH (a) RETURN a", 1)
+    profiler.record("RETURN 2", 1)
+    profiler.record("MATCH (b) RETURN b", 1)
+
+    dump = profiler.dump()
+
+    assert dump["evicted"] == 1
+    assert sorted(e["fingerprint"] for e in dump["entries"]) == [
+        "MATCH (b) RETURN b",
+        "RETURN ?",
+    ]
+
+    profiler.reset()
+    assert not profiler.entries()
+    assert profiler.dump()["evicted"] == 0
@@ -0,0 +1,132 @@
+import pytest
+from opencensus.trace.base_exporter import Exporter
+from opencensus.trace.blank_span import BlankSpan
+from opencensus.trace.samplers import AlwaysOffSampler, AlwaysOnSampler
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from starlette_context.middleware import RawContextMiddleware
+
+from common.telemetry import trace_block, trace_calls, trace_details
+from common.telemetry.tracing_middleware import TracingMiddleware
+
+
+class ListExporter(Exporter):
+    def __init__(self):
+        self.span_datas = []
+
+    def emit(self, span_datas):
+        self.span_datas.extend(span_datas)
+
+    def export(self, span_datas):
+        self.emit(span_datas)
+
+    @property
+    def names(self) -> list[str]:
+        return [span_data.name for span_data in self.span_datas]
+
+
+@trace_calls
+def traced_function():
+    return "traced"
+
+
+def endpoint(request):
+    with trace_block("block"):
+        traced_function()
+    if request.query_params.get("fail"):
+        return PlainTextResponse("failed", status_code=500)
+    return PlainTextResponse("ok")
+
+
+def create_client(exporter: Exporter, **kwargs) -> TestClient:
+    app = Starlette(
+        routes=[Route("/items", endpoint), Route("/listings/items", endpoint)],
+        middleware=[
+            Middleware(RawContextMiddleware),
+            Middleware(TracingMiddleware, exporter=exporter, **kwargs),
+        ],
+    )
+    return TestClient(app)
+
+
+def test_sampled_request_records_all_spans():
+    exporter = ListExporter()
+    client = create_client(exporter, sampler=AlwaysOnSampler())
+
+    response = client.get("/items")
+
+    assert response.headers["traceresponse"].endswith("-01")
+    assert exporter.names == ["traced_function", "block", "GET /items"]
+
+
+def test_not_sampled_request_records_nothing():
+    exporter = ListExporter()
+    client = create_client(exporter, sampler=AlwaysOffSampler())
+
+    response = client.get("/items")
+
+    assert response.status_code == 200
+    assert response.headers["traceresponse"].endswith("-00")
+    assert not exporter.span_datas
+
+
+def test_traceparent_header_requests_sampling():
+    exporter = ListExporter()
+    client = create_client(exporter, sampler=AlwaysOffSampler())
+
+    client.get(
+        "/items",
+        headers={
+            "traceparent": "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+        },
+    )
+
+    assert "GET /items" in exporter.names
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [("/items", ["traced_function", "block", "GET /items"]), ("/listings/items", [])],
+)
+def test_route_sample_rates(path, expected):
+    exporter = ListExporter()
+    client = create_client(
+        exporter, sampler=AlwaysOnSampler(), route_sample_rates={"/listings/*": 0}
+    )
+
+    client.get(path)
+
+    assert exporter.names == expected
+
+
+def test_failed_request_is_retained():
+    exporter = ListExporter()
+    client = create_client(exporter, sampler=AlwaysOffSampler(), retain_failed=True)
+
+    client.get("/items")
+    assert not exporter.span_datas
+
+    client.get("/items", params={"fail": 1})
+    assert exporter.names == ["GET /items"]
+    assert exporter.span_datas[0].attributes["trace.retained"] is True
+
+
+def test_slow_request_is_retained():
+    exporter = ListExporter()
+    client = create_client(
+        exporter, sampler=AlwaysOffSampler(), retain_slow_duration=1e-9
+    )
+
+    client.get("/items")
+
+    assert exporter.names == ["GET /items"]
+
+
+def test_trace_details_disabled():
+    with trace_details(False):
+        with trace_block("block") as span:
+            assert isinstance(span, BlankSpan)
+        assert traced_function() == "traced"
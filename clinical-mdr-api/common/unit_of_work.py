@@ -0,0 +1,255 @@
+"""
+Request-scoped Neo4j units of work, routed by access mode.
+
+With `settings.neo4j_unit_of_work_enabled`, each synchronous endpoint runs in a single Neo4j transaction:
+    - `GET`, `HEAD` and `OPTIONS` requests in a READ transaction, that a routing driver (`neo4j://` DSN)
+      sends to a read replica or follower of a cluster,
+    - all other requests in a WRITE transaction on the leader, committed when the endpoint returns
+      and rolled back when it raises.
+
+Cypher queries that run outside an explicit `db.transaction` join the unit of work.
+Within a WRITE unit of work, `db.transaction` blocks join it as well, so that the whole request is atomic.
+Mind that an exception raised in such a block only rolls back its writes when it reaches the endpoint.
+Within a READ unit of work, `db.write_transaction` and `db.transaction` blocks (default access mode is WRITE)
+run in a WRITE transaction of their own, while the READ transaction is set aside.
+
+Causal consistency is kept with bookmarks:
+    - all transactions of a unit of work use a bookmark manager shared by the process,
+      so that a read waits for the writes committed before by this API instance,
+    - the bookmarks of committed writes are returned in the `X-Neo4j-Bookmarks` response header,
+      a client that sends them back in the same request header reads its own writes on any API instance.
+
+Async endpoints are left alone, as neomodel keeps its transaction state per thread
+and the event loop thread is shared by all concurrent requests.
+"""
+
+import asyncio
+import logging
+import threading
+from functools import wraps
+from typing import Any, Callable, Iterable
+
+import neo4j
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from neo4j.exceptions import ClientError
+from neomodel.exceptions import UniqueProperty
+from neomodel.sync_.core import TransactionProxy, db
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from starlette_context import context
+
+log = logging.getLogger(__name__)
+
+BOOKMARKS_HEADER_NAME = "X-Neo4j-Bookmarks"
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Shared by all units of work of this process
+bookmark_manager = neo4j.GraphDatabase.bookmark_manager()
+
+_local = threading.local()
+
+
+class UnitOfWork:
+    """A single Neo4j transaction spanning all queries of the current thread until exit"""
+
+    def __init__(self, access_mode: str, bookmarks: Iterable[str] = ()):
+        self.access_mode = access_mode
+        self.bookmarks = tuple(bookmarks)
+        self.committed_bookmarks: neo4j.Bookmarks | None = None
+        self._joined = False
+
+    @property
+    def is_read(self) -> bool:
+        return self.access_mode == neo4j.READ_ACCESS
+
+    def __enter__(self) -> "UnitOfWork":
+        if current_unit_of_work() is not None or db._active_transaction is not None:
+            # Already in a transaction (e.g. tests calling endpoints directly), join it
+            self._joined = True
+            return self
+
+        db.begin(
+            access_mode=self.access_mode,
+            bookmarks=neo4j.Bookmarks.from_raw_values(self.bookmarks),
+            bookmark_manager=bookmark_manager,
+        )
+        _local.unit_of_work = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self._joined:
+            return
+
+        _local.unit_of_work = None
+        if exc_value:
+            db.rollback()
+        else:
+            bookmarks = db.commit()
+            if not self.is_read:
+                self.committed_bookmarks = bookmarks
+
+    def suspend(self) -> tuple[Any, Any]:
+        """Sets the transaction aside, so that another transaction can run in this thread"""
+        suspended = (db._active_transaction, db._session)
+        db._active_transaction, db._session = None, None
+        _local.unit_of_work = None
+        return suspended
+
+    def resume(self, suspended: tuple[Any, Any]) -> None:
+        db._active_transaction, db._session = suspended
+        _local.unit_of_work = self
+
+
+def current_unit_of_work() -> UnitOfWork | None:
+    return getattr(_local, "unit_of_work", None)
+
+
+def access_mode_for_methods(methods: Iterable[str]) -> str:
+    if set(methods) <= READ_METHODS:
+        return neo4j.READ_ACCESS
+    return neo4j.WRITE_ACCESS
+
+
+def run_in_unit_of_work(func: Callable, access_mode: str) -> Callable:
+    """Decorator for synchronous endpoints, to run each call in a unit of work"""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        bookmarks = context.get("neo4j_bookmarks", ()) if context.exists() else ()
+        with UnitOfWork(access_mode, bookmarks) as unit_of_work:
+            result = func(*args, **kwargs)
+        _remember_bookmarks(unit_of_work.committed_bookmarks)
+        return result
+
+    return wrapper
+
+
+def install_unit_of_work(app: FastAPI) -> None:
+    """Runs all synchronous endpoints of the app in a unit of work of the access mode of their HTTP methods"""
+
+    count = 0
+    for route in app.routes:
+        if (
+            not isinstance(route, APIRoute)
+            or route.dependant.call is None
+            or asyncio.iscoroutinefunction(route.dependant.call)
+        ):
+            continue
+        # The request handler of the route was built with a reference to the dependant,
+        # so replacing its callable is enough
+        route.dependant.call = run_in_unit_of_work(
+            route.dependant.call, access_mode_for_methods(route.methods)
+        )
+        count += 1
+
+    log.info("Installed Neo4j unit of work on %s endpoints", count)
+
+
+class UnitOfWorkMiddleware:
+    """Exchanges the Neo4j bookmarks of the units of work with the client"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        context["neo4j_bookmarks"] = tuple(
+            bookmark.strip()
+            for value in headers.getlist(BOOKMARKS_HEADER_NAME)
+            for bookmark in value.split(",")
+            if bookmark.strip()
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and (
+                bookmarks := context.get("neo4j_bookmarks")
+            ):
+                response_headers = MutableHeaders(scope=message)
+                response_headers.append(BOOKMARKS_HEADER_NAME, ",".join(bookmarks))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _remember_bookmarks(bookmarks: neo4j.Bookmarks | None) -> None:
+    if bookmarks and context.exists():
+        context["neo4j_bookmarks"] = tuple(bookmarks.raw_values)
+
+
+def patch_neomodel_transactions():
+    """Monkey-patch neomodel transactions to cooperate with the unit of work of the current thread"""
+
+    if getattr(TransactionProxy, "_unit_of_work_patched", False):
+        return
+
+    original_enter = TransactionProxy.__enter__
+    original_exit = TransactionProxy.__exit__
+
+    # Decorators like `@db.transaction` share one proxy between all threads and calls,
+    # so the state of the entered transactions is kept in a stack per thread
+    def _stack() -> list:
+        if not hasattr(_local, "transactions"):
+            _local.transactions = []
+        return _local.transactions
+
+    @wraps(original_enter)
+    def __enter__(self: TransactionProxy) -> TransactionProxy:
+        unit_of_work = current_unit_of_work()
+        if unit_of_work is None:
+            _stack().append(None)
+            try:
+                return original_enter(self)
+            except BaseException:
+                _stack().pop()
+                raise
+
+        if unit_of_work.is_read and self.access_mode != neo4j.READ_ACCESS:
+            # Writes get a transaction of their own
+            suspended = unit_of_work.suspend()
+            try:
+                db.begin(
+                    access_mode=self.access_mode or neo4j.WRITE_ACCESS,
+                    bookmark_manager=bookmark_manager,
+                )
+            except BaseException:
+                unit_of_work.resume(suspended)
+                raise
+            _stack().append((unit_of_work, suspended))
+        else:
+            _stack().append((unit_of_work, None))
+        return self
+
+    @wraps(original_exit)
+    def __exit__(self: TransactionProxy, exc_type, exc_value, traceback) -> None:
+        entry = _stack().pop()
+        if entry is None:
+            return original_exit(self, exc_type, exc_value, traceback)
+
+        unit_of_work, suspended = entry
+        if suspended is not None:
+            try:
+                original_exit(self, exc_type, exc_value, traceback)
+            finally:
+                unit_of_work.resume(suspended)
+            if exc_value is None:
+                _remember_bookmarks(getattr(self, "last_bookmark", None))
+            return None
+
+        # Joined the unit of work, which commits or rolls back
+        if (
+            exc_type is ClientError
+            and exc_value.code == "Neo.ClientError.Schema.ConstraintValidationFailed"
+        ):
+            raise UniqueProperty(exc_value.message)
+        return None
+
+    log.info("Patching neomodel.sync_.core.TransactionProxy")
+
+    TransactionProxy.__enter__ = __enter__
+    TransactionProxy.__exit__ = __exit__
+    TransactionProxy._unit_of_work_patched = True
@@ -5,7 +5,17 @@ from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from types import GenericAlias, NoneType, UnionType
-from typing import Any, Callable, Generic, TypeVar, get_args, get_origin, overload
+from typing import (
+    Any,
+    Callable,
+    Generic,
+    Iterator,
+    Sequence,
+    TypeVar,
+    get_args,
+    get_origin,
+    overload,
+)
 
 import neo4j.time
 from pydantic import BaseModel
@@ -482,6 +492,11 @@ def get_edit_input_or_previous_value(
     return getattr(existing_vo, field_name_in_vo)
 
 
+def chunks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
 def get_db_result_as_dict(row: list[Any], columns: list[str]) -> dict[str, Any]:
     item = {}
     for key, value in zip(columns, row):
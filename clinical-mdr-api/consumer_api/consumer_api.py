@@ -25,16 +25,23 @@ from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from neomodel import config as neomodel_config
 from opencensus.ext.azure.trace_exporter import AzureExporter
-from opencensus.trace.samplers import AlwaysOnSampler
+from opencensus.trace.samplers import ProbabilitySampler
 from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 from starlette_context.middleware import RawContextMiddleware
 
 from common.auth.dependencies import security
 from common.auth.discovery import reconfigure_with_openid_discovery
+from common.auth.user import user_registry
 from common.config import settings
 from common.exceptions import MDRApiBaseException
 from common.models.error import ErrorResponse
 from common.telemetry.traceback_middleware import ExceptionTracebackMiddleware
+from common.unit_of_work import (
+    UnitOfWorkMiddleware,
+    install_unit_of_work,
+    patch_neomodel_transactions,
+)
 from consumer_api.shared.common import get_api_version
 from consumer_api.system.routes import router as system_router
 from consumer_api.v1.main import router as v1_router
@@ -66,6 +73,10 @@ if settings.gzip_response_min_size:
 # Context middleware - must come before TracingMiddleware
 middlewares.append(Middleware(RawContextMiddleware))
 
+# Neo4j bookmarks of the request unit of work - must come after RawContextMiddleware
+if settings.neo4j_unit_of_work_enabled:
+    middlewares.append(Middleware(UnitOfWorkMiddleware))
+
 # Tracing middleware
 if settings.tracing_enabled:
 
@@ -94,10 +105,13 @@ if settings.tracing_enabled:
     middlewares.append(
         Middleware(
             TracingMiddleware,
-            sampler=AlwaysOnSampler(),
+            sampler=ProbabilitySampler(settings.trace_sample_rate),
             exporter=tracing_exporter,
             exclude_paths={"*/system/healthcheck"},
             exclude_clients={"127.0.0.1", "::1"},
+            route_sample_rates=settings.trace_route_sample_rates,
+            retain_slow_duration=settings.trace_retain_slow_request_duration,
+            retain_failed=settings.trace_retain_failed_requests,
         )
     )
 
@@ -114,6 +128,8 @@ async def lifespan(_app: FastAPI):
         # Reconfiguring Swagger UI settings with OpenID Connect discovery
         await reconfigure_with_openid_discovery()
     yield
+    # Writes the users buffered since the last flush
+    await run_in_threadpool(user_registry.close)
 
 
 app = FastAPI(
@@ -195,6 +211,10 @@ app.include_router(system_router, tags=["System"])
 app.include_router(v1_router, prefix="/v1")
 # app.include_router(v2_router, prefix="/v2")
 
+if settings.neo4j_unit_of_work_enabled:
+    patch_neomodel_transactions()
+    install_unit_of_work(app)
+
 
 def custom_openapi():
     if app.openapi_schema:
@@ -1,8 +1,10 @@
 """ Schema migrations needed for release 1.17 to PROD post August 2025."""
+
 import json
 import os
 
 from migrations.common import migrate_ct_config_values, migrate_indexes_and_constraints
+from migrations.utils.migration_runner import DRY_RUN, MigrationRunner
 from migrations.utils.utils import (
     api_get,
     api_get_paged,
@@ -10,8 +12,6 @@ from migrations.utils.utils import (
     get_db_connection,
     get_db_driver,
     get_logger,
-    print_counters_table,
-    run_cypher_query,
 )
 
 logger = get_logger(os.path.basename(__file__))
@@ -23,6 +23,14 @@ MIGRATION_DESC = "schema-migration-release-1.17"
 def main():
     logger.info("Running migration on DB '%s'", os.environ["DATABASE_NAME"])
 
+    if DRY_RUN:
+        # Only the steps of the MigrationRunner can be counted without being run
+        logger.info(
+            "Dry run: skipping the indexes, CT config values and study design classes"
+        )
+        migrate_merge_branch_for_this_arm_for_sdtm_adam(DB_DRIVER, logger)
+        return
+
     ### Common migrations
     migrate_indexes_and_constraints(DB_CONNECTION, logger)
     migrate_ct_config_values(DB_CONNECTION, logger)
@@ -81,16 +89,18 @@ def migrate_merge_branch_for_this_arm_for_sdtm_adam(db_driver, log):
     log.info(
         "Migrating merge_branch_for_this_arm_for_sdtm_adam boolean property for all StudyArms",
     )
-    _, merge_branch_for_this_arm_for_sdtm_adam = run_cypher_query(
-        db_driver,
-        """
+    runner = MigrationRunner(db_driver, MIGRATION_DESC)
+    updated = runner.iterate(
+        "merge_branch_for_this_arm_for_sdtm_adam",
+        match="""
         MATCH (study_arm:StudyArm)
         WHERE study_arm.merge_branch_for_this_arm_for_sdtm_adam IS NULL
-        SET study_arm.merge_branch_for_this_arm_for_sdtm_adam=false
         """,
+        node="study_arm",
+        update="SET study_arm.merge_branch_for_this_arm_for_sdtm_adam=false",
     )
-    print_counters_table(merge_branch_for_this_arm_for_sdtm_adam.counters)
-    return merge_branch_for_this_arm_for_sdtm_adam.counters.contains_updates
+    runner.finish()
+    return updated > 0
 
 
 if __name__ == "__main__":
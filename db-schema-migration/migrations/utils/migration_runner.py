@@ -0,0 +1,247 @@
+"""Batched execution of migration steps, with progress checkpoints stored in the database"""
+
+import os
+import time
+from typing import Any, Optional
+
+import neo4j
+
+from migrations.utils.utils import DATABASE_NAME, get_logger, load_env
+
+logger = get_logger(os.path.basename(__file__))
+
+BATCH_SIZE = int(load_env("MIGRATION_BATCH_SIZE", "1000"))
+DRY_RUN = load_env("MIGRATION_DRY_RUN", "false").lower() == "true"
+
+CHECKPOINT_LABEL = "MigrationCheckpoint"
+
+
+class StepReport:
+    def __init__(self, step: str):
+        self.step = step
+        self.items = 0
+        self.batches = 0
+        self.seconds = 0.0
+        self.skipped = False
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+
+class MigrationRunner:
+    """
+    Runs the steps of a migration, in batches of `batch_size` items each committed in its own transaction.
+
+    After every batch, the position reached in the step is saved in a `MigrationCheckpoint` node,
+    in the same transaction as the batch. When a migration fails, running it again skips the steps
+    already completed and resumes the interrupted step after the last committed batch.
+    The checkpoints of a migration are removed by `finish` once all of its steps are completed.
+
+    In a dry run, the items each step would update are counted, and the steps are not run.
+    Only the steps run by the runner are skipped: a migration script checks `DRY_RUN` itself
+    before the other changes it makes, like the re-creation of the indexes or the API calls.
+    """
+
+    def __init__(
+        self,
+        driver: neo4j.Driver,
+        migration: str,
+        batch_size: int = BATCH_SIZE,
+        dry_run: bool = DRY_RUN,
+    ):
+        self.driver = driver
+        self.migration = migration
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.reports: list[StepReport] = []
+
+    def _read(
+        self, query: str, params: Optional[dict[str, Any]] = None
+    ) -> list[neo4j.Record]:
+        with self.driver.session(database=DATABASE_NAME) as session:
+            return session.execute_read(lambda tx: list(tx.run(query, params)))
+
+    def get_checkpoint(self, step: str) -> Optional[dict[str, Any]]:
+        records = self._read(
+            f"""
+            MATCH (checkpoint:{CHECKPOINT_LABEL} {{migration: $migration, step: $step}})
+            RETURN checkpoint {{.after, .items, .done}} AS checkpoint
+            """,
+            {"migration": self.migration, "step": step},
+        )
+        return records[0]["checkpoint"] if records else None
+
+    def _save_checkpoint(
+        self,
+        tx: neo4j.ManagedTransaction,
+        step: str,
+        after: int,
+        items: int,
+        done: bool,
+    ):
+        tx.run(
+            f"""
+            MERGE (checkpoint:{CHECKPOINT_LABEL} {{migration: $migration, step: $step}})
+            SET checkpoint.after = $after, checkpoint.items = $items, checkpoint.done = $done,
+                checkpoint.updated_at = datetime()
+            """,
+            migration=self.migration,
+            step=step,
+            after=after,
+            items=items,
+            done=done,
+        ).consume()
+
+    def iterate(
+        self,
+        step: str,
+        match: str,
+        node: str,
+        update: str,
+        params: Optional[dict[str, Any]] = None,
+    ) -> int:
+        """
+        Applies `update` to each node `node` matched by the `match` clauses, in batches.
+
+        The ids of the nodes to update are read once, in the order of the ids, and each batch
+        only matches its own nodes by id. The checkpoint of the step is the id of the last node processed.
+        `match` must not depend on the nodes updated before, as they are not matched again when resuming.
+        Returns the number of nodes updated, or the number of nodes to update in a dry run.
+        """
+        report = StepReport(step)
+        self.reports.append(report)
+        checkpoint = self.get_checkpoint(step) or {
+            "after": -1,
+            "items": 0,
+            "done": False,
+        }
+        if checkpoint["done"]:
+            logger.info("%s: already completed, skipping", step)
+            report.skipped = True
+            return 0
+
+        start = time.perf_counter()
+        ids = [
+            record["id"]
+            for record in self._read(
+                f"""
+                {match}
+                WITH DISTINCT {node} WHERE id({node}) > $after
+                RETURN id({node}) AS id ORDER BY id
+                """,
+                {**(params or {}), "after": checkpoint["after"]},
+            )
+        ]
+        total = len(ids)
+        if self.dry_run:
+            report.items = total
+            report.seconds = time.perf_counter() - start
+            logger.info("%s: %i nodes to update (dry run)", step, total)
+            return total
+        if checkpoint["after"] >= 0:
+            logger.info(
+                "%s: resuming after %i nodes updated", step, checkpoint["items"]
+            )
+
+        update_query = f"""
+            UNWIND $ids AS node_id
+            MATCH ({node}) WHERE id({node}) = node_id
+            {update}
+            """
+
+        def run_batch(tx: neo4j.ManagedTransaction, batch: list[int], done: bool):
+            if batch:
+                tx.run(update_query, {**(params or {}), "ids": batch}).consume()
+            self._save_checkpoint(
+                tx,
+                step,
+                after=batch[-1] if batch else checkpoint["after"],
+                items=checkpoint["items"] + len(batch),
+                done=done,
+            )
+
+        with self.driver.session(database=DATABASE_NAME) as session:
+            # a step without nodes to update still records its completion
+            for position in range(0, max(total, 1), self.batch_size):
+                batch = ids[position : position + self.batch_size]
+                session.execute_write(
+                    run_batch, batch, position + self.batch_size >= total
+                )
+                report.batches += 1
+                report.items += len(batch)
+                report.seconds = time.perf_counter() - start
+                if batch:
+                    checkpoint["after"] = batch[-1]
+                    checkpoint["items"] += len(batch)
+                    logger.info(
+                        "%s: %i/%i nodes updated, %.0f nodes/s",
+                        step,
+                        report.items,
+                        total,
+                        report.throughput,
+                    )
+        return report.items
+
+    def run_step(
+        self, step: str, query: str, params: Optional[dict[str, Any]] = None
+    ) -> int:
+        """
+        Runs a single statement as a step, which is skipped when resuming after it was completed.
+
+        Returns the number of updates (properties set, nodes and relationships created or deleted, labels added or removed).
+        A dry run only reports the step.
+        """
+        report = StepReport(step)
+        self.reports.append(report)
+        checkpoint = self.get_checkpoint(step)
+        if checkpoint and checkpoint["done"]:
+            logger.info("%s: already completed, skipping", step)
+            report.skipped = True
+            return 0
+        if self.dry_run:
+            logger.info("%s: not run (dry run)", step)
+            return 0
+
+        def run(tx: neo4j.ManagedTransaction) -> int:
+            counters = tx.run(query, params).consume().counters
+            self._save_checkpoint(tx, step, after=-1, items=0, done=True)
+            return (
+                counters.properties_set
+                + counters.nodes_created
+                + counters.nodes_deleted
+                + counters.relationships_created
+                + counters.relationships_deleted
+                + counters.labels_added
+                + counters.labels_removed
+            )
+
+        start = time.perf_counter()
+        with self.driver.session(database=DATABASE_NAME) as session:
+            report.items = session.execute_write(run)
+        report.batches = 1
+        report.seconds = time.perf_counter() - start
+        logger.info("%s: %i updates in %.1f s", step, report.items, report.seconds)
+        return report.items
+
+    def finish(self):
+        """Prints the report of the steps and removes the checkpoints of the completed migration"""
+        self.print_report()
+        if not self.dry_run:
+            with self.driver.session(database=DATABASE_NAME) as session:
+                session.run(
+                    f"MATCH (checkpoint:{CHECKPOINT_LABEL} {{migration: $migration}}) DELETE checkpoint",
+                    {"migration": self.migration},
+                ).consume()
+
+    def print_report(self):
+        print(f"---- {self.migration}{' (dry run)' if self.dry_run else ''} ----")
+        print(f"{'Step':40}{'Items':>10}{'Batches':>10}{'Seconds':>10}{'Items/s':>10}")
+        for report in self.reports:
+            if report.skipped:
+                print(f"{report.step:40}{'skipped, completed before':>40}")
+            else:
+                print(
+                    f"{report.step:40}{report.items:>10}{report.batches:>10}"
+                    f"{report.seconds:>10.1f}{report.throughput:>10.0f}"
+                )
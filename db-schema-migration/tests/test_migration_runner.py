@@ -0,0 +1,90 @@
+import os
+
+import neo4j.exceptions
+import pytest
+
+from migrations.utils.migration_runner import MigrationRunner
+from migrations.utils.utils import get_db_driver, get_logger, run_cypher_query
+from tests.utils.utils import clear_db
+
+# pylint: disable=unused-argument
+# pylint: disable=redefined-outer-name
+
+DB_DRIVER = get_db_driver()
+logger = get_logger(os.path.basename(__file__))
+
+NBR_ARMS = 20000
+BATCH_SIZE = 1000
+FAILING_ARM = 12345
+
+MATCH = """
+    MATCH (study_arm:StudyArm)
+    WHERE study_arm.merge_branch_for_this_arm_for_sdtm_adam IS NULL
+    """
+
+
+@pytest.fixture(scope="module")
+def study_arms():
+    """Insert a large number of study arms to migrate"""
+    clear_db()
+    run_cypher_query(
+        DB_DRIVER,
+        """
+        UNWIND range(1, $nbr_arms) AS i
+        CREATE (:StudyArm {uid: "StudyArm_" + i, divisor: CASE i WHEN $failing_arm THEN 0 ELSE 1 END})
+        """,
+        params={"nbr_arms": NBR_ARMS, "failing_arm": FAILING_ARM},
+    )
+
+
+def migrate(dry_run: bool = False) -> int:
+    runner = MigrationRunner(
+        DB_DRIVER, "test-migration-runner", batch_size=BATCH_SIZE, dry_run=dry_run
+    )
+    updated = runner.iterate(
+        "merge_branch_for_this_arm_for_sdtm_adam",
+        match=MATCH,
+        node="study_arm",
+        # the division by zero fails the batch of the failing arm
+        update="SET study_arm.merge_branch_for_this_arm_for_sdtm_adam = 1 / study_arm.divisor = 0",
+    )
+    runner.finish()
+    return updated
+
+
+def count_not_migrated() -> int:
+    records, _ = run_cypher_query(DB_DRIVER, f"{MATCH} RETURN count(study_arm)")
+    return records[0][0]
+
+
+def test_dry_run_counts_without_updating(study_arms):
+    assert migrate(dry_run=True) == NBR_ARMS
+    assert count_not_migrated() == NBR_ARMS
+
+
+@pytest.mark.order(after="test_dry_run_counts_without_updating")
+def test_failed_migration_resumes_after_last_batch(study_arms):
+    with pytest.raises(neo4j.exceptions.ClientError):
+        migrate()
+    # the batches before the one of the failing arm are committed, with their checkpoint
+    not_migrated = count_not_migrated()
+    assert 0 < not_migrated <= NBR_ARMS
+    assert not_migrated % BATCH_SIZE == 0
+
+    run_cypher_query(
+        DB_DRIVER,
+        "MATCH (study_arm:StudyArm {uid: $uid}) SET study_arm.divisor = 1",
+        params={"uid": f"StudyArm_{FAILING_ARM}"},
+    )
+    assert migrate() == not_migrated
+    assert count_not_migrated() == 0
+
+    records, _ = run_cypher_query(
+        DB_DRIVER, "MATCH (checkpoint:MigrationCheckpoint) RETURN count(checkpoint)"
+    )
+    assert records[0][0] == 0
+
+
+@pytest.mark.order(after="test_failed_migration_resumes_after_last_batch")
+def test_repeated_migration_updates_nothing(study_arms):
+    assert migrate() == 0
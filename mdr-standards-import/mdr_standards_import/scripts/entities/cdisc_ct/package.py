@@ -1,6 +1,6 @@
 from typing import Sequence
 from mdr_standards_import.scripts.entities.inconsistency import Inconsistency
-from mdr_standards_import.scripts.utils import string_to_boolean
+from mdr_standards_import.scripts.utils import iter_json_object, string_to_boolean
 from mdr_standards_import.scripts.entities.cdisc_ct.codelist import Codelist
 from mdr_standards_import.scripts.entities.cdisc_ct.codelist_attributes import (
     CodelistAttributes,
@@ -94,6 +94,22 @@ class Package:
         self.__load_package_data(package_json_data)
         self.__differentiate_between_code_name_submission_values()
 
+    def load_from_json_file(self, package_file):
+        """
+        Same as `load_from_json_data`, but parses the codelists of the package file
+        one by one instead of loading the whole file into memory.
+        """
+        package_json_data = {}
+        for key, value in iter_json_object(package_file, streamed_keys={"codelists"}):
+            if key == "codelists":
+                self.__load_package_data(package_json_data)
+                self.__load_codelists_data(value)
+            else:
+                package_json_data[key] = value
+        # the package attributes might (also) follow the codelists in the file
+        self.__load_package_data(package_json_data)
+        self.__differentiate_between_code_name_submission_values()
+
     def __load_package_data(self, package_json_data):
         self.__set_attributes(
             package_json_data.get("name", None),
@@ -8,7 +8,7 @@ from mdr_standards_import.scripts.wrapper.cdisc_ct.wrapper_import_into_cdisc_db
     wrapper_import_cdisc_ct_into_cdisc_db,
 )
 from mdr_standards_import.scripts.wrapper.cdisc_ct.wrapper_import_from_cdisc_db_into_mdr import (
-    wrapper_import_cdisc_ct_from_cdisc_db_into_mdr,
+    wrapper_import_cdisc_ct_dates_from_cdisc_db_into_mdr,
 )
 from mdr_standards_import.scripts.wrapper.cdisc_data_models.wrapper_import_into_cdisc_db import (
     wrapper_import_cdisc_data_models_into_cdisc_db,
@@ -40,10 +40,9 @@ def bulk_import(
         package_dates = get_ordered_package_dates(
             path.join(json_data_directory, "cdisc_ct")
         )
-        for effective_date in package_dates:
-            wrapper_import_cdisc_ct_from_cdisc_db_into_mdr(
-                author_id=author_id, effective_date=effective_date
-            )
+        wrapper_import_cdisc_ct_dates_from_cdisc_db_into_mdr(
+            author_id=author_id, effective_dates=package_dates
+        )
 
     # CDISC Data models
     if import_data_models:
@@ -1,5 +1,6 @@
 import time
 import re
+from os import environ
 from mdr_standards_import.scripts.utils import (
     are_lists_equal,
     create_user,
@@ -10,8 +11,12 @@ from mdr_standards_import.scripts.utils import (
 
 AUTHOR_ID = "CDISC_IMPORT"
 
+# Number of codelists written per statement by the batched loader,
+# 0 selects the per codelist loader.
+CT_IMPORT_BATCH_SIZE = int(environ.get("CT_IMPORT_BATCH_SIZE", "0"))
 
-def print_ignored_stats(tx, effective_date):
+
+def get_ignored_stats(tx, effective_date):
     result = tx.run(
         """
         MATCH (import:Import{effective_date: date($effective_date)})
@@ -38,7 +43,10 @@ def print_ignored_stats(tx, effective_date):
         """,
         effective_date=effective_date,
     ).single()
+    return result.data() if result is not None else {}
+
 
+def print_ignored_stats(result):
     print("==  ! Unresolved inconsistencies will not be imported !")
     print("==  ! The following concepts will be ignored:")
     print(f"==     # packages: {result.get('num_packages', 'n/a')}")
@@ -908,6 +916,614 @@ def use_existing_term_attributes_value(tx, term, packages):
     )
 
 
+##########################################################################
+# Batched loader                                                         #
+##########################################################################
+# The batched loader writes the same graph as the per codelist functions
+# above, but processes the codelists in chunks of `batch_size`,
+# with one statement per chunk and kind of change (UNWIND over the chunk).
+# Each chunk is written in a transaction of its own, to keep the RAM bound
+# that motivated splitting the per codelist transactions.
+# Statements that must be applied per row (e.g. because of a LIMIT)
+# are wrapped in a CALL subquery, so that each row behaves exactly like
+# a separate call of the corresponding per codelist function.
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def merge_codelists_version_independent_data_batch(tx, codelists_data, effective_date):
+    tx.run(
+        """
+        MERGE (library:Library{name: 'CDISC'})
+        WITH library
+        UNWIND $codelists_data AS data
+        MERGE (cl_root:CTCodelistRoot{uid: data.codelist.concept_id})
+        MERGE (library)-[:CONTAINS_CODELIST]->(cl_root)
+        MERGE (cl_root)-[:HAS_ATTRIBUTES_ROOT]->(:CTCodelistAttributesRoot)
+        MERGE (cl_root)-[:HAS_NAME_ROOT]->(:CTCodelistNameRoot)
+        """,
+        codelists_data=codelists_data,
+    )
+    tx.run(
+        """
+        UNWIND $codelists_data AS data
+        MATCH (library:Library{name: 'CDISC'})-[:CONTAINS_CODELIST]->(cl_root:CTCodelistRoot{uid: data.codelist.concept_id})
+
+        WITH library, data, cl_root
+        // for each catalogue that has this codelist
+        FOREACH (package IN data.packages |
+            MERGE (ct_package:CTPackage{uid: package.name})
+            MERGE (catalogue:CTCatalogue{name: package.catalogue_name})
+            MERGE (catalogue)-[has_codelist:HAS_CODELIST]->(cl_root)
+            ON CREATE SET
+                has_codelist.start_date=datetime($start_date),
+                has_codelist.author_id=$author_id
+            MERGE (package_codelist:CTPackageCodelist{uid: package.name + '_' + data.codelist.concept_id})
+            MERGE (ct_package)-[:CONTAINS_CODELIST]->(package_codelist)
+        )
+        """,
+        codelists_data=codelists_data,
+        start_date=effective_date,
+        author_id=AUTHOR_ID,
+    )
+    tx.run(
+        """
+        UNWIND $codelists_data AS data
+        MATCH (library:Library{name: 'CDISC'})-[:CONTAINS_CODELIST]->(cl_root:CTCodelistRoot{uid: data.codelist.concept_id})
+
+        WITH library, data, cl_root
+        // for each term of the codelist
+        FOREACH (term_data IN data.terms_data |
+            MERGE (t_root:CTTermRoot{uid: term_data.term.uid})
+            SET t_root.concept_id = term_data.term.concept_id
+            MERGE (library)-[:CONTAINS_TERM]->(t_root)
+            MERGE (t_root)-[:HAS_ATTRIBUTES_ROOT]->(:CTTermAttributesRoot)
+            MERGE (t_root)-[:HAS_NAME_ROOT]->(:CTTermNameRoot)
+            FOREACH (package IN term_data.packages |
+                MERGE (package_codelist:CTPackageCodelist{uid: package.name + '_' + data.codelist.concept_id})
+                MERGE (package_term:CTPackageTerm{uid: package.name + "_" + term_data.term.uid})
+                MERGE (package_codelist)-[:CONTAINS_TERM]->(package_term)
+            )
+        )
+        """,
+        codelists_data=codelists_data,
+    )
+    return sum(len(data["terms_data"]) for data in codelists_data)
+
+
+def plan_has_term_changes(codelists_data, active_term_uids, retired_term_uids):
+    """
+    Computes the terms to add to and remove from each codelist,
+    like update_has_term_and_had_term_relationships does codelist by codelist.
+    `active_term_uids` and `retired_term_uids` map codelist concept ids to term uid lists.
+    """
+    to_deactivate = []
+    to_add = []
+    nbr_added_terms = 0
+    nbr_removed_terms = 0
+    nbr_unchanged_terms = 0
+    for codelist_data in codelists_data:
+        codelist_uid = codelist_data["codelist"]["concept_id"]
+        codelist_term_uids = [
+            terms_data["term"]["uid"] for terms_data in codelist_data["terms_data"]
+        ]
+        matching_active_term_uids = active_term_uids.get(codelist_uid, [])
+        retired = set(retired_term_uids.get(codelist_uid, []))
+        active = set(matching_active_term_uids)
+        codelist_terms = set(codelist_term_uids)
+
+        term_uids_to_deactivate = [
+            term_uid
+            for term_uid in matching_active_term_uids
+            if term_uid not in codelist_terms and term_uid not in retired
+        ]
+        term_uids_to_add = [
+            term_uid
+            for term_uid in codelist_term_uids
+            if term_uid not in active and term_uid not in retired
+        ]
+        if term_uids_to_deactivate:
+            to_deactivate.append(
+                {"codelist_uid": codelist_uid, "term_uids": term_uids_to_deactivate}
+            )
+        if term_uids_to_add:
+            to_add.append({"codelist_uid": codelist_uid, "term_uids": term_uids_to_add})
+        nbr_removed_terms += len(term_uids_to_deactivate)
+        nbr_added_terms += len(term_uids_to_add)
+        nbr_unchanged_terms += (
+            len(codelist_term_uids)
+            - len(term_uids_to_add)
+            - len(term_uids_to_deactivate)
+        )
+    return (
+        to_deactivate,
+        to_add,
+        (nbr_added_terms, nbr_removed_terms, nbr_unchanged_terms),
+    )
+
+
+def update_has_term_and_had_term_relationships_batch(
+    tx, codelists_data, effective_date
+):
+    codelist_uids = [data["codelist"]["concept_id"] for data in codelists_data]
+    active_term_uids = {}
+    result = tx.run(
+        """
+        UNWIND $codelist_uids AS codelist_uid
+        MATCH (:CTCodelistRoot{uid: codelist_uid})-[ht:HAS_TERM]->(term_root)
+        WHERE ht.start_date <= datetime($effective_date)
+        RETURN DISTINCT codelist_uid, term_root.uid AS uid, ht.start_date as start_date
+        """,
+        codelist_uids=codelist_uids,
+        effective_date=effective_date,
+    )
+    for record in result:
+        active_term_uids.setdefault(record["codelist_uid"], []).append(record["uid"])
+
+    retired_term_uids = {}
+    result = tx.run(
+        """
+        UNWIND $codelist_uids AS codelist_uid
+        MATCH (:CTCodelistRoot{uid: codelist_uid})-[ht:HAD_TERM]->(term_root)
+        WHERE ht.start_date <= datetime($effective_date) AND ht.end_date > datetime($effective_date)
+        RETURN DISTINCT codelist_uid, term_root.uid AS uid
+        """,
+        codelist_uids=codelist_uids,
+        effective_date=effective_date,
+    )
+    for record in result:
+        retired_term_uids.setdefault(record["codelist_uid"], []).append(record["uid"])
+
+    to_deactivate, to_add, counts = plan_has_term_changes(
+        codelists_data, active_term_uids, retired_term_uids
+    )
+    tx.run(
+        """
+        UNWIND $changes AS change
+        MATCH (codelist_root:CTCodelistRoot{uid: change.codelist_uid})-[has_term:HAS_TERM]->(term_root)
+        WHERE term_root.uid IN change.term_uids
+
+        CREATE (codelist_root)-[had_term:HAD_TERM]->(term_root)
+        SET
+            had_term.start_date = has_term.start_date,
+            had_term.end_date = datetime($end_date),
+            had_term.author_id = has_term.author_id
+        DELETE has_term
+        """,
+        end_date=effective_date,
+        changes=to_deactivate,
+    )
+    tx.run(
+        """
+        UNWIND $changes AS change
+        MATCH (codelist_root:CTCodelistRoot{uid: change.codelist_uid})
+        MATCH (term_root:CTTermRoot)
+        WHERE term_root.uid IN change.term_uids
+
+        CREATE (codelist_root)-[:HAS_TERM{
+            start_date: datetime($start_date),
+            author_id: $author_id
+        }]->(term_root)
+        """,
+        start_date=effective_date,
+        changes=to_add,
+        author_id=AUTHOR_ID,
+    )
+    return counts
+
+
+def plan_codelist_attributes(codelists_data, existing_codelists, effective_date):
+    """
+    Decides for each codelist if its attributes value is created, versioned or reused,
+    with the same rules as update_attributes.
+    """
+    plan = {"create": [], "new_version": [], "use_existing": []}
+    for codelist_data in codelists_data:
+        codelist = codelist_data.get("codelist", None)
+        row = {"codelist": codelist, "packages": codelist_data.get("packages", None)}
+        record = existing_codelists.get(codelist["concept_id"])
+        if record is None:
+            plan["create"].append(row)
+            continue
+        value = record["cl_attributes_value"]
+        value_for_date = record["cl_attributes_value_for_date"]
+        if value_for_date is not None:
+            if not _are_attribute_values_equal(value_for_date, codelist):
+                print(codelist)
+                print(value_for_date)
+                raise RuntimeError(
+                    f"Oh my god! Codelist {codelist['concept_id']} already has a version for {effective_date} but the definition has changed!"
+                )
+            # Already imported for this date, nothing to write
+            plan.setdefault("skip", []).append(row)
+        elif not _are_attribute_values_equal(value, codelist):
+            plan["new_version"].append(row)
+        else:
+            plan["use_existing"].append(row)
+    return plan
+
+
+def plan_term_values(codelists_data, existing_terms, effective_date):
+    """
+    Decides for each term of each codelist if its attributes value is created,
+    versioned or reused, with the same rules as merge_term_values.
+
+    A term can belong to several codelists. merge_term_values handles the codelists
+    one by one, so that a term created or versioned for one codelist is seen as existing
+    by the following codelists, but not by the other terms of the same codelist.
+    This is reproduced by tracking the latest attributes value of each term here,
+    and by splitting the changes into rounds, where round k holds the k-th occurrence
+    of each term. The rounds must be written in order.
+    """
+    state = {
+        uid: (record["t_attributes_value"], record["t_attributes_value_for_date"])
+        for uid, record in existing_terms.items()
+    }
+    rounds = []
+    occurrences = {}
+    counts = {"new_terms": 0, "updated_terms": 0, "unchanged_terms": 0}
+    for codelist_data in codelists_data:
+        codelist = codelist_data.get("codelist", None)
+        updates = {}
+        for term_data in codelist_data.get("terms_data", {}):
+            term = term_data.get("term", None)
+            row = {"term": term, "packages": term_data.get("packages", None)}
+            index = occurrences.get(term["uid"], 0)
+            occurrences[term["uid"]] = index + 1
+            if index == len(rounds):
+                rounds.append({"create": [], "new_version": [], "use_existing": []})
+            plan = rounds[index]
+
+            record = state.get(term["uid"])
+            if record is None:
+                name = sponsor_specific_parse_term_name(codelist, term)
+                row["name"] = name
+                row["name_sentence_case"] = get_sentence_case_string(name)
+                plan["create"].append(row)
+                updates[term["uid"]] = (term, None)
+                counts["new_terms"] += 1
+                continue
+            value, value_for_date = record
+            if value_for_date is not None:
+                if not _are_term_attribute_values_equal(value_for_date, term):
+                    print(term)
+                    print(value_for_date)
+                    raise RuntimeError(
+                        f"Oh my god! Term {term['concept_id']} already has a version for {effective_date} but the definition has changed!"
+                    )
+                counts["unchanged_terms"] += 1
+            elif not _are_term_attribute_values_equal(value, term):
+                plan["new_version"].append(row)
+                updates[term["uid"]] = (term, None)
+                counts["updated_terms"] += 1
+            else:
+                plan["use_existing"].append(row)
+                counts["unchanged_terms"] += 1
+        state.update(updates)
+    return rounds, counts
+
+
+def write_codelist_attributes_batch(tx, plan, effective_date):
+    tx.run(
+        """
+        UNWIND $rows AS row
+        CALL { WITH row
+            MATCH (:CTCodelistRoot{uid: row.codelist.concept_id})-[:HAS_ATTRIBUTES_ROOT]->(cl_attributes_root)
+            CREATE (cl_attributes_value: CTCodelistAttributesValue)
+            SET
+                cl_attributes_value.name = row.codelist.name,
+                cl_attributes_value.submission_value = row.codelist.submission_value,
+                cl_attributes_value.preferred_term = row.codelist.preferred_term,
+                cl_attributes_value.definition = row.codelist.definition,
+                cl_attributes_value.extensible = coalesce(toBoolean(row.codelist.extensible), false),
+                cl_attributes_value.synonyms = row.codelist.synonyms
+            CREATE (cl_attributes_root)-[:LATEST]->(cl_attributes_value)
+            CREATE (cl_attributes_root)-[:LATEST_FINAL]->(cl_attributes_value)
+            CREATE (cl_attributes_root)-[:HAS_VERSION{
+                start_date: datetime($effective_date_string),
+                status: 'Final',
+                version: '1.0',
+                change_description: 'Imported from CDISC',
+                author_id: $author_id
+            }]->(cl_attributes_value)
+
+            WITH cl_attributes_value, row
+            FOREACH (package IN row.packages |
+                MERGE (package_codelist:CTPackageCodelist{uid: package.name + "_" + row.codelist.concept_id})
+                CREATE (package_codelist)-[:CONTAINS_ATTRIBUTES]->(cl_attributes_value)
+            )
+        }
+        """,
+        rows=plan["create"],
+        effective_date_string=effective_date,
+        author_id=AUTHOR_ID,
+    )
+    tx.run(
+        """
+        UNWIND $rows AS row
+        CALL { WITH row
+            MATCH (codelist_root:CTCodelistRoot{uid: row.codelist.concept_id})-[:HAS_NAME_ROOT]->(name_root)
+            WHERE NOT (name_root)-[:LATEST]->()
+            CREATE (name_root)-[:LATEST]->(name_value:CTCodelistNameValue)
+            SET
+                name_value.name = row.codelist.name
+            CREATE (name_root)-[:LATEST_FINAL]->(name_value)
+            CREATE (name_root)-[:HAS_VERSION{
+                start_date: datetime(),
+                status: 'Final',
+                version: '1.0',
+                change_description: $change_description,
+                author_id: $author_id
+            }]->(name_value)
+        }
+        """,
+        rows=plan["create"],
+        author_id=AUTHOR_ID,
+        change_description="Initial import from CDISC",
+    ).consume()
+    tx.run(
+        """
+        UNWIND $rows AS row
+        CALL { WITH row
+            MATCH (:CTCodelistRoot{uid: row.codelist.concept_id})-[:HAS_ATTRIBUTES_ROOT]
+                ->(cl_attributes_root)-[latest_final:LATEST_FINAL]->(cl_old_attributes_value)
+                <-[latest:LATEST]-(cl_attributes_root)
+            WITH cl_attributes_root, cl_old_attributes_value, latest, latest_final, row
+            MATCH (cl_attributes_root)-[has_version:HAS_VERSION]->(cl_old_attributes_value)
+            SET has_version.end_date = datetime($effective_date_string)
+            DELETE latest, latest_final
+
+            WITH cl_attributes_root, has_version.version AS version, row LIMIT 1
+            CREATE (cl_new_attributes_value:CTCodelistAttributesValue)
+            SET
+                cl_new_attributes_value.name = row.codelist.name,
+                cl_new_attributes_value.submission_value = row.codelist.submission_value,
+                cl_new_attributes_value.preferred_term = row.codelist.preferred_term,
+                cl_new_attributes_value.definition = row.codelist.definition,
+                cl_new_attributes_value.extensible = coalesce(toBoolean(row.codelist.extensible), false),
+                cl_new_attributes_value.synonyms = row.codelist.synonyms
+            CREATE (cl_attributes_root)-[:LATEST_FINAL]->(cl_new_attributes_value)
+            CREATE (cl_attributes_root)-[:HAS_VERSION{
+                start_date: datetime($effective_date_string),
+                status: 'Final',
+                version: toString(coalesce(toInteger(split(version, '.')[0]), 0) + 1) + '.0',
+                change_description: 'Imported from CDISC',
+                author_id: $author_id
+            }]->(cl_new_attributes_value)
+            CREATE (cl_attributes_root)-[:LATEST]->(cl_new_attributes_value)
+
+            WITH cl_new_attributes_value, row
+            FOREACH (package IN row.packages |
+                MERGE (package_codelist:CTPackageCodelist{uid: package.name + "_" + row.codelist.concept_id})
+                CREATE (package_codelist)-[:CONTAINS_ATTRIBUTES]->(cl_new_attributes_value)
+            )
+        }
+        """,
+        rows=plan["new_version"],
+        effective_date_string=effective_date,
+        author_id=AUTHOR_ID,
+    )
+    tx.run(
+        """
+        UNWIND $rows AS row
+        CALL { WITH row
+            MATCH (:CTCodelistRoot{uid: row.codelist.concept_id})-[:HAS_ATTRIBUTES_ROOT]->()-[:LATEST]->(cl_attributes_value)
+            WITH cl_attributes_value, row
+            UNWIND row.packages AS package
+                MATCH (package_codelist:CTPackageCodelist{uid: package.name + "_" + row.codelist.concept_id})
+                MERGE (package_codelist)-[:CONTAINS_ATTRIBUTES]->(cl_attributes_value)
+        }
+        """,
+        rows=plan["use_existing"],
+    )
+
+
+def write_term_values_batch(tx, plan, effective_date):
+    tx.run(
+        """
+        UNWIND $rows AS row
+        CALL { WITH row
+            MATCH (:CTTermRoot{uid: row.term.uid})-[:HAS_ATTRIBUTES_ROOT]->(t_attributes_root)
+            CREATE (t_attributes_value: CTTermAttributesValue)
+            SET
+                t_attributes_value.code_submission_value = row.term.code_submission_value,
+                t_attributes_value.name_submission_value = row.term.name_submission_value,
+                t_attributes_value.preferred_term = row.term.preferred_term,
+                t_attributes_value.definition = row.term.definition,
+                t_attributes_value.synonyms = row.term.synonyms,
+                t_attributes_value.concept_id = row.term.concept_id
+            CREATE (t_attributes_root)-[:LATEST]->(t_attributes_value)
+            CREATE (t_attributes_root)-[:LATEST_FINAL]->(t_attributes_value)
+            CREATE (t_attributes_root)-[:HAS_VERSION{
+                start_date: datetime($effective_date_string),
+                status: 'Final',
+                version: '1.0',
+                change_description: 'Imported from CDISC',
+                author_id: $author_id
+            }]->(t_attributes_value)
+
+            WITH t_attributes_value, row
+            FOREACH (package IN row.packages |
+                MERGE (package_term:CTPackageTerm{uid: package.name + "_" + row.term.uid})
+                CREATE (package_term)-[:CONTAINS_ATTRIBUTES]->(t_attributes_value)
+            )
+        }
+        """,
+        rows=plan["create"],
+        effective_date_string=effective_date,
+        author_id=AUTHOR_ID,
+    )
+    tx.run(
+        """
+        UNWIND $rows AS row
+        CALL { WITH row
+            MATCH (term_root:CTTermRoot{uid: row.term.uid})-[:HAS_NAME_ROOT]->(name_root)
+            WHERE NOT (name_root)-[:LATEST]->()
+            CREATE (name_root)-[:LATEST]->(name_value:CTTermNameValue)
+            SET
+                name_value.name = row.name,
+                name_value.name_sentence_case = row.name_sentence_case
+            CREATE (name_root)-[:LATEST_FINAL]->(name_value)
+            CREATE (name_root)-[:HAS_VERSION{
+                start_date: datetime(),
+                status: 'Final',
+                version: '1.0',
+                change_description: $change_description,
+                author_id: $author_id
+            }]->(name_value)
+        }
+        """,
+        rows=plan["create"],
+        author_id=AUTHOR_ID,
+        change_description="Initial import from CDISC",
+    ).consume()
+    tx.run(
+        """
+        UNWIND $rows AS row
+        CALL { WITH row
+            MATCH (:CTTermRoot{uid: row.term.uid})-[:HAS_ATTRIBUTES_ROOT]
+                ->(t_attributes_root)-[latest_final:LATEST_FINAL]->(t_old_attributes_value)
+                <-[latest:LATEST]-(t_attributes_root)
+            WITH t_attributes_root, t_old_attributes_value, latest, latest_final, row
+            MATCH (t_attributes_root)-[has_version:HAS_VERSION]->(t_old_attributes_value)
+            SET has_version.end_date = datetime($effective_date_string)
+            DELETE latest, latest_final
+
+            WITH t_attributes_root, has_version.version AS version, row LIMIT 1
+            CREATE (t_new_attributes_value:CTTermAttributesValue)
+            SET
+                t_new_attributes_value.code_submission_value = row.term.code_submission_value,
+                t_new_attributes_value.name_submission_value = row.term.name_submission_value,
+                t_new_attributes_value.preferred_term = row.term.preferred_term,
+                t_new_attributes_value.definition = row.term.definition,
+                t_new_attributes_value.synonyms = row.term.synonyms,
+                t_new_attributes_value.concept_id = row.term.concept_id
+            CREATE (t_attributes_root)-[:LATEST_FINAL]->(t_new_attributes_value)
+            CREATE (t_attributes_root)-[:HAS_VERSION{
+                start_date: datetime($effective_date_string),
+                status: 'Final',
+                version: toString(coalesce(toInteger(split(version, '.')[0]), 0) + 1) + '.0',
+                change_description: 'Imported from CDISC',
+                author_id: $author_id
+            }]->(t_new_attributes_value)
+            CREATE (t_attributes_root)-[:LATEST]->(t_new_attributes_value)
+
+            WITH t_new_attributes_value, row
+            FOREACH (package IN row.packages |
+                MERGE (package_term:CTPackageTerm{uid: package.name + "_" + row.term.uid})
+                CREATE (package_term)-[:CONTAINS_ATTRIBUTES]->(t_new_attributes_value)
+            )
+        }
+        """,
+        rows=plan["new_version"],
+        effective_date_string=effective_date,
+        author_id=AUTHOR_ID,
+    )
+    tx.run(
+        """
+        UNWIND $rows AS row
+        CALL { WITH row
+            MATCH (:CTTermRoot{uid: row.term.uid})-[:HAS_ATTRIBUTES_ROOT]->()-[:LATEST]->(t_attributes_value)
+            WITH t_attributes_value, row
+            UNWIND row.packages AS package
+                MATCH (package_term:CTPackageTerm{uid: package.name + "_" + row.term.uid})
+                MERGE (package_term)-[:CONTAINS_ATTRIBUTES]->(t_attributes_value)
+        }
+        """,
+        rows=plan["use_existing"],
+    )
+
+
+def update_attributes_batch(tx, codelists_data, effective_date):
+    cl_concept_ids = [cl["codelist"]["concept_id"] for cl in codelists_data]
+    existing_codelists = _fetch_all_codelists(tx, cl_concept_ids, effective_date)
+    codelist_plan = plan_codelist_attributes(
+        codelists_data, existing_codelists, effective_date
+    )
+
+    term_uids = list(
+        {
+            term_data["term"]["uid"]
+            for codelist_data in codelists_data
+            for term_data in codelist_data.get("terms_data", {})
+        }
+    )
+    existing_terms = _fetch_all_terms(tx, term_uids, effective_date)
+    term_rounds, summary = plan_term_values(
+        codelists_data, existing_terms, effective_date
+    )
+
+    write_codelist_attributes_batch(tx, codelist_plan, effective_date)
+    for term_plan in term_rounds:
+        write_term_values_batch(tx, term_plan, effective_date)
+
+    summary["new_codelists"] = len(codelist_plan["create"])
+    summary["updated_codelists"] = len(codelist_plan["new_version"])
+    summary["unchanged_codelists"] = len(codelist_plan["use_existing"]) + len(
+        codelist_plan.get("skip", [])
+    )
+    return summary
+
+
+def print_throughput(phase, nbr_items, unit, elapsed_time):
+    rate = nbr_items / elapsed_time if elapsed_time > 0 else float("inf")
+    print(
+        f"==      {phase}: {nbr_items} {unit} in {round(elapsed_time, 1)} seconds, {round(rate, 1)} {unit}/s"
+    )
+
+
+def write_codelists_batched(mdr_neo4j_driver, mdr_db_name, codelists_data, effective_date, batch_size):
+    """Writes the codelists and terms of one effective date into the MDR, chunk by chunk"""
+    nbr_codelists = len(codelists_data)
+    nbr_terms = sum(len(data["terms_data"]) for data in codelists_data)
+
+    print(f"==  * Merging version independant codelist data, batch size {batch_size}.")
+    start_time = time.time()
+    with mdr_neo4j_driver.session(database=mdr_db_name) as session:
+        for chunk in chunks(codelists_data, batch_size):
+            session.write_transaction(
+                merge_codelists_version_independent_data_batch, chunk, effective_date
+            )
+    print_throughput("Codelists", nbr_codelists, "codelists", time.time() - start_time)
+
+    print("==  * Updating HAS_TERM and HAD_TERM relationships.")
+    start_time = time.time()
+    added_terms, removed_terms, unchanged_terms = 0, 0, 0
+    with mdr_neo4j_driver.session(database=mdr_db_name) as session:
+        for chunk in chunks(codelists_data, batch_size):
+            added, removed, unchanged = session.write_transaction(
+                update_has_term_and_had_term_relationships_batch, chunk, effective_date
+            )
+            added_terms += added
+            removed_terms += removed
+            unchanged_terms += unchanged
+    print(f"==      Terms added to codelists:     {added_terms:6}")
+    print(f"==      Terms removed from codelists: {removed_terms:6}")
+    print(f"==      Unchanged terms in codelists: {unchanged_terms:6}")
+    print_throughput("Codelist terms", nbr_terms, "terms", time.time() - start_time)
+
+    print("==  * Updating attributes.")
+    start_time = time.time()
+    summary = {}
+    with mdr_neo4j_driver.session(database=mdr_db_name) as session:
+        for chunk in chunks(codelists_data, batch_size):
+            chunk_summary = session.write_transaction(
+                update_attributes_batch, chunk, effective_date
+            )
+            for key, value in chunk_summary.items():
+                summary[key] = summary.get(key, 0) + value
+    print(f"==      New codelists:       {summary.get('new_codelists', 0):6}")
+    print(f"==      Updated codelists:   {summary.get('updated_codelists', 0):6}")
+    print(f"==      Unchanged codelists: {summary.get('unchanged_codelists', 0):6}")
+    print(f"==      New terms:           {summary.get('new_terms', 0):6}")
+    print(f"==      Updated terms:       {summary.get('updated_terms', 0):6}")
+    print(f"==      Unchanged terms:     {summary.get('unchanged_terms', 0):6}")
+    print_throughput("Attributes", nbr_terms, "terms", time.time() - start_time)
+
+
 ##########################################################################
 # Update this part of the code to apply sponsor-specific transformations #
 ##########################################################################
@@ -1051,6 +1667,16 @@ def sponsor_specific_parse_term_name(codelist, term):
     return newname
 
 
+def read_from_cdisc_db(effective_date, cdisc_ct_neo4j_driver, cdisc_db_name):
+    """Reads the data of the effective date that is imported into the MDR from the CDISC DB"""
+    with cdisc_ct_neo4j_driver.session(database=cdisc_db_name) as session:
+        ignored_stats = session.read_transaction(get_ignored_stats, effective_date)
+        packages_data = session.read_transaction(get_packages, effective_date)
+        codelists_data = session.read_transaction(get_codelists, effective_date)
+        session.close()
+    return ignored_stats, packages_data, codelists_data
+
+
 def import_from_cdisc_db_into_mdr(
     effective_date,
     cdisc_ct_neo4j_driver,
@@ -1058,7 +1684,16 @@ def import_from_cdisc_db_into_mdr(
     mdr_neo4j_driver,
     mdr_db_name,
     author_id,
+    batch_size=CT_IMPORT_BATCH_SIZE,
+    cdisc_data=None,
 ):
+    """
+    Imports the CT of the effective date from the CDISC DB into the MDR DB.
+
+    :param cdisc_data: optional, a future holding the result of `read_from_cdisc_db`
+        for the effective date, when it has been read ahead (cf. `prefetched`).
+        If not given, the data is read from the CDISC DB here.
+    """
     global AUTHOR_ID
     AUTHOR_ID = author_id
 
@@ -1068,16 +1703,13 @@ def import_from_cdisc_db_into_mdr(
         print("WARNING: No effective date specified. Not importing anything.")
         return
 
-    with cdisc_ct_neo4j_driver.session(database=cdisc_db_name) as session:
-        with session.begin_transaction() as tx:
-            print_ignored_stats(tx, effective_date)
-            tx.commit()
-
-        # read from the CDISC DB
-        packages_data = session.read_transaction(get_packages, effective_date)
-        codelists_data = session.read_transaction(get_codelists, effective_date)
-
-        session.close()
+    if cdisc_data is not None:
+        ignored_stats, packages_data, codelists_data = cdisc_data.result()
+    else:
+        ignored_stats, packages_data, codelists_data = read_from_cdisc_db(
+            effective_date, cdisc_ct_neo4j_driver, cdisc_db_name
+        )
+    print_ignored_stats(ignored_stats)
 
     with mdr_neo4j_driver.session(database=mdr_db_name) as session:
         # write to the clinical MDR db
@@ -1092,46 +1724,51 @@ def import_from_cdisc_db_into_mdr(
             effective_date,
         )
         session.close()
-    print("==  * Merging version independant codelist data.")
-    with mdr_neo4j_driver.session(database=mdr_db_name) as session:
-        for data in codelists_data:
-            # This is split into three separate transactions to reduce ram footprint
-            session.write_transaction(
-                merge_codelist_version_independent_data,
-                data,
-            )
-            session.write_transaction(
-                merge_codelist_packages_version_independent_data, data, effective_date
-            )
-            session.write_transaction(
-                merge_codelist_terms_version_independent_data,
-                data,
-            )
-        session.close()
-
-    with mdr_neo4j_driver.session(database=mdr_db_name) as session:
-        print("==  * Updating HAS_TERM and HAD_TERM relationships.")
-        added_terms, removed_terms, unchanged_terms = session.write_transaction(
-            update_has_term_and_had_term_relationships, codelists_data, effective_date
+    if batch_size:
+        write_codelists_batched(
+            mdr_neo4j_driver, mdr_db_name, codelists_data, effective_date, batch_size
         )
-        print(f"==      Terms added to codelists:     {added_terms:6}")
-        print(f"==      Terms removed from codelists: {removed_terms:6}")
-        print(f"==      Unchanged terms in codelists: {unchanged_terms:6}")
-        session.close()
-
-    with mdr_neo4j_driver.session(database=mdr_db_name) as session:
-        print("==  * Updating attributes.")
-        summary = session.write_transaction(
-            update_attributes, codelists_data, effective_date
-        )
-        print(f"==      New codelists:       {summary['new_codelists']:6}")
-        print(f"==      Updated codelists:   {summary['updated_codelists']:6}")
-        print(f"==      Unchanged codelists: {summary['unchanged_codelists']:6}")
-        print(f"==      New terms:           {summary['new_terms']:6}")
-        print(f"==      Updated terms:       {summary['updated_terms']:6}")
-        print(f"==      Unchanged terms:     {summary['unchanged_terms']:6}")
+    else:
+        print("==  * Merging version independant codelist data.")
+        with mdr_neo4j_driver.session(database=mdr_db_name) as session:
+            for data in codelists_data:
+                # This is split into three separate transactions to reduce ram footprint
+                session.write_transaction(
+                    merge_codelist_version_independent_data,
+                    data,
+                )
+                session.write_transaction(
+                    merge_codelist_packages_version_independent_data, data, effective_date
+                )
+                session.write_transaction(
+                    merge_codelist_terms_version_independent_data,
+                    data,
+                )
+            session.close()
 
-        session.close()
+        with mdr_neo4j_driver.session(database=mdr_db_name) as session:
+            print("==  * Updating HAS_TERM and HAD_TERM relationships.")
+            added_terms, removed_terms, unchanged_terms = session.write_transaction(
+                update_has_term_and_had_term_relationships, codelists_data, effective_date
+            )
+            print(f"==      Terms added to codelists:     {added_terms:6}")
+            print(f"==      Terms removed from codelists: {removed_terms:6}")
+            print(f"==      Unchanged terms in codelists: {unchanged_terms:6}")
+            session.close()
+
+        with mdr_neo4j_driver.session(database=mdr_db_name) as session:
+            print("==  * Updating attributes.")
+            summary = session.write_transaction(
+                update_attributes, codelists_data, effective_date
+            )
+            print(f"==      New codelists:       {summary['new_codelists']:6}")
+            print(f"==      Updated codelists:   {summary['updated_codelists']:6}")
+            print(f"==      Unchanged codelists: {summary['unchanged_codelists']:6}")
+            print(f"==      New terms:           {summary['new_terms']:6}")
+            print(f"==      Updated terms:       {summary['updated_terms']:6}")
+            print(f"==      Unchanged terms:     {summary['unchanged_terms']:6}")
+
+            session.close()
 
     with mdr_neo4j_driver.session(database=mdr_db_name) as session:
         session.write_transaction(create_user, author_id)    
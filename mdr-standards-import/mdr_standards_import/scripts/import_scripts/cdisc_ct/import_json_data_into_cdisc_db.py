@@ -1,4 +1,4 @@
-import json, time
+import time
 import traceback
 from mdr_standards_import.scripts.entities.cdisc_ct.ct_import import CTImport
 from mdr_standards_import.scripts.entities.cdisc_ct.package import Package
@@ -75,12 +75,42 @@ def finish_import(tx, import_id):
     ).single()
 
 
+def load_packages(ct_import, effective_date, data_directory):
+    """
+    Loads the JSON package files of the effective date into the given CT import
+    and resolves the inconsistencies where possible. This does not access the DB.
+    """
+    file_names = [
+        file_name
+        for file_name in listdir(data_directory)
+        if file_name.endswith(effective_date + ".json")
+    ]
+    for file_name in file_names:
+        print(f"==  * Processing file: '{file_name}'.")
+        with open(path.join(data_directory, file_name), "r") as package_file:
+            package = Package(ct_import)
+            package.load_from_json_file(package_file)
+            ct_import.add_package(package)
+
+    ct_import.check_for_inconsistencies()
+
+    inconsistency_resolver = InconsistencyResolver()
+    inconsistency_resolver.resolve(ct_import)
+
+
+def load_ct_import(effective_date, data_directory, author_id):
+    ct_import = CTImport(effective_date, author_id)
+    load_packages(ct_import, effective_date, data_directory)
+    return ct_import
+
+
 def import_json_data_into_cdisc_db(
     effective_date,
     data_directory,
     cdisc_import_neo4j_driver,
     cdisc_import_db_name,
     author_id,
+    ct_import=None,
 ):
     """
     :param effective_date: string, the effective date in ISO 8601 format (YYYY-MM-DD)
@@ -92,11 +122,19 @@ def import_json_data_into_cdisc_db(
     :param cdisc_import_db_name: string, the name of the Neo4j database in which the CDISC data is loaded
         in the first place (after it will be loaded into the default MDR db)
     :param author_id: string, the id of the user that triggers this step
+    :param ct_import: optional, a future holding the result of `load_ct_import` for the effective date,
+        when the JSON files have been loaded ahead (cf. `prefetched`).
+        If not given, the JSON files are loaded here.
     """
 
     try:
         start_time = time.time()
-        ct_import = CTImport(effective_date, author_id)
+        if ct_import is not None:
+            ct_import = ct_import.result()
+            is_loaded = True
+        else:
+            ct_import = CTImport(effective_date, author_id)
+            is_loaded = False
 
         # If using a staging database, it might not exist yet
         # so we need to create it first
@@ -114,22 +152,8 @@ def import_json_data_into_cdisc_db(
             session.write_transaction(await_indexes)
             import_id = session.write_transaction(create_import_node, ct_import)
 
-            file_names = [
-                file_name
-                for file_name in listdir(data_directory)
-                if file_name.endswith(effective_date + ".json")
-            ]
-            for file_name in file_names:
-                print(f"==  * Processing file: '{file_name}'.")
-                with open(path.join(data_directory, file_name), "r") as package_file:
-                    package = Package(ct_import)
-                    package.load_from_json_data(json.load(package_file))
-                    ct_import.add_package(package)
-
-            ct_import.check_for_inconsistencies()
-
-            inconsistency_resolver = InconsistencyResolver()
-            inconsistency_resolver.resolve(ct_import)
+            if not is_loaded:
+                load_packages(ct_import, effective_date, data_directory)
 
             create_ct_import(ct_import, session)
 
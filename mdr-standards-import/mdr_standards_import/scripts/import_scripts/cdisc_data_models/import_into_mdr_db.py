@@ -57,6 +57,38 @@ CLASS_VERSION_REL_TYPE = "HAS_INSTANCE"
 VARIABLE_VERSION_REL_TYPE = "HAS_INSTANCE"
 SCENARIO_VERSION_REL_TYPE = "HAS_INSTANCE"
 
+# Number of rows written per statement when merging the classes, scenarii and variables,
+# 0 selects the per item loader.
+DATA_MODEL_IMPORT_BATCH_SIZE = int(load_env("DATA_MODEL_IMPORT_BATCH_SIZE", "1000"))
+
+# Properties compared to decide whether an existing instance is reused
+CLASS_PROPERTIES = ("title", "label", "description")
+SCENARIO_PROPERTIES = ("label",)
+VARIABLE_PROPERTIES = (
+    "title",
+    "label",
+    "description",
+    "role",
+    "notes",
+    "variable_c_code",
+    "usage_restrictions",
+    "examples",
+    "value_list",
+    "described_value_domain",
+    "role_description",
+    "simple_datatype",
+    "length",
+    "implementation_notes",
+    "mapping_instructions",
+    "prompt",
+    "question_text",
+    "completion_instructions",
+    "core",
+    "analysis_variable_set",
+)
+# Properties of a scenario variable held by its instance, the others are held by its implementation
+VARIABLE_INSTANCE_PROPERTIES = ("title", "label", "simple_datatype", "length")
+
 VARIABLE_VALUE_LIST_MAPPINGS_FILE = load_env(
     "VARIABLE_VALUE_LIST_MAPPINGS_FILE",
     "cdisc_data/extra/variable_value_list_mappings.csv",
@@ -95,6 +127,17 @@ def import_from_cdisc_db_into_mdr(
 
     start_time = time.time()
 
+    if DATA_MODEL_IMPORT_BATCH_SIZE:
+        merge_classes_fn = merge_classes
+        merge_scenarios_fn = merge_scenarios
+        merge_variables_fn = merge_variables
+        link_variables_fn = link_variables_with_variables
+    else:
+        merge_classes_fn = merge_classes_per_item
+        merge_scenarios_fn = merge_scenarios_per_item
+        merge_variables_fn = merge_variables_per_item
+        link_variables_fn = link_variables_with_variables_per_item
+
     if catalogue is None or version_number is None:
         print(
             f"WARNING: No catalogue or version number specified. Not importing anything."
@@ -103,6 +146,7 @@ def import_from_cdisc_db_into_mdr(
 
     with cdisc_neo4j_driver.session(database=cdisc_db_name) as session:
         # read from the CDISC DB
+        phase_start_time = time.time()
         version_data = session.read_transaction(get_version, catalogue, version_number)
         classes_data = session.read_transaction(get_classes, catalogue, version_number)
         scenarios_data = session.read_transaction(
@@ -113,11 +157,18 @@ def import_from_cdisc_db_into_mdr(
         )
 
         session.close()
+        print_phase_duration(
+            "Read from the CDISC DB",
+            len(classes_data) + len(scenarios_data) + len(variables_data),
+            "items",
+            time.time() - phase_start_time,
+        )
 
         if len(version_data) > 0 and "version" in version_data[0]:
             with mdr_neo4j_driver.session(database=mdr_db_name) as session:
                 # write to the clinical MDR db
                 print("==  * Merging structure nodes and relationships.")
+                phase_start_time = time.time()
                 session.write_transaction(
                     merge_structure_nodes_and_relationships,
                     version_data[0]["version"],
@@ -125,45 +176,76 @@ def import_from_cdisc_db_into_mdr(
                     scenarios_data,
                     variables_data,
                 )
+                print_phase_duration(
+                    "Structure",
+                    len(classes_data) + len(scenarios_data) + len(variables_data),
+                    "items",
+                    time.time() - phase_start_time,
+                )
 
                 print("==  * Merging Data Model / Implementation Guide.")
+                phase_start_time = time.time()
                 session.write_transaction(merge_data_model, version_data[0]["version"])
+                print_phase_duration(
+                    "Data model", 1, "versions", time.time() - phase_start_time
+                )
 
                 print("==  * Merging Classes.")
+                phase_start_time = time.time()
                 (
                     added_classes,
                     updated_classes,
                     unchanged_classes,
                 ) = session.write_transaction(
-                    merge_classes, version_data[0]["version"], classes_data
+                    merge_classes_fn, version_data[0]["version"], classes_data
                 )
                 print(f"==      Added classes:       {added_classes:6}")
                 print(f"==      Updated classes:     {updated_classes:6}")
                 print(f"==      Unchanged classes:   {unchanged_classes:6}")
+                print_phase_duration(
+                    "Classes",
+                    len(classes_data),
+                    "classes",
+                    time.time() - phase_start_time,
+                )
 
                 print("==  * Merging Scenarii.")
+                phase_start_time = time.time()
                 (
                     added_scenarii,
                     updated_scenarii,
                     unchanged_scenarii,
                 ) = session.write_transaction(
-                    merge_scenarios, version_data[0]["version"], scenarios_data
+                    merge_scenarios_fn, version_data[0]["version"], scenarios_data
                 )
                 print(f"==      Added scenarii:      {added_scenarii:6}")
                 print(f"==      Updated scenarii:    {updated_scenarii:6}")
                 print(f"==      Unchanged scenarii:  {unchanged_scenarii:6}")
+                print_phase_duration(
+                    "Scenarii",
+                    len(scenarios_data),
+                    "scenarii",
+                    time.time() - phase_start_time,
+                )
 
                 print("==  * Merging Variables.")
+                phase_start_time = time.time()
                 (
                     added_variables,
                     updated_variables,
                     unchanged_variables,
                 ) = session.write_transaction(
-                    merge_variables, version_data[0]["version"], variables_data
+                    merge_variables_fn, version_data[0]["version"], variables_data
                 )
                 print(f"==      Added variables:     {added_variables:6}")
                 print(f"==      Updated variables:   {updated_variables:6}")
                 print(f"==      Unchanged variables: {unchanged_variables:6}")
+                print_phase_duration(
+                    "Variables",
+                    len(variables_data),
+                    "variables",
+                    time.time() - phase_start_time,
+                )
 
                 # This has to happen after the variables creation transaction has been committed
                 # Otherwise, new variables are not matched
@@ -172,11 +254,18 @@ def import_from_cdisc_db_into_mdr(
                     == DataModelType.IMPLEMENTATION.value
                 ):
                     print("==  * Linking dataset variables with variable classes.")
+                    phase_start_time = time.time()
                     session.write_transaction(
-                        link_variables_with_variables,
+                        link_variables_fn,
                         version_data[0]["version"],
                         variables_data,
                     )
+                    print_phase_duration(
+                        "Variable links",
+                        len(variables_data),
+                        "variables",
+                        time.time() - phase_start_time,
+                    )
 
                 session.close()
 
@@ -189,6 +278,13 @@ def import_from_cdisc_db_into_mdr(
     print("============================================")
 
 
+def print_phase_duration(phase, nbr_items, unit, elapsed_time):
+    rate = nbr_items / elapsed_time if elapsed_time > 0 else float("inf")
+    print(
+        f"==      {phase}: {nbr_items} {unit} in {round(elapsed_time, 1)} seconds, {round(rate, 1)} {unit}/s"
+    )
+
+
 def get_version(tx, catalogue: str, prefixed_version_number: str):
     version_data = tx.run(
         """
@@ -445,15 +541,1030 @@ def merge_data_model(tx, version_data):
             MATCH (v:DataModelVersion {{uid: version_data.uid}})
             CREATE (v)-[:{version_rel_type}]->(dm_value)
         """,
-            data_model_uid=data_model_uid,
-            version_data=version_data,
-            version_number=version_number,
-            prefixed_version_number=prefixed_version_number,
-            author_id=AUTHOR_ID,
-        )
+            data_model_uid=data_model_uid,
+            version_data=version_data,
+            version_number=version_number,
+            prefixed_version_number=prefixed_version_number,
+            author_id=AUTHOR_ID,
+        )
+
+    if not is_foundational:
+        link_ig_with_data_model(tx, version_data)
+
+
+def parse_value_list_mapping_file() -> "dict[str, ValueListMapping]":
+    # Read the variable value list mappings CSV file
+    # And load the records into a dictionary of ValueListMapping objects
+    # Dictionary entry key should be sponsormodelname_datasetuid_value
+    value_list_mappings = {}
+
+    if os.path.isfile(VARIABLE_VALUE_LIST_MAPPINGS_FILE) is True:
+        with open(VARIABLE_VALUE_LIST_MAPPINGS_FILE, "r") as f:
+            csv_reader = csv.reader(f)
+
+            headers = next(csv_reader)
+
+            for row in csv_reader:
+                sponsor_model_name = row[headers.index("model_name")]
+                dataset_uid = row[headers.index("dataset_uid")]
+                variable_uid = row[headers.index("variable_uid")]
+                code_submission_value = row[headers.index("term_code_submission_value")]
+
+                key = f"{sponsor_model_name}_{dataset_uid}_{variable_uid}_{code_submission_value}"
+
+                # Create a ValueListMapping object and add it to the dictionary
+                # You would need to define the ValueListMapping class
+                value_list_mappings[key] = ValueListMapping(
+                    model_name=sponsor_model_name,
+                    dataset_uid=dataset_uid,
+                    term_code_submission_value=code_submission_value,
+                    term_uid=row[headers.index("term_uid")],
+                    variable_uid=variable_uid,
+                    codelist_uid=row[headers.index("codelist_uid")],
+                )
+
+    return value_list_mappings
+
+
+##########################################################################
+# Set-based loading of classes, scenarios and variables                  #
+##########################################################################
+# The instances of a catalogue are read once per kind of item and indexed
+# by uid and by the values of the properties compared to decide on reuse.
+# The items are then planned in order, as they were merged one by one:
+# an instance created for an item can be reused by the following items.
+# Finally, all instances are created and linked with UNWIND statements,
+# in chunks of DATA_MODEL_IMPORT_BATCH_SIZE rows.
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def run_batched(tx, query, rows, **params):
+    """Runs the query with $rows set to each chunk of rows, returns the records of all chunks"""
+    records = []
+    for chunk in chunks(rows, DATA_MODEL_IMPORT_BATCH_SIZE):
+        records.extend(tx.run(query, rows=chunk, **params).data())
+    return records
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    return value
+
+
+class ReusableInstances:
+    """
+    Instances of the items of a catalogue, indexed by item uid and by the values of the compared properties.
+
+    An instance is a dict holding either the node `id` of an existing instance (and `id_impl` for scenario variables),
+    or the `key` of the item it is planned to be created for.
+    """
+
+    def __init__(self, properties):
+        self.properties = properties
+        self.uids = set()
+        self.instances = {}
+
+    def _key(self, uid, values):
+        return (uid,) + tuple(
+            _hashable(values.get(name, None)) for name in self.properties
+        )
+
+    def add(self, uid, values, instance):
+        self.uids.add(uid)
+        # The first instance with these values is reused, like the former linear search did
+        self.instances.setdefault(self._key(uid, values), instance)
+
+    def has_uid(self, uid):
+        return uid in self.uids
+
+    def find(self, uid, values):
+        return self.instances.get(self._key(uid, values), None)
+
+
+def plan_instance(reusable, uid, values, key, counts):
+    """
+    Returns the instance to use for an item and whether it has to be created.
+    An item without instances for its uid is counted as new, otherwise as updated or unchanged.
+    """
+    instance = reusable.find(uid, values)
+    if instance is not None:
+        counts["unchanged"] += 1
+        return instance, False
+
+    counts["updated" if reusable.has_uid(uid) else "new"] += 1
+    instance = {"key": key}
+    reusable.add(uid, values, instance)
+    return instance, True
+
+
+def plan_classes(classes_data, reusable_classes):
+    counts = {"new": 0, "updated": 0, "unchanged": 0}
+    create_rows = []
+    link_rows = []
+    for key, class_data in enumerate(classes_data):
+        _class = class_data.get("class", None)
+        instance, create = plan_instance(
+            reusable_classes, _class["uid"], _class, key, counts
+        )
+        if create:
+            create_rows.append({"key": key, "class": _class})
+        link_rows.append({"instance": instance, "class": _class})
+    return create_rows, link_rows, counts
+
+
+def plan_scenarios(scenarios_data, reusable_scenarios):
+    counts = {"new": 0, "updated": 0, "unchanged": 0}
+    create_rows = []
+    link_rows = []
+    for key, scenario_data in enumerate(scenarios_data):
+        scenario = scenario_data.get("scenario", None)
+        instance, create = plan_instance(
+            reusable_scenarios, scenario["uid"], scenario, key, counts
+        )
+        if create:
+            create_rows.append({"key": key, "scenario": scenario})
+        link_rows.append(
+            {
+                "instance": instance,
+                "scenario": scenario,
+                "dataset_href": scenario_data.get("dataset_href", None),
+            }
+        )
+    return create_rows, link_rows, counts
+
+
+def plan_variables(
+    variables_data, reusable_class_variables, reusable_scenario_variables
+):
+    """
+    Plans the variables of a class and the variables of a scenario.
+
+    The instance of a scenario variable holds part of its properties, the others are held
+    by its scenario variable implementation. A scenario variable can reuse an instance
+    together with one of its implementations, and a class variable can reuse the instance
+    of a scenario variable when the properties of the instance alone are the same.
+    """
+    counts = {"new": 0, "updated": 0, "unchanged": 0}
+    create_rows = []
+    link_rows = []
+    for key, variable_data in enumerate(variables_data):
+        variable = variable_data.get("variable", None)
+        parent_type = variable_data.get("parent_type", None)
+        if parent_type == "scenario":
+            instance, create = plan_instance(
+                reusable_scenario_variables, variable["uid"], variable, key, counts
+            )
+            if create:
+                reusable_class_variables.add(
+                    variable["uid"],
+                    {
+                        name: variable.get(name, None)
+                        for name in VARIABLE_INSTANCE_PROPERTIES
+                    },
+                    instance,
+                )
+        else:
+            instance, create = plan_instance(
+                reusable_class_variables, variable["uid"], variable, key, counts
+            )
+        if create:
+            create_rows.append(
+                {"key": key, "parent_type": parent_type, "variable": variable}
+            )
+        link_rows.append(
+            {
+                "instance": instance,
+                "created": create,
+                "parent_type": parent_type,
+                "parent_href": variable_data.get("parent_href", None),
+                "variable": variable,
+            }
+        )
+    return create_rows, link_rows, counts
+
+
+def resolve_instances(link_rows, records):
+    """
+    Sets the node ids of the instances of the rows, from the records of the created instances.
+    Rows of items whose instance could not be created are left out.
+    """
+    created = {record["key"]: record for record in records}
+    rows = []
+    for row in link_rows:
+        row = dict(row)
+        instance = row.pop("instance")
+        if "key" in instance:
+            instance = created.get(instance["key"], None)
+            if instance is None:
+                continue
+        row["instance_id"] = instance["id"]
+        row["impl_id"] = instance.get("id_impl", None)
+        rows.append(row)
+    return rows
+
+
+def get_reusable_instances(tx, query, properties, **params):
+    """Returns the instances of the query records (uid, id, instance and for scenario variables id_impl, impl)"""
+    reusable = ReusableInstances(properties)
+    for record in tx.run(query, **params):
+        values = record["instance"]
+        instance = {"id": record["id"]}
+        if "impl" in record.keys():
+            # The properties of the implementation take precedence
+            values = {**values, **record["impl"]}
+            instance["id_impl"] = record["id_impl"]
+        reusable.add(record["uid"], values, instance)
+    return reusable
+
+
+def create_replaced_by_relationships(
+    tx, rows, item_name, version_rel_types, prefixed_version_number
+):
+    """
+    Links the instances of the rows with the instances of the prior versions of their items,
+    when the prior version belongs to another root.
+    """
+    prior_hrefs = list(
+        {
+            row[item_name]["prior_version"]
+            for row in rows
+            if row[item_name].get("prior_version", None)
+        }
+    )
+    if not prior_hrefs:
+        return
+    prior_instances = {}
+    result = tx.run(
+        f"""
+        MATCH ()-[rel:{"|".join(version_rel_types)}]->(prior_instance_node)<-[:HAS_INSTANCE]-(prior_root_node)
+        WHERE rel.href IN $prior_hrefs
+        RETURN rel.href AS href, id(prior_instance_node) AS id, prior_root_node.uid AS uid
+        """,
+        prior_hrefs=prior_hrefs,
+    )
+    for record in result:
+        prior_instances.setdefault(record["href"], []).append(record)
+
+    replaced_rows = [
+        {
+            "instance_id": row["instance_id"],
+            "prior_id": prior_instance["id"],
+            "catalogue": row[item_name].get("catalogue", None),
+        }
+        for row in rows
+        for prior_instance in prior_instances.get(
+            row[item_name].get("prior_version", None), []
+        )
+        if prior_instance["uid"] is not None
+        and prior_instance["uid"] != row[item_name]["uid"]
+    ]
+    run_batched(
+        tx,
+        """
+        UNWIND $rows AS row
+        MATCH (instance) WHERE id(instance)=row.instance_id
+        MATCH (prior_instance_node) WHERE id(prior_instance_node)=row.prior_id
+        MERGE (instance)<-[rep:REPLACED_BY]-(prior_instance_node)
+        SET rep.catalogue=row.catalogue, rep.version_number=$prefixed_version_number
+        """,
+        replaced_rows,
+        prefixed_version_number=prefixed_version_number,
+    )
+
+
+def merge_classes(tx, version_data, classes_data):
+    model_value_label = ""
+    class_root_label = ""
+    class_value_label = ""
+    model_to_class_rel_type = ""
+    version_to_model_rel_type = ""
+    version_to_class_rel_type = ""
+    prefixed_version_number = _prettify_version_number(version_data["version_number"])
+    if version_data["data_model_type"] == DataModelType.FOUNDATIONAL.value:
+        model_value_label = DATA_MODEL_VALUE_LABEL
+        class_root_label = DATASET_CLASS_ROOT_LABEL
+        class_value_label = DATASET_CLASS_VALUE_LABEL
+        model_to_class_rel_type = CATALOGUE_TO_CLASS_ROOT_REL_TYPE
+        version_to_model_rel_type = VERSION_TO_DATA_MODEL_REL_TYPE
+        version_to_class_rel_type = VERSION_TO_CLASS_REL_TYPE
+    elif version_data["data_model_type"] == DataModelType.IMPLEMENTATION.value:
+        model_value_label = DATA_MODEL_IG_VALUE_LABEL
+        class_root_label = DATASET_ROOT_LABEL
+        class_value_label = DATASET_VALUE_LABEL
+        model_to_class_rel_type = CATALOGUE_TO_DATASET_ROOT_REL_TYPE
+        version_to_model_rel_type = VERSION_TO_DATA_MODEL_IG_REL_TYPE
+        version_to_class_rel_type = VERSION_TO_DATASET_REL_TYPE
+
+    reusable_classes = get_reusable_instances(
+        tx,
+        f"""
+        MATCH (root:{class_root_label})-[:{CLASS_VERSION_REL_TYPE}]->(value)
+            <-[:{version_to_class_rel_type}]-(:DataModelVersion)<-[:CONTAINS_VERSION]-(catalogue:DataModelCatalogue {{name: $catalogue}})
+        WHERE root.uid IN $uids
+        RETURN DISTINCT root.uid AS uid, id(value) AS id, properties(value) AS instance
+        ORDER BY id
+        """,
+        CLASS_PROPERTIES,
+        catalogue=version_data["catalogue"],
+        uids=list({class_data["class"]["uid"] for class_data in classes_data}),
+    )
+    create_rows, link_rows, counts = plan_classes(classes_data, reusable_classes)
+
+    records = run_batched(
+        tx,
+        f"""
+        UNWIND $rows AS row
+        MATCH (root:{class_root_label}{{uid: row.class.uid}})
+        CREATE (instance:{class_value_label})
+        SET
+           instance.title = row.class.title,
+           instance.label = row.class.label,
+           instance.description = row.class.description
+        CREATE (root)-[:{CLASS_VERSION_REL_TYPE}]->(instance)
+        RETURN row.key AS key, id(instance) AS id
+        """,
+        create_rows,
+    )
+    link_rows = resolve_instances(link_rows, records)
+    run_batched(
+        tx,
+        f"""
+        UNWIND $rows AS row
+        MATCH (instance) WHERE id(instance)=row.instance_id
+        MATCH (dmv:DataModelVersion {{href: $version_href}})-[:{version_to_model_rel_type}]->(model_value:{model_value_label})
+        MERGE (dmv)-[contains_class:{version_to_class_rel_type}]->(instance)
+        SET contains_class.href=row.class.href
+        MERGE (model_value)-[has_class:{model_to_class_rel_type}]->(instance)
+        ON CREATE SET has_class.ordinal = row.class.ordinal
+        """,
+        link_rows,
+        version_href=version_data["href"],
+    )
+    create_replaced_by_relationships(
+        tx,
+        link_rows,
+        "class",
+        [VERSION_TO_CLASS_REL_TYPE, VERSION_TO_DATASET_REL_TYPE],
+        prefixed_version_number,
+    )
+
+    if version_data["data_model_type"] == DataModelType.IMPLEMENTATION.value:
+        link_datasets_with_classes(
+            tx,
+            [class_data["class"] for class_data in classes_data],
+            prefixed_version_number,
+        )
+    link_classes_with_subclasses(
+        tx,
+        [
+            c["class"]
+            for c in classes_data
+            if c["class"]["subclasses"] is not None
+            and len(c["class"]["subclasses"]) > 0
+        ],
+        prefixed_version_number,
+    )
+    return counts["new"], counts["updated"], counts["unchanged"]
+
+
+def merge_scenarios(tx, version_data, scenarios_data):
+    prefixed_version_number = _prettify_version_number(version_data["version_number"])
+    class_value_label = ""
+    version_to_class_rel_type = ""
+    if version_data["data_model_type"] == DataModelType.FOUNDATIONAL.value:
+        class_value_label = DATASET_CLASS_VALUE_LABEL
+        version_to_class_rel_type = VERSION_TO_CLASS_REL_TYPE
+    elif version_data["data_model_type"] == DataModelType.IMPLEMENTATION.value:
+        class_value_label = DATASET_VALUE_LABEL
+        version_to_class_rel_type = VERSION_TO_DATASET_REL_TYPE
+
+    reusable_scenarios = get_reusable_instances(
+        tx,
+        f"""
+        MATCH (root:{SCENARIO_ROOT_LABEL})-[:{SCENARIO_VERSION_REL_TYPE}]->(instance)
+            <-[:{VERSION_TO_SCENARIO_REL_TYPE}]-(:DataModelVersion)<-[:CONTAINS_VERSION]-(catalogue:DataModelCatalogue {{name: $catalogue}})
+        WHERE root.uid IN $uids
+        RETURN DISTINCT root.uid AS uid, id(instance) AS id, properties(instance) AS instance
+        ORDER BY id
+        """,
+        SCENARIO_PROPERTIES,
+        catalogue=version_data["catalogue"],
+        uids=list(
+            {scenario_data["scenario"]["uid"] for scenario_data in scenarios_data}
+        ),
+    )
+    create_rows, link_rows, counts = plan_scenarios(scenarios_data, reusable_scenarios)
+
+    records = run_batched(
+        tx,
+        f"""
+        UNWIND $rows AS row
+        MATCH (root:{SCENARIO_ROOT_LABEL}{{uid: row.scenario.uid}})
+        CREATE (instance:{SCENARIO_VALUE_LABEL})
+        SET
+           instance.label = row.scenario.label
+        CREATE (root)-[:{SCENARIO_VERSION_REL_TYPE}]->(instance)
+        RETURN row.key AS key, id(instance) AS id
+        """,
+        create_rows,
+    )
+    run_batched(
+        tx,
+        f"""
+        UNWIND $rows AS row
+        MATCH (instance) WHERE id(instance)=row.instance_id
+        MATCH (dmv:DataModelVersion {{href: $version_href}})-[rel:{version_to_class_rel_type}]->(class_value:{class_value_label})
+            WHERE rel.href=row.dataset_href
+        MERGE (dmv)-[:{VERSION_TO_SCENARIO_REL_TYPE} {{href: row.scenario.href}}]->(instance)
+        CREATE (class_value)-[has_scenario:{CLASS_TO_SCENARIO_REL_TYPE}]->(instance)
+        SET has_scenario.ordinal = row.scenario.ordinal, has_scenario.version_number = $prefixed_version_number
+        """,
+        resolve_instances(link_rows, records),
+        version_href=version_data["href"],
+        prefixed_version_number=prefixed_version_number,
+    )
+    return counts["new"], counts["updated"], counts["unchanged"]
+
+
+def merge_variables(tx, version_data, variables_data):
+    prefixed_version_number = _prettify_version_number(version_data["version_number"])
+    model_root_label = ""
+    model_value_label = ""
+    class_value_label = ""
+    variable_root_label = ""
+    variable_value_label = ""
+    class_to_variable_rel_type = ""
+    version_to_class_rel_type = ""
+    version_to_variable_rel_type = ""
+    if version_data["data_model_type"] == DataModelType.FOUNDATIONAL.value:
+        model_root_label = DATA_MODEL_ROOT_LABEL
+        model_value_label = DATA_MODEL_VALUE_LABEL
+        class_value_label = DATASET_CLASS_VALUE_LABEL
+        variable_root_label = VARIABLE_CLASS_ROOT_LABEL
+        variable_value_label = VARIABLE_CLASS_VALUE_LABEL
+        class_to_variable_rel_type = CLASS_TO_VARIABLE_CLASS_ROOT_REL_TYPE
+        version_to_class_rel_type = VERSION_TO_CLASS_REL_TYPE
+        version_to_variable_rel_type = VERSION_TO_VARIABLE_CLASS_REL_TYPE
+    elif version_data["data_model_type"] == DataModelType.IMPLEMENTATION.value:
+        model_root_label = DATA_MODEL_IG_ROOT_LABEL
+        model_value_label = DATA_MODEL_IG_VALUE_LABEL
+        class_value_label = DATASET_VALUE_LABEL
+        variable_root_label = DATASET_VARIABLE_ROOT_LABEL
+        variable_value_label = DATASET_VARIABLE_VALUE_LABEL
+        class_to_variable_rel_type = CLASS_TO_DATASET_VARIABLE_ROOT_REL_TYPE
+        version_to_class_rel_type = VERSION_TO_DATASET_REL_TYPE
+        version_to_variable_rel_type = VERSION_TO_DATASET_VARIABLE_REL_TYPE
+
+    uids = list({variable_data["variable"]["uid"] for variable_data in variables_data})
+    reusable_class_variables = get_reusable_instances(
+        tx,
+        f"""
+        MATCH (root:{variable_root_label})-[:{VARIABLE_VERSION_REL_TYPE}]->(instance)
+            <-[:{version_to_variable_rel_type}]-(:DataModelVersion)<-[:CONTAINS_VERSION]-(catalogue:DataModelCatalogue {{name: $catalogue}})
+        WHERE root.uid IN $uids
+        RETURN DISTINCT root.uid AS uid, id(instance) AS id, properties(instance) AS instance
+        ORDER BY id
+        """,
+        VARIABLE_PROPERTIES,
+        catalogue=version_data["catalogue"],
+        uids=uids,
+    )
+    # Instances of the variables of the scenarii in the given catalogue and dataset,
+    # each with one of its scenario variable implementations
+    reusable_scenario_variables = get_reusable_instances(
+        tx,
+        f"""
+        MATCH (root:{variable_root_label})-[:{VARIABLE_VERSION_REL_TYPE}]->(instance)
+            <-[:{SCENARIO_TO_VARIABLE_REL_TYPE}]-(scenario:{SCENARIO_VALUE_LABEL})<-[:{CLASS_TO_SCENARIO_REL_TYPE}]-(:{class_value_label})
+            <--(:{model_value_label})<--(:{model_root_label})<--(catalogue:DataModelCatalogue {{name: $catalogue}})
+        WHERE root.uid IN $uids
+        MATCH (scenario)<-[:{SCENARIO_VARIABLE_TO_SCENARIO_REL_TYPE}]-(impl:{SCENARIO_VARIABLE_VALUE_LABEL})
+            <-[:{VARIABLE_TO_SCENARIO_VARIABLE_REL_TYPE}]-(instance)
+        RETURN DISTINCT root.uid AS uid, id(instance) AS id, properties(instance) AS instance,
+            id(impl) AS id_impl, properties(impl) AS impl
+        ORDER BY id, id_impl
+        """,
+        VARIABLE_PROPERTIES,
+        catalogue=version_data["catalogue"],
+        uids=uids,
+    )
+    create_rows, link_rows, counts = plan_variables(
+        variables_data, reusable_class_variables, reusable_scenario_variables
+    )
+
+    records = run_batched(
+        tx,
+        f"""
+        UNWIND $rows AS row
+        MATCH (root:{variable_root_label}{{uid: row.variable.uid}})
+        CREATE (value:{variable_value_label})
+        SET
+            value.title = row.variable.title,
+            value.label = row.variable.label,
+            value.simple_datatype = row.variable.simple_datatype,
+            value.length = row.variable.length,
+            value.description = row.variable.description,
+            value.role = row.variable.role,
+            value.notes = row.variable.notes,
+            value.variable_c_code = row.variable.variable_c_code,
+            value.usage_restrictions = row.variable.usage_restrictions,
+            value.examples = row.variable.examples,
+            value.value_list = row.variable.value_list,
+            value.described_value_domain = row.variable.described_value_domain,
+            value.role_description = row.variable.role_description,
+            value.implementation_notes = row.variable.implementation_notes,
+            value.mapping_instructions = row.variable.mapping_instructions,
+            value.prompt = row.variable.prompt,
+            value.question_text = row.variable.question_text,
+            value.completion_instructions = row.variable.completion_instructions,
+            value.core = row.variable.core,
+            value.analysis_variable_set = row.variable.analysis_variable_set
+        CREATE (root)-[:{VARIABLE_VERSION_REL_TYPE}]->(value)
+        RETURN row.key AS key, id(value) AS id
+        """,
+        [row for row in create_rows if row["parent_type"] != "scenario"],
+    )
+    records += run_batched(
+        tx,
+        f"""
+        UNWIND $rows AS row
+        MATCH (root:{variable_root_label}{{uid: row.variable.uid}})
+        CREATE (value:{variable_value_label})
+        SET
+            value.title = row.variable.title,
+            value.label = row.variable.label,
+            value.simple_datatype = row.variable.simple_datatype,
+            value.length = row.variable.length
+        CREATE (scenario_variable_value:{SCENARIO_VARIABLE_VALUE_LABEL})
+        SET
+            scenario_variable_value.description = row.variable.description,
+            scenario_variable_value.role = row.variable.role,
+            scenario_variable_value.notes = row.variable.notes,
+            scenario_variable_value.variable_c_code = row.variable.variable_c_code,
+            scenario_variable_value.usage_restrictions = row.variable.usage_restrictions,
+            scenario_variable_value.examples = row.variable.examples,
+            scenario_variable_value.value_list = row.variable.value_list,
+            scenario_variable_value.described_value_domain = row.variable.described_value_domain,
+            scenario_variable_value.role_description = row.variable.role_description,
+            scenario_variable_value.implementation_notes = row.variable.implementation_notes,
+            scenario_variable_value.mapping_instructions = row.variable.mapping_instructions,
+            scenario_variable_value.prompt = row.variable.prompt,
+            scenario_variable_value.question_text = row.variable.question_text,
+            scenario_variable_value.completion_instructions = row.variable.completion_instructions,
+            scenario_variable_value.core = row.variable.core
+        CREATE (root)-[:{VARIABLE_VERSION_REL_TYPE}]->(value)
+        RETURN row.key AS key, id(value) AS id, id(scenario_variable_value) AS id_impl
+        """,
+        [row for row in create_rows if row["parent_type"] == "scenario"],
+    )
+    link_rows = resolve_instances(link_rows, records)
+
+    run_batched(
+        tx,
+        f"""
+        UNWIND $rows AS row
+        MATCH (value) WHERE id(value)=row.instance_id
+        MATCH (dmv:DataModelVersion {{href: $version_href}})-[rel:{version_to_class_rel_type}]->(class_value:{class_value_label})
+            WHERE rel.href=row.parent_href
+        MERGE (dmv)-[:{version_to_variable_rel_type} {{href: row.variable.href}}]->(value)
+        MERGE (class_value)-[has_variable:{class_to_variable_rel_type} {{
+            ordinal: row.variable.ordinal,
+            version_number: $prefixed_version_number
+        }}]->(value)
+        """,
+        [row for row in link_rows if row["parent_type"] == "class"],
+        version_href=version_data["href"],
+        prefixed_version_number=prefixed_version_number,
+    )
+    run_batched(
+        tx,
+        f"""
+        UNWIND $rows AS row
+        MATCH (value) WHERE id(value)=row.instance_id
+        MATCH (scenario_variable_value) WHERE id(scenario_variable_value)=row.impl_id
+        MATCH (dmv:DataModelVersion {{href: $version_href}})-[rel:{VERSION_TO_SCENARIO_REL_TYPE}]->(scenario_value:{SCENARIO_VALUE_LABEL})
+            WHERE rel.href=row.parent_href
+        MERGE (dmv)-[:{version_to_variable_rel_type} {{href: row.variable.href}}]->(value)
+        MERGE (scenario_value)-[has_variable:{SCENARIO_TO_VARIABLE_REL_TYPE} {{
+            ordinal: row.variable.ordinal,
+            version_number: $prefixed_version_number
+        }}]->(value)
+        MERGE (dmv)-[contains_scenario_variable:{VERSION_TO_SCENARIO_VARIABLE_REL_TYPE}]->(scenario_variable_value)
+        MERGE (scenario_variable_value)-[:{SCENARIO_VARIABLE_TO_SCENARIO_REL_TYPE}]->(scenario_value)
+        MERGE (value)-[var_sc_rel:{VARIABLE_TO_SCENARIO_VARIABLE_REL_TYPE}{{version_number: $prefixed_version_number}}]->(scenario_variable_value)
+        """,
+        [row for row in link_rows if row["parent_type"] == "scenario"],
+        version_href=version_data["href"],
+        prefixed_version_number=prefixed_version_number,
+    )
+
+    # The codelists of a created variable are referenced by its instance,
+    # or by its scenario variable implementation for a scenario variable
+    codelist_rows = [
+        {
+            "node_id": (
+                row["impl_id"]
+                if row["parent_type"] == "scenario"
+                else row["instance_id"]
+            ),
+            "codelists": row["variable"]["codelists"],
+        }
+        for row in link_rows
+        if row["created"] and row["variable"].get("codelists", None)
+    ]
+    run_batched(
+        tx,
+        """
+        UNWIND $rows AS row
+        MATCH (node) WHERE id(node)=row.node_id
+        UNWIND row.codelists AS codelist
+        MATCH (c:CTCodelistRoot {uid: codelist})
+        MERGE (node)-[:REFERENCES_CODELIST]->(c)
+        """,
+        codelist_rows,
+    )
+    existing_codelists = set(
+        tx.run(
+            """
+            MATCH (c:CTCodelistRoot)
+            WHERE c.uid IN $uids
+            RETURN c.uid AS uid
+            """,
+            uids=list(
+                {codelist for row in codelist_rows for codelist in row["codelists"]}
+            ),
+        ).value()
+    )
+    # As when the variables were merged one by one, the prior version of a created variable
+    # is only linked when the variable references an existing codelist
+    create_replaced_by_relationships(
+        tx,
+        [
+            row
+            for row in link_rows
+            if not row["created"]
+            or any(
+                codelist in existing_codelists
+                for codelist in row["variable"].get("codelists", None) or []
+            )
+        ],
+        "variable",
+        [VERSION_TO_VARIABLE_CLASS_REL_TYPE, VERSION_TO_DATASET_VARIABLE_REL_TYPE],
+        prefixed_version_number,
+    )
+
+    value_list_mappings = parse_value_list_mapping_file()
+    terms_data_cache = {}
+    for row in link_rows:
+        if row["created"] and "value_list" in row["variable"]:
+            link_variable_with_value_terms(
+                tx,
+                version_data=version_data,
+                variable=row["variable"],
+                parent_href=row["parent_href"],
+                value_list_mappings=value_list_mappings,
+                terms_data_cache=terms_data_cache,
+            )
+
+    # The QUALIFIES_VARIABLES relationships exist between two variables of the same version,
+    # so they are created once all variables have been created
+    create_qualify_variable_relationships(
+        tx,
+        [
+            variable_data["variable"]
+            for variable_data in variables_data
+            if "qualifies_variables" in variable_data["variable"]
+            and len(variable_data["variable"]["qualifies_variables"]) > 0
+        ],
+        prefixed_version_number,
+    )
+
+    return counts["new"], counts["updated"], counts["unchanged"]
+
+
+def link_ig_with_data_model(tx, version_data):
+    tx.run(
+        """
+        MATCH (ig:DataModelIGValue {name:$ig_name})
+        MATCH (:DataModelVersion {href:$implements})-[:CONTAINS_DATA_MODEL]->(dm:DataModelValue)
+        MERGE (ig)-[:IMPLEMENTS]->(dm)
+    """,
+        ig_name=version_data["name"],
+        implements=version_data["implements_data_model"],
+    )
+
+
+def link_datasets_with_classes(tx, classes, prefixed_version_number):
+    run_batched(
+        tx,
+        f"""
+        UNWIND $rows AS class
+        MATCH (:DataModelVersion)-[rel:{VERSION_TO_DATASET_REL_TYPE}]->(dataset_instance:DatasetInstance)
+        WHERE rel.href=class.href
+        MATCH (:DataModelVersion)-[implemented_rel:{VERSION_TO_CLASS_REL_TYPE}]->(class_instance:DatasetClassInstance)
+        WHERE implemented_rel.href=class.implements_class
+        MERGE (dataset_instance)-[:IMPLEMENTS_DATASET_CLASS {{
+            catalogue: class.catalogue,
+            version_number: $prefixed_version_number
+        }}]->(class_instance)
+        """,
+        [_class for _class in classes if "implements_class" in _class],
+        prefixed_version_number=prefixed_version_number,
+    )
+
+
+def link_classes_with_subclasses(tx, classes, prefixed_version_number):
+    run_batched(
+        tx,
+        f"""
+        UNWIND $rows AS class
+        MATCH (:DataModelVersion)-[rel:{VERSION_TO_CLASS_REL_TYPE}|{VERSION_TO_DATASET_REL_TYPE}]->(class_value)
+        WHERE rel.href=class.href
+        UNWIND class.subclasses AS subclass_href
+        MATCH (:DataModelVersion)-[rel_sub:{VERSION_TO_CLASS_REL_TYPE}]->(subclass_value)
+        WHERE rel_sub.href=subclass_href
+        MERGE (class_value)<-[:HAS_PARENT_CLASS {{
+            catalogue: class.catalogue,
+            version_number: $prefixed_version_number
+        }}]-(subclass_value)
+        """,
+        classes,
+        prefixed_version_number=prefixed_version_number,
+    )
+
+
+def link_variables_with_variables(tx, version_data, variables_data):
+    prefixed_version_number = _prettify_version_number(version_data["version_number"])
+    variables = [
+        variable_data["variable"]
+        for variable_data in variables_data
+        if variable_data.get("variable", None)
+    ]
+    match = f"""
+        UNWIND $rows AS row
+        MATCH (n:DatasetVariable|VariableClass {{uid: row.uid}})-->(source_variable_value)<--(source_dmv:DataModelVersion {{name: $source_version}})
+        UNWIND row.classes_href AS class_href
+        MATCH ()-[rel:{VERSION_TO_VARIABLE_CLASS_REL_TYPE}|{VERSION_TO_DATASET_VARIABLE_REL_TYPE}]->(target_variable_value)
+        WHERE rel.href=class_href
+    """
+
+    run_batched(
+        tx,
+        f"""
+        {match}
+        MERGE (source_variable_value)-[:IMPLEMENTS_VARIABLE{{
+            catalogue: row.catalogue,
+            version_number: $prefixed_version_number
+        }}]->(target_variable_value)
+        """,
+        [
+            {
+                "uid": variable["uid"],
+                "classes_href": variable["implements_variables"],
+                "catalogue": variable["catalogue"],
+            }
+            for variable in variables
+            if "implements_variables" in variable
+            and len(variable["implements_variables"]) > 0
+        ],
+        source_version=version_data["name"],
+        prefixed_version_number=prefixed_version_number,
+    )
+    run_batched(
+        tx,
+        f"""
+        {match}
+        MERGE (source_variable_value)-[:HAS_MAPPING_TARGET{{
+            version_number: $prefixed_version_number
+        }}]->(target_variable_value)
+        """,
+        [
+            {"uid": variable["uid"], "classes_href": variable["mapping_targets"]}
+            for variable in variables
+            if "mapping_targets" in variable and len(variable["mapping_targets"]) > 0
+        ],
+        source_version=version_data["name"],
+        prefixed_version_number=prefixed_version_number,
+    )
+
+
+def terms_name_codelist_mapping(tx, term_name, cache=None):
+    # This query gets all Terms with code_submission_value = _value
+    # It also gets the codelists these belong to
+    # And it only returns the most recent version of a term for each codelist
+    # The terms of a value are looked up once per cache, the CT is not changed by the data models import
+    if cache is not None and term_name in cache:
+        return cache[term_name]
+    terms_data = tx.run(
+        """
+        MATCH (codelist_value:CTCodelistAttributesValue)<-[:LATEST]-(:CTCodelistAttributesRoot)<--(codelist_root:CTCodelistRoot)
+            -->(term_root:CTTermRoot)-->(:CTTermAttributesRoot)-[version_rel:HAS_VERSION]->(term:CTTermAttributesValue)
+        WHERE term.code_submission_value=$code_submission_value
+        WITH codelist_root, codelist_value, version_rel, term_root
+        ORDER BY codelist_root.uid, version_rel.start_date DESC
+        WITH codelist_root, codelist_value, collect(term_root)[0] AS terms
+        UNWIND terms AS term_root
+        RETURN DISTINCT term_root.uid AS term_uid, collect(DISTINCT {uid:codelist_root.uid, submission_value: codelist_value.submission_value}) AS codelists
+    """,
+        code_submission_value=term_name,
+    ).data()
+    if cache is not None:
+        cache[term_name] = terms_data
+
+    return terms_data
+
+
+def link_variable_with_value_terms(
+    tx,
+    version_data: dict,
+    variable: dict,
+    parent_href: str,
+    value_list_mappings: "dict[str, ValueListMapping]",
+    terms_data_cache: "dict[str, list] | None" = None,
+):
+    previous_codelist_uid = None
+    match_variable_clause = f"""
+        MATCH (dmv:DataModelVersion)-[rel:{VERSION_TO_DATASET_VARIABLE_REL_TYPE}]->(variable_instance:DatasetVariableInstance)
+        WHERE rel.href=$variable_href
+    """
+    create_relationship_clause = "MERGE (variable_instance)-[:REFERENCES_TERM]->(term)"
+    for _value in variable["value_list"]:
+        terms_data = terms_name_codelist_mapping(tx, _value, terms_data_cache)
+
+        # If there is only one CCode, then link the variable with it
+        if len(terms_data) == 1:
+            match_term = "MATCH (term: CTTermRoot {uid: $term_uid})"
+            query = " ".join(
+                [match_variable_clause, match_term, create_relationship_clause]
+            )
+            tx.run(
+                query,
+                term_uid=terms_data[0]["term_uid"],
+                variable_href=variable["href"],
+            )
+            # Store the codelist name in the list for the next case
+            if previous_codelist_uid is None:
+                previous_codelist_uid = terms_data[0]["codelists"][0]["uid"]
+
+        # Else, if other elements in the value_list had a single match, then use the term coming from the same codelist
+        else:
+            if previous_codelist_uid is not None:
+                # Hardcoding based on past data knowledge
+                if _value == "U":
+                    _value = "UNKNOWN"
+
+                    # Re-run the terms query for the replacement
+                    terms_data = terms_name_codelist_mapping(
+                        tx, _value, terms_data_cache
+                    )
+
+                # Link variable with terms
+                # Find the term which belongs to the same codelist as the previous hit
+                # For example, UNKNOWN in the STENRF codelist for the --STRTPT variables
+                term_uid = next(
+                    (
+                        term_data["term_uid"]
+                        for term_data in terms_data
+                        if previous_codelist_uid
+                        in [codelist["uid"] for codelist in term_data["codelists"]]
+                    ),
+                    None,
+                )
+
+                if term_uid is not None:
+                    match_term = "MATCH (term: CTTermRoot {uid: $term_uid})<--(:CTCodelistRoot{uid: $codelist_uid})"
+                    query = " ".join(
+                        [match_variable_clause, match_term, create_relationship_clause]
+                    )
+                    tx.run(
+                        query,
+                        variable_href=variable["href"],
+                        term_uid=term_uid,
+                        codelist_uid=previous_codelist_uid,
+                    )
+
+                    # Relationship created, go to next value in value_list
+                    continue
+
+            # If we reach here, it means there was more than one match for the value (or none)
+            # It also means the script could not figure out a codelist from other values in the value_list (if any)
+            # So, if one of the terms is in a codelist which submission_value is the same name as the variable uid, then use that term
+            if len(terms_data) > 0 and (
+                any(
+                    [
+                        variable["name"]
+                        in [
+                            codelist["submission_value"]
+                            for codelist in term_data["codelists"]
+                        ]
+                        for term_data in terms_data
+                    ]
+                )
+                or (
+                    variable["name"] == "DOMAIN"
+                    and any(
+                        [
+                            "SDOMAIN"
+                            in [
+                                codelist["submission_value"]
+                                for codelist in term_data["codelists"]
+                            ]
+                            for term_data in terms_data
+                        ]
+                    )
+                )
+            ):
+                term_uid = next(
+                    (
+                        term_data["term_uid"]
+                        for term_data in terms_data
+                        if variable["name"]
+                        in [
+                            codelist["submission_value"]
+                            for codelist in term_data["codelists"]
+                        ]
+                    ),
+                    None,
+                )
+
+                if term_uid is None and variable["name"] == "DOMAIN":
+                    term_uid = next(
+                        (
+                            term_data["term_uid"]
+                            for term_data in terms_data
+                            if "SDOMAIN"
+                            in [
+                                codelist["submission_value"]
+                                for codelist in term_data["codelists"]
+                            ]
+                        ),
+                        None,
+                    )
+
+                match_term = "MATCH (term: CTTermRoot {uid: $term_uid})"
+                query = " ".join(
+                    [match_variable_clause, match_term, create_relationship_clause]
+                )
+                tx.run(
+                    query,
+                    term_uid=term_uid,
+                    variable_href=variable["href"],
+                )
+
+            elif value_list_mappings:
+                # Finally, search the value list mappings coming from the file  for a match
+                value_list_mapping = value_list_mappings.get(
+                    f"{version_data['name']}_{parent_href.split('/')[-1]}_{variable['uid']}_{_value}",
+                    None,
+                )
+
+                if value_list_mapping is not None:
+                    # Create the relationship between DatasetVariable and CTTerm corresponding to the value
+                    match_term = "MATCH (term: CTTermRoot {uid: $term_uid})<--(:CTCodelistRoot{uid: $codelist_uid})"
+                    query = " ".join(
+                        [match_variable_clause, match_term, create_relationship_clause]
+                    )
+                    tx.run(
+                        query,
+                        variable_href=variable["href"],
+                        term_uid=value_list_mapping.term_uid,
+                        codelist_uid=value_list_mapping.codelist_uid,
+                    )
+
+
+def create_qualify_variable_relationships(
+    tx, source_variables, prefixed_version_number
+):
+    run_batched(
+        tx,
+        f"""
+        UNWIND $rows AS source_variable
+        MATCH ()-[source_rel:{VERSION_TO_VARIABLE_CLASS_REL_TYPE}]->(source_variable_value)
+        WHERE source_rel.href=source_variable.href
+        UNWIND source_variable.qualifies_variables AS target_href
+        MATCH ()-[target_rel:{VERSION_TO_VARIABLE_CLASS_REL_TYPE}]->(target_variable_value)
+        WHERE target_rel.href=target_href
+            MERGE (source_variable_value)-[:QUALIFIES_VARIABLE{{
+                catalogue: source_variable.catalogue,
+                version_number: $prefixed_version_number
+            }}]->(target_variable_value)
+        """,
+        source_variables,
+        prefixed_version_number=prefixed_version_number,
+    )
 
-    if not is_foundational:
-        link_ig_with_data_model(tx, version_data)
+
+# The per item loader below writes the classes, scenarii and variables one statement at a time.
+# It is selected with DATA_MODEL_IMPORT_BATCH_SIZE=0 and kept to compare the graphs written by both loaders.
+# Note that its queries match the model value with an untyped relationship `-[{version_to_model_rel_type}]->`
+# (the rel type is bound as a variable name), where the batched loader uses `-[:{version_to_model_rel_type}]->`.
 
 
 def _get_class_instances(tx, catalogue, data_model_type, uid):
@@ -569,7 +1680,7 @@ def _get_reusable_class(existing_classes, target_class):
     return None
 
 
-def merge_classes(tx, version_data, classes_data):
+def merge_classes_per_item(tx, version_data, classes_data):
     nbr_unchanged = 0
     nbr_updated = 0
     nbr_new = 0
@@ -629,7 +1740,7 @@ def _get_reusable_scenario(existing_scenarios, target_scenario):
             return reusable_version_id
 
 
-def merge_scenarios(tx, version_data, scenarios_data):
+def merge_scenarios_per_item(tx, version_data, scenarios_data):
     nbr_unchanged = 0
     nbr_updated = 0
     nbr_new = 0
@@ -716,10 +1827,11 @@ def _get_reusable_variable_ids(existing_variables, target_variable):
     return None, None
 
 
-def merge_variables(tx, version_data, variables_data):
+def merge_variables_per_item(tx, version_data, variables_data):
     nbr_unchanged = 0
     nbr_updated = 0
     nbr_new = 0
+    value_list_mappings = parse_value_list_mapping_file()
     for variable_data in variables_data:
         # First, iterate over all variables
         # If this uid already has at least one instance
@@ -730,8 +1842,6 @@ def merge_variables(tx, version_data, variables_data):
         parent_href = variable_data.get("parent_href", None)
         parent_type = variable_data.get("parent_type", None)
 
-        value_list_mappings = parse_value_list_mapping_file()
-
         records = _get_variable_instances(
             tx,
             catalogue=version_data["catalogue"],
@@ -785,7 +1895,7 @@ def merge_variables(tx, version_data, variables_data):
             "qualifies_variables" in variable
             and len(variable["qualifies_variables"]) > 0
         ):
-            create_qualify_variable_relationships(
+            create_qualify_variable_relationships_per_item(
                 tx,
                 source_variable=variable,
                 prefixed_version_number=_prettify_version_number(
@@ -796,40 +1906,6 @@ def merge_variables(tx, version_data, variables_data):
     return nbr_new, nbr_updated, nbr_unchanged
 
 
-def parse_value_list_mapping_file() -> "dict[str, ValueListMapping]":
-    # Read the variable value list mappings CSV file
-    # And load the records into a dictionary of ValueListMapping objects
-    # Dictionary entry key should be sponsormodelname_datasetuid_value
-    value_list_mappings = {}
-
-    if os.path.isfile(VARIABLE_VALUE_LIST_MAPPINGS_FILE) is True:
-        with open(VARIABLE_VALUE_LIST_MAPPINGS_FILE, "r") as f:
-            csv_reader = csv.reader(f)
-
-            headers = next(csv_reader)
-
-            for row in csv_reader:
-                sponsor_model_name = row[headers.index("model_name")]
-                dataset_uid = row[headers.index("dataset_uid")]
-                variable_uid = row[headers.index("variable_uid")]
-                code_submission_value = row[headers.index("term_code_submission_value")]
-
-                key = f"{sponsor_model_name}_{dataset_uid}_{variable_uid}_{code_submission_value}"
-
-                # Create a ValueListMapping object and add it to the dictionary
-                # You would need to define the ValueListMapping class
-                value_list_mappings[key] = ValueListMapping(
-                    model_name=sponsor_model_name,
-                    dataset_uid=dataset_uid,
-                    term_code_submission_value=code_submission_value,
-                    term_uid=row[headers.index("term_uid")],
-                    variable_uid=variable_uid,
-                    codelist_uid=row[headers.index("codelist_uid")],
-                )
-
-    return value_list_mappings
-
-
 def create_initial_class_instance(tx, version_data, _class):
     model_value_label = ""
     class_root_label = ""
@@ -1396,18 +2472,6 @@ def use_existing_variable_instance(
     )
 
 
-def link_ig_with_data_model(tx, version_data):
-    tx.run(
-        """
-        MATCH (ig:DataModelIGValue {name:$ig_name})
-        MATCH (:DataModelVersion {href:$implements})-[:CONTAINS_DATA_MODEL]->(dm:DataModelValue)
-        MERGE (ig)-[:IMPLEMENTS]->(dm)
-    """,
-        ig_name=version_data["name"],
-        implements=version_data["implements_data_model"],
-    )
-
-
 def link_dataset_with_class(tx, _class, prefixed_version_number):
     if "implements_class" in _class:
         tx.run(
@@ -1448,7 +2512,7 @@ def link_class_with_subclasses(tx, _class, subclasses, prefixed_version_number):
     )
 
 
-def link_variables_with_variables(tx, version_data, variables_data):
+def link_variables_with_variables_per_item(tx, version_data, variables_data):
     prefixed_version_number = _prettify_version_number(version_data["version_number"])
     for variable_data in variables_data:
         variable = variable_data.get("variable", None)
@@ -1500,183 +2564,9 @@ def link_variable_with_variable(tx, version_data, variable, prefixed_version_num
         )
 
 
-def terms_name_codelist_mapping(tx, term_name):
-    # This query gets all Terms with code_submission_value = _value
-    # It also gets the codelists these belong to
-    # And it only returns the most recent version of a term for each codelist
-    terms_data = tx.run(
-        """
-        MATCH (codelist_value:CTCodelistAttributesValue)<-[:LATEST]-(:CTCodelistAttributesRoot)<--(codelist_root:CTCodelistRoot)
-            -->(term_root:CTTermRoot)-->(:CTTermAttributesRoot)-[version_rel:HAS_VERSION]->(term:CTTermAttributesValue)
-        WHERE term.code_submission_value=$code_submission_value
-        WITH codelist_root, codelist_value, version_rel, term_root
-        ORDER BY codelist_root.uid, version_rel.start_date DESC
-        WITH codelist_root, codelist_value, collect(term_root)[0] AS terms
-        UNWIND terms AS term_root
-        RETURN DISTINCT term_root.uid AS term_uid, collect(DISTINCT {uid:codelist_root.uid, submission_value: codelist_value.submission_value}) AS codelists
-    """,
-        code_submission_value=term_name,
-    ).data()
-
-    return terms_data
-
-
-def link_variable_with_value_terms(
-    tx,
-    version_data: dict,
-    variable: dict,
-    parent_href: str,
-    value_list_mappings: "dict[str, ValueListMapping]",
+def create_qualify_variable_relationships_per_item(
+    tx, source_variable, prefixed_version_number
 ):
-    previous_codelist_uid = None
-    match_variable_clause = f"""
-        MATCH (dmv:DataModelVersion)-[rel:{VERSION_TO_DATASET_VARIABLE_REL_TYPE}]->(variable_instance:DatasetVariableInstance)
-        WHERE rel.href=$variable_href
-    """
-    create_relationship_clause = "MERGE (variable_instance)-[:REFERENCES_TERM]->(term)"
-    for _value in variable["value_list"]:
-        terms_data = terms_name_codelist_mapping(tx, _value)
-
-        # If there is only one CCode, then link the variable with it
-        if len(terms_data) == 1:
-            match_term = "MATCH (term: CTTermRoot {uid: $term_uid})"
-            query = " ".join(
-                [match_variable_clause, match_term, create_relationship_clause]
-            )
-            tx.run(
-                query,
-                term_uid=terms_data[0]["term_uid"],
-                variable_href=variable["href"],
-            )
-            # Store the codelist name in the list for the next case
-            if previous_codelist_uid is None:
-                previous_codelist_uid = terms_data[0]["codelists"][0]["uid"]
-
-        # Else, if other elements in the value_list had a single match, then use the term coming from the same codelist
-        else:
-            if previous_codelist_uid is not None:
-                # Hardcoding based on past data knowledge
-                if _value == "U":
-                    _value = "UNKNOWN"
-
-                    # Re-run the terms query for the replacement
-                    terms_data = terms_name_codelist_mapping(tx, _value)
-
-                # Link variable with terms
-                # Find the term which belongs to the same codelist as the previous hit
-                # For example, UNKNOWN in the STENRF codelist for the --STRTPT variables
-                term_uid = next(
-                    (
-                        term_data["term_uid"]
-                        for term_data in terms_data
-                        if previous_codelist_uid
-                        in [codelist["uid"] for codelist in term_data["codelists"]]
-                    ),
-                    None,
-                )
-
-                if term_uid is not None:
-                    match_term = "MATCH (term: CTTermRoot {uid: $term_uid})<--(:CTCodelistRoot{uid: $codelist_uid})"
-                    query = " ".join(
-                        [match_variable_clause, match_term, create_relationship_clause]
-                    )
-                    tx.run(
-                        query,
-                        variable_href=variable["href"],
-                        term_uid=term_uid,
-                        codelist_uid=previous_codelist_uid,
-                    )
-
-                    # Relationship created, go to next value in value_list
-                    continue
-
-            # If we reach here, it means there was more than one match for the value (or none)
-            # It also means the script could not figure out a codelist from other values in the value_list (if any)
-            # So, if one of the terms is in a codelist which submission_value is the same name as the variable uid, then use that term
-            if len(terms_data) > 0 and (
-                any(
-                    [
-                        variable["name"]
-                        in [
-                            codelist["submission_value"]
-                            for codelist in term_data["codelists"]
-                        ]
-                        for term_data in terms_data
-                    ]
-                )
-                or (
-                    variable["name"] == "DOMAIN"
-                    and any(
-                        [
-                            "SDOMAIN"
-                            in [
-                                codelist["submission_value"]
-                                for codelist in term_data["codelists"]
-                            ]
-                            for term_data in terms_data
-                        ]
-                    )
-                )
-            ):
-                term_uid = next(
-                    (
-                        term_data["term_uid"]
-                        for term_data in terms_data
-                        if variable["name"]
-                        in [
-                            codelist["submission_value"]
-                            for codelist in term_data["codelists"]
-                        ]
-                    ),
-                    None,
-                )
-
-                if term_uid is None and variable["name"] == "DOMAIN":
-                    term_uid = next(
-                        (
-                            term_data["term_uid"]
-                            for term_data in terms_data
-                            if "SDOMAIN"
-                            in [
-                                codelist["submission_value"]
-                                for codelist in term_data["codelists"]
-                            ]
-                        ),
-                        None,
-                    )
-
-                match_term = "MATCH (term: CTTermRoot {uid: $term_uid})"
-                query = " ".join(
-                    [match_variable_clause, match_term, create_relationship_clause]
-                )
-                tx.run(
-                    query,
-                    term_uid=term_uid,
-                    variable_href=variable["href"],
-                )
-
-            elif value_list_mappings:
-                # Finally, search the value list mappings coming from the file  for a match
-                value_list_mapping = value_list_mappings.get(
-                    f"{version_data['name']}_{parent_href.split('/')[-1]}_{variable['uid']}_{_value}",
-                    None,
-                )
-
-                if value_list_mapping is not None:
-                    # Create the relationship between DatasetVariable and CTTerm corresponding to the value
-                    match_term = "MATCH (term: CTTermRoot {uid: $term_uid})<--(:CTCodelistRoot{uid: $codelist_uid})"
-                    query = " ".join(
-                        [match_variable_clause, match_term, create_relationship_clause]
-                    )
-                    tx.run(
-                        query,
-                        variable_href=variable["href"],
-                        term_uid=value_list_mapping.term_uid,
-                        codelist_uid=value_list_mapping.codelist_uid,
-                    )
-
-
-def create_qualify_variable_relationships(tx, source_variable, prefixed_version_number):
     tx.run(
         f"""
             UNWIND $targets_href AS target_href
@@ -1,4 +1,6 @@
-import sys, re
+import sys, re, json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from neo4j import GraphDatabase
 from os import environ
 from os import listdir
@@ -404,3 +406,123 @@ def create_user(tx, author_id):
         """,
         author_id=author_id,
     )
+
+
+def prefetched(items, load, depth: int = 1):
+    """
+    Yields `(item, future)` pairs for the given items in order, where the future
+    holds the result of `load(item)`.
+
+    The items are loaded one after the other in a background thread,
+    at most `depth` items ahead of the item that is being processed by the caller,
+    so that loading the next items overlaps with processing the current one.
+    Call `future.result()` to get the loaded data or the exception raised while loading.
+    """
+    items = list(items)
+    pending = deque()
+    next_index = 0
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") as executor:
+        try:
+            for index, item in enumerate(items):
+                while next_index < len(items) and next_index <= index + depth:
+                    pending.append(executor.submit(load, items[next_index]))
+                    next_index += 1
+                yield item, pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class _JsonStreamReader:
+    def __init__(self, file, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _read_more(self) -> bool:
+        if self.eof:
+            return False
+        if self.pos > self.chunk_size:
+            self.buffer = self.buffer[self.pos :]
+            self.pos = 0
+        # read at least as much as is buffered, so that re-decoding a large value
+        # that does not fit into the buffer yet stays linear
+        chunk = self.file.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_more():
+                raise ValueError("Unexpected end of JSON data")
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(
+                f"Expected one of '{chars}' but got '{char}' in the JSON data"
+            )
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # a number at the end of the buffer might continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read_more()
+
+    def array_items(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def iter_json_object(file, streamed_keys=(), chunk_size: int = 1 << 16):
+    """
+    Parses the JSON object in the given text file incrementally and yields its
+    `(key, value)` members in document order.
+
+    The values of the members in `streamed_keys` must be arrays, they are yielded as generators
+    that parse one array item at a time, so that large arrays are never held in memory at once.
+    Such a generator must be consumed before the next member is read,
+    items that were not consumed are skipped.
+    """
+    reader = _JsonStreamReader(file, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key in streamed_keys and reader.peek() == "[":
+            items = reader.array_items()
+            yield key, items
+            for _ in items:
+                pass
+        else:
+            yield key, reader.value()
+        if reader.expect(",}") == "}":
+            return
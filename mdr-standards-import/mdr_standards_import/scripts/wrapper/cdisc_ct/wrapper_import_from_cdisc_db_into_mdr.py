@@ -14,17 +14,21 @@ The script expects the following parameters:
 from os import environ
 from mdr_standards_import.scripts.import_scripts.cdisc_ct.import_into_mdr_db import (
     import_from_cdisc_db_into_mdr,
+    read_from_cdisc_db,
 )
 from mdr_standards_import.scripts.utils import (
     get_effective_date,
     get_author_id,
     get_cdisc_neo4j_driver,
     get_mdr_neo4j_driver,
+    prefetched,
 )
 
 
 CDISC_IMPORT_DATABASE = environ.get("NEO4J_CDISC_IMPORT_DATABASE", "cdisc")
 MDR_DATABASE = environ.get("NEO4J_MDR_DATABASE", "neo4j")
+# Number of effective dates that are read ahead from the cdisc-DB while the current one is written
+CT_IMPORT_PREFETCH = int(environ.get("CT_IMPORT_PREFETCH", "0"))
 
 
 def wrapper_import_cdisc_ct_from_cdisc_db_into_mdr(
@@ -51,5 +55,49 @@ def wrapper_import_cdisc_ct_from_cdisc_db_into_mdr(
     cdisc_neo4j_driver.close()
 
 
+def wrapper_import_cdisc_ct_dates_from_cdisc_db_into_mdr(
+    author_id: str, effective_dates: list, prefetch: int = CT_IMPORT_PREFETCH
+):
+    """
+    Imports the given effective dates one after the other, like calling
+    `wrapper_import_cdisc_ct_from_cdisc_db_into_mdr` for each date.
+
+    With `prefetch` > 0, the data of the next dates is read from the cdisc-DB while the
+    current date is written into the MDR-DB. The MDR-DB is still written date by date in the given order.
+    """
+    if prefetch <= 0:
+        for effective_date in effective_dates:
+            wrapper_import_cdisc_ct_from_cdisc_db_into_mdr(author_id, effective_date)
+        return
+
+    cdisc_neo4j_driver = get_cdisc_neo4j_driver()
+    mdr_neo4j_driver = get_mdr_neo4j_driver()
+
+    for effective_date, cdisc_data in prefetched(
+        effective_dates,
+        lambda effective_date: read_from_cdisc_db(
+            effective_date, cdisc_neo4j_driver, CDISC_IMPORT_DATABASE
+        ),
+        prefetch,
+    ):
+        print(f"============================================")
+        print(
+            f"== Importing from the cdisc-DB='{CDISC_IMPORT_DATABASE}' into the MDR-DB='{MDR_DATABASE}' for the effective_date='{effective_date}'..."
+        )
+        print(f"==")
+        import_from_cdisc_db_into_mdr(
+            effective_date,
+            cdisc_neo4j_driver,
+            CDISC_IMPORT_DATABASE,
+            mdr_neo4j_driver,
+            MDR_DATABASE,
+            author_id,
+            cdisc_data=cdisc_data,
+        )
+
+    mdr_neo4j_driver.close()
+    cdisc_neo4j_driver.close()
+
+
 if __name__ == "__main__":
     wrapper_import_cdisc_ct_from_cdisc_db_into_mdr(get_author_id(1), get_effective_date(2))
@@ -17,16 +17,20 @@ from os import environ
 
 from mdr_standards_import.scripts.import_scripts.cdisc_ct.import_json_data_into_cdisc_db import (
     import_json_data_into_cdisc_db,
+    load_ct_import,
 )
 from mdr_standards_import.scripts.utils import (
     get_directory_name,
     get_author_id,
     get_cdisc_neo4j_driver,
     get_ordered_package_dates,
+    prefetched,
 )
 
 
 CDISC_IMPORT_DATABASE = environ.get("NEO4J_CDISC_IMPORT_DATABASE", "cdisc")
+# Number of effective dates that are loaded ahead while the current one is imported
+CT_IMPORT_PREFETCH = int(environ.get("CT_IMPORT_PREFETCH", "0"))
 
 
 def wrapper_import_cdisc_ct_into_cdisc_db(
@@ -39,7 +43,17 @@ def wrapper_import_cdisc_ct_into_cdisc_db(
 
     package_dates = get_ordered_package_dates(json_data_directory)
     print(f"Found the following dates: {str(package_dates)}")
-    for effective_date in package_dates:
+    if CT_IMPORT_PREFETCH > 0:
+        dates = prefetched(
+            package_dates,
+            lambda effective_date: load_ct_import(
+                effective_date, json_data_directory, author_id
+            ),
+            CT_IMPORT_PREFETCH,
+        )
+    else:
+        dates = ((effective_date, None) for effective_date in package_dates)
+    for effective_date, ct_import in dates:
         print(f"============================================")
         print(
             f"== Importing JSON data into the cdisc-DB='{CDISC_IMPORT_DATABASE}' for the effective_date='{effective_date}'."
@@ -51,6 +65,7 @@ def wrapper_import_cdisc_ct_into_cdisc_db(
             cdisc_neo4j_driver,
             CDISC_IMPORT_DATABASE,
             author_id,
+            ct_import=ct_import,
         )
 
     cdisc_neo4j_driver.close()
@@ -0,0 +1,154 @@
+import pytest
+
+from mdr_standards_import.scripts.import_scripts.cdisc_ct.import_into_mdr_db import (
+    chunks,
+    plan_codelist_attributes,
+    plan_has_term_changes,
+    plan_term_values,
+)
+
+
+def _term(uid, preferred_term="Term", definition="def"):
+    return {
+        "uid": uid,
+        "concept_id": uid.split("_")[0],
+        "code_submission_value": uid,
+        "name_submission_value": uid,
+        "preferred_term": preferred_term,
+        "definition": definition,
+        "synonyms": [],
+    }
+
+
+def _codelist(concept_id, term_uids, name="Codelist"):
+    return {
+        "codelist": {
+            "concept_id": concept_id,
+            "name": name,
+            "submission_value": concept_id,
+            "preferred_term": name,
+            "definition": "def",
+            "extensible": False,
+            "synonyms": [],
+        },
+        "packages": [{"name": "SDTM CT 2020-03-27"}],
+        "terms_data": [
+            {"term": _term(uid), "packages": [{"name": "SDTM CT 2020-03-27"}]}
+            for uid in term_uids
+        ],
+    }
+
+
+class Test:
+    def test__chunks(self):
+        # given, when, then
+        assert list(chunks([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
+        assert list(chunks([], 2)) == []
+
+    def test__plan_has_term_changes(self):
+        # given
+        codelists_data = [_codelist("C1", ["T1_C1", "T2_C1", "T3_C1"])]
+        active = {"C1": ["T1_C1", "T4_C1"]}
+        retired = {"C1": ["T3_C1"]}
+
+        # when
+        to_deactivate, to_add, counts = plan_has_term_changes(
+            codelists_data, active, retired
+        )
+
+        # then
+        assert to_deactivate == [{"codelist_uid": "C1", "term_uids": ["T4_C1"]}]
+        assert to_add == [{"codelist_uid": "C1", "term_uids": ["T2_C1"]}]
+        assert counts == (1, 1, 1)
+
+    def test__plan_codelist_attributes(self):
+        # given
+        new, changed, same = (
+            _codelist("C1", []),
+            _codelist("C2", [], name="New name"),
+            _codelist("C3", []),
+        )
+        existing = {
+            "C2": {
+                "cl_attributes_value": _codelist("C2", [])["codelist"],
+                "cl_attributes_value_for_date": None,
+            },
+            "C3": {
+                "cl_attributes_value": same["codelist"],
+                "cl_attributes_value_for_date": None,
+            },
+        }
+
+        # when
+        plan = plan_codelist_attributes([new, changed, same], existing, "2020-03-27")
+
+        # then
+        assert [row["codelist"]["concept_id"] for row in plan["create"]] == ["C1"]
+        assert [row["codelist"]["concept_id"] for row in plan["new_version"]] == [
+            "C2"
+        ]
+        assert [row["codelist"]["concept_id"] for row in plan["use_existing"]] == [
+            "C3"
+        ]
+
+    def test__plan_codelist_attributes_changed_for_date(self):
+        # given
+        codelist_data = _codelist("C1", [], name="New name")
+        existing = {
+            "C1": {
+                "cl_attributes_value": codelist_data["codelist"],
+                "cl_attributes_value_for_date": _codelist("C1", [])["codelist"],
+            }
+        }
+
+        # when, then
+        with pytest.raises(RuntimeError):
+            plan_codelist_attributes([codelist_data], existing, "2020-03-27")
+
+    def test__plan_term_values_shared_terms(self):
+        # given
+        # T1 is new and shared by both codelists, T2 exists and is unchanged
+        codelists_data = [
+            _codelist("C1", ["T1_C1", "T2_C2"]),
+            _codelist("C2", ["T1_C1", "T2_C2"]),
+        ]
+        existing = {
+            "T2_C2": {
+                "t_attributes_value": _term("T2_C2"),
+                "t_attributes_value_for_date": None,
+            }
+        }
+
+        # when
+        rounds, counts = plan_term_values(codelists_data, existing, "2020-03-27")
+
+        # then
+        # the second codelist sees T1 as existing, like the per codelist loader does
+        assert len(rounds) == 2
+        assert [row["term"]["uid"] for row in rounds[0]["create"]] == ["T1_C1"]
+        assert rounds[0]["create"][0]["name"] == "Term"
+        assert [row["term"]["uid"] for row in rounds[0]["use_existing"]] == ["T2_C2"]
+        assert [row["term"]["uid"] for row in rounds[1]["use_existing"]] == [
+            "T1_C1",
+            "T2_C2",
+        ]
+        assert counts == {"new_terms": 1, "updated_terms": 0, "unchanged_terms": 3}
+
+    def test__plan_term_values_changed_term(self):
+        # given
+        codelists_data = [
+            _codelist("C1", ["T1_C1"]),
+        ]
+        existing = {
+            "T1_C1": {
+                "t_attributes_value": _term("T1_C1", definition="old"),
+                "t_attributes_value_for_date": None,
+            }
+        }
+
+        # when
+        rounds, counts = plan_term_values(codelists_data, existing, "2020-03-27")
+
+        # then
+        assert [row["term"]["uid"] for row in rounds[0]["new_version"]] == ["T1_C1"]
+        assert counts == {"new_terms": 0, "updated_terms": 1, "unchanged_terms": 0}
@@ -1,3 +1,6 @@
+import io
+import json
+
 from mdr_standards_import.scripts.utils import *
 
 
@@ -77,3 +80,57 @@ class Test:
         assert is_newer_than("2021-01-01", "2020-01-01") is True
         assert is_newer_than("2021-01-01", "2020") is True
         assert is_newer_than("2021-01-01", "2019-10-29") is True
+
+    def test__iter_json_object(self):
+        # given
+        data = {
+            "name": "SDTM CT 2020-03-27",
+            "codelists": [{"conceptId": "C1", "terms": []}, {"conceptId": "C2"}],
+            "number": 12345,
+            "empty": [],
+        }
+        text = json.dumps(data, indent=2)
+
+        # when, then
+        # use a tiny chunk size to split values across chunks
+        for chunk_size in [1, 3, 7, 1 << 16]:
+            members = []
+            for key, value in iter_json_object(
+                io.StringIO(text), streamed_keys={"codelists", "empty"}, chunk_size=chunk_size
+            ):
+                members.append((key, list(value) if key in ("codelists", "empty") else value))
+            assert members == list(data.items())
+
+    def test__iter_json_object_skips_unconsumed_items(self):
+        # given
+        text = '{"codelists": [1, 2, 3], "name": "x"}'
+
+        # when
+        members = [
+            key for key, _ in iter_json_object(io.StringIO(text), streamed_keys={"codelists"})
+        ]
+
+        # then
+        assert members == ["codelists", "name"]
+
+    def test__prefetched(self):
+        # given
+        loaded = []
+
+        def load(item):
+            loaded.append(item)
+            if item == 3:
+                raise ValueError(item)
+            return item * 10
+
+        # when
+        results = []
+        for item, future in prefetched([1, 2, 3], load, depth=1):
+            try:
+                results.append((item, future.result()))
+            except ValueError:
+                results.append((item, "error"))
+
+        # then
+        assert results == [(1, 10), (2, 20), (3, "error")]
+        assert loaded == [1, 2, 3]
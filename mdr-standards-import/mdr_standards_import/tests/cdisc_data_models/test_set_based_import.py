@@ -0,0 +1,301 @@
+import random
+
+from mdr_standards_import.scripts.import_scripts.cdisc_data_models import (
+    import_into_mdr_db,
+)
+from mdr_standards_import.scripts.import_scripts.cdisc_data_models.import_into_mdr_db import (
+    VARIABLE_INSTANCE_PROPERTIES,
+    VARIABLE_PROPERTIES,
+    ReusableInstances,
+    merge_variables,
+    merge_variables_per_item,
+    plan_classes,
+    plan_variables,
+)
+
+# An SDTMIG/ADaMIG sized model
+NBR_DATASETS = 80
+NBR_SCENARIOS = 20
+COMMON_VARIABLES = ["STUDYID", "DOMAIN", "USUBJID", "VISITNUM", "VISIT", "EPOCH"]
+
+
+def _variable(name, label, codelists=None, description=None):
+    return {
+        "uid": name,
+        "name": name,
+        "title": name,
+        "label": label,
+        "description": description,
+        "simple_datatype": "Char",
+        "length": 8,
+        "core": "Req",
+        "ordinal": "1",
+        "href": f"/mdr/{name}/{label}",
+        "codelists": codelists or [],
+        "examples": ["A", "B"],
+    }
+
+
+def generate_variables_data(seed=42):
+    """Variables of datasets and scenarii, with the common variables repeated in each of them"""
+    rng = random.Random(seed)
+    variables_data = []
+    for dataset in range(NBR_DATASETS):
+        domain = f"D{dataset:02}"
+        for name in COMMON_VARIABLES:
+            # A few datasets describe a common variable differently
+            label = f"{name} label" if rng.random() > 0.05 else f"{name} in {domain}"
+            variables_data.append(
+                {
+                    "variable": _variable(name, label),
+                    "parent_href": f"/mdr/datasets/{domain}",
+                    "parent_type": "class",
+                }
+            )
+        for index in range(rng.randint(20, 60)):
+            name = f"{domain}VAR{index}"
+            variables_data.append(
+                {
+                    "variable": _variable(name, f"{name} label", codelists=["C66742"]),
+                    "parent_href": f"/mdr/datasets/{domain}",
+                    "parent_type": "class",
+                }
+            )
+    for scenario in range(NBR_SCENARIOS):
+        for name in COMMON_VARIABLES[:3] + [f"SC{scenario}VAR{i}" for i in range(5)]:
+            variables_data.append(
+                {
+                    "variable": _variable(
+                        name,
+                        f"{name} label",
+                        description=f"In scenario {scenario % 3}",
+                    ),
+                    "parent_href": f"/mdr/scenarios/{scenario}",
+                    "parent_type": "scenario",
+                }
+            )
+    return variables_data
+
+
+def plan_variables_one_by_one(variables_data, class_instances, scenario_instances):
+    """Plans the variables like they were merged one by one, with a linear search of the instances of each uid"""
+    class_instances = list(class_instances)
+    scenario_instances = list(scenario_instances)
+    counts = {"new": 0, "updated": 0, "unchanged": 0}
+    instances = []
+    for key, variable_data in enumerate(variables_data):
+        variable = variable_data["variable"]
+        is_scenario = variable_data["parent_type"] == "scenario"
+        candidates = [
+            (values, instance)
+            for uid, values, instance in (
+                scenario_instances if is_scenario else class_instances
+            )
+            if uid == variable["uid"]
+        ]
+        instance = next(
+            (
+                instance
+                for values, instance in candidates
+                if all(
+                    values.get(name, None) == variable.get(name, None)
+                    for name in VARIABLE_PROPERTIES
+                )
+            ),
+            None,
+        )
+        if instance is not None:
+            counts["unchanged"] += 1
+        else:
+            counts["updated" if candidates else "new"] += 1
+            instance = {"key": key}
+            if is_scenario:
+                scenario_instances.append((variable["uid"], variable, instance))
+                class_instances.append(
+                    (
+                        variable["uid"],
+                        {
+                            name: variable.get(name, None)
+                            for name in VARIABLE_INSTANCE_PROPERTIES
+                        },
+                        instance,
+                    )
+                )
+            else:
+                class_instances.append((variable["uid"], variable, instance))
+        instances.append(instance)
+    return instances, counts
+
+
+def _reusable(instances, properties=VARIABLE_PROPERTIES):
+    reusable = ReusableInstances(properties)
+    for uid, values, instance in instances:
+        reusable.add(uid, values, instance)
+    return reusable
+
+
+class FakeTransaction:
+    """Records the statements, and returns node ids for the instances created"""
+
+    def __init__(self):
+        self.statements = []
+        self.next_id = 1000
+
+    def run(self, query, **params):
+        self.statements.append((query, params))
+        records = []
+        if "RETURN row.key AS key" in query:
+            for row in params["rows"]:
+                records.append(
+                    {"key": row["key"], "id": self.next_id, "id_impl": -self.next_id}
+                )
+                self.next_id += 1
+        return FakeResult(records)
+
+
+class FakeResult(list):
+    def data(self):
+        return list(self)
+
+    def value(self):
+        return []
+
+
+class Test:
+    def test__plan_classes(self):
+        # given
+        classes_data = [
+            {"class": {"uid": "AE", "title": "AE", "label": "Adverse Events"}},
+            {"class": {"uid": "CM", "title": "CM", "label": "Medications"}},
+            {"class": {"uid": "DM", "title": "DM", "label": "Demographics"}},
+        ]
+        reusable = _reusable(
+            [
+                ("CM", {"title": "CM", "label": "Concomitant Medications"}, {"id": 1}),
+                ("DM", {"title": "DM", "label": "Demographics"}, {"id": 2}),
+            ],
+            import_into_mdr_db.CLASS_PROPERTIES,
+        )
+
+        # when
+        create_rows, link_rows, counts = plan_classes(classes_data, reusable)
+
+        # then
+        assert [row["class"]["uid"] for row in create_rows] == ["AE", "CM"]
+        assert [row["instance"] for row in link_rows] == [
+            {"key": 0},
+            {"key": 1},
+            {"id": 2},
+        ]
+        assert counts == {"new": 1, "updated": 1, "unchanged": 1}
+
+    def test__plan_variables_like_one_by_one(self):
+        # given
+        variables_data = generate_variables_data()
+        assert len(variables_data) > 3000
+        # a prior version of the catalogue, where a few variables were described differently
+        prior_variables = generate_variables_data(seed=7)[::3]
+        class_instances = [
+            (data["variable"]["uid"], data["variable"], {"id": node_id})
+            for node_id, data in enumerate(prior_variables)
+            if data["parent_type"] == "class"
+        ]
+        scenario_instances = [
+            (data["variable"]["uid"], data["variable"], {"id": node_id, "id_impl": 0})
+            for node_id, data in enumerate(prior_variables)
+            if data["parent_type"] == "scenario"
+        ]
+
+        # when
+        create_rows, link_rows, counts = plan_variables(
+            variables_data, _reusable(class_instances), _reusable(scenario_instances)
+        )
+
+        # then
+        expected_instances, expected_counts = plan_variables_one_by_one(
+            variables_data, class_instances, scenario_instances
+        )
+        assert [row["instance"] for row in link_rows] == expected_instances
+        assert counts == expected_counts
+        assert [row["key"] for row in create_rows] == [
+            key
+            for key, instance in enumerate(expected_instances)
+            if instance.get("key", None) == key
+        ]
+        assert min(counts.values()) > 0
+
+    def test__plan_variables_reuses_scenario_instance_for_class(self):
+        # given
+        scenario_variable = _variable("AGE", "Age", description="Scenario")
+        class_variable = {
+            name: scenario_variable.get(name, None)
+            for name in VARIABLE_INSTANCE_PROPERTIES
+        }
+        class_variable["uid"] = "AGE"
+        variables_data = [
+            {"variable": scenario_variable, "parent_type": "scenario"},
+            {"variable": class_variable, "parent_type": "class"},
+            {"variable": scenario_variable, "parent_type": "scenario"},
+        ]
+
+        # when
+        create_rows, link_rows, counts = plan_variables(
+            variables_data, _reusable([]), _reusable([])
+        )
+
+        # then
+        assert len(create_rows) == 1
+        assert [row["instance"] for row in link_rows] == [{"key": 0}] * 3
+        assert counts == {"new": 1, "updated": 0, "unchanged": 2}
+
+    def test__merge_variables_writes_in_batches(self, monkeypatch):
+        # given
+        monkeypatch.setattr(import_into_mdr_db, "DATA_MODEL_IMPORT_BATCH_SIZE", 1000)
+        variables_data = generate_variables_data()
+        version_data = {
+            "catalogue": "SDTMIG",
+            "data_model_type": "Implementation",
+            "version_number": "3-4",
+            "href": "/mdr/sdtmig/3-4",
+            "name": "sdtmig-3-4",
+        }
+        tx = FakeTransaction()
+
+        # when
+        added, updated, unchanged = merge_variables(tx, version_data, variables_data)
+
+        # then
+        assert added + updated + unchanged == len(variables_data)
+        # the number of statements depends on the number of batches, not of variables
+        assert len(tx.statements) < 20
+        links = [
+            row
+            for query, params in tx.statements
+            if "MERGE (dmv)" in query
+            for row in params["rows"]
+        ]
+        assert len(links) == len(variables_data)
+        assert all(row["instance_id"] >= 1000 for row in links)
+
+    def test__merge_variables_per_item_writes_one_by_one(self):
+        # given
+        variables_data = generate_variables_data()[:50]
+        version_data = {
+            "catalogue": "SDTMIG",
+            "data_model_type": "Implementation",
+            "version_number": "3-4",
+            "href": "/mdr/sdtmig/3-4",
+            "name": "sdtmig-3-4",
+            "effective_date": "2024-01-01",
+        }
+        tx = FakeTransaction()
+
+        # when
+        added, updated, unchanged = merge_variables_per_item(
+            tx, version_data, variables_data
+        )
+
+        # then
+        assert (added, updated, unchanged) == (len(variables_data), 0, 0)
+        # one lookup and one create statement per variable
+        assert len(tx.statements) == 2 * len(variables_data)
@@ -134,6 +134,70 @@ REL_INDEXES = [
     ("HAS_DATASET_VARIABLE", "version_number"),
     ("HAS_VERSION", "start_date"),
     ("HAS_VERSION", "end_date"),
+    ("HAS_VERSION", "author_id"),
+]
+
+# array of full-text indexes to create [name, labels or relationship type, properties]
+# used by the API to find the rows matching a wildcard filter, the names must match the ones it declares
+FULLTEXT_ANALYZER = "standard-no-stop-words"
+FULLTEXT_INDEXES = [
+    (
+        "fulltext_ConceptValue",
+        ["ConceptValue"],
+        [
+            "name",
+            "name_sentence_case",
+            "definition",
+            "abbreviation",
+            "nci_concept_id",
+            "nci_concept_name",
+            "external_id",
+            # ActivityValue
+            "synonyms",
+            "request_rationale",
+            "contact_person",
+            "reason_for_rejecting",
+            # ActivityInstanceValue
+            "topic_code",
+            "adam_param_code",
+            "legacy_description",
+            # UnitDefinitionValue
+            "legacy_code",
+            "comment",
+        ],
+    ),
+    ("fulltext_ConceptRoot", ["ConceptRoot"], ["uid"]),
+    ("fulltext_Library", ["Library"], ["name"]),
+    ("fulltext_User", ["User"], ["username"]),
+    ("fulltext_StudyValue", ["StudyValue"], ["study_id_prefix", "study_number"]),
+    ("fulltext_CTTermRoot", ["CTTermRoot"], ["uid"]),
+    ("fulltext_CTTermNameValue", ["CTTermNameValue"], ["name", "name_sentence_case"]),
+    (
+        "fulltext_CTTermAttributesValue",
+        ["CTTermAttributesValue"],
+        ["code_submission_value", "preferred_term"],
+    ),
+    ("fulltext_DictionaryTermRoot", ["DictionaryTermRoot"], ["uid"]),
+    ("fulltext_DictionaryTermValue", ["DictionaryTermValue"], ["name"]),
+    (
+        "fulltext_SyntaxRoot",
+        ["SyntaxTemplateRoot", "SyntaxPreInstanceRoot", "SyntaxInstanceRoot"],
+        ["uid", "sequence_id"],
+    ),
+    (
+        "fulltext_SyntaxValue",
+        ["SyntaxTemplateValue", "SyntaxPreInstanceValue", "SyntaxInstanceValue"],
+        ["name", "name_plain", "guidance_text"],
+    ),
+]
+
+# array of relationship full-text indexes to create [name, relationship types, properties]
+REL_FULLTEXT_INDEXES = [
+    (
+        "fulltext_HAS_VERSION",
+        ["HAS_VERSION"],
+        ["status", "version", "change_description", "author_id"],
+    ),
 ]
 
 # array of constraints to create [label, property, type["NODE KEY", "UNIQUE", "NOT NULL"]]
@@ -218,6 +282,7 @@ CONSTRAINTS = [
     ("FootnoteTemplateRoot", "uid", CONSTRAINT_TYPE_NODE_KEY),
     ("OdmStudyEventRoot", "uid", CONSTRAINT_TYPE_NODE_KEY),
     ("TemplateParameterValueRoot", "uid", CONSTRAINT_TYPE_NODE_KEY),
+    ("TemplateParameterValuesVersion", "parameter_name", CONSTRAINT_TYPE_NODE_KEY),
     ("TextValueRoot", "uid", CONSTRAINT_TYPE_NODE_KEY),
     ("User", "user_id", CONSTRAINT_TYPE_NODE_KEY),
     ("WeekInStudyRoot", "uid", CONSTRAINT_TYPE_NODE_KEY),
@@ -240,6 +305,20 @@ def build_create_node_text_index_query(data):
     return query
 
 
+def build_create_fulltext_index_query(data, relationship: bool = False):
+    name, labels, props = data
+    if relationship:
+        pattern = f"()-[n:{'|'.join(labels)}]-()"
+    else:
+        pattern = f"(n:{'|'.join(labels)})"
+    properties = ", ".join(f"n.{prop}" for prop in props)
+    query = (
+        f"CREATE FULLTEXT INDEX {name} IF NOT EXISTS FOR {pattern} ON EACH [{properties}]"
+        f" OPTIONS {{indexConfig: {{`fulltext.analyzer`: '{FULLTEXT_ANALYZER}'}}}}"
+    )
+    return query
+
+
 def build_create_rel_index_query(data):
     label, prop = data
     name = label + "_" + prop
@@ -284,6 +363,14 @@ def build_schema_queries():
         query = build_create_rel_index_query(idx)
         queries.append(query)
 
+    for idx in FULLTEXT_INDEXES:
+        query = build_create_fulltext_index_query(idx)
+        queries.append(query)
+
+    for idx in REL_FULLTEXT_INDEXES:
+        query = build_create_fulltext_index_query(idx, relationship=True)
+        queries.append(query)
+
     for cst in CONSTRAINTS:
         query = build_create_constraint_query(
             label=cst[0], property=cst[1], type=cst[2]
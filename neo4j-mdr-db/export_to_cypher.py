@@ -1,31 +1,461 @@
-from neo4j import GraphDatabase
+"""
+Exports the contents of a database as Cypher statements, in the format read by import_from_cypher.py.
+
+The nodes of each label and the relationships of each type are read by a single query, in one read
+transaction, and the records are streamed from its cursor and written in chunks, so the memory needed
+doesn't depend on the size of the database. A node with several labels is exported with the first of
+its labels in alphabetical order.
+
+The labels and relationship types are read by separate transactions, and Neo4j read transactions are
+read committed, not snapshots: the export is only consistent when nothing writes to the database while
+it runs. Stop the applications or export a copy of the database.
+
+Each label and relationship type is written to its own gzip compressed part file, and the position reached
+is checkpointed after every chunk. An interrupted export resumes from the checkpoint when run again,
+with a new query starting after the last id written.
+Labels and relationship types are independent of each other, and can be exported by parallel sessions.
+When all of them are exported, the part files are concatenated into the output file, a valid gzip file
+with the schema first, then the nodes, the relationships, and finally the removal of the import ids.
+"""
+
+import argparse
+import gzip
+import itertools
+import json
+import math
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from os import environ
 
+from neo4j import GraphDatabase
+from neo4j.spatial import Point
+from neo4j.time import Date, DateTime, Duration, Time
+
 DATABASE = environ.get("NEO4J_MDR_DATABASE")
 HOST = environ.get("NEO4J_MDR_HOST")
 PORT = environ.get("NEO4J_MDR_BOLT_PORT")
 USER = environ.get("NEO4J_MDR_AUTH_USER")
-PASS =  environ.get("NEO4J_MDR_AUTH_PASSWORD")
+PASS = environ.get("NEO4J_MDR_AUTH_PASSWORD")
+
+IMPORT_LABEL = "UNIQUE IMPORT LABEL"
+IMPORT_ID = "UNIQUE IMPORT ID"
+CLEANUP_BATCH_SIZE = 20000
+
+
+def quote_name(name):
+    return "`" + name.replace("`", "``") + "`"
+
+
+def quote_string(value):
+    escaped = []
+    for char in value:
+        if char == "\\":
+            escaped.append("\\\\")
+        elif char == "'":
+            escaped.append("\\'")
+        elif char == "\n":
+            escaped.append("\\n")
+        elif char == "\r":
+            escaped.append("\\r")
+        elif char == "\t":
+            escaped.append("\\t")
+        elif char < " ":
+            escaped.append(f"\\u{ord(char):04x}")
+        else:
+            escaped.append(char)
+    return "'" + "".join(escaped) + "'"
+
+
+def cypher_literal(value):
+    """Returns the Cypher literal of a property value, on a single line"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "0.0/0.0"
+        if math.isinf(value):
+            return "1.0/0.0" if value > 0 else "-1.0/0.0"
+        return repr(value)
+    if isinstance(value, str):
+        return quote_string(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(cypher_literal(item) for item in value) + "]"
+    if isinstance(value, dict):
+        return cypher_map(value)
+    if isinstance(value, DateTime):
+        if value.tzinfo is None:
+            return f"localdatetime('{value.iso_format()}')"
+        zone = getattr(value.tzinfo, "zone", None)
+        return f"datetime('{value.iso_format()}{f'[{zone}]' if zone else ''}')"
+    if isinstance(value, Date):
+        return f"date('{value.iso_format()}')"
+    if isinstance(value, Time):
+        if value.tzinfo is None:
+            return f"localtime('{value.iso_format()}')"
+        return f"time('{value.iso_format()}')"
+    if isinstance(value, Duration):
+        return f"duration('{value.iso_format()}')"
+    if isinstance(value, Point):
+        coordinates = ", ".join(
+            f"{axis}: {cypher_literal(coordinate)}"
+            for axis, coordinate in zip("xyz", value)
+        )
+        return f"point({{srid: {value.srid}, {coordinates}}})"
+    raise TypeError(f"Can't export a property value of type {type(value).__name__}")
+
+
+def cypher_map(values):
+    return (
+        "{"
+        + ", ".join(
+            f"{quote_name(key)}: {cypher_literal(value)}"
+            for key, value in values.items()
+        )
+        + "}"
+    )
+
+
+def transaction(statements):
+    return (
+        ":begin\n"
+        + "".join(f"{statement};\n" for statement in statements)
+        + ":commit\n"
+    )
+
+
+def node_statements(records):
+    """Statements creating the nodes of a chunk, grouped by their labels"""
+    by_labels = {}
+    for record in records:
+        by_labels.setdefault(tuple(sorted(record["labels"])), []).append(
+            f"{{_id: {record['id']}, properties: {cypher_map(record['properties'])}}}"
+        )
+    statements = []
+    for labels, rows in by_labels.items():
+        set_labels = (
+            f" SET n:{':'.join(quote_name(label) for label in labels)}"
+            if labels
+            else ""
+        )
+        statements.append(
+            f"UNWIND [{', '.join(rows)}] AS row "
+            f"CREATE (n:{quote_name(IMPORT_LABEL)} {{{quote_name(IMPORT_ID)}: row._id}}) "
+            f"SET n += row.properties{set_labels}"
+        )
+    return statements
+
+
+def relationship_statement(rel_type, records):
+    """Statement creating the relationships of a chunk, all of the same type"""
+    rows = ", ".join(
+        f"{{start: {record['start']}, end: {record['end']}, properties: {cypher_map(record['properties'])}}}"
+        for record in records
+    )
+    node = f"{quote_name(IMPORT_LABEL)} {{{quote_name(IMPORT_ID)}: row.%s}}"
+    return (
+        f"UNWIND [{rows}] AS row "
+        f"MATCH (start:{node % 'start'}) MATCH (end:{node % 'end'}) "
+        f"CREATE (start)-[r:{quote_name(rel_type)}]->(end) SET r += row.properties"
+    )
+
+
+def node_query(label):
+    """Query and parameters of the nodes of a label after a node id, in the order of their ids"""
+    if label is None:
+        query = """
+            MATCH (n) WHERE id(n) > $after AND size(labels(n)) = 0
+            RETURN id(n) AS id, labels(n) AS labels, properties(n) AS properties
+            ORDER BY id(n)
+            """
+    else:
+        query = f"""
+            MATCH (n:{quote_name(label)}) WHERE id(n) > $after AND all(l IN labels(n) WHERE l >= $label)
+            RETURN id(n) AS id, labels(n) AS labels, properties(n) AS properties
+            ORDER BY id(n)
+            """
+    return query, {"label": label}
+
+
+def relationship_query(rel_type):
+    """Query and parameters of the relationships of a type after an id, in the order of their ids"""
+    query = f"""
+        MATCH (start)-[r:{quote_name(rel_type)}]->(end) WHERE id(r) > $after
+        RETURN id(r) AS id, id(start) AS start, id(end) AS end, properties(r) AS properties
+        ORDER BY id(r)
+        """
+    return query, {}
 
-uri = "neo4j://{}:{}".format(HOST, PORT)
-driver = GraphDatabase.driver(uri, auth=(USER, PASS))
 
-print("Dumping database contents as cypher statements")
-def get_data(tx):
-    result = tx.run("CALL apoc.export.cypher.all(null, {streamStatements: true, batchSize: 1000, format: 'cypher-shell', saveIndexNames: true, saveConstraintNames: true, multipleRelationshipsWithType: true})")
-    return result.data()
+def get_constraint_statements(tx):
+    return [
+        record["createStatement"]
+        for record in tx.run(
+            "SHOW CONSTRAINTS YIELD createStatement RETURN createStatement"
+        )
+    ]
 
-with driver.session(database=DATABASE) as session:
+
+def get_index_statements(tx):
+    # indexes backing constraints are created with them, token lookup indexes exist in every database
+    indexes = tx.run(
+        """
+        SHOW INDEXES YIELD type, owningConstraint, createStatement
+        WHERE owningConstraint IS NULL AND type <> 'LOOKUP'
+        RETURN createStatement
+        """
+    )
+    return [record["createStatement"] for record in indexes]
+
+
+class Checkpoint:
+    """Position reached in each part, saved in a JSON file next to the output"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.parts = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                self.parts = json.load(file)
+
+    def get(self, part):
+        with self.lock:
+            return dict(
+                self.parts.get(
+                    part, {"after": -1, "count": 0, "size": 0, "done": False}
+                )
+            )
+
+    def save(self, part, position):
+        with self.lock:
+            self.parts[part] = position
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self.parts, file)
+            os.replace(tmp_path, self.path)
+
+
+class Exporter:
+    def __init__(self, driver, database, output, chunk_size):
+        self.driver = driver
+        self.database = database
+        self.output = output
+        self.chunk_size = chunk_size
+        self.parts_dir = output + ".parts"
+        os.makedirs(self.parts_dir, exist_ok=True)
+        self.checkpoint = Checkpoint(os.path.join(self.parts_dir, "checkpoint.json"))
+        self.progress_lock = threading.Lock()
+        self.exported = {"nodes": 0, "relationships": 0}
+        self.totals = {"nodes": 0, "relationships": 0}
+
+    def part_path(self, part):
+        name = "".join(char if char.isalnum() else f"_{ord(char):x}_" for char in part)
+        return os.path.join(self.parts_dir, f"{name}.cypher.gz")
+
+    def report(self, kind, count):
+        with self.progress_lock:
+            self.exported[kind] += count
+            print(
+                f"Progress: {self.exported['nodes']}/{self.totals['nodes']} nodes, "
+                f"{self.exported['relationships']}/{self.totals['relationships']} relationships",
+                end="\r",
+            )
+
+    def export_part(self, part, kind, query, to_statements):
+        position = self.checkpoint.get(part)
+        self.report(kind, position["count"])
+        if position["done"]:
+            return
+
+        def stream(tx):
+            """Writes the records of a single cursor to the part file, a chunk at a time"""
+            # a retried transaction starts again from the last checkpoint
+            position = self.checkpoint.get(part)
+            path = self.part_path(part)
+            # drop anything written after the last checkpoint
+            with open(path, "ab") as file:
+                file.truncate(position["size"])
+            statement, parameters = query
+            cursor = iter(tx.run(statement, after=position["after"], **parameters))
+            while True:
+                records = list(itertools.islice(cursor, self.chunk_size))
+                if records:
+                    # each chunk is a gzip member of its own, appended to the part file
+                    with gzip.open(path, "at", encoding="utf-8") as file:
+                        file.write(transaction(to_statements(records)))
+                    position["after"] = records[-1]["id"]
+                    position["count"] += len(records)
+                    self.report(kind, len(records))
+                position["size"] = os.path.getsize(path)
+                position["done"] = len(records) < self.chunk_size
+                self.checkpoint.save(part, position)
+                if position["done"]:
+                    return
+
+        with self.driver.session(
+            database=self.database, fetch_size=self.chunk_size
+        ) as session:
+            session.read_transaction(stream)
+
+    def export_label(self, label):
+        self.export_part(
+            f"nodes-{label or ''}",
+            "nodes",
+            node_query(label),
+            node_statements,
+        )
+
+    def export_relationship_type(self, rel_type):
+        self.export_part(
+            f"relationships-{rel_type}",
+            "relationships",
+            relationship_query(rel_type),
+            lambda records: [relationship_statement(rel_type, records)],
+        )
+
+    def run(self, workers):
+        with self.driver.session(database=self.database) as session:
+            labels = session.read_transaction(
+                lambda tx: [
+                    record["label"]
+                    for record in tx.run("CALL db.labels() YIELD label RETURN label")
+                ]
+            )
+            rel_types = session.read_transaction(
+                lambda tx: [
+                    record["relationshipType"]
+                    for record in tx.run(
+                        "CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType"
+                    )
+                ]
+            )
+            schema = session.read_transaction(get_constraint_statements)
+            schema += session.read_transaction(get_index_statements)
+            self.totals["nodes"] = session.read_transaction(
+                lambda tx: tx.run("MATCH (n) RETURN count(n) AS nbr_nodes")
+                .single()
+                .get("nbr_nodes")
+            )
+            self.totals["relationships"] = session.read_transaction(
+                lambda tx: tx.run("MATCH ()-[r]->() RETURN count(r) AS nbr_rels")
+                .single()
+                .get("nbr_rels")
+            )
+        print(
+            f"Database contains {self.totals['nodes']} nodes with {len(labels)} labels "
+            f"and {self.totals['relationships']} relationships of {len(rel_types)} types"
+        )
+
+        # unlabelled nodes are exported as a part of their own
+        node_parts = [None] + sorted(labels)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self.export_label, label) for label in node_parts
+            ]
+            futures += [
+                executor.submit(self.export_relationship_type, rel_type)
+                for rel_type in sorted(rel_types)
+            ]
+            for future in futures:
+                future.result()
+        print()
+
+        schema_path = self.part_path("schema")
+        with gzip.open(schema_path, "wt", encoding="utf-8") as file:
+            file.write(
+                transaction(
+                    [
+                        *schema,
+                        f"CREATE CONSTRAINT UNIQUE_IMPORT_NAME FOR (node:{quote_name(IMPORT_LABEL)}) "
+                        f"REQUIRE (node.{quote_name(IMPORT_ID)}) IS UNIQUE",
+                    ]
+                )
+            )
+            file.write("CALL db.awaitIndexes(300);\n")
+        cleanup_path = self.part_path("cleanup")
+        nbr_nodes = sum(
+            self.checkpoint.get(f"nodes-{label or ''}")["count"] for label in node_parts
+        )
+        with gzip.open(cleanup_path, "wt", encoding="utf-8") as file:
+            for _ in range(math.ceil(nbr_nodes / CLEANUP_BATCH_SIZE)):
+                file.write(
+                    transaction(
+                        [
+                            f"MATCH (n:{quote_name(IMPORT_LABEL)}) WITH n LIMIT {CLEANUP_BATCH_SIZE} "
+                            f"REMOVE n:{quote_name(IMPORT_LABEL)} REMOVE n.{quote_name(IMPORT_ID)}"
+                        ]
+                    )
+                )
+            file.write(transaction(["DROP CONSTRAINT UNIQUE_IMPORT_NAME"]))
+
+        # concatenated gzip files are a valid gzip file
+        parts = (
+            [schema_path]
+            + [self.part_path(f"nodes-{label or ''}") for label in node_parts]
+            + [
+                self.part_path(f"relationships-{rel_type}")
+                for rel_type in sorted(rel_types)
+            ]
+            + [cleanup_path]
+        )
+        print(f"Saving data to '{self.output}'")
+        with open(self.output, "wb") as output:
+            for path in parts:
+                if os.path.exists(path):
+                    with open(path, "rb") as part:
+                        shutil.copyfileobj(part, output)
+        shutil.rmtree(self.parts_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Dump the database contents as Cypher statements"
+    )
+    parser.add_argument(
+        "--output",
+        default=f"dump-{DATABASE}.cypher.gz",
+        help="gzip compressed output file",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="nodes or relationships fetched and written at a time",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="labels and relationship types exported in parallel",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="discard the checkpoint of an interrupted export",
+    )
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.output + ".parts"):
+        shutil.rmtree(args.output + ".parts")
+    if os.path.exists(os.path.join(args.output + ".parts", "checkpoint.json")):
+        print(f"Resuming the interrupted export to '{args.output}'")
+
+    uri = "neo4j://{}:{}".format(HOST, PORT)
+    driver = GraphDatabase.driver(uri, auth=(USER, PASS))
+    print("Dumping database contents as cypher statements")
     print(f"Connecting to database '{DATABASE}' on host: {HOST}")
-    nbr_nodes = session.read_transaction(lambda tx: tx.run("MATCH (n) RETURN count(n) as nbr_nodes").single().get("nbr_nodes"))
-    nbr_rels = session.read_transaction(lambda tx: tx.run("MATCH ()-[r]-() RETURN count(r) as nbr_rels").single().get("nbr_rels"))
-    print(f"Database contains {nbr_nodes} nodes and {nbr_rels} relationships")
-    print("Requesting data")
-    data = session.read_transaction(get_data)
-    print(f"Saving data to 'dump-{DATABASE}.cypher'")
-    with open(f"dump-{DATABASE}.cypher", "w") as f:
-        for chunk in data:
-            f.write(chunk['cypherStatements'])
-
-driver.close()
-print("Done!")
+    try:
+        Exporter(driver, DATABASE, args.output, args.chunk_size).run(args.workers)
+    finally:
+        driver.close()
+    print("Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 from neo4j import GraphDatabase
 from os import environ
+import gzip
+import io
 import os
 import sys
 
@@ -70,7 +72,12 @@ if __name__ == "__main__":
         session.write_transaction(run_queries, [querystring])
     with driver.session(database=DATABASE) as session:
 
-        with open(filename, 'r') as file:
+        with open(filename, 'rb') as raw_file:
+            # dumps written by export_to_cypher.py are gzip compressed
+            if filename.endswith(".gz"):
+                file = io.TextIOWrapper(gzip.GzipFile(fileobj=raw_file), encoding="utf-8")
+            else:
+                file = io.TextIOWrapper(raw_file, encoding="utf-8")
             nbr_tx = 0
             while True:
                 queries = next_transaction(file)
@@ -78,6 +85,6 @@ if __name__ == "__main__":
                     break
                 session.write_transaction(run_queries, queries)
                 nbr_tx += 1
-                print(f"Progress: {file.tell()/file_size:.1%}, transactions executed: {nbr_tx}", end="\r")
+                print(f"Progress: {raw_file.tell()/file_size:.1%}, transactions executed: {nbr_tx}", end="\r")
     driver.close()
     print("\nDone!")
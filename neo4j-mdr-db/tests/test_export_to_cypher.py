@@ -0,0 +1,125 @@
+"""
+Exports a generated graph from a local Neo4j database and checks the memory used by the exporter.
+
+The database given by the NEO4J_MDR_* variables must be empty, the test is skipped otherwise.
+EXPORT_TEST_NODES sets the size of the graph, with as many relationships as nodes,
+EXPORT_TEST_MAX_RSS_MB the memory ceiling of the export process.
+"""
+
+import gzip
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from neo4j import GraphDatabase
+from neo4j.exceptions import DriverError, Neo4jError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position
+from export_to_cypher import DATABASE, HOST, PASS, PORT, USER
+
+NODES = int(os.environ.get("EXPORT_TEST_NODES", "1500000"))
+MAX_RSS_MB = int(os.environ.get("EXPORT_TEST_MAX_RSS_MB", "250"))
+NODE_LABEL = "ExportTestNode"
+LABELS = ["ExportTestA", "ExportTestB", "ExportTestC"]
+
+
+class ExportMemoryTest(unittest.TestCase):
+    """Exports a graph of a few million nodes and relationships"""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.driver = GraphDatabase.driver(
+                f"neo4j://{HOST}:{PORT}", auth=(USER, PASS)
+            )
+            cls.driver.verify_connectivity()
+        except (DriverError, Neo4jError, ValueError) as exc:
+            raise unittest.SkipTest(f"No Neo4j database available: {exc}")
+        if cls.run_query("MATCH (n) RETURN count(n) AS count")[0]["count"]:
+            cls.driver.close()
+            raise unittest.SkipTest(f"Database '{DATABASE}' isn't empty")
+
+        # the nodes are spread over the labels, and all have a second label, each one is linked to the next
+        cls.run_query(f"CREATE INDEX FOR (n:{NODE_LABEL}) ON (n.index)")
+        for offset, label in enumerate(LABELS):
+            cls.run_query(
+                f"""
+                UNWIND range($offset, $nodes - 1, $step) AS index
+                CALL {{
+                    WITH index
+                    CREATE (:{NODE_LABEL}:{label} {{index: index, name: 'Node ' + toString(index), created: datetime()}})
+                }} IN TRANSACTIONS OF 50000 ROWS
+                """,
+                offset=offset,
+                nodes=NODES,
+                step=len(LABELS),
+            )
+        cls.run_query("CALL db.awaitIndexes(300)")
+        cls.run_query(
+            f"""
+            UNWIND range(0, $nodes - 1) AS index
+            CALL {{
+                WITH index
+                MATCH (start:{NODE_LABEL} {{index: index}}), (end:{NODE_LABEL} {{index: (index + 1) % $nodes}})
+                CREATE (start)-[:EXPORT_TEST_NEXT {{index: index}}]->(end)
+            }} IN TRANSACTIONS OF 50000 ROWS
+            """,
+            nodes=NODES,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.run_query(
+            """
+            MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 50000 ROWS
+            """
+        )
+        for record in cls.run_query(
+            "SHOW INDEXES YIELD name, labelsOrTypes WHERE $label IN labelsOrTypes RETURN name",
+            label=NODE_LABEL,
+        ):
+            cls.run_query(f"DROP INDEX {record['name']}")
+        cls.driver.close()
+
+    @classmethod
+    def run_query(cls, query, **parameters):
+        with cls.driver.session(database=DATABASE) as session:
+            return list(session.run(query, **parameters))
+
+    def test_export_memory_ceiling(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "dump.cypher.gz")
+            subprocess.run(
+                [
+                    sys.executable,
+                    os.path.join(
+                        os.path.dirname(__file__), "..", "export_to_cypher.py"
+                    ),
+                    "--output",
+                    output,
+                    "--workers",
+                    "2",
+                ],
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            # ru_maxrss is in kilobytes on Linux
+            max_rss_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+            self.assertLess(max_rss_mb, MAX_RSS_MB)
+
+            nodes = relationships = 0
+            with gzip.open(output, "rt", encoding="utf-8") as file:
+                for line in file:
+                    nodes += line.count("{_id: ")
+                    relationships += line.count("{start: ")
+            self.assertEqual(nodes, NODES)
+            self.assertEqual(relationships, NODES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,10 +6,21 @@ import os
 import logging
 import sys
 import json
+import math
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 OUTPUT_DIR = environ.get("OUTPUT_DIR", "./output")
 LOG_LEVEL = environ.get("LOG_LEVEL", "INFO")
 
+# Maximum number of api requests in flight at the same time
+EXPORT_CONCURRENCY = int(environ.get("EXPORT_CONCURRENCY", "8"))
+
+# Skip studies that have not changed since the previous export
+INCREMENTAL_EXPORT = environ.get("INCREMENTAL_EXPORT", "False") == "True"
+MANIFEST_FILENAME = "export-manifest.json"
+
 INCLUDE_STUDY_NUMBERS = environ.get("INCLUDE_STUDY_NUMBERS", "")
 EXCLUDE_STUDY_NUMBERS = environ.get("EXCLUDE_STUDY_NUMBERS", "")
 
@@ -33,6 +44,8 @@ class StudyExporter:
         )
         self.log = logging.getLogger("studybuilder_export")
         self.api_base_url = self._read_env("API_BASE_URL")
+        # Bounds the number of concurrent requests, shared by all worker threads
+        self.request_slots = threading.BoundedSemaphore(EXPORT_CONCURRENCY)
         self._create_httpx_client()
         self.verify_connection()
 
@@ -83,7 +96,13 @@ class StudyExporter:
                 client_id=client_id,
                 scope=scope,
             )
-        self.client = httpx.Client(base_url=self.api_base_url, auth=auth, verify=context, timeout=60)
+        limits = httpx.Limits(
+            max_connections=EXPORT_CONCURRENCY,
+            max_keepalive_connections=EXPORT_CONCURRENCY,
+        )
+        self.client = httpx.Client(
+            base_url=self.api_base_url, auth=auth, verify=context, timeout=60, limits=limits
+        )
 
 
     # ---------------------------------------------------------------
@@ -109,11 +128,13 @@ class StudyExporter:
         if params is None:
             params = DEFAULT_QUERY_PARAMS
         else:
+            params = dict(params)
             for key, value in DEFAULT_QUERY_PARAMS.items():
                 if key not in params:
                     params[key] = value
 
-        response = self.client.get(path, params=params)
+        with self.request_slots:
+            response = self.client.get(path, params=params)
         if response.is_success:
             self.log.info(f"Successfully fetched data from: {path}")
             data = response.json()
@@ -127,26 +148,42 @@ class StudyExporter:
                 self.log.error("get %s %s", path, response.text)
             return None
 
-    def get_from_api_paged(self, path, params=None, page_size=100):
-        page_number = 1
+    def iter_from_api_paged(self, path, params=None, page_size=100):
+        """
+        Yields the items of a paged endpoint, in order.
+        Once the first page has given the total count, the remaining pages
+        are fetched in parallel, keeping at most EXPORT_CONCURRENCY pages in memory.
+        """
         page_params = {
-            "page_number": page_number,
+            "page_number": 1,
             "page_size": page_size,
             "total_count": True,
         }
-        page_params.update(params)
+        if params:
+            page_params.update(params)
         data = self.get_from_api(path, params=page_params, items_only=False)
-        all_data = data["items"]
-        count = data["total"]
-
-        # Get remaining pages
-        page_params["total_count"] = False
-        while page_size * page_number < count:
-            page_number += 1
-            page_params["page_number"] = page_number
-            data = self.get_from_api(path, params=page_params, items_only=True)
-            all_data.extend(data)
-        return all_data
+        if data is None:
+            return
+        yield from data["items"]
+        nbr_pages = math.ceil(data["total"] / page_size)
+
+        def get_page(page_number):
+            return self.get_from_api(
+                path,
+                params={**page_params, "page_number": page_number, "total_count": False},
+                items_only=True,
+            )
+
+        with ThreadPoolExecutor(max_workers=EXPORT_CONCURRENCY) as pool:
+            for start in range(2, nbr_pages + 1, EXPORT_CONCURRENCY):
+                end = min(start + EXPORT_CONCURRENCY, nbr_pages + 1)
+                for items in pool.map(get_page, range(start, end)):
+                    if items is None:
+                        raise RuntimeError(f"Failed to fetch a page of {path}")
+                    yield from items
+
+    def get_from_api_paged(self, path, params=None, page_size=100):
+        return list(self.iter_from_api_paged(path, params=params, page_size=page_size))
 
     def get_dictionary_uid(self, library):
         params = {"library_name": library}
@@ -162,7 +199,56 @@ class StudyExporter:
         path = os.path.join(dir, filename)
         with open(path, "w") as f:
             self.log.info(f"Saving to file: {path}")
-            f.write(json.dumps(data, indent=2, sort_keys=True))
+            json.dump(data, f, indent=2, sort_keys=True)
+
+    def save_json_items(self, items, dir, filename):
+        """
+        Streams the items to a json array file, one item at a time.
+        The output is identical to that of save_formatted_json for a list of the same items.
+        """
+        filename = filename.replace("/", ".")
+        path = os.path.join(dir, filename)
+        with open(path, "w") as f:
+            self.log.info(f"Saving to file: {path}")
+            separator = "[\n"
+            for item in items:
+                f.write(separator)
+                f.write(textwrap.indent(json.dumps(item, indent=2, sort_keys=True), "  "))
+                separator = ",\n"
+            f.write("[]" if separator == "[\n" else "\n]")
+
+    def export_endpoint(self, path, filename, params=None, page_size=None):
+        """
+        Fetches an endpoint and saves it, page by page if a page size is given.
+        Returns False if the endpoint could not be fetched, a failed page raises.
+        """
+        if page_size is None:
+            data = self.get_from_api(path, params=params)
+            self.save_formatted_json(data, OUTPUT_DIR, filename)
+            return data is not None
+        items = self.iter_from_api_paged(path, params=params, page_size=page_size)
+        self.save_json_items(items, OUTPUT_DIR, filename)
+        return True
+
+    def export_all(self, jobs):
+        """
+        Runs export_endpoint for all the jobs in parallel.
+        Each job is a dict of export_endpoint arguments.
+        Returns the results of export_endpoint, in the order of the jobs.
+        """
+        with ThreadPoolExecutor(max_workers=EXPORT_CONCURRENCY) as pool:
+            futures = [pool.submit(self.export_endpoint, **job) for job in jobs]
+            return [future.result() for future in futures]
+
+    def load_manifest(self):
+        path = os.path.join(OUTPUT_DIR, MANIFEST_FILENAME)
+        if not os.path.exists(path):
+            return {"studies": {}}
+        with open(path) as f:
+            return json.load(f)
+
+    def save_manifest(self, manifest):
+        self.save_formatted_json(manifest, OUTPUT_DIR, MANIFEST_FILENAME)
 
     def filter_studies(self, studies):
         include_numbers = [
@@ -373,27 +459,43 @@ dictionaries = [
 ]
 
 
-def run_export():
-    try:
-        os.mkdir("output")
-    except FileExistsError:
-        pass
-    api = StudyExporter()
+def study_fingerprint(study):
+    """The status, version and timestamp of the current version of a study"""
+    version = study["current_metadata"].get("version_metadata") or {}
+    return {
+        "study_status": version.get("study_status"),
+        "version_number": version.get("version_number"),
+        "version_timestamp": version.get("version_timestamp"),
+    }
+
 
-    # Clinical programmes
-    api.log.info("=== Export clinical programmes ===")
-    programmes = api.get_from_api("/clinical-programmes")
-    api.save_formatted_json(programmes, OUTPUT_DIR, "clinical-programmes.json")
+def study_is_unchanged(study, manifest):
+    """
+    A study can be skipped in an incremental export when its current version
+    is the same as in the previous export, and it is not a draft.
+    Editing the selections of a draft study does not change its version timestamp,
+    so draft studies are always exported.
+    """
+    fingerprint = study_fingerprint(study)
+    if fingerprint["study_status"] == "DRAFT":
+        return False
+    return manifest["studies"].get(study["uid"]) == fingerprint
 
-    # Brands
-    api.log.info("=== Export brands ===")
-    brands = api.get_from_api("/brands")
-    api.save_formatted_json(brands, OUTPUT_DIR, "brands.json")
 
-    # Projects
-    api.log.info("=== Export projects ===")
-    projects = api.get_from_api("/projects")
-    api.save_formatted_json(projects, OUTPUT_DIR, "projects.json")
+def run_export():
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    api = StudyExporter()
+    manifest = api.load_manifest()
+
+    # Clinical programmes, brands and projects
+    api.log.info("=== Export clinical programmes, brands and projects ===")
+    api.export_all(
+        [
+            {"path": "/clinical-programmes", "filename": "clinical-programmes.json"},
+            {"path": "/brands", "filename": "brands.json"},
+            {"path": "/projects", "filename": "projects.json"},
+        ]
+    )
 
     # Studies
     api.log.info("=== Export studies ===")
@@ -402,107 +504,111 @@ def run_export():
     api.save_formatted_json(studies, OUTPUT_DIR, "studies.json")
     study_uids = [s["uid"] for s in studies]
     api.log.info(f"Found studies {study_uids}")
-
-    # Study metadata
-    api.log.info("=== Export study metadata ===")
+    if INCREMENTAL_EXPORT:
+        unchanged = {s["uid"] for s in studies if study_is_unchanged(s, manifest)}
+        if unchanged:
+            api.log.info(f"Skipping unchanged studies {sorted(unchanged)}")
+        study_uids = [uid for uid in study_uids if uid not in unchanged]
+
+    # Study metadata and design
+    api.log.info("=== Export study metadata and design ===")
     # Include all optional fields
     # , --> %2C
     # + --> %2B
     fields = "%2C".join(["%2B" + f for f in study_optional_fields])
+    jobs = []
+    jobs_study_uids = []
     for uid in study_uids:
-        api.log.info(f"Export metadata for study uid: {uid}")
-        study = api.get_from_api(f"/studies/{uid}?fields={fields}")
-        api.save_formatted_json(study, OUTPUT_DIR, f"studies/{uid}.json")
-
-    # Study design
-    api.log.info("=== Export study design ===")
-    for uid in study_uids:
-        api.log.info(f"Export study design for study uid: {uid}")
+        api.log.info(f"Export metadata and study design for study uid: {uid}")
+        jobs.append(
+            {"path": f"/studies/{uid}?fields={fields}", "filename": f"studies/{uid}.json"}
+        )
         for ep in study_design_endpoints:
             study_ep = ep.format(study_uid=uid)
-            data = api.get_from_api(f"/{study_ep}")
-            api.save_formatted_json(data, OUTPUT_DIR, f"{study_ep}.json")
-
-    # Templates
-    api.log.info("=== Export syntax templates ===")
-    for ep in template_endpoints:
-        data = api.get_from_api(f"/{ep}")
-        api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.json")
+            jobs.append({"path": f"/{study_ep}", "filename": f"{study_ep}.json"})
+        jobs_study_uids.extend([uid] * (len(jobs) - len(jobs_study_uids)))
+    results = api.export_all(jobs)
+    failed_study_uids = {
+        uid for uid, exported in zip(jobs_study_uids, results) if not exported
+    }
+    if failed_study_uids:
+        api.log.error(
+            f"Failed to export studies {sorted(failed_study_uids)}, "
+            "they are left out of the manifest and exported again by the next export"
+        )
 
-    # Templates pre-instances
-    api.log.info("=== Export syntax pre-instances ===")
-    for ep in syntax_pre_instance_endpoints:
-        data = api.get_from_api(f"/{ep}")
-        api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.json")
+    # Templates and pre-instances
+    api.log.info("=== Export syntax templates and pre-instances ===")
+    api.export_all(
+        [
+            {"path": f"/{ep}", "filename": f"{ep}.json"}
+            for ep in template_endpoints + syntax_pre_instance_endpoints
+        ]
+    )
 
     # Sponsor extensions to CT packages
     api.log.info("=== Export sponsor extensions ===")
+    jobs = []
     for ext in sponsor_ct_extensions:
         ep = ext["endpoint"]
         params = ext["parameters"]
-        page_size = ext["page_size"]
         codelist_name = params["codelist_name"]
         api.log.info(f"Export sponsor extensions to {codelist_name} codelist")
+        jobs.append(
+            {
+                "path": f"/{ep}",
+                "filename": f"{ep}.{codelist_name}.json",
+                "params": params,
+                "page_size": ext["page_size"],
+            }
+        )
+    api.export_all(jobs)
 
-        # Small dataset, no need to split into pages.
-        if page_size is None:
-            data = api.get_from_api(f"/{ep}", params=params)
-            api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.{codelist_name}.json")
-
-        # Large dataset, split request into pages.
-        else:
-            data = api.get_from_api_paged(f"/{ep}", params=params, page_size=page_size)
-            api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.{codelist_name}.json")
-
-    # Concepts
-    api.log.info("=== Export concepts ===")
-    for cpt in concept_endpoints:
-        ep = cpt["endpoint"]
-        params = cpt["parameters"]
-        page_size = cpt["page_size"]
-        concept_name = ep.rsplit("/", 1)[1]
-        api.log.info(f"Export concept: {concept_name}")
-
-        # Small dataset, no need to split into pages.
-        if page_size is None:
-            data = api.get_from_api(f"/{ep}", params=params)
-            api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.json")
-
-        # Large dataset, split request into pages.
-        else:
-            data = api.get_from_api_paged(f"/{ep}", params=params, page_size=page_size)
-            api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.json")
-
-    # Activity items etc
-    api.log.info("=== Export activity items, classes etc ===")
-    for cpt in activity_endpoints:
+    # Concepts, activity items, classes etc
+    # Large datasets have a page size and are split into pages, small ones are fetched at once.
+    api.log.info("=== Export concepts, activity items, classes etc ===")
+    jobs = []
+    for cpt in concept_endpoints + activity_endpoints:
         ep = cpt["endpoint"]
-        params = cpt["parameters"]
-        page_size = cpt["page_size"]
-        api.log.info(f"Export activity data: {ep}")
-
-        # Small dataset, no need to split into pages.
-        if page_size is None:
-            data = api.get_from_api(f"/{ep}", params=params)
-            api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.json")
-
-        # Large dataset, split request into pages.
-        else:
-            data = api.get_from_api_paged(f"/{ep}", params=params, page_size=page_size)
-            api.save_formatted_json(data, OUTPUT_DIR, f"{ep}.json")
+        api.log.info(f"Export: {ep}")
+        jobs.append(
+            {
+                "path": f"/{ep}",
+                "filename": f"{ep}.json",
+                "params": cpt["parameters"],
+                "page_size": cpt["page_size"],
+            }
+        )
+    api.export_all(jobs)
 
     # Dictionaries
     api.log.info("=== Export dictionaries ===")
+    jobs = []
     for d in dictionaries:
         api.log.info(f"Export dictionary: {d}")
         uid = api.get_dictionary_uid(d)
         if uid is None:
             api.log.error(f"Could not find dictionary: {d}")
             continue
-        params = {"codelist_uid": uid}
-        data = api.get_from_api("/dictionaries/terms", params=params)
-        api.save_formatted_json(data, OUTPUT_DIR, f"dictionaries.{d}.json")
-
+        jobs.append(
+            {
+                "path": "/dictionaries/terms",
+                "filename": f"dictionaries.{d}.json",
+                "params": {"codelist_uid": uid},
+            }
+        )
+    api.export_all(jobs)
+
+    # Record the exported study versions for the next incremental export,
+    # only for the studies whose endpoints were all fetched
+    manifest["studies"].update(
+        {
+            s["uid"]: study_fingerprint(s)
+            for s in studies
+            if s["uid"] in study_uids and s["uid"] not in failed_study_uids
+        }
+    )
+    api.save_manifest(manifest)
 
     # All done
     api.log.info(f"=== Export completed successfully ===")
@@ -3,7 +3,6 @@ from collections import defaultdict
 import csv
 import json
 
-import aiohttp
 
 from importers.functions.caselessdict import CaselessDict
 from importers.functions.parsers import map_boolean
@@ -1567,9 +1566,7 @@ class Activities(BaseImporter):
             "MDR_MIGRATION_ACTIVITY_ITEM_CLASSES"
         )
 
-        timeout = aiohttp.ClientTimeout(None)
-        conn = aiohttp.TCPConnector(limit=4, force_close=True)
-        async with aiohttp.ClientSession(timeout=timeout, connector=conn) as session:
+        async with self.api.client_session() as session:
             if (
                 self._limit_import_to is None
                 or ACTIVITY_GROUPS in self._limit_import_to
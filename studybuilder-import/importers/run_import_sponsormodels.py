@@ -1,12 +1,10 @@
 import asyncio
 import csv
-from datetime import datetime
 import json
 import os
 import re
 from collections import defaultdict
-
-import aiohttp
+from datetime import datetime
 
 from importers.functions.caselessdict import CaselessDict
 from importers.functions.utils import load_env
@@ -554,9 +552,7 @@ class SponsorModels(BaseImporter):
         await asyncio.gather(*api_tasks)
 
     async def async_run(self):
-        timeout = aiohttp.ClientTimeout(None)
-        conn = aiohttp.TCPConnector(limit=4, force_close=True)
-        async with aiohttp.ClientSession(timeout=timeout, connector=conn) as session:
+        async with self.api.client_session() as session:
             await self.handle_activity_instance_class_relations(
                 MDR_MIGRATION_ACTIVITY_INSTANCE_CLASS_MODEL_RELS,
                 session,
@@ -0,0 +1,63 @@
+import asyncio
+
+from ..utils.http_client import AdaptiveLimiter, retry_delay, should_retry
+from ..utils.metrics import Metrics, percentile
+
+
+def test_should_retry():
+    assert should_retry("GET", 502)
+    assert should_retry("POST", 503)
+    assert should_retry("POST", 429)
+    assert not should_retry("POST", 502)
+    assert not should_retry("GET", 400)
+    assert should_retry("GET", None)
+    assert not should_retry("POST", None)
+
+
+def test_retry_delay_is_capped():
+    for attempt in range(10):
+        assert 0 <= retry_delay(attempt, base=0.5, cap=2) <= 2
+
+
+def test_limiter_increases_on_fast_success():
+    limiter = AdaptiveLimiter(initial=2, maximum=6, latency_target=1)
+    for _ in range(50):
+        limiter.record(0.01, True)
+    assert limiter.limit == 6
+
+
+def test_limiter_decreases_on_failure():
+    limiter = AdaptiveLimiter(initial=8, maximum=8, latency_target=1)
+    limiter.record(0.01, False)
+    assert limiter.limit == 4
+    # Repeated failures within the same interval only back off once
+    limiter.record(0.01, False)
+    assert limiter.limit == 4
+
+
+def test_limiter_bounds_concurrency():
+    limiter = AdaptiveLimiter(initial=3, maximum=3)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.slot() as outcome:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.001)
+            outcome["status"] = 200
+
+    async def run_all():
+        await asyncio.gather(*[call() for _ in range(30)])
+
+    asyncio.run(run_all())
+    assert peak == 3
+    assert limiter.in_flight == 0
+
+
+def test_latency_percentiles():
+    assert percentile([], 50) is None
+    metrics = Metrics()
+    for i in range(1, 101):
+        metrics.record_latency("/ct/terms--GET", i / 100)
+    result = metrics.latency_percentiles("/ct/terms--GET")
+    assert result == {"p50": 0.5, "p90": 0.9, "p99": 0.99}
@@ -0,0 +1,163 @@
+import json
+import threading
+import time
+
+import pytest
+
+from ..utils.metrics import Metrics
+from ..utils.scheduler import ImportStep, StepScheduler
+
+events = []
+events_lock = threading.Lock()
+
+
+class FakeCache:
+    def __init__(self, built_by):
+        self.built_by = built_by
+        self.added_terms = {}
+
+    def copy(self):
+        cache = FakeCache(self.built_by)
+        cache.added_terms = dict(self.added_terms)
+        return cache
+
+
+def make_importer(name, duration=0.01, fail=False):
+    class FakeImporter:
+        def __init__(self, metrics_inst=None, cache=None):
+            self.cache = cache
+
+        def run(self):
+            with events_lock:
+                events.append(("start", name))
+            time.sleep(duration)
+            if fail:
+                raise RuntimeError(f"{name} failed")
+            with events_lock:
+                events.append(("end", name))
+
+        def get_cache(self):
+            return FakeCache(name)
+
+    return FakeImporter
+
+
+@pytest.fixture(autouse=True)
+def clear_events():
+    events.clear()
+
+
+def test_steps_run_after_their_prerequisites():
+    steps = [
+        ImportStep("a", make_importer("a", 0.05)),
+        ImportStep("b", make_importer("b", 0.05)),
+        ImportStep("c", make_importer("c"), requires=["a", "b"]),
+    ]
+    StepScheduler(steps, Metrics(), max_parallel=2).run()
+    # a and b run concurrently, c only starts when both are done
+    assert events.index(("start", "b")) < events.index(("end", "a"))
+    assert events.index(("start", "c")) > events.index(("end", "a"))
+    assert events.index(("start", "c")) > events.index(("end", "b"))
+
+
+def test_cache_is_handed_to_consumers():
+    received = {}
+
+    class Consumer:
+        def __init__(self, metrics_inst=None, cache=None):
+            received["cache"] = cache
+
+        def run(self):
+            pass
+
+    steps = [
+        ImportStep("provider", make_importer("provider"), provides_cache=True),
+        ImportStep("consumer", Consumer, requires=["provider"], uses_cache=True),
+    ]
+    StepScheduler(steps, Metrics()).run()
+    assert received["cache"].built_by == "provider"
+
+
+def test_parallel_steps_get_their_own_cache():
+    received = {}
+
+    def make_consumer(name, term):
+        class Consumer:
+            def __init__(self, metrics_inst=None, cache=None):
+                self.cache = cache
+                received[name] = cache
+
+            def run(self):
+                time.sleep(0.02)
+                self.cache.added_terms[term] = name
+
+        return Consumer
+
+    steps = [
+        ImportStep("provider", make_importer("provider"), provides_cache=True),
+        ImportStep(
+            "a", make_consumer("a", "A"), requires=["provider"], uses_cache=True
+        ),
+        ImportStep(
+            "b", make_consumer("b", "B"), requires=["provider"], uses_cache=True
+        ),
+        ImportStep("c", make_consumer("c", "C"), requires=["a", "b"], uses_cache=True),
+    ]
+    scheduler = StepScheduler(steps, Metrics(), max_parallel=2)
+    scheduler.run()
+    # a and b ran at the same time on copies, c sees the terms added by both
+    assert received["a"] is not received["b"]
+    assert received["a"].added_terms == {"A": "a"}
+    assert received["b"].added_terms == {"B": "b"}
+    assert received["c"].added_terms == {"A": "a", "B": "b", "C": "c"}
+    assert scheduler.cache.added_terms == {"A": "a", "B": "b", "C": "c"}
+
+
+def test_cache_is_rebuilt_when_resuming(tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    checkpoint.write_text(json.dumps({"completed": ["provider"]}), encoding="utf-8")
+    received = {}
+
+    class Consumer:
+        def __init__(self, metrics_inst=None, cache=None):
+            received["cache"] = cache
+
+        def run(self):
+            pass
+
+    steps = [
+        ImportStep("provider", make_importer("provider"), provides_cache=True),
+        ImportStep("consumer", Consumer, requires=["provider"], uses_cache=True),
+    ]
+    StepScheduler(steps, Metrics(), checkpoint_file=str(checkpoint)).run()
+    assert ("start", "provider") not in events
+    assert received["cache"].built_by == "provider"
+
+
+def test_invalid_dependencies_are_rejected():
+    with pytest.raises(ValueError):
+        StepScheduler([ImportStep("a", make_importer("a"), requires=["b"])], Metrics())
+    with pytest.raises(ValueError):
+        StepScheduler([ImportStep("a", make_importer("a"), uses_cache=True)], Metrics())
+
+
+def test_failed_import_resumes_from_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    steps = [
+        ImportStep("a", make_importer("a")),
+        ImportStep("b", make_importer("b", fail=True), requires=["a"]),
+        ImportStep("c", make_importer("c"), requires=["b"]),
+    ]
+    metrics = Metrics()
+    with pytest.raises(RuntimeError):
+        StepScheduler(steps, metrics, checkpoint_file=checkpoint).run()
+    with open(checkpoint, encoding="utf-8") as f:
+        assert json.load(f) == {"completed": ["a"]}
+    assert ("start", "c") not in events
+    assert "b" in metrics.step_times
+
+    events.clear()
+    steps[1] = ImportStep("b", make_importer("b"), requires=["a"])
+    StepScheduler(steps, Metrics(), checkpoint_file=checkpoint).run()
+    assert [name for kind, name in events if kind == "start"] == ["b", "c"]
+    assert not (tmp_path / "checkpoint.json").exists()
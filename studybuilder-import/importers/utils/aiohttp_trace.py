@@ -1,26 +1,33 @@
 import aiohttp
 
 
-def request_tracer(results_collector):
+def request_tracer(metrics):
+    """Trace config that reports the latency of every request
+    to the `record_latency` method of the given metrics instance."""
+
     async def on_request_start(
         session: aiohttp.ClientSession, context, params: aiohttp.TraceRequestStartParams
     ):
         context.on_request_start = session.loop.time()
-        context.method = params.method
-        context.url = params.url
 
     async def on_request_end(
         session: aiohttp.ClientSession, context, params: aiohttp.TraceRequestEndParams
     ):
         total = session.loop.time() - context.on_request_start
-        context.on_request_end = total
-        context.status = params.response.status
-        context.response = await params.response.text()
-        print(context)
+        metrics.record_latency(f"{params.url.path}--{params.method}", total)
+
+    async def on_request_exception(
+        session: aiohttp.ClientSession,
+        context,
+        params: aiohttp.TraceRequestExceptionParams,
+    ):
+        total = session.loop.time() - context.on_request_start
+        metrics.record_latency(f"{params.url.path}--{params.method}", total)
 
     trace_config = aiohttp.TraceConfig()
 
     trace_config.on_request_start.append(on_request_start)
     trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
 
     return trace_config
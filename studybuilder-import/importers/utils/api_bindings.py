@@ -6,11 +6,20 @@ import math
 import sys
 import time
 from typing import Sequence
+from urllib.parse import urlsplit
 
 import aiohttp
 import requests
 
 from importers.functions.caselessdict import CaselessDict
+from importers.utils.http_client import (
+    API_LIMITER,
+    MAX_RETRIES,
+    create_client_session,
+    create_pooled_session,
+    retry_delay,
+    should_retry,
+)
 from importers.utils.metrics import Metrics
 from importers.utils.path_join import path_join
 
@@ -111,7 +120,8 @@ class ApiBinding:
             self.metrics = Metrics()
         else:
             self.metrics = metrics
-        self.sem = asyncio.Semaphore(8)
+        self.session = create_pooled_session()
+        self.limiter = API_LIMITER
         if logger is not None:
             self.log = logger
         else:
@@ -125,6 +135,88 @@ class ApiBinding:
     def update_headers(self, api_headers):
         self.api_headers = api_headers
 
+    def client_session(self) -> aiohttp.ClientSession:
+        """Create a keep-alive aiohttp session for the async api calls,
+        with latencies reported to the metrics of this binding."""
+        return create_client_session(self.metrics)
+
+    # ---------------------------------------------------------------
+    # Request helpers, using the pooled session and retrying with jitter
+    # ---------------------------------------------------------------
+    #
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("headers", self.api_headers)
+        metrics_key = f"{urlsplit(url).path}--{method}"
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.ConnectionError as e:
+                self.metrics.record_latency(metrics_key, time.monotonic() - start)
+                connect_failed = isinstance(e, requests.ConnectTimeout)
+                if attempt >= MAX_RETRIES or not (
+                    connect_failed or should_retry(method, None)
+                ):
+                    raise
+                self.log.warning("%s %s failed: %s, retrying", method, url, e)
+            else:
+                self.metrics.record_latency(metrics_key, time.monotonic() - start)
+                if attempt >= MAX_RETRIES or not should_retry(
+                    method, response.status_code
+                ):
+                    return response
+                self.log.warning(
+                    "%s %s returned %s, retrying", method, url, response.status_code
+                )
+            self.metrics.icrement(metrics_key + "-Retry")
+            time.sleep(retry_delay(attempt))
+            attempt += 1
+
+    async def _request_async(
+        self,
+        method: str,
+        url: str,
+        session: aiohttp.ClientSession,
+        body: dict | None = None,
+    ):
+        """
+        Send an async request within the adaptive concurrency limit.
+        Returns the status, the decoded json (None if the response was not json)
+        and the response text.
+        """
+        attempt = 0
+        while True:
+            async with self.limiter.slot() as outcome:
+                try:
+                    async with session.request(
+                        method, url, json=body, headers=self.api_headers
+                    ) as response:
+                        outcome["status"] = response.status
+                        text = await response.text()
+                        try:
+                            result = await response.json()
+                        except (aiohttp.ContentTypeError, json.JSONDecodeError):
+                            result = None
+                except aiohttp.ClientConnectionError as e:
+                    connect_failed = isinstance(e, aiohttp.ClientConnectorError)
+                    if attempt >= MAX_RETRIES or not (
+                        connect_failed or should_retry(method, None)
+                    ):
+                        raise
+                    self.log.warning("%s %s failed: %s, retrying", method, url, e)
+                else:
+                    if attempt >= MAX_RETRIES or not should_retry(
+                        method, response.status
+                    ):
+                        return response.status, result, text
+                    self.log.warning(
+                        "%s %s returned %s, retrying", method, url, response.status
+                    )
+            self.metrics.icrement(f"{urlsplit(url).path}--{method}-Retry")
+            await asyncio.sleep(retry_delay(attempt))
+            attempt += 1
+
     # ---------------------------------------------------------------
     # Verify connection to api (and database)
     # ---------------------------------------------------------------
@@ -133,8 +225,10 @@ class ApiBinding:
     # TODO Replace with api health check resource ...
     def verify_connection(self):
         try:
-            response = requests.get(
-                path_join(self.api_base_url, "openapi.json"), headers=self.api_headers
+            response = self._request(
+                "GET",
+                path_join(self.api_base_url, "openapi.json"),
+                headers=self.api_headers,
             )
             response.raise_for_status()
         except Exception as e:
@@ -171,8 +265,8 @@ class ApiBinding:
     def simple_delete(self, path, simple_path=None):
         if simple_path is None:
             simple_path = path
-        response = requests.delete(
-            path_join(self.api_base_url, path), headers=self.api_headers
+        response = self._request(
+            "DELETE", path_join(self.api_base_url, path), headers=self.api_headers
         )
         if response.ok:
             self.metrics.icrement(simple_path + "--DELETE")
@@ -187,7 +281,8 @@ class ApiBinding:
     def simple_post_to_api(self, path, body, simple_path=None, params=None):
         if simple_path is None:
             simple_path = path
-        response = requests.post(
+        response = self._request(
+            "POST",
             path_join(self.api_base_url, path),
             headers=self.api_headers,
             json=body,
@@ -220,15 +315,19 @@ class ApiBinding:
 
     def post_to_api(self, object, body=None, path=None):
         if path is None:
-            response = requests.post(
+            response = self._request(
+                "POST",
                 path_join(self.api_base_url, object["path"]),
                 headers=self.api_headers,
                 json=object["body"],
             )
             path = object["path"]
         else:
-            response = requests.post(
-                path_join(self.api_base_url, path), headers=self.api_headers, json=body
+            response = self._request(
+                "POST",
+                path_join(self.api_base_url, path),
+                headers=self.api_headers,
+                json=body,
             )
         short_path = "".join([i for i in path if not i.isdigit()])
 
@@ -264,7 +363,7 @@ class ApiBinding:
 
     def patch_to_api(self, body, path):
         url = path_join(self.api_base_url, path, body["uid"])
-        response = requests.patch(url, headers=self.api_headers, json=body)
+        response = self._request("PATCH", url, headers=self.api_headers, json=body)
         if response.ok:
             self.metrics.icrement(path + "--Patch")
             self.log.info("Patch %s %s", path, "success")
@@ -284,7 +383,7 @@ class ApiBinding:
 
     def approve_item(self, uid: str, url: str):
         full_url = path_join(self.api_base_url, url, uid, "approvals")
-        response = requests.post(full_url, headers=self.api_headers)
+        response = self._request("POST", full_url, headers=self.api_headers)
         if not response.ok:
             self.log.warning("Failed to approve %s %s", uid, response.content)
             return None
@@ -293,12 +392,12 @@ class ApiBinding:
 
     def approve_item_names_and_attributes(self, uid: str, url: str):
         full_url = path_join(self.api_base_url, url, uid, "names/approvals")
-        response = requests.post(full_url, headers=self.api_headers)
+        response = self._request("POST", full_url, headers=self.api_headers)
         if not response.ok:
             self.log.warning("Failed to approve names %s %s", uid, response.content)
             return False
         full_url = path_join(self.api_base_url, url, uid, "attributes/approvals")
-        response = requests.post(full_url, headers=self.api_headers)
+        response = self._request("POST", full_url, headers=self.api_headers)
         if not response.ok:
             self.log.warning(
                 "Failed to approve attributes %s %s", uid, response.content
@@ -320,8 +419,11 @@ class ApiBinding:
             if "page_number" not in params:
                 params["page_number"] = 1
 
-        response = requests.get(
-            path_join(self.api_base_url, path), params=params, headers=self.api_headers
+        response = self._request(
+            "GET",
+            path_join(self.api_base_url, path),
+            params=params,
+            headers=self.api_headers,
         )
 
         if response.ok:
@@ -432,8 +534,8 @@ class ApiBinding:
         return identifiers
 
     def get_libraries(self):
-        response = requests.get(
-            path_join(self.api_base_url, "libraries"), headers=self.api_headers
+        response = self._request(
+            "GET", path_join(self.api_base_url, "libraries"), headers=self.api_headers
         )
         response.raise_for_status()
         libs = response.json()
@@ -443,7 +545,8 @@ class ApiBinding:
 
     def create_library(self, object):
         self.metrics.icrement("/libraries")
-        response = requests.post(
+        response = self._request(
+            "POST",
             path_join(self.api_base_url, "libraries"),
             headers=self.api_headers,
             json=object,
@@ -460,7 +563,8 @@ class ApiBinding:
             }
         else:
             params = {"codelist_name": codelist_name, "page_number": 1, "page_size": 0}
-        response = requests.get(
+        response = self._request(
+            "GET",
             path_join(self.api_base_url, "ct/terms"),
             params=params,
             headers=self.api_headers,
@@ -471,7 +575,8 @@ class ApiBinding:
 
     # Get all terms from a codelist identified by codelist uid
     def get_terms_for_codelist_uid(self, codelist_uid: str):
-        response = requests.get(
+        response = self._request(
+            "GET",
             path_join(self.api_base_url, "ct/terms"),
             params={"codelist_uid": codelist_uid, "page_number": 1, "page_size": 0},
             headers=self.api_headers,
@@ -482,7 +587,8 @@ class ApiBinding:
 
     def get_filtered_terms(self, filters: dict):
         filters = json.dumps(filters)
-        response = requests.get(
+        response = self._request(
+            "GET",
             self.api_base_url + "/ct/terms/attributes",
             params={
                 "page_number": 1,
@@ -508,7 +614,8 @@ class ApiBinding:
                 "op": "eq",
             }
         filters = json.dumps(filters_dict)
-        response = requests.get(
+        response = self._request(
+            "GET",
             self.api_base_url + "/ct/terms/attributes",
             params={
                 "library_name": "CDISC",
@@ -524,7 +631,8 @@ class ApiBinding:
 
     # Get all dictionary mapping all codelist names to a uid
     def get_code_lists_uids(self):
-        response = requests.get(
+        response = self._request(
+            "GET",
             path_join(
                 self.api_base_url, "ct/codelists/names?page_number=1&page_size=0"
             ),
@@ -599,7 +707,8 @@ class ApiBinding:
             "page_number": 1,
             "page_size": 0,
         }
-        response = requests.get(
+        response = self._request(
+            "GET",
             path_join(self.api_base_url, "studies", study_uid, "study-objectives"),
             headers=self.api_headers,
             params=params,
@@ -616,8 +725,11 @@ class ApiBinding:
             "page_number": 1,
             "page_size": 0,
         }
-        response = requests.get(
-            path_join(self.api_base_url, path), headers=self.api_headers, params=params
+        response = self._request(
+            "GET",
+            path_join(self.api_base_url, path),
+            headers=self.api_headers,
+            params=params,
         )
         response.raise_for_status()
         result = response.json()
@@ -629,7 +741,8 @@ class ApiBinding:
 
     def find_object_by_key(self, name, path, key="name"):
         params = {"filters": '{"' + key + '":{"v":["' + name + '"],"op":"eq"}}'}
-        response = requests.get(
+        response = self._request(
+            "GET",
             path_join(self.api_base_url, path),
             params=params,
             headers=self.api_headers,
@@ -641,7 +754,8 @@ class ApiBinding:
 
     # Find the uid for a dictionary from its name
     def find_dictionary_uid(self, name):
-        response = requests.get(
+        response = self._request(
+            "GET",
             path_join(self.api_base_url, "dictionaries/codelists"),
             params={"library_name": name},
             headers=self.api_headers,
@@ -654,7 +768,8 @@ class ApiBinding:
 
     # Find a term via its name from a dictionary
     def find_dictionary_item_uid_from_name(self, dict_uid, name):
-        response = requests.get(
+        response = self._request(
+            "GET",
             path_join(self.api_base_url, "dictionaries/terms"),
             params={
                 "codelist_uid": dict_uid,
@@ -674,8 +789,11 @@ class ApiBinding:
             "page_number": 1,
             "page_size": 0,
         }
-        response = requests.get(
-            path_join(self.api_base_url, path), headers=self.api_headers, params=params
+        response = self._request(
+            "GET",
+            path_join(self.api_base_url, path),
+            headers=self.api_headers,
+            params=params,
         )
         response.raise_for_status()
         result = response.json()
@@ -688,7 +806,7 @@ class ApiBinding:
 
     def simple_approve(self, path: str):
         path = path_join(self.api_base_url, path)
-        res = requests.post(path, headers=self.api_headers)
+        res = self._request("POST", path, headers=self.api_headers)
         if not res.ok:
             self.log.warning("Failed to approve %s", path)
             return False
@@ -697,7 +815,9 @@ class ApiBinding:
 
     def simple_approve2(self, url: str, path: str, label=""):
         url = path_join(url, path)
-        res = requests.post(path_join(self.api_base_url, url), headers=self.api_headers)
+        res = self._request(
+            "POST", path_join(self.api_base_url, url), headers=self.api_headers
+        )
         if not res.ok:
             self.log.warning("Failed to approve %s", url)
             self.metrics.icrement(f"{url}--{label}ApproveError")
@@ -708,7 +828,7 @@ class ApiBinding:
 
     def simple_patch(self, body, url, path):
         full_url = path_join(self.api_base_url, url)
-        response = requests.patch(full_url, headers=self.api_headers, json=body)
+        response = self._request("PATCH", full_url, headers=self.api_headers, json=body)
         if response.ok:
             self.metrics.icrement(path + "--Patch")
             self.log.info("Patch %s %s", path, "success")
@@ -736,56 +856,34 @@ class ApiBinding:
     # ---------------------------------------------------------------
     #
     async def new_version_to_api_async(self, path: str, session: aiohttp.ClientSession):
-        async with session.post(
-            path_join(self.api_base_url, path), json={}, headers=self.api_headers
-        ) as response:
-            status = response.status
-            try:
-                result = await response.json()
-            except aiohttp.ContentTypeError:
-                textresult = await response.text()
-                result = {}
-                self.log.error(
-                    f"Failed to post to '{path}', status: {status}, message: {textresult}"
-                )
-            return status, result
+        status, result, text = await self._request_async(
+            "POST", path_join(self.api_base_url, path), session, body={}
+        )
+        if result is None:
+            result = {}
+            self.log.error(
+                f"Failed to post to '{path}', status: {status}, message: {text}"
+            )
+        return status, result
 
     async def patch_to_api_async(
         self, path: str, body: dict, session: aiohttp.ClientSession
     ):
-        async with session.patch(
-            path_join(self.api_base_url, path), json=body, headers=self.api_headers
-        ) as response:
-            status = response.status
-
-            if status == 405:
-                async with session.put(
-                    path_join(self.api_base_url, path),
-                    json=body,
-                    headers=self.api_headers,
-                ) as response:
-                    status = response.status
-
-                    try:
-                        result = await response.json()
-                    except aiohttp.ContentTypeError:
-                        textresult = await response.text()
-                        result = {}
-                        self.log.error(
-                            f"Failed to patch to '{path}', status: {status}, message: {textresult}"
-                        )
-                    return status, result
-            try:
-                result = await response.json()
-            except aiohttp.ContentTypeError:
-                textresult = await response.text()
-                result = {}
-                self.log.error(
-                    f"Failed to patch to '{path}', status: {status}, message: {textresult}"
-                )
-            return status, result
+        url = path_join(self.api_base_url, path)
+        status, result, text = await self._request_async(
+            "PATCH", url, session, body=body
+        )
+        if status == 405:
+            status, result, text = await self._request_async(
+                "PUT", url, session, body=body
+            )
+        if result is None:
+            result = {}
+            self.log.error(
+                f"Failed to patch to '{path}', status: {status}, message: {text}"
+            )
+        return status, result
 
-    # This gives reasonable waiting for lock on atomic incrementing of identifiers
     async def post_to_api_async(
         self,
         url: str,
@@ -793,75 +891,51 @@ class ApiBinding:
         session: aiohttp.ClientSession,
         logfile_name: str | None = None,
     ):
-        async with self.sem:
-            async with session.post(
-                path_join(self.api_base_url, url), json=body, headers=self.api_headers
-            ) as response:
-                status = response.status
-                try:
-                    result = await response.json()
-                    if logfile_name and status not in [200, 201]:
-                        with open(logfile_name, "a") as logfile:
-                            logfile.write(
-                                (
-                                    f"Failed to post to '{url}', status: {status}, "
-                                    f"message: {result['message'] if 'message' in result else result['detail']}, body: {body}\n"
-                                )
-                            )
-                except aiohttp.ContentTypeError:
-                    textresult = await response.text()
-                    result = {}
-                    self.log.error(
-                        f"Failed to post to '{url}', status: {status}, message: {textresult}"
+        status, result, text = await self._request_async(
+            "POST", path_join(self.api_base_url, url), session, body=body
+        )
+        if result is None:
+            result = {}
+            self.log.error(
+                f"Failed to post to '{url}', status: {status}, message: {text}"
+            )
+        elif logfile_name and status not in [200, 201]:
+            with open(logfile_name, "a") as logfile:
+                logfile.write(
+                    (
+                        f"Failed to post to '{url}', status: {status}, "
+                        f"message: {result['message'] if 'message' in result else result['detail']}, body: {body}\n"
                     )
-                return status, result
+                )
+        return status, result
 
     async def approve_async(self, url: str, session: aiohttp.ClientSession):
-        async with session.post(
-            path_join(self.api_base_url, url), json={}, headers=self.api_headers
-        ) as response:
-            status = response.status
-            if response.ok:
-                result = await response.json()
-            else:
-                try:
-                    error_result = await response.json()
-                    error_message = get_error_message(error_result)
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                self.log.warning(
-                    f"Failed to approve {url}, status: {status}, message: {error_message}"
-                )
-                result = {}
-            return status, result
+        status, result, text = await self._request_async(
+            "POST", path_join(self.api_base_url, url), session, body={}
+        )
+        if not status_ok(status):
+            error_message = get_error_message(result) if result is not None else text
+            self.log.warning(
+                f"Failed to approve {url}, status: {status}, message: {error_message}"
+            )
+            result = {}
+        return status, result
 
     async def approve_item_async(
         self, uid: str, url: str, session: aiohttp.ClientSession
     ):
         url = path_join(self.api_base_url, url, uid, "approvals")
-        async with session.post(
-            url,
-            json={},
-            headers=self.api_headers,
-        ) as response:
-            status = response.status
-            if response.ok:
-                result = await response.json()
-            else:
-                try:
-                    error_result = await response.json()
-                    error_message = get_error_message(error_result)
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                self.log.warning(
-                    f"Failed to approve {url}, status: {status}, message: {error_message}"
-                )
-                result = {}
-            if not response.ok:
-                self.metrics.icrement(url + "--ApproveError")
-            else:
-                self.metrics.icrement(url + "--Approve")
-            return status, result
+        status, result, text = await self._request_async("POST", url, session, body={})
+        if not status_ok(status):
+            error_message = get_error_message(result) if result is not None else text
+            self.log.warning(
+                f"Failed to approve {url}, status: {status}, message: {error_message}"
+            )
+            result = {}
+            self.metrics.icrement(url + "--ApproveError")
+        else:
+            self.metrics.icrement(url + "--Approve")
+        return status, result
 
     async def post_then_approve(
         self, data: dict, session: aiohttp.ClientSession, approve: bool
@@ -890,7 +964,7 @@ class ApiBinding:
         uid = response.get("uid")
         if approve is True and uid is not None:
             # Sleeping to avoid errors when running locally (with limited resources for the db).
-            time.sleep(SLEEP_BEFORE_APPROVE)
+            await asyncio.sleep(SLEEP_BEFORE_APPROVE)
             self.log.info(f"Approve object with uid '{uid}'")
             status, result = await self.approve_item_async(
                 uid=uid, url=data["approve_path"], session=session
@@ -924,7 +998,7 @@ class ApiBinding:
         uid = response.get("uid")
         if approve and uid is not None:
             # Sleeping to avoid errors when running locally (with limited resources for the db).
-            time.sleep(SLEEP_BEFORE_APPROVE)
+            await asyncio.sleep(SLEEP_BEFORE_APPROVE)
             status, reponse = await self.approve_item_async(
                 uid=response.get("uid"), url=data["approve_path"], session=session
             )
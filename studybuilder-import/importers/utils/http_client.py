@@ -0,0 +1,176 @@
+import asyncio
+import collections
+import contextlib
+import random
+import threading
+import time
+from os import environ
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from importers.utils.aiohttp_trace import request_tracer
+
+# Statuses where the api refused the request before doing any work,
+# these are safe to retry for any method.
+RETRY_ANY_METHOD_STATUSES = {429, 503}
+# Statuses that are only retried for idempotent methods,
+# since the request may have been (partly) processed.
+RETRY_IDEMPOTENT_STATUSES = {500, 502, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+MAX_RETRIES = int(environ.get("API_MAX_RETRIES", "4"))
+RETRY_BASE_DELAY = float(environ.get("API_RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(environ.get("API_RETRY_MAX_DELAY", "10"))
+POOL_SIZE = int(environ.get("API_POOL_SIZE", "32"))
+INITIAL_CONCURRENCY = float(environ.get("API_INITIAL_CONCURRENCY", "4"))
+MAX_CONCURRENCY = int(environ.get("API_MAX_CONCURRENCY", "16"))
+LATENCY_TARGET = float(environ.get("API_LATENCY_TARGET", "2.0"))
+
+
+def should_retry(method: str, status: int | None) -> bool:
+    """Return True if a request with the given method and status may be retried.
+    A status of None means that the connection broke without a response,
+    which is only retried for idempotent methods.
+    Callers may always retry when the connection could not be established at all.
+    """
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    if status is None:
+        return idempotent
+    if status in RETRY_ANY_METHOD_STATUSES:
+        return True
+    return status in RETRY_IDEMPOTENT_STATUSES and idempotent
+
+
+def retry_delay(attempt: int, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY) -> float:
+    """Exponential backoff with full jitter, attempt counts from 0"""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def create_pooled_session(pool_size=POOL_SIZE) -> requests.Session:
+    """Create a requests session that keeps connections to the api alive
+    and reuses them for all synchronous calls.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limiter for the api calls, using
+    additive increase / multiplicative decrease (AIMD).
+
+    The limit grows by roughly one slot per window of successful calls
+    that complete within the latency target.
+    A failed call (5xx, connection error) or a slow call shrinks the limit
+    by the backoff factor, at most once per latency target interval
+    so that a burst of failures does not collapse the limit to the minimum at once.
+
+    A single limiter is shared by all importer steps, also when they run
+    in parallel threads with one event loop each.
+    Waiters are therefore queued with a thread safe handoff,
+    each one waiting on a future of its own loop.
+    Synchronous calls are not limited, there is at most one in flight per step.
+    """
+
+    def __init__(
+        self,
+        initial=INITIAL_CONCURRENCY,
+        minimum=1,
+        maximum=MAX_CONCURRENCY,
+        latency_target=LATENCY_TARGET,
+        backoff=0.5,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._waiters = collections.deque()
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            if ok and latency <= self.latency_target:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            else:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.latency_target:
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self._last_decrease = now
+            self._wake_waiters()
+
+    def _wake_waiters(self):
+        # Must be called with the lock held
+        while self._waiters and self.in_flight < int(self.limit):
+            loop, future = self._waiters.popleft()
+            self.in_flight += 1
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def _release(self, start: float, status: int | None):
+        self.record(time.monotonic() - start, status is not None and status < 500)
+        with self._lock:
+            self.in_flight -= 1
+            self._wake_waiters()
+
+    async def _acquire_async(self):
+        with self._lock:
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+                else:
+                    # The slot was handed over while we were cancelled, give it back
+                    self.in_flight -= 1
+                    self._wake_waiters()
+            raise
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Wait for a free slot, yields a dict where the caller
+        stores the response status under "status".
+        """
+        await self._acquire_async()
+        outcome = {"status": None}
+        start = time.monotonic()
+        try:
+            yield outcome
+        finally:
+            self._release(start, outcome["status"])
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+# Shared by all api bindings, so that parallel import steps
+# stay within one global concurrency budget
+API_LIMITER = AdaptiveLimiter()
+
+
+def create_client_session(metrics=None, pool_size=POOL_SIZE) -> aiohttp.ClientSession:
+    """Create an aiohttp session with a keep-alive connection pool,
+    with request latencies reported to the given metrics instance.
+    """
+    trace_configs = [request_tracer(metrics)] if metrics is not None else []
+    connector = aiohttp.TCPConnector(limit=pool_size, keepalive_timeout=30)
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(None),
+        connector=connector,
+        trace_configs=trace_configs,
+    )
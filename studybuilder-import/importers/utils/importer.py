@@ -64,6 +64,15 @@ class TermCache:
         )
         self.added_terms = CaselessDict()
 
+    def copy(self):
+        """
+        Copy for an import step running next to other steps.
+        The terms read from the api are shared, the terms added by the step are kept in the copy.
+        """
+        cache = copy.copy(self)
+        cache.added_terms = CaselessDict(self.added_terms)
+        return cache
+
 
 # Decorator to avoid starting every function with the open() context manager
 def open_file():
@@ -1,11 +1,26 @@
+import math
 import re
+import threading
+
+
+def percentile(sorted_values: list, pct: float):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
 
 
 class Metrics:
     metrics: dict
+    latencies: dict
+    step_times: dict
 
     def __init__(self):
         self.metrics = dict()
+        self.latencies = dict()
+        self.step_times = dict()
+        self._lock = threading.Lock()
 
     def simplify_path(self, path: str):
         parts = path.rsplit("--", 1)
@@ -21,7 +36,49 @@ class Metrics:
 
     def icrement(self, key: str, increment: int = 1):
         key = self.simplify_path(key)
-        self.metrics[key] = self.metrics.get(key, 0) + increment
+        with self._lock:
+            self.metrics[key] = self.metrics.get(key, 0) + increment
+
+    def record_step(self, name: str, seconds: float):
+        self.step_times[name] = seconds
+
+    def print_step_times(self):
+        print("----------------------------------------")
+        print("Import steps, seconds")
+        print("----------------------------------------")
+        for name, seconds in self.step_times.items():
+            print("{}:{:.1f}".format(name, seconds))
+        print("----------------------------------------")
+
+    def record_latency(self, key: str, seconds: float):
+        key = self.simplify_path(key)
+        with self._lock:
+            self.latencies.setdefault(key, []).append(seconds)
+
+    def latency_percentiles(self, key: str, percentiles=(50, 90, 99)):
+        key = self.simplify_path(key)
+        with self._lock:
+            values = sorted(self.latencies.get(key, []))
+        return {f"p{pct}": percentile(values, pct) for pct in percentiles}
+
+    def print_latencies(self):
+        print("----------------------------------------")
+        print("Latencies per endpoint, seconds (count, p50, p90, p99, max)")
+        print("----------------------------------------")
+        for key in sorted(self.latencies):
+            with self._lock:
+                values = sorted(self.latencies[key])
+            print(
+                "{}:{} {:.3f} {:.3f} {:.3f} {:.3f}".format(
+                    key,
+                    len(values),
+                    percentile(values, 50),
+                    percentile(values, 90),
+                    percentile(values, 99),
+                    values[-1],
+                )
+            )
+        print("----------------------------------------")
 
     def print(self, sort_by_number=False):
         print("----------------------------------------")
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger("legacy_mdr_migrations - scheduler")
+
+
+class ImportStep:
+    """
+    One step of the full import.
+
+    `requires` lists the names of the steps that must have completed before this one starts.
+    A step with `provides_cache` hands its term cache over to the steps with `uses_cache`,
+    which must (directly or indirectly) require it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        importer,
+        requires=(),
+        provides_cache=False,
+        uses_cache=False,
+    ):
+        self.name = name
+        self.importer = importer
+        self.requires = tuple(requires)
+        self.provides_cache = provides_cache
+        self.uses_cache = uses_cache
+
+
+class StepScheduler:
+    """
+    Runs import steps in dependency order, starting every step as soon as
+    its prerequisites are done, with at most `max_parallel` steps at a time.
+    Each step runs in a worker thread with an event loop of its own,
+    all steps share the api concurrency budget of the api bindings.
+
+    Each step using the term cache gets a copy of it, so that steps running at the same time
+    never update the same cache. The terms added by a step are merged back into the shared cache
+    when the step completes, for the steps that depend on it.
+    When resuming after the step providing the cache, the cache is rebuilt from the api.
+
+    The names of completed steps are written to the checkpoint file,
+    so that a failed import can be resumed without repeating the completed steps.
+    The checkpoint is removed once all steps have completed.
+    """
+
+    def __init__(self, steps, metrics, max_parallel=4, checkpoint_file=None):
+        self.steps = list(steps)
+        self.metrics = metrics
+        self.max_parallel = max(1, max_parallel)
+        self.checkpoint_file = checkpoint_file
+        self.cache = None
+        self._validate()
+
+    def _validate(self):
+        by_name = {}
+        for step in self.steps:
+            if step.name in by_name:
+                raise ValueError(f"Duplicate import step '{step.name}'")
+            for req in step.requires:
+                if req not in by_name:
+                    raise ValueError(
+                        f"Step '{step.name}' requires '{req}', which must be declared before it"
+                    )
+            by_name[step.name] = step
+        for step in self.steps:
+            if step.uses_cache and not any(
+                by_name[name].provides_cache for name in self.prerequisites(step.name)
+            ):
+                raise ValueError(
+                    f"Step '{step.name}' uses the term cache but does not require a step providing it"
+                )
+
+    def prerequisites(self, name: str) -> set:
+        """All steps that the named step depends on, directly or indirectly"""
+        by_name = {step.name: step for step in self.steps}
+        found = set()
+        pending = list(by_name[name].requires)
+        while pending:
+            req = pending.pop()
+            if req not in found:
+                found.add(req)
+                pending.extend(by_name[req].requires)
+        return found
+
+    def load_checkpoint(self) -> set:
+        if not self.checkpoint_file or not os.path.exists(self.checkpoint_file):
+            return set()
+        with open(self.checkpoint_file, encoding="utf-8") as f:
+            completed = set(json.load(f).get("completed", []))
+        logger.warning(
+            "Resuming import from %s, skipping completed steps: %s",
+            self.checkpoint_file,
+            ", ".join(sorted(completed)),
+        )
+        return completed
+
+    def save_checkpoint(self, completed: list):
+        if not self.checkpoint_file:
+            return
+        tmp_file = self.checkpoint_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"completed": completed}, f, indent=2)
+        os.replace(tmp_file, self.checkpoint_file)
+
+    def clear_checkpoint(self):
+        if self.checkpoint_file and os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+
+    def _run_step(self, step: ImportStep, cache):
+        # The importers drive their async parts with asyncio.get_event_loop(),
+        # worker threads don't have a loop unless one is set.
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        start = time.monotonic()
+        try:
+            importer = step.importer(metrics_inst=self.metrics, cache=cache)
+            importer.run()
+            if step.provides_cache:
+                return importer.get_cache()
+            return cache
+        finally:
+            self.metrics.record_step(step.name, time.monotonic() - start)
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    def _step_cache(self, step: ImportStep):
+        if not step.uses_cache:
+            return None
+        if self.cache is None:
+            # The step providing the cache completed in a previous run
+            provider = next(
+                other
+                for other in self.steps
+                if other.provides_cache and other.name in self.prerequisites(step.name)
+            )
+            logger.warning(
+                "Rebuilding the term cache of import step '%s'", provider.name
+            )
+            self.cache = provider.importer(metrics_inst=self.metrics).get_cache()
+        return self.cache.copy()
+
+    def run(self):
+        completed = [
+            step.name for step in self.steps if step.name in self.load_checkpoint()
+        ]
+        pending = [step for step in self.steps if step.name not in completed]
+        running = {}
+        failures = []
+        with ThreadPoolExecutor(
+            max_workers=self.max_parallel, thread_name_prefix="import-step"
+        ) as pool:
+            while pending or running:
+                if not failures:
+                    ready = [
+                        step
+                        for step in pending
+                        if all(req in completed for req in step.requires)
+                    ]
+                    for step in ready[: self.max_parallel - len(running)]:
+                        logger.warning("Starting import step '%s'", step.name)
+                        cache = self._step_cache(step)
+                        running[pool.submit(self._run_step, step, cache)] = step
+                        pending.remove(step)
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    try:
+                        cache = future.result()
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        logger.error("Import step '%s' failed: %s", step.name, e)
+                        failures.append((step.name, e))
+                        continue
+                    if step.provides_cache:
+                        self.cache = cache
+                    elif step.uses_cache:
+                        self.cache.added_terms.update(cache.added_terms)
+                    completed.append(step.name)
+                    self.save_checkpoint(completed)
+                    logger.warning(
+                        "Finished import step '%s' in %.1f s",
+                        step.name,
+                        self.metrics.step_times[step.name],
+                    )
+        if failures:
+            name, error = failures[0]
+            raise RuntimeError(
+                f"Import step '{name}' failed, rerun to resume from {self.checkpoint_file}"
+            ) from error
+        self.clear_checkpoint()
@@ -1,3 +1,5 @@
+import os
+
 from importers.run_import_activities import Activities
 from importers.run_import_compounds import Compounds
 from importers.run_import_config import Configuration
@@ -12,67 +14,137 @@ from importers.run_import_standardcodelistterms1 import StandardCodelistTerms1
 from importers.run_import_standardcodelistterms2 import StandardCodelistTerms2
 from importers.run_import_unitdefinitions import Units
 from importers.utils.metrics import Metrics
+from importers.utils.scheduler import ImportStep, StepScheduler
 
-
-def main():
-    metr = Metrics()
-
+# The steps of the full import, with the steps each one depends on.
+# Steps without a dependency between them may run in parallel.
+# The term cache is built by Activities, the later steps each get a copy of it.
+IMPORT_STEPS = [
     # Migrate the libraries (SNOMED etc)
-    dictmigrator = Dictionaries(metrics_inst=metr)
-    dictmigrator.run()
-
+    ImportStep("Dictionaries", Dictionaries),
     # General configuration
-    config = Configuration(metrics_inst=metr)
-    config.run()
-
+    ImportStep("Configuration", Configuration),
     # Import standard codelist terms, part 1
-    standardterms1 = StandardCodelistTerms1(metrics_inst=metr)
-    standardterms1.run()
-
+    ImportStep("StandardCodelistTerms1", StandardCodelistTerms1),
     # Import standard codelist terms, part 2
-    standardterms2 = StandardCodelistTerms2(metrics_inst=metr)
-    standardterms2.run()
-
+    ImportStep(
+        "StandardCodelistTerms2",
+        StandardCodelistTerms2,
+        requires=["StandardCodelistTerms1"],
+    ),
     # Import unit definitions
-    units = Units(metrics_inst=metr)
-    units.run()
-
-    activities = Activities(metrics_inst=metr)
-    activities.run()
-    cache = activities.get_cache()
-
+    ImportStep(
+        "Units",
+        Units,
+        requires=["Dictionaries", "StandardCodelistTerms2"],
+    ),
+    ImportStep(
+        "Activities",
+        Activities,
+        requires=["Units"],
+        provides_cache=True,
+    ),
     # Import sponsor models
-    sponsor_models = SponsorModels(metrics_inst=metr, cache=cache)
-    sponsor_models.run()
-
+    ImportStep(
+        "SponsorModels",
+        SponsorModels,
+        requires=["Activities"],
+        uses_cache=True,
+    ),
     # Finish up sponsor library
-    finishing = StandardCodelistFinish(metrics_inst=metr, cache=cache)
-    finishing.run()
-
+    ImportStep(
+        "StandardCodelistFinish",
+        StandardCodelistFinish,
+        requires=["Activities"],
+        uses_cache=True,
+    ),
     # Import compounds
-    compounds = Compounds(metrics_inst=metr, cache=cache)
-    compounds.run()
-
+    ImportStep(
+        "Compounds",
+        Compounds,
+        requires=["StandardCodelistFinish"],
+        uses_cache=True,
+    ),
     # Import crfs
-    crfs = Crfs(metrics_inst=metr, cache=cache)
-    crfs.run()
-
+    ImportStep(
+        "Crfs",
+        Crfs,
+        requires=["Compounds"],
+        uses_cache=True,
+    ),
     # Import mock data
-    mockdata = Mockdata(metrics_inst=metr, cache=cache)
-    mockdata.run()
-
+    ImportStep(
+        "Mockdata",
+        Mockdata,
+        requires=["Configuration", "SponsorModels", "Compounds", "Crfs"],
+        uses_cache=True,
+    ),
     # Import mock data from json
-    mockdatajson = MockdataJson(metrics_inst=metr, cache=cache)
-    mockdatajson.run()
-
+    ImportStep(
+        "MockdataJson",
+        MockdataJson,
+        requires=["Mockdata"],
+        uses_cache=True,
+    ),
     # Import E2E specific data from json
-    mockdatae2e = MockdataJsonE2E(metrics_inst=metr, cache=cache)
-    mockdatae2e.run()
+    ImportStep(
+        "MockdataJsonE2E",
+        MockdataJsonE2E,
+        requires=["MockdataJson"],
+        uses_cache=True,
+    ),
+]
+
+
+def main(max_parallel=4, checkpoint_file="import_checkpoint.json", restart=False):
+    metr = Metrics()
 
-    # Display metrics
-    metr.print_sorted_by_key()
-    metr.print_sorted_by_value()
+    scheduler = StepScheduler(
+        IMPORT_STEPS,
+        metrics=metr,
+        max_parallel=max_parallel,
+        checkpoint_file=checkpoint_file,
+    )
+    if restart:
+        scheduler.clear_checkpoint()
+    try:
+        scheduler.run()
+    finally:
+        # Display metrics
+        metr.print_sorted_by_key()
+        metr.print_sorted_by_value()
+        metr.print_latencies()
+        metr.print_step_times()
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="run_import.py")
+    parser.add_argument(
+        "-p",
+        "--parallel",
+        type=int,
+        default=int(os.environ.get("MDR_MIGRATION_PARALLEL_STEPS", "4")),
+        help="Maximum number of import steps to run at the same time, 1 runs the steps in sequence",
+    )
+    parser.add_argument(
+        "-c",
+        "--checkpoint",
+        default=os.environ.get(
+            "MDR_MIGRATION_CHECKPOINT_FILE", "import_checkpoint.json"
+        ),
+        help="File recording the completed steps, used to resume a failed import",
+    )
+    parser.add_argument(
+        "-r",
+        "--restart",
+        action="store_true",
+        help="Ignore any checkpoint and run all steps",
+    )
+    args = parser.parse_args()
+    main(
+        max_parallel=args.parallel,
+        checkpoint_file=args.checkpoint,
+        restart=args.restart,
+    )